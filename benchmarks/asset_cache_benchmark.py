@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Count datablocks created when many objects use the same files
+
+A project whose images, fonts, and models come from a handful of files is
+blended into the headless stand-in for bpy, once with the asset cache and
+once with a cache which never hits, as before the cache existed. The number
+of images, textures, materials, fonts, and meshes created, and of OBJ
+imports, is reported for each, along with the hit rate of the cache. Each
+object is checked to show files with the same content and the same material
+settings in both. Images are only looked up when a material is missed, as
+materials made from the same image share its datablock.
+
+The stand-in loaders do not decode images or parse models, so the time
+saved in Blender, where every load and import reads its file, is much
+greater than the time reported here.
+
+To run this script, use the following command:
+python3 asset_cache_benchmark.py [--objects N [N ...]] [--files N]
+"""
+
+import os
+import sys
+import time
+import struct
+import shutil
+import tempfile
+import warnings
+import argparse
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Validators warn on every reference check made outside of a project, and
+# pyw3d warns about each Blender module it cannot import
+warnings.simplefilter("ignore")
+from pyw3d import headless
+headless.install()
+import pyw3d.project
+from pyw3d.headless import bpy
+from pyw3d.asset_cache import AssetCache
+from pyw3d.project import W3DProject
+from pyw3d.objects import W3DObject, W3DText, W3DImage, W3DModel
+from pyw3d.placement import W3DPlacement
+
+DATABLOCKS = ("images", "textures", "materials", "fonts", "meshes")
+
+
+class UncachedAssetCache(AssetCache):
+    """Asset cache which never finds a datablock, so that every object
+    loads its own and no objects are linked duplicates"""
+
+    def _get(self, kind, key):
+        self.misses[kind] = self.misses.get(kind, 0) + 1
+        return None
+
+
+class Counter(object):
+    """Count calls of a stand-in operator"""
+
+    def __init__(self, operator):
+        self.operator = operator
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.operator(*args, **kwargs)
+
+
+def write_asset_files(directory, num_files):
+    """Write num_files PNG images, fonts, and OBJ models to directory,
+    with one duplicate of each under another name
+
+    :returns: (image paths, font paths, model paths)"""
+    paths = ([], [], [])
+    for index in range(num_files):
+        image_path = os.path.join(directory, "image{}.png".format(index))
+        with open(image_path, "wb") as image_file:
+            image_file.write(b"\x89PNG\r\n\x1a\n" + struct.pack(
+                ">I4sII", 13, b"IHDR", 64*(index + 1), 32))
+        font_path = os.path.join(directory, "font{}.ttf".format(index))
+        with open(font_path, "w") as font_file:
+            font_file.write("font {}\n".format(index))
+        model_path = os.path.join(directory, "model{}.obj".format(index))
+        with open(model_path, "w") as model_file:
+            model_file.write("o model{0}\nv 0 0 {0}\nv 1 0 0\nv 0 1 0\n"
+                             "f 1 2 3\n".format(index))
+        for kind_paths, path in zip(
+                paths, (image_path, font_path, model_path)):
+            kind_paths.append(path)
+    for kind_paths in paths:
+        root, extension = os.path.splitext(kind_paths[0])
+        copy_path = "{}_copy{}".format(root, extension)
+        shutil.copyfile(kind_paths[0], copy_path)
+        kind_paths.append(copy_path)
+    return paths
+
+
+def asset_project(num_objects, image_paths, font_paths, model_paths):
+    """Return project with equal numbers of images, text objects, and
+    models, cycling through the given files"""
+    project = W3DProject()
+    for index in range(num_objects):
+        kind = index % 3
+        paths = (image_paths, font_paths, model_paths)[kind]
+        path = paths[(index//3) % len(paths)]
+        if kind == 0:
+            content = W3DImage(filename=path)
+        elif kind == 1:
+            content = W3DText(text="Text {}".format(index), font=path)
+        else:
+            content = W3DModel(filename=path)
+        project["objects"].append(W3DObject(
+            name="object{}".format(index),
+            lighting=bool(index % 2),
+            double_sided=bool(index % 5),
+            placement=W3DPlacement(position=(index % 7, 0, -index % 11)),
+            content=content))
+    return project
+
+
+def file_content(filepath):
+    with open(filepath, "rb") as asset_file:
+        return asset_file.read()
+
+
+def object_state(blender_object):
+    """Return description of the content of the files and the material
+    settings shown by blender_object"""
+    material = blender_object.active_material
+    image = None
+    if material.texture_slots:
+        image = file_content(
+            material.texture_slots[0].texture.image.filepath)
+    font = getattr(blender_object.data, "font", None)
+    return (
+        blender_object.type, image, font and file_content(font.filepath),
+        material.use_shadeless,
+        material.game_settings.use_backface_culling,
+        tuple(blender_object.color))
+
+
+def run(project, cache_class):
+    """Return (seconds taken to blend project, number of each kind of
+    datablock, number of OBJ imports, the asset cache, state of each
+    object)"""
+    bpy.read_factory_settings()
+    importer = Counter(bpy.ops.import_scene.obj)
+    bpy.ops.import_scene.obj = importer
+    asset_cache_class = pyw3d.project.AssetCache
+    pyw3d.project.AssetCache = cache_class
+    try:
+        start = time.perf_counter()
+        project.blend()
+        elapsed = time.perf_counter() - start
+    finally:
+        pyw3d.project.AssetCache = asset_cache_class
+        bpy.ops.import_scene.obj = importer.operator
+    states = {
+        blender_object.name: object_state(blender_object)
+        for blender_object in bpy.data.objects
+        if blender_object.name.startswith("object_")}
+    counts = [len(getattr(bpy.data, name)) for name in DATABLOCKS]
+    return elapsed, counts, importer.calls, project.asset_cache, states
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark sharing of datablocks loaded from files")
+    parser.add_argument(
+        "--objects", type=int, nargs="+", default=[30, 300, 1000],
+        help="Numbers of objects")
+    parser.add_argument(
+        "--files", type=int, default=3,
+        help="Number of distinct files of each kind")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        paths = write_asset_files(directory, args.files)
+        for num_objects in args.objects:
+            project = asset_project(num_objects, *paths)
+            uncached = run(project, UncachedAssetCache)
+            cached = run(project, AssetCache)
+            assert uncached[4] == cached[4]
+            print("{} objects".format(num_objects))
+            print("{:>10}  {}    imports".format("", " ".join(
+                "{:>9}".format(name) for name in DATABLOCKS)))
+            for label, result in (("uncached", uncached), ("cached", cached)):
+                print("{:>10}: {} {:10d} {:8.3f} s".format(
+                    label, " ".join(
+                        "{:9d}".format(count) for count in result[1]),
+                    result[2], result[0]))
+            print("    " + cached[3].report().replace("\n", "\n    "))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
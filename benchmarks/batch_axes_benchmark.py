@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Compare batch axis conversions and look-at matrices against scalar ones
+
+Random vectors are converted between legacy and Blender axes by
+convert_to_blender_axes and convert_to_legacy_axes, one vector at a time, and
+by their batch versions, for a list of tuples and for a flat array. Look-at
+rotation matrices are computed from random directions by matrix_from_look,
+with the headless stand-in for mathutils, and by matrices_from_look, with a
+separate up direction for each and with one shared up direction.
+
+Batch conversions are checked to give exactly the same components as the
+scalar ones, and batch matrices to agree with the scalar ones to within
+rounding. The time taken by each is reported.
+
+To run this script, use the following command:
+python3 batch_axes_benchmark.py [--vectors N [N ...]] [--seed SEED]
+"""
+
+import os
+import sys
+import time
+import random
+import warnings
+import argparse
+from array import array
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Validators warn on every reference check made outside of a project, and
+# pyw3d warns about each Blender module it cannot import
+warnings.simplefilter("ignore")
+from pyw3d import headless
+headless.install()
+from pyw3d.headless import mathutils
+from pyw3d.errors import EBKAC
+from pyw3d.placement import convert_to_blender_axes, \
+    convert_to_legacy_axes, convert_to_blender_axes_batch, \
+    convert_to_legacy_axes_batch, matrix_from_look, matrices_from_look
+
+TOLERANCE = 1e-12
+
+
+def random_vectors(rng, num_vectors):
+    return [
+        tuple(rng.uniform(-10, 10) for axis in range(3))
+        for index in range(num_vectors)]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def scalar_conversion(convert):
+    return lambda vectors: [convert(vector) for vector in vectors]
+
+
+def flat(vectors):
+    return array("d", [
+        component for vector in vectors for component in vector])
+
+
+def scalar_matrices(looks, ups):
+    return [
+        matrix_from_look(mathutils.Vector(look), mathutils.Vector(up))
+        for look, up in zip(looks, ups)]
+
+
+def check_conversion(by_scalar, by_batch):
+    expected = flat(by_scalar)
+    if len(by_batch) != len(expected):
+        raise AssertionError("Batch gave {} components, not {}".format(
+            len(by_batch), len(expected)))
+    for index, (component, scalar) in enumerate(zip(by_batch, expected)):
+        if component != scalar:
+            raise AssertionError(
+                "Component {} of vector {} is {}, not {}".format(
+                    index % 3, index//3, component, scalar))
+
+
+def check_matrices(by_scalar, by_batch):
+    if len(by_batch) != 9*len(by_scalar):
+        raise AssertionError("Batch gave {} components, not {}".format(
+            len(by_batch), 9*len(by_scalar)))
+    for index, matrix in enumerate(by_scalar):
+        for row in range(3):
+            for column in range(3):
+                component = by_batch[9*index + 3*row + column]
+                if not abs(matrix[row][column] - component) < TOLERANCE:
+                    raise AssertionError(
+                        "Element ({}, {}) of matrix {} is {}, not {}".format(
+                            row, column, index, component,
+                            matrix[row][column]))
+
+
+def check_errors():
+    for call in (
+            lambda: convert_to_blender_axes_batch(array("d", [1., 2.])),
+            lambda: matrices_from_look([(1, 0, 0)]*3, [(0, 1, 0)]*2)):
+        try:
+            call()
+        except EBKAC:
+            pass
+        else:
+            raise AssertionError("Mismatched batch was accepted")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark batch axis conversions and look-at matrices")
+    parser.add_argument(
+        "--vectors", type=int, nargs="+", default=[10000, 100000],
+        help="Numbers of vectors")
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed for random vectors")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    check_errors()
+    for num_vectors in args.vectors:
+        print("{} vectors".format(num_vectors))
+        vectors = random_vectors(rng, num_vectors)
+        ups = random_vectors(rng, num_vectors)
+        comparisons = []
+        for convert, convert_batch in (
+                (convert_to_blender_axes, convert_to_blender_axes_batch),
+                (convert_to_legacy_axes, convert_to_legacy_axes_batch)):
+            comparisons.append((
+                convert.__name__, scalar_conversion(convert), (vectors,),
+                convert_batch, ((vectors,), (flat(vectors),)),
+                check_conversion))
+        comparisons.append((
+            "matrix_from_look", scalar_matrices, (vectors, ups),
+            matrices_from_look, ((vectors, ups), (flat(vectors), flat(ups))),
+            check_matrices))
+        comparisons.append((
+            "shared up", scalar_matrices, (vectors, [(0, 1, 0)]*num_vectors),
+            matrices_from_look, ((vectors,), (flat(vectors), (0, 1, 0))),
+            check_matrices))
+
+        for label, scalar, scalar_args, batch, batch_args, check in (
+                comparisons):
+            scalar_time, by_scalar = timed(scalar, *scalar_args)
+            batch_times = []
+            for args_ in batch_args:
+                batch_time, by_batch = timed(batch, *args_)
+                check(by_scalar, by_batch)
+                batch_times.append(batch_time)
+            print(
+                "{:>24}: scalar {:7.3f} s, batch {:7.3f} s from tuples,"
+                " {:7.3f} s from flat array".format(
+                    label, scalar_time, *batch_times))
+
+
+if __name__ == "__main__":
+    main()
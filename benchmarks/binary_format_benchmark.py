@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Compare the W3D binary format against W3D XML and pickle
+
+A synthetic project is saved as W3D XML, as a pickle, and in the W3D binary
+format, and loaded again from each. The size of each file and the time taken
+to save and load it are reported. XML and binary files are loaded as trusted
+input (see W3DFeature.deferred_validation), since a pickle is never
+validated. The binary file is loaded both in full and lazily, in which case
+the time to open it and read its triggers, as a script might, is reported
+separately from the time to then use the rest of the project.
+
+Projects loaded from the binary file are checked to be identical to the
+saved project, down to the type of every value.
+
+To run this script, use the following command:
+python3 binary_format_benchmark.py [--objects N [N ...]]
+"""
+
+import os
+import sys
+import time
+import pickle
+import warnings
+import argparse
+import tempfile
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Validators warn on every reference check made outside of a project, and
+# pyw3d warns about each Blender module it cannot import
+warnings.simplefilter("ignore")
+from pyw3d.project import W3DProject
+from pyw3d.features import W3DFeature
+from pyw3d.structs import SortedList
+from synthetic import synthetic_project
+
+
+def structure(value):
+    """Return representation of value which differs for any two values of
+    different content or type"""
+    if isinstance(value, W3DFeature):
+        return (type(value), tuple(sorted(
+            (key, structure(item)) for key, item in value.option_items())))
+    if isinstance(value, dict):
+        return (type(value), tuple(sorted(
+            ((structure(key), structure(item))
+             for key, item in value.items()), key=repr)))
+    if isinstance(value, (list, tuple, SortedList)):
+        # Items first, since a lazily loaded list changes type when used
+        items = tuple(structure(item) for item in value)
+        return (type(value), items)
+    return (type(value), repr(value))
+
+
+def use(project):
+    """Touch every list of features of project"""
+    for key in project.indexed_keys:
+        len(project[key])
+
+
+def save_pickle(project, filename):
+    with open(filename, "wb") as file_:
+        pickle.dump(project, file_)
+
+
+def load_pickle(filename):
+    with open(filename, "rb") as file_:
+        return pickle.load(file_)
+
+
+FORMATS = (
+    ("xml", "story.xml", W3DProject.save_XML,
+     lambda filename: W3DProject.fromXML_file(filename, trusted=True)),
+    ("pickle", "story.p", save_pickle, load_pickle),
+    ("binary", "story.w3db", W3DProject.save_binary,
+     lambda filename: W3DProject.fromBinary_file(
+         filename, lazy=False, trusted=True)),
+)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the W3D binary project format")
+    parser.add_argument(
+        "--objects", type=int, nargs="+", default=[1000, 10000],
+        help="Numbers of objects")
+    args = parser.parse_args()
+
+    working_directory = os.getcwd()
+    for num_objects in args.objects:
+        project = synthetic_project(
+            num_objects=num_objects, num_timelines=10,
+            actions_per_timeline=100, num_triggers=50)
+        expected = structure(project)
+        print("{} objects".format(num_objects))
+        with tempfile.TemporaryDirectory() as directory:
+            for label, basename, save, load in FORMATS:
+                filename = os.path.join(directory, basename)
+                save_time = timed(save, project, filename)[0]
+                load_time, loaded = timed(load, filename)
+                os.chdir(working_directory)
+                if label == "binary":
+                    assert structure(loaded) == expected
+                print("{:>12}: {:10d} bytes, save {:7.3f} s, load {:7.3f}"
+                      " s".format(
+                          label, os.path.getsize(filename), save_time,
+                          load_time))
+
+            filename = os.path.join(directory, "story.w3db")
+            start = time.perf_counter()
+            loaded = W3DProject.fromBinary_file(filename, trusted=True)
+            len(loaded["trigger_events"])
+            open_time = time.perf_counter() - start
+            os.chdir(working_directory)
+            rest_time = timed(use, loaded)[0]
+            assert structure(loaded) == expected
+            print("{:>12}: triggers {:7.3f} s, rest of project {:7.3f}"
+                  " s".format("binary lazy", open_time, rest_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Compare the cost of blending a project through each construction backend
+
+A synthetic project is blended into the headless stand-in for bpy through
+OperatorBackend, which creates everything with bpy.ops and changes the active
+object before each call, and through DataBackend, which creates objects in
+bpy.data and never changes the active object. Every operator call and every
+change of the active object is counted, and the resulting scenes are checked
+to be identical.
+
+The stand-in operators do none of the work that Blender does after each
+operator. Unless --no-scene-update is given, every operator call is followed
+by a stand-in scene update which visits each object in the scene, as Blender
+does, so that the time taken grows with the size of the scene in the same way.
+Objects with text content are created by operators through either backend.
+
+Game properties and logic bricks are also added by operators through either
+backend, since Blender 2.76 has no other way to create them, so only the
+creation of empties, cameras, lamps, and objects sharing mesh data differs
+between the two. Operator calls for game properties and logic bricks are
+counted separately. Together with those for text, they make up most of the
+calls of either backend, so the time taken by the two is expected to be
+close.
+
+To run this script, use the following command:
+python3 construction_backend_benchmark.py [--objects N [N ...]]
+    [--timelines N] [--actions N] [--triggers N] [--no-scene-update]
+"""
+
+import os
+import sys
+import time
+import warnings
+import argparse
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Validators warn on every reference check made outside of a project, and
+# pyw3d warns about each Blender module it cannot import
+warnings.simplefilter("ignore")
+from pyw3d import headless
+headless.install()
+from pyw3d.headless import bpy
+from pyw3d.blender_backend import OperatorBackend, DataBackend
+from synthetic import synthetic_project
+
+OPERATOR_MODULES = ("object", "mesh", "logic", "import_scene", "file", "wm")
+LOGIC_OPERATORS = (
+    "game_property_new", "sensor_add", "controller_add", "actuator_add")
+
+
+class Counts(object):
+    """Counts of operator calls and changes of the active object"""
+
+    def __init__(self):
+        self.operators = 0
+        self.logic_operators = 0
+        self.active_changes = 0
+        self.scene_update = True
+
+
+COUNTS = Counts()
+
+
+def _scene_update():
+    """Visit every object in the scene, as Blender does after each
+    operator"""
+    for blender_object in bpy.context.scene.objects:
+        blender_object.game.properties
+        blender_object.layers
+
+
+def _counted(operator, logic):
+    def counted_operator(*args, **kwargs):
+        COUNTS.operators += 1
+        COUNTS.logic_operators += logic
+        result = operator(*args, **kwargs)
+        if COUNTS.scene_update:
+            _scene_update()
+        return result
+    return staticmethod(counted_operator)
+
+
+def _get_active(scene_objects):
+    return scene_objects.__dict__.get("_active")
+
+
+def _set_active(scene_objects, value):
+    COUNTS.active_changes += 1
+    scene_objects.__dict__["_active"] = value
+
+
+def instrument():
+    """Count every operator call and change of the active object made
+    through the headless bpy"""
+    for module_name in OPERATOR_MODULES:
+        operators = type(getattr(bpy.ops, module_name))
+        for name, operator in list(vars(operators).items()):
+            if isinstance(operator, staticmethod):
+                setattr(operators, name, _counted(
+                    operator.__func__, name in LOGIC_OPERATORS))
+    bpy.SceneObjects.active = property(_get_active, _set_active)
+
+
+def _value_state(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_value_state(item) for item in value)
+    if hasattr(value, "name"):
+        return value.name
+    return value
+
+
+def _brick_state(brick):
+    return tuple(sorted(
+        (name, _value_state(value)) for name, value in vars(brick).items()))
+
+
+def scene_state():
+    """Return description of every object in the scene and its game
+    logic"""
+    state = {}
+    for blender_object in bpy.context.scene.objects:
+        state[blender_object.name] = (
+            blender_object.type,
+            type(blender_object.data).__name__,
+            tuple(blender_object.layers),
+            tuple(blender_object.location),
+            tuple(blender_object.rotation_euler),
+            tuple(
+                (game_property.name, game_property.type, game_property.value)
+                for game_property in blender_object.game.properties),
+            tuple(
+                _brick_state(brick) for bricks in (
+                    blender_object.game.sensors,
+                    blender_object.game.controllers,
+                    blender_object.game.actuators)
+                for brick in bricks))
+    return state
+
+
+def run(project, backend):
+    """Return (seconds taken to blend project, operator calls, changes of
+    the active object, state of the resulting scene, operator calls for
+    game properties and logic bricks)"""
+    bpy.read_factory_settings()
+    COUNTS.operators = 0
+    COUNTS.logic_operators = 0
+    COUNTS.active_changes = 0
+    start = time.perf_counter()
+    project.blend(backend=backend)
+    elapsed = time.perf_counter() - start
+    return (
+        elapsed, COUNTS.operators, COUNTS.active_changes, scene_state(),
+        COUNTS.logic_operators)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark construction backends")
+    parser.add_argument(
+        "--objects", type=int, nargs="+", default=[100, 500, 2000],
+        help="Numbers of objects")
+    parser.add_argument(
+        "--timelines", type=int, default=10, help="Number of timelines")
+    parser.add_argument(
+        "--actions", type=int, default=20,
+        help="Number of actions in each timeline")
+    parser.add_argument(
+        "--triggers", type=int, default=50,
+        help="Number of position triggers")
+    parser.add_argument(
+        "--no-scene-update", action="store_true",
+        help="Do not emulate the scene update after each operator")
+    args = parser.parse_args()
+
+    instrument()
+    COUNTS.scene_update = not args.no_scene_update
+    for num_objects in args.objects:
+        project = synthetic_project(
+            num_objects=num_objects, num_groups=10,
+            num_timelines=args.timelines,
+            actions_per_timeline=args.actions, num_triggers=args.triggers)
+        operator_result = run(project, OperatorBackend())
+        data_result = run(project, DataBackend())
+        assert operator_result[3] == data_result[3]
+        print("{} objects ({} in scene)".format(
+            num_objects, len(data_result[3])))
+        for label, result in (
+                ("operators", operator_result), ("data", data_result)):
+            print(
+                "{:>10}: {:8.3f} s {:7d} operator calls ({:7d} for logic)"
+                " {:7d} active changes".format(
+                    label, result[0], result[1], result[4], result[2]))
+        print("{:>10}: {:.2f}x the time of operators".format(
+            "data", data_result[0]/operator_result[0]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Measure the speedup from deferring validation of W3D features
+
+Two workloads are timed, each with per-assignment validation and within
+W3DFeature.deferred_validation:
+    1. Scripted generation of objects in the style of
+    samples/sphere_sample.py
+    2. Loading a synthetic story with W3DProject.fromXML_file
+
+The cost of the single validate pass that checks the deferred result is
+reported separately. Each is timed several times, alternating between them,
+and the shortest time of each is reported.
+
+To run this script, use the following command:
+python3 deferred_validation_benchmark.py [--objects N] [--repeat N]
+"""
+
+import os
+import sys
+import gc
+import time
+import warnings
+import argparse
+import tempfile
+from math import pi, sin, cos
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+warnings.simplefilter("ignore")
+from pyw3d.features import W3DFeature
+from pyw3d.project import W3DProject
+from pyw3d.objects import W3DObject, W3DText
+from pyw3d.placement import W3DPlacement, W3DRotation
+from synthetic import write_synthetic_story
+
+
+def generate_sphere(num_objects):
+    """Build project of text objects arranged on a sphere"""
+    project = W3DProject(allow_movement=True)
+    theta_div = max(int(num_objects**0.5), 2)
+    for index in range(num_objects):
+        theta = pi/theta_div*(index % theta_div)
+        phi = 2*pi/theta_div*(index // theta_div)
+        project["objects"].append(W3DObject(
+            name="elem{}".format(index),
+            color=(index % 256, (3*index) % 256, (5*index) % 256),
+            placement=W3DPlacement(
+                position=(
+                    10*sin(theta)*cos(phi),
+                    10*sin(theta)*sin(phi),
+                    10*cos(theta)
+                ),
+                rotation=W3DRotation(
+                    rotation_mode="LookAt",
+                    rotation_vector=(0, 0, 0)
+                )
+            ),
+            content=W3DText(text="W3D")
+        ))
+    return project
+
+
+def time_call(function, *args):
+    """Return (result, wall time in seconds) of calling function"""
+    gc.collect()
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def deferred(function):
+    """Return version of function which runs with validation deferred"""
+    def deferred_function(*args):
+        with W3DFeature.deferred_validation():
+            return function(*args)
+    return deferred_function
+
+
+def relative(validated_time, time_taken):
+    """Describe time_taken relative to validated_time"""
+    if time_taken <= validated_time:
+        return "{:.1f}x faster".format(validated_time/time_taken)
+    return "{:.1f}x slower".format(time_taken/validated_time)
+
+
+def compare(label, repeat, function, *args):
+    """Print shortest timings of repeat calls of function with and without
+    deferred validation"""
+    validated_times = []
+    deferred_times = []
+    validate_times = []
+    for _ in range(repeat):
+        result, validated_time = time_call(function, *args)
+        del result
+        result, deferred_time = time_call(deferred(function), *args)
+        unused, validate_time = time_call(result.validate)
+        del result
+        validated_times.append(validated_time)
+        deferred_times.append(deferred_time)
+        validate_times.append(validate_time)
+    validated_time = min(validated_times)
+    deferred_time = min(deferred_times)
+    validate_time = min(validate_times)
+    print(label)
+    print("    validated: {:7.2f} s".format(validated_time))
+    print("     deferred: {:7.2f} s ({})".format(
+        deferred_time, relative(validated_time, deferred_time)))
+    print("  + validate(): {:6.2f} s ({} overall)".format(
+        validate_time,
+        relative(validated_time, deferred_time + validate_time)))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark deferred validation")
+    parser.add_argument(
+        "--objects", type=int, default=20000,
+        help="Number of objects to generate or load")
+    parser.add_argument(
+        "--repeat", type=int, default=3,
+        help="Number of times to time each")
+    args = parser.parse_args()
+
+    compare(
+        "Scripted generation of {} objects".format(args.objects),
+        args.repeat, generate_sphere, args.objects)
+
+    with tempfile.TemporaryDirectory() as story_dir:
+        filename = os.path.join(story_dir, "story.xml")
+        write_synthetic_story(
+            filename, num_objects=args.objects, num_timelines=20,
+            actions_per_timeline=100)
+        compare(
+            "fromXML_file on story with {} objects".format(args.objects),
+            args.repeat, W3DProject.fromXML_stream, filename)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Compare repeated exports through one worker against a process per export
+
+A synthetic project is exported several times in a row, as when previewing
+a project while editing it, through headless export workers. Starting a new
+worker for every export, as export_to_blender used to start Blender, is
+compared against sending every export to a single worker which is kept
+running. Every export is checked to produce the same file.
+
+The headless worker starts in the time it takes Python to import pyw3d.
+Blender takes several seconds longer to start, all of which is saved on each
+export after the first by a persistent worker.
+
+To run this script, use the following command:
+python3 export_worker_benchmark.py [--exports N] [--objects N]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import warnings
+import argparse
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Validators warn on every reference check made outside of a project, and
+# pyw3d warns about each Blender module it cannot import
+warnings.simplefilter("ignore")
+from pyw3d.export_worker import ExportWorker
+from synthetic import synthetic_project
+
+
+def export_separately(project, filenames):
+    """Export project to each file through a new worker
+
+    :returns: (seconds taken for each export, paths of exported files)"""
+    times = []
+    paths = []
+    for filename in filenames:
+        start = time.perf_counter()
+        with ExportWorker(headless=True) as worker:
+            paths.append(worker.export(project, filename))
+        times.append(time.perf_counter() - start)
+    return times, paths
+
+
+def export_persistently(project, filenames):
+    """Export project to each file through one worker
+
+    :returns: (seconds taken for each export, paths of exported files)"""
+    times = []
+    paths = []
+    with ExportWorker(headless=True) as worker:
+        for filename in filenames:
+            start = time.perf_counter()
+            paths.append(worker.export(project, filename))
+            times.append(time.perf_counter() - start)
+    return times, paths
+
+
+def file_content(filepath):
+    with open(filepath) as blend_file:
+        return blend_file.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark a persistent export worker")
+    parser.add_argument(
+        "--exports", type=int, default=5, help="Number of exports")
+    parser.add_argument(
+        "--objects", type=int, default=100, help="Number of objects")
+    args = parser.parse_args()
+
+    project = synthetic_project(
+        num_objects=args.objects, num_timelines=5, actions_per_timeline=10)
+    directory = tempfile.mkdtemp()
+    try:
+        results = []
+        for label, export in (
+                ("separate", export_separately),
+                ("persistent", export_persistently)):
+            filenames = [
+                os.path.join(directory, "{}{}.blend".format(label, index))
+                for index in range(args.exports)]
+            results.append((label,) + export(project, filenames))
+        contents = set(
+            file_content(path) for _, _, paths in results for path in paths)
+        assert len(contents) == 1
+        print("{} exports of {} objects".format(args.exports, args.objects))
+        for label, times, _ in results:
+            print("{:>10}: first {:7.3f} s, later {:7.3f} s each, "
+                  "{:7.3f} s total".format(
+                      label, times[0],
+                      sum(times[1:])/max(len(times) - 1, 1), sum(times)))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
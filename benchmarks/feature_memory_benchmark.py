@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Compare memory held by W3D objects against the former representation
+
+Text objects with a placement and a color, as in a large story, are created
+with the current feature classes, which carry no per-instance attribute
+dictionary or ui_order list and share one default rotation among all
+placements until it is accessed. They are compared against subclasses which
+restore the former representation: an attribute dictionary on every
+feature, a ui_order list for every object, and a W3DRotation for every
+placement. Memory allocated per object (as measured by tracemalloc) is
+reported, and both sets of objects are checked to produce identical XML.
+
+To run this script, use the following command:
+python3 feature_memory_benchmark.py [--objects N [N ...]]
+"""
+
+import os
+import sys
+import time
+import warnings
+import argparse
+import tracemalloc
+import xml.etree.ElementTree as ET
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Validators warn on every reference check made outside of a project, and
+# pyw3d warns about each Blender module it cannot import
+warnings.simplefilter("ignore")
+from pyw3d.objects import W3DObject, W3DText
+from pyw3d.placement import W3DPlacement, W3DRotation
+
+
+class LegacyRotation(W3DRotation):
+    """W3DRotation with an attribute dictionary"""
+
+
+class LegacyPlacement(W3DPlacement):
+    """W3DPlacement with an attribute dictionary and its own rotation"""
+
+    def __init__(self, *args, **kwargs):
+        super(LegacyPlacement, self).__init__(*args, **kwargs)
+        if self.peek("rotation") is self.default_rotation:
+            self["rotation"] = LegacyRotation()
+
+
+class LegacyText(W3DText):
+    """W3DText with an attribute dictionary"""
+
+
+class LegacyObject(W3DObject):
+    """W3DObject with an attribute dictionary holding a ui_order list"""
+
+    def __init__(self, *args, **kwargs):
+        super(LegacyObject, self).__init__(*args, **kwargs)
+        self.ui_order = [
+            "name", "visible", "color", "lighting", "scale", "click_through",
+            "around_own_axis",
+            #"sound",
+            "placement", "link", "content"
+        ]
+
+
+CURRENT = (W3DObject, W3DPlacement, W3DText)
+LEGACY = (LegacyObject, LegacyPlacement, LegacyText)
+
+
+def create_objects(num_objects, classes):
+    object_class, placement_class, text_class = classes
+    return [
+        object_class(
+            name="object{}".format(index),
+            color=(index % 256, (7*index) % 256, (13*index) % 256),
+            placement=placement_class(
+                position=(0.1*index, 0.2*index, 0.3*index)),
+            content=text_class(text="Text {}".format(index)))
+        for index in range(num_objects)]
+
+
+def measure(num_objects, classes):
+    """Return (bytes allocated per object, seconds taken to create objects,
+    objects)"""
+    start = time.perf_counter()
+    objects = create_objects(num_objects, classes)
+    elapsed = time.perf_counter() - start
+    del objects
+    tracemalloc.start()
+    objects = create_objects(num_objects, classes)
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return allocated/num_objects, elapsed, objects
+
+
+def xml_output(objects):
+    root = ET.Element("ObjectRoot")
+    for w3d_object in objects:
+        w3d_object.toXML(root)
+    return ET.tostring(root)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark memory held by W3D objects")
+    parser.add_argument(
+        "--objects", type=int, nargs="+", default=[10000, 100000],
+        help="Numbers of objects")
+    args = parser.parse_args()
+
+    for num_objects in args.objects:
+        legacy = measure(num_objects, LEGACY)
+        current = measure(num_objects, CURRENT)
+        assert xml_output(legacy[2]) == xml_output(current[2])
+        print("{} objects".format(num_objects))
+        for label, result in (("legacy", legacy), ("current", current)):
+            print("{:>8}: {:7.0f} bytes/object, {:7.3f} s to create".format(
+                label, result[0], result[1]))
+
+
+if __name__ == "__main__":
+    main()
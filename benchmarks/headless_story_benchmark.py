@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Measure per-tick cost of the game logic of a synthetic story
+
+The story is blended with the headless stand-ins for bpy, bge, and mathutils,
+and its generated logic is run for a fixed number of simulated seconds. Time
+spent in each controller is reported, most expensive first. Neither Blender
+nor a display is required.
+
+To run this script, use the following command:
+python3 headless_story_benchmark.py [--objects N] [--timelines N]
+    [--actions N] [--triggers N] [--seconds S] [--top N]
+"""
+
+import os
+import sys
+import time
+import warnings
+import argparse
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Validators warn on every reference check made outside of a project, and
+# pyw3d warns about each Blender module it cannot import
+warnings.simplefilter("ignore")
+from pyw3d import headless
+from synthetic import synthetic_project
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark generated game logic of a synthetic story")
+    parser.add_argument(
+        "--objects", type=int, default=200, help="Number of objects")
+    parser.add_argument(
+        "--timelines", type=int, default=10, help="Number of timelines")
+    parser.add_argument(
+        "--actions", type=int, default=100,
+        help="Number of actions in each timeline")
+    parser.add_argument(
+        "--triggers", type=int, default=10,
+        help="Number of position triggers")
+    parser.add_argument(
+        "--seconds", type=float, default=10,
+        help="Simulated seconds to run game logic for")
+    parser.add_argument(
+        "--top", type=int, default=15,
+        help="Number of most expensive controllers to list")
+    args = parser.parse_args()
+
+    headless.install()
+    project = synthetic_project(
+        num_objects=args.objects, num_timelines=args.timelines,
+        actions_per_timeline=args.actions, num_triggers=args.triggers)
+    start = time.perf_counter()
+    with headless.simulate(project) as simulation:
+        blend_time = time.perf_counter() - start
+        simulation.run(args.seconds)
+        report = simulation.report().split("\n")
+        total = sum(
+            timing.seconds for timing in simulation.timings.values())
+        print("Blended {} game objects in {:.2f} s".format(
+            len(simulation.scene.objects), blend_time))
+        print("\n".join(report[:3 + args.top]))
+        print("Total: {:.1f} us/tick in {} controllers".format(
+            1e6*total/simulation.frame, len(simulation.timings)))
+
+
+if __name__ == "__main__":
+    main()
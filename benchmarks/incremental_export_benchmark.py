@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Compare incremental re-export of an edited project against a full export
+
+A synthetic project is blended into the headless stand-in for bpy. A few of
+its features are then edited, as in the editor, one after another: the color
+of an object, the link of another, an added and a removed object, the box of
+a position trigger, whether another is enabled, a look trigger, and a
+timeline. After each edit, the
+scene is updated by an incremental export. The result is checked against a
+full export of the edited project into fresh data, and the time taken and
+the number of text objects converted to meshes by each are reported.
+
+Group definitions are compared regardless of their order, which
+W3DProject.sort_groups reverses for unrelated groups on every export.
+
+To run this script, use the following command:
+python3 incremental_export_benchmark.py [--objects N [N ...]]
+"""
+
+import os
+import sys
+import time
+import warnings
+import argparse
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Validators warn on every reference check made outside of a project, and
+# pyw3d warns about each Blender module it cannot import
+warnings.simplefilter("ignore")
+from pyw3d import headless
+headless.install()
+from pyw3d.headless import bpy
+from pyw3d.placement import W3DPlacement
+from pyw3d.objects import W3DObject, W3DText
+from pyw3d.triggers import LookAtPoint
+from pyw3d.actions import ObjectAction
+from synthetic import synthetic_project
+from construction_backend_benchmark import scene_state
+
+def recolor_object(project):
+    project["objects"][3]["color"] = (1, 2, 3)
+
+
+def disable_link(project):
+    project["objects"][10]["link"]["enabled"] = False
+
+
+def add_object(project):
+    project["objects"].append(W3DObject(
+        name="added", content=W3DText(text="Added"),
+        placement=W3DPlacement(position=(0, 1, 0))))
+
+
+def remove_object(project):
+    del project["objects"][7]
+
+
+def move_trigger_box(project):
+    project["trigger_events"][2]["box"]["corner1"] = (5, 5, 5)
+
+
+def disable_trigger(project):
+    project["trigger_events"][4]["enabled"] = False
+
+
+def add_look_trigger(project):
+    project["trigger_events"].append(LookAtPoint(
+        name="look", point=(0, 0, -4), actions=[
+            ObjectAction(object_name="object1", visible=False)]))
+
+
+def start_timeline(project):
+    project["timelines"][1]["start_immediately"] = True
+
+
+EDITS = (
+    recolor_object, disable_link, add_object, remove_object,
+    move_trigger_box, disable_trigger, add_look_trigger, start_timeline)
+
+
+class Counter(object):
+    """Count calls of a stand-in operator"""
+
+    def __init__(self, operator):
+        self.operator = operator
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.operator(*args, **kwargs)
+
+
+def export_state():
+    """Return description of every object and of every text block"""
+    return (
+        scene_state(),
+        {
+            text.name: (
+                sorted(text.as_string().split("\n"))
+                if text.name == "group_defs.py" else text.as_string())
+            for text in bpy.data.texts})
+
+
+def blend(project, incremental):
+    """Return (seconds taken to blend project, number of text objects
+    converted to meshes)"""
+    converter = Counter(bpy.ops.object.convert)
+    bpy.ops.object.convert = converter
+    try:
+        start = time.perf_counter()
+        project.blend(incremental=incremental)
+        elapsed = time.perf_counter() - start
+    finally:
+        bpy.ops.object.convert = converter.operator
+    return elapsed, converter.calls
+
+
+def edited_project(num_objects, edits):
+    project = synthetic_project(
+        num_objects=num_objects, num_timelines=5, actions_per_timeline=10,
+        num_triggers=10)
+    for edit in edits:
+        edit(project)
+    return project
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark incremental re-export")
+    parser.add_argument(
+        "--objects", type=int, nargs="+", default=[100, 500, 1000],
+        help="Numbers of objects")
+    args = parser.parse_args()
+
+    for num_objects in args.objects:
+        print("{} objects".format(num_objects))
+        project = edited_project(num_objects, ())
+        bpy.read_factory_settings()
+        project.blend()
+        for index, edit in enumerate(EDITS):
+            edit(project)
+            incremental = blend(project, True)
+            incremental_state = export_state()
+
+            bpy.read_factory_settings()
+            full = blend(edited_project(num_objects, EDITS[:index + 1]), False)
+            assert export_state() == incremental_state
+            print(
+                "{:>18}: full {:7.3f} s {:5d} conversions, incremental {:7.3f}"
+                " s {:5d} conversions".format(
+                    edit.__name__, full[0], full[1], incremental[0],
+                    incremental[1]))
+
+            # Export the next edit incrementally from a full export
+            bpy.read_factory_settings()
+            project.blend()
+
+
+if __name__ == "__main__":
+    main()
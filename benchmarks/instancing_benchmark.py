@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Count meshes and conversions when many objects show identical content
+
+A sphere of text objects which all show the same string, as in
+samples/sphere_sample.py, with a few distinct strings mixed in, is blended
+into the headless stand-in for bpy. Objects with identical content are
+linked duplicates of one mesh, and are compared against blending every
+object's content anew, as before content was instanced. The number of meshes
+and of text objects created and converted to meshes is reported for each,
+and the placement, scale, color, and material settings of every object are
+checked to agree between the two. Objects showing the same string differ in
+lighting, so settings applied to the material of one linked duplicate must
+not reach the others through their shared mesh.
+
+To run this script, use the following command:
+python3 instancing_benchmark.py [--objects N [N ...]] [--strings N]
+"""
+
+import os
+import sys
+import time
+import math
+import warnings
+import argparse
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Validators warn on every reference check made outside of a project, and
+# pyw3d warns about each Blender module it cannot import
+warnings.simplefilter("ignore")
+from pyw3d import headless
+headless.install()
+from pyw3d.headless import bpy
+from pyw3d.project import W3DProject
+from pyw3d.objects import W3DObject, W3DText, W3DContent
+from pyw3d.placement import W3DPlacement, W3DRotation
+
+INSTANCED_CLASSES = [
+    content_class for content_class in W3DContent.__subclasses__()
+    if content_class.instanced]
+
+
+def sphere_project(num_objects, num_strings):
+    """Return project with num_objects text objects arranged on a sphere
+    and facing its center, of which one in ten shows one of num_strings
+    other strings"""
+    project = W3DProject()
+    for index in range(num_objects):
+        theta = math.pi*(index + 0.5)/num_objects
+        phi = 2*math.pi*index*0.618034
+        if index % 10 == 9:
+            text = "Label {}".format((index//10) % num_strings)
+        else:
+            text = "W3D"
+        project["objects"].append(W3DObject(
+            name="elem{}".format(index),
+            color=((17*index) % 256, (31*index) % 256, (47*index) % 256),
+            lighting=bool(index % 3),
+            placement=W3DPlacement(
+                position=(
+                    10*math.sin(theta)*math.cos(phi),
+                    10*math.sin(theta)*math.sin(phi),
+                    10*math.cos(theta)),
+                rotation=W3DRotation(
+                    rotation_mode="LookAt", rotation_vector=(0, 0, 0))),
+            content=W3DText(text=text)))
+    return project
+
+
+class Counter(object):
+    """Count calls of a stand-in operator"""
+
+    def __init__(self, operator):
+        self.operator = operator
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.operator(*args, **kwargs)
+
+
+def object_state(blender_object):
+    """Return description of the transform, color, and material settings
+    of blender_object"""
+    material = blender_object.active_material
+    return (
+        blender_object.type,
+        tuple(round(value, 9) for value in blender_object.location),
+        tuple(round(value, 9) for value in blender_object.rotation_euler),
+        tuple(blender_object.scale),
+        tuple(blender_object.color),
+        material.use_shadeless,
+        material.game_settings.use_backface_culling)
+
+
+def run(project, instanced):
+    """Return (seconds taken to blend project, number of meshes, number of
+    text objects converted to meshes, state of each object)"""
+    bpy.read_factory_settings()
+    converter = Counter(bpy.ops.object.convert)
+    bpy.ops.object.convert = converter
+    if not instanced:
+        for content_class in INSTANCED_CLASSES:
+            content_class.instanced = False
+    try:
+        start = time.perf_counter()
+        project.blend()
+        elapsed = time.perf_counter() - start
+    finally:
+        for content_class in INSTANCED_CLASSES:
+            content_class.instanced = True
+        bpy.ops.object.convert = converter.operator
+    states = {
+        blender_object.name: object_state(blender_object)
+        for blender_object in bpy.data.objects
+        if blender_object.name.startswith("object_")}
+    return elapsed, len(bpy.data.meshes), converter.calls, states
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark linked duplicates of identical content")
+    parser.add_argument(
+        "--objects", type=int, nargs="+", default=[90, 500, 1000],
+        help="Numbers of objects")
+    parser.add_argument(
+        "--strings", type=int, default=5,
+        help="Number of distinct strings other than the common one")
+    args = parser.parse_args()
+
+    for num_objects in args.objects:
+        project = sphere_project(num_objects, args.strings)
+        separate = run(project, False)
+        instanced = run(project, True)
+        assert separate[3] == instanced[3]
+        print("{} objects".format(num_objects))
+        for label, result in (
+                ("separate", separate), ("instanced", instanced)):
+            print("{:>10}: {:6d} meshes {:6d} conversions {:8.3f} s".format(
+                label, result[1], result[2], result[0]))
+
+
+if __name__ == "__main__":
+    main()
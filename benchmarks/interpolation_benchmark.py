@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Measure how far continuous moves, color changes, and scaling stray from
+their intended paths when logic ticks are dropped
+
+The story of transition_benchmark.py is run with the headless stand-ins
+while some logic ticks are skipped, as when the BGE falls behind under load.
+Transitions which interpolate by the time elapsed since the start of each
+action are compared against transitions which add a fixed velocity on every
+tick. The reference path is that of interpolated transitions with no dropped
+ticks, which follows start + change*elapsed/duration.
+
+The largest difference from the reference of the position, orientation,
+color, and scale of any object is reported both over the whole run and at
+its end, after every action has finished.
+
+Interpolated transitions of the same attribute of one object which overlap
+in time are then checked to add together: an object moved and turned by
+two actions which overlap must end where it ends when the second action
+starts after the first has finished, with and without dropped ticks.
+
+To run this script, use the following command:
+python3 interpolation_benchmark.py [--objects N] [--groups N] [--actions N]
+    [--seconds S] [--drop-rate P] [--max-drop N]
+"""
+
+import os
+import sys
+import random
+import warnings
+import argparse
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Validators warn on every reference check made outside of a project, and
+# pyw3d warns about each Blender module it cannot import
+warnings.simplefilter("ignore")
+from pyw3d import headless
+headless.install()
+import pyw3d.actions
+from pyw3d.actions import ObjectAction
+from pyw3d.placement import W3DPlacement, W3DRotation
+from pyw3d.timeline import W3DTimeline
+from pyw3d.project import W3DProject
+from transition_benchmark import transition_project, VELOCITY_CLASSES
+from synthetic import synthetic_object
+
+ATTRIBUTES = ("position", "orientation", "color", "scale")
+TOLERANCE = 1e-9
+
+
+def object_state(game_object):
+    """Return position, orientation, color, and scale of game_object as
+    flat tuples"""
+    return (
+        tuple(game_object.position),
+        tuple(
+            component for row in game_object.orientation
+            for component in row),
+        tuple(game_object.color),
+        tuple(game_object.scaling))
+
+
+def run(project, seconds, drop_rate, max_drop, seed=0):
+    """Return state of objects after each tick which was run, by frame
+
+    Before each tick, with probability drop_rate, between one and max_drop
+    ticks are skipped instead."""
+    rng = random.Random(seed)
+    history = {}
+    with headless.simulate(project) as simulation:
+        game_objects = [
+            game_object for game_object in simulation.scene.objects
+            if game_object.name.startswith("object_")]
+        ticks = int(seconds*simulation.tic_rate)
+        while simulation.frame < ticks:
+            if rng.random() < drop_rate:
+                simulation.skip(rng.randint(1, max_drop))
+                continue
+            simulation.step()
+            history[simulation.frame] = [
+                object_state(game_object) for game_object in game_objects]
+    return history
+
+
+def overlap_project(second_start):
+    """Return project with a timeline which moves and turns one object over
+    two seconds, and then moves it by another offset and turns it again over
+    two seconds from second_start"""
+    project = W3DProject()
+    project["objects"].append(synthetic_object(1))
+    project["timelines"].append(W3DTimeline(
+        name="overlap", start_immediately=True, actions=[
+            (0, ObjectAction(
+                object_name="object1", duration=2, move_relative=True,
+                placement=W3DPlacement(
+                    position=(4, 0, 0), rotation=W3DRotation(
+                        rotation_mode="Axis", rotation_vector=(0, 0, 1),
+                        rotation_angle=30)))),
+            (second_start, ObjectAction(
+                object_name="object1", duration=2, move_relative=True,
+                placement=W3DPlacement(
+                    position=(0, 4, 0), rotation=W3DRotation(
+                        rotation_mode="Axis", rotation_vector=(0, 0, 1),
+                        rotation_angle=60))))]))
+    return project
+
+
+def check_overlap(drop_rate, max_drop):
+    """Check that overlapping moves end where sequential moves do
+
+    :returns: Largest difference of any component of the final state"""
+    sequential = run(overlap_project(2), 5, 0, 1)
+    overlapping = run(overlap_project(1), 5, drop_rate, max_drop)
+    expected = sequential[max(sequential)][0]
+    final = overlapping[max(overlapping)][0]
+    error = 0.
+    for attribute, values, expected_values in zip(
+            ATTRIBUTES, final, expected):
+        for index, (value, expected_value) in enumerate(
+                zip(values, expected_values)):
+            if not abs(value - expected_value) < TOLERANCE:
+                raise AssertionError(
+                    "Component {} of {} after overlapping moves is {}, not"
+                    " {}".format(index, attribute, value, expected_value))
+            error = max(error, abs(value - expected_value))
+    return error
+
+
+def errors(history, reference):
+    """Return (largest difference from reference of each attribute over all
+    frames, largest difference of each attribute in the last frame)"""
+    worst = [0.]*len(ATTRIBUTES)
+    final = [0.]*len(ATTRIBUTES)
+    last_frame = max(history)
+    for frame, states in history.items():
+        for state, reference_state in zip(states, reference[frame]):
+            for index, (values, reference_values) in enumerate(
+                    zip(state, reference_state)):
+                error = max(
+                    abs(value - reference_value) for value, reference_value
+                    in zip(values, reference_values))
+                worst[index] = max(worst[index], error)
+                if frame == last_frame:
+                    final[index] = max(final[index], error)
+    return worst, final
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare interpolated and velocity transitions when"
+        " logic ticks are dropped")
+    parser.add_argument(
+        "--objects", type=int, default=50, help="Number of objects")
+    parser.add_argument(
+        "--groups", type=int, default=4, help="Number of groups")
+    parser.add_argument(
+        "--actions", type=int, default=100,
+        help="Number of moves of individual objects")
+    parser.add_argument(
+        "--seconds", type=float, default=8,
+        help="Simulated seconds to run game logic for")
+    parser.add_argument(
+        "--drop-rate", type=float, default=0.2,
+        help="Probability of dropping ticks before each tick")
+    parser.add_argument(
+        "--max-drop", type=int, default=3,
+        help="Largest number of consecutive ticks dropped")
+    args = parser.parse_args()
+
+    project = transition_project(args.objects, args.groups, args.actions)
+    reference = run(project, args.seconds, 0, 1)
+    results = [(
+        "interpolated, dropped ticks", run(
+            project, args.seconds, args.drop_rate, args.max_drop))]
+    current_classes = {
+        name: getattr(pyw3d.actions, name) for name in VELOCITY_CLASSES}
+    for name, velocity_class in VELOCITY_CLASSES.items():
+        setattr(pyw3d.actions, name, velocity_class)
+    try:
+        results.append(("velocity, every tick", run(
+            project, args.seconds, 0, 1)))
+        results.append(("velocity, dropped ticks", run(
+            project, args.seconds, args.drop_rate, args.max_drop)))
+    finally:
+        for name, current_class in current_classes.items():
+            setattr(pyw3d.actions, name, current_class)
+
+    print("{:>31} {}".format("", " ".join(
+        "{:>12}".format(attribute) for attribute in ATTRIBUTES)))
+    for label, history in results:
+        worst, final = errors(history, reference)
+        print("{:>31} {}".format("{} (worst)".format(label), " ".join(
+            "{:12.2e}".format(error) for error in worst)))
+        print("{:>31} {}".format("(final)", " ".join(
+            "{:12.2e}".format(error) for error in final)))
+    for label, drop_rate in (
+            ("every tick", 0), ("dropped ticks", args.drop_rate)):
+        print("{:>31} {:12.2e}".format(
+            "overlapping, {}".format(label),
+            check_overlap(drop_rate, args.max_drop)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Measure per-tick cost of detecting where the user is looking for many
+look triggers
+
+A story with LookAtPoint, LookAtDirection, and LookAtObject triggers is run
+with the headless stand-ins while the camera turns around the vertical axis
+and tilts up and down. Detection by the shared BlenderLookIndex on the camera
+is compared against the previous implementation, in which the camera had a
+separate detection controller for every trigger, and the status of every
+trigger is checked to agree between the two on every tick.
+
+To run this script, use the following command:
+python3 look_trigger_benchmark.py [--triggers N [N ...]] [--seconds S]
+"""
+
+import os
+import sys
+import math
+import random
+import warnings
+import argparse
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Validators warn on every reference check made outside of a project, and
+# pyw3d warns about each Blender module it cannot import
+warnings.simplefilter("ignore")
+from pyw3d import headless
+headless.install()
+import pyw3d.triggers
+from pyw3d.project import W3DProject
+from pyw3d.objects import W3DObject, W3DText
+from pyw3d.placement import W3DPlacement
+from pyw3d.triggers import LookAtPoint, LookAtDirection, LookAtObject
+from pyw3d.activators import BlenderPointTrigger, BlenderDirectionTrigger, \
+    BlenderLookObjectTrigger
+from pyw3d.names import generate_trigger_name
+import bpy
+
+
+class LegacyLookMixin(object):
+    """Camera setup of look triggers as implemented before the
+    BlenderLookIndex, with a property sensor and detection controller on the
+    camera for each trigger, enabled by a copy of the trigger's enabled
+    property on the camera"""
+
+    def setup_camera(self):
+        camera_object = self.select_camera()
+        bpy.ops.object.game_property_new(
+            type='BOOL',
+            name=self.name
+        )
+        camera_object.game.properties[
+            self.name].value = self.enable_immediately
+        bpy.ops.logic.sensor_add(
+            type="PROPERTY",
+            object="CAMERA",
+            name=self.name
+        )
+        camera_object.game.sensors[-1].name = self.name
+        camera_enable_sensor = camera_object.game.sensors[self.name]
+        camera_enable_sensor.use_pulse_true_level = True
+        camera_enable_sensor.frequency = 1
+        camera_enable_sensor.property = self.name
+        camera_enable_sensor.value = str(self.enable_immediately)
+        self.camera_enable_sensor = camera_enable_sensor
+
+        bpy.ops.logic.controller_add(
+            type='PYTHON',
+            object="CAMERA",
+            name=self.name)
+        camera_object.game.controllers[-1].name = self.name
+        controller = camera_object.game.controllers[self.name]
+        controller.mode = "MODULE"
+        controller.module = "{}.detect_event".format(self.name)
+        return camera_object
+
+    def create_enabled_copier(self):
+        self.select_base_object()
+        bpy.ops.logic.sensor_add(
+            type="PROPERTY",
+            object=self.name,
+            name="enabled_sensor"
+        )
+        self.base_object.game.sensors[-1].name = "enabled_sensor"
+        self.enabled_sensor = self.base_object.game.sensors["enabled_sensor"]
+        self.enabled_sensor.property = "enabled"
+        self.enabled_sensor.evaluation_type = "PROPCHANGED"
+        bpy.ops.logic.controller_add(
+            type='LOGIC_AND',
+            object=self.name,
+            name="enable")
+        self.enabled_controller = self.base_object.game.controllers["enable"]
+
+        camera_object = self.select_camera()
+        bpy.ops.logic.actuator_add(
+            type="PROPERTY",
+            object="CAMERA",
+            name=self.name
+        )
+        camera_object.game.actuators[-1].name = self.name
+        self.property_copier = camera_object.game.actuators[self.name]
+        self.property_copier.mode = "COPY"
+        self.property_copier.property = self.name
+        self.property_copier.object = self.base_object
+        self.property_copier.object_property = "enabled"
+
+    def create_blender_objects(self):
+        super(LegacyLookMixin, self).create_blender_objects()
+        self.setup_camera()
+        self.create_enabled_copier()
+
+    def link_logic_bricks(self):
+        super(LegacyLookMixin, self).link_logic_bricks()
+        self.enabled_controller.link(
+            sensor=self.enabled_sensor, actuator=self.property_copier)
+        camera_object = self.select_camera()
+        camera_object.game.controllers[self.name].link(
+            sensor=self.camera_enable_sensor)
+
+
+class LegacyPointTrigger(LegacyLookMixin, BlenderPointTrigger):
+
+    def generate_detection_logic(self):
+        return "\n".join([
+            "\ndef detect_event(cont):",
+            "    scene = bge.logic.getCurrentScene()",
+            "    own = cont.owner",
+            "    trigger = scene.objects['{}']".format(self.name),
+            "    if 'initialized' not in trigger:",
+            "        trigger['initialized'] = True",
+            "        return",
+            "    if (own.pointInsideFrustum({})".format(tuple(self.point)),
+            "            and trigger['enabled'] and",
+            "            trigger['status'] == 'Stop'):",
+            "        trigger['status'] = 'Start'"
+        ])
+
+
+class LegacyDirectionTrigger(LegacyLookMixin, BlenderDirectionTrigger):
+
+    def generate_detection_logic(self):
+        return "\n".join([
+            "\ndef detect_event(cont):",
+            "    scene = bge.logic.getCurrentScene()",
+            "    own = cont.owner",
+            "    cam_dir = (own.getCameraToWorld().to_quaternion() *",
+            "        mathutils.Vector((0, 0, -1)))",
+            "    target_dir = mathutils.Vector({})".format(
+                tuple(self.direction)),
+            "    angle = abs(cam_dir.angle(target_dir, 3.14))",
+            "    trigger = scene.objects['{}']".format(self.name),
+            "    if (angle < {}".format(math.radians(self.angle)),
+            "            and trigger['enabled'] and",
+            "            trigger['status'] == 'Stop'):",
+            "        trigger['status'] = 'Start'"
+        ])
+
+
+class LegacyLookObjectTrigger(LegacyLookMixin, BlenderLookObjectTrigger):
+
+    def generate_detection_logic(self):
+        return "\n".join([
+            "\ndef detect_event(cont):",
+            "    scene = bge.logic.getCurrentScene()",
+            "    own = cont.owner",
+            "    position = scene.objects['{}'].position".format(
+                self.look_at_object),
+            "    trigger = scene.objects['{}']".format(self.name),
+            "    if 'initialized' not in trigger:",
+            "        trigger['initialized'] = True",
+            "        return",
+            "    if (own.pointInsideFrustum(position)",
+            "            and trigger['enabled']",
+            "            and trigger['status'] == 'Stop'):",
+            "        trigger['status'] = 'Start'"
+        ])
+
+
+LEGACY_CLASSES = {
+    "BlenderPointTrigger": LegacyPointTrigger,
+    "BlenderDirectionTrigger": LegacyDirectionTrigger,
+    "BlenderLookObjectTrigger": LegacyLookObjectTrigger
+}
+
+
+def random_point(rng, distance):
+    """Return a point at the given distance from the origin"""
+    azimuth = rng.uniform(0, 2*math.pi)
+    elevation = rng.uniform(-0.6, 0.6)
+    return (
+        distance*math.cos(elevation)*math.cos(azimuth),
+        distance*math.cos(elevation)*math.sin(azimuth),
+        distance*math.sin(elevation))
+
+
+def trigger_project(num_triggers):
+    """Return project with look triggers of each kind, in equal numbers,
+    whose actions last for one second so that they may activate repeatedly
+    """
+    rng = random.Random(0)
+    project = W3DProject()
+    for index in range(num_triggers):
+        name = "trigger{}".format(index)
+        kind = index % 3
+        if kind == 0:
+            trigger = LookAtPoint(
+                name=name, point=random_point(rng, rng.uniform(2, 20)))
+        elif kind == 1:
+            trigger = LookAtDirection(
+                name=name, direction=random_point(rng, 1))
+        else:
+            object_name = "object{}".format(index)
+            project["objects"].append(W3DObject(
+                name=object_name,
+                placement=W3DPlacement(
+                    position=random_point(rng, rng.uniform(2, 20))),
+                content=W3DText(text=object_name)))
+            trigger = LookAtObject(name=name, object=object_name)
+        trigger["duration"] = 1
+        trigger["actions"] = []
+        project["trigger_events"].append(trigger)
+    return project
+
+
+def run(project, num_triggers, seconds):
+    """Return (detection time per tick in seconds, statuses of triggers on
+    each tick)"""
+    trigger_names = [
+        generate_trigger_name("trigger{}".format(index))
+        for index in range(num_triggers)]
+    history = []
+    with headless.simulate(project) as simulation:
+        camera = simulation.scene.objects["CAMERA"]
+        ticks = int(seconds*simulation.tic_rate)
+        for tick in range(ticks):
+            camera.applyRotation((0, 0, 4*math.pi/ticks))
+            camera.applyRotation(
+                (0.02*math.cos(8*math.pi*tick/ticks), 0, 0), True)
+            simulation.step()
+            history.append(tuple(
+                simulation.scene.objects[name]["status"]
+                for name in trigger_names))
+        detect_time = sum(
+            timing.seconds for timing in simulation.timings.values()
+            if timing.name.startswith(("CAMERA.trigger_", "CAMERA.look_")))
+        return detect_time/simulation.frame, history
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark detection of look triggers")
+    parser.add_argument(
+        "--triggers", type=int, nargs="+", default=[10, 100, 300],
+        help="Numbers of look triggers")
+    parser.add_argument(
+        "--seconds", type=float, default=10,
+        help="Simulated seconds to run game logic for")
+    args = parser.parse_args()
+
+    for num_triggers in args.triggers:
+        project = trigger_project(num_triggers)
+        indexed_time, indexed_history = run(
+            project, num_triggers, args.seconds)
+        blend_look_index = W3DProject.blend_look_index
+        current_classes = {
+            name: getattr(pyw3d.triggers, name) for name in LEGACY_CLASSES}
+        for name, legacy_class in LEGACY_CLASSES.items():
+            setattr(pyw3d.triggers, name, legacy_class)
+        W3DProject.blend_look_index = lambda project: None
+        try:
+            legacy_time, legacy_history = run(
+                project, num_triggers, args.seconds)
+        finally:
+            for name, current_class in current_classes.items():
+                setattr(pyw3d.triggers, name, current_class)
+            W3DProject.blend_look_index = blend_look_index
+        assert indexed_history == legacy_history
+        starts = sum(
+            statuses.count("Start") for statuses in indexed_history)
+        print("{} look triggers ({} activations)".format(
+            num_triggers, starts))
+        print("     legacy: {:8.1f} us/tick".format(1e6*legacy_time))
+        print("    indexed: {:8.1f} us/tick ({:.1f}x faster)".format(
+            1e6*indexed_time, legacy_time/indexed_time))
+
+
+if __name__ == "__main__":
+    main()
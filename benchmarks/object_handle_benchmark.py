@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Count lookups of game objects by name made by the generated logic of a
+synthetic story
+
+The story is run with the headless stand-ins twice: once with the shared
+object handle cache of the w3d_runtime module, and once with a w3d_runtime
+which looks up every object by name on each call, as the generated logic did
+before the cache was introduced. The position, color, scale, and visibility
+of every object are checked to agree between the two runs on every tick.
+
+Note that the headless CListValue finds objects by name through a dictionary,
+whereas the BGE searches the list of objects, so the time saved in the BGE
+grows with the number of objects in the scene.
+
+To run this script, use the following command:
+python3 object_handle_benchmark.py [--objects N] [--timelines N]
+    [--actions N] [--seconds S]
+"""
+
+import os
+import sys
+import warnings
+import argparse
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Validators warn on every reference check made outside of a project, and
+# pyw3d warns about each Blender module it cannot import
+warnings.simplefilter("ignore")
+from pyw3d import headless
+headless.install()
+import pyw3d.project
+from pyw3d.headless import bge
+from synthetic import synthetic_project
+
+LEGACY_GET_OBJECT = """
+def get_object(scene, name):
+    return scene.objects[name]
+"""
+
+
+class LookupCounter(object):
+    """Counts lookups by name in every CListValue while installed"""
+
+    def __init__(self):
+        self.count = 0
+        self._getitem = bge.CListValue.__getitem__
+
+    def __enter__(self):
+        getitem = self._getitem
+
+        def counting_getitem(clist, key):
+            if isinstance(key, str):
+                self.count += 1
+            return getitem(clist, key)
+        bge.CListValue.__getitem__ = counting_getitem
+        return self
+
+    def __exit__(self, *exc_info):
+        bge.CListValue.__getitem__ = self._getitem
+
+
+def run(project, seconds):
+    """Return (lookups by name per tick, controller time per tick in
+    seconds, state of objects on each tick)"""
+    history = []
+    with headless.simulate(project) as simulation:
+        game_objects = [
+            game_object for game_object in simulation.scene.objects
+            if game_object.name.startswith("object_")]
+        with LookupCounter() as counter:
+            for _ in range(int(seconds*simulation.tic_rate)):
+                simulation.step()
+                history.append(tuple(
+                    (tuple(game_object.position), tuple(game_object.color),
+                     tuple(game_object.scaling), game_object.visible)
+                    for game_object in game_objects))
+        total = sum(
+            timing.seconds for timing in simulation.timings.values())
+        return (
+            counter.count/simulation.frame, total/simulation.frame, history)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Count lookups of game objects by name")
+    parser.add_argument(
+        "--objects", type=int, default=200, help="Number of objects")
+    parser.add_argument(
+        "--timelines", type=int, default=10, help="Number of timelines")
+    parser.add_argument(
+        "--actions", type=int, default=100,
+        help="Number of actions in each timeline")
+    parser.add_argument(
+        "--seconds", type=float, default=10,
+        help="Simulated seconds to run game logic for")
+    args = parser.parse_args()
+
+    project = synthetic_project(
+        num_objects=args.objects, num_timelines=args.timelines,
+        actions_per_timeline=args.actions)
+    cached_lookups, cached_time, cached_history = run(project, args.seconds)
+    runtime_script = pyw3d.project.RUNTIME_SCRIPT
+    pyw3d.project.RUNTIME_SCRIPT = runtime_script + LEGACY_GET_OBJECT
+    try:
+        legacy_lookups, legacy_time, legacy_history = run(
+            project, args.seconds)
+    finally:
+        pyw3d.project.RUNTIME_SCRIPT = runtime_script
+    assert cached_history == legacy_history
+    print("     legacy: {:8.1f} lookups/tick {:8.1f} us/tick".format(
+        legacy_lookups, 1e6*legacy_time))
+    print("     cached: {:8.1f} lookups/tick {:8.1f} us/tick".format(
+        cached_lookups, 1e6*cached_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Compare bulk transforms of object placements by feature and by table
+
+The objects of a synthetic project are transformed in bulk, as a layout
+script or the export might, once by looping over their W3DPlacement
+features and once through a PlacementTable:
+
+    shift: move every object, and write the placements back
+    convert: convert every position to legacy axes
+    transforms: compute the world location and rotation matrix of every
+    object, from the wall to which it is placed relative and its rotation
+
+Rotation matrices are computed for the features with the headless stand-in
+for mathutils. The results of the two are checked to agree, and the time
+taken by each is reported. The time taken to build the table from the objects
+is reported separately, since a table is built once for any number of
+operations.
+
+To run this script, use the following command:
+python3 placement_table_benchmark.py [--objects N [N ...]]
+"""
+
+import os
+import sys
+import time
+import warnings
+import argparse
+from array import array
+import xml.etree.ElementTree as ET
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Validators warn on every reference check made outside of a project, and
+# pyw3d warns about each Blender module it cannot import
+warnings.simplefilter("ignore")
+from pyw3d import headless
+headless.install()
+from pyw3d.headless import mathutils
+from pyw3d.placement import convert_to_legacy_axes
+from pyw3d.placement_table import PlacementTable
+from synthetic import synthetic_project
+
+SHIFT = (0.5, -0.25, 1.)
+WALL_LOCATIONS = {
+    "Center": (0, 0, 0),
+    "FrontWall": (0, 0, -4),
+    "LeftWall": (-4, 0, 0),
+    "RightWall": (4, 0, 0),
+    "FloorWall": (0, -4, 0)}
+TOLERANCE = 1e-9
+
+
+class Located(object):
+    """Stand-in for a Blender object at a given location"""
+
+    def __init__(self, location):
+        self.location = location
+
+
+def shift_features(objects):
+    for w3d_object in objects:
+        position = w3d_object["placement"]["position"]
+        w3d_object["placement"]["position"] = tuple(
+            component + offset for component, offset in zip(position, SHIFT))
+
+
+def shift_table(table, objects):
+    positions = table.positions
+    for axis, offset in enumerate(SHIFT):
+        positions[axis::3] = array("d", [
+            component + offset for component in positions[axis::3]])
+    table.store(objects)
+
+
+def convert_features(objects):
+    return [
+        convert_to_legacy_axes(w3d_object["placement"]["position"])
+        for w3d_object in objects]
+
+
+def convert_table(table, objects):
+    table.convert_to_legacy_axes()
+    return table.positions
+
+
+def transforms_features(objects):
+    result = []
+    for w3d_object in objects:
+        placement = w3d_object["placement"]
+        location = (
+            mathutils.Vector(placement["position"]) +
+            mathutils.Vector(WALL_LOCATIONS[placement["relative_to"]]))
+        matrix = placement.peek("rotation").get_rotation_matrix(
+            Located(location))
+        result.append((location, matrix))
+    return result
+
+
+def transforms_table(table, objects):
+    locations = table.world_locations(WALL_LOCATIONS)
+    return locations, table.rotation_matrices(locations)
+
+
+def xml_output(objects):
+    root = ET.Element("ObjectRoot")
+    for w3d_object in objects:
+        w3d_object.toXML(root)
+    return ET.tostring(root)
+
+
+def check_shift(features_project, table_project, *_):
+    assert (xml_output(features_project["objects"]) ==
+            xml_output(table_project["objects"]))
+
+
+def check_convert(features_project, table_project, by_features, by_table):
+    assert list(by_table) == [
+        component for position in by_features for component in position]
+
+
+def check_transforms(features_project, table_project, by_features, by_table):
+    locations, matrices = by_table
+    for index, (location, matrix) in enumerate(by_features):
+        for axis in range(3):
+            assert abs(location[axis] - locations[3*index + axis]) < TOLERANCE
+            for column in range(3):
+                assert abs(
+                    matrix[axis][column] -
+                    matrices[9*index + 3*axis + column]) < TOLERANCE
+
+
+OPERATIONS = (
+    ("shift", shift_features, shift_table, check_shift),
+    ("convert", convert_features, convert_table, check_convert),
+    ("transforms", transforms_features, transforms_table, check_transforms),
+)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark bulk placement transforms")
+    parser.add_argument(
+        "--objects", type=int, nargs="+", default=[1000, 10000],
+        help="Numbers of objects")
+    args = parser.parse_args()
+
+    for num_objects in args.objects:
+        print("{} objects".format(num_objects))
+        for label, by_features, by_table, check in OPERATIONS:
+            features_project = synthetic_project(num_objects=num_objects)
+            table_project = synthetic_project(num_objects=num_objects)
+            features_time, features_result = timed(
+                by_features, features_project["objects"])
+            build_time, table = timed(
+                PlacementTable.from_objects, table_project["objects"])
+            table_time, table_result = timed(
+                by_table, table, table_project["objects"])
+            check(
+                features_project, table_project, features_result,
+                table_result)
+            print(
+                "{:>12}: features {:7.3f} s, table {:7.3f} s (build"
+                " {:7.3f} s)".format(
+                    label, features_time, table_time, build_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Measure per-tick cost of detecting user position for many position
+triggers
+
+A story with many HeadPositionTriggers is run with the headless stand-ins
+while the camera moves forward through the boxes of the triggers. Detection
+by the shared BlenderRegionIndex is compared against the previous
+implementation, in which every trigger had its own detection controller,
+and the status of every trigger is checked to agree between the two on
+every tick.
+
+To run this script, use the following command:
+python3 region_trigger_benchmark.py [--triggers N [N ...]] [--seconds S]
+"""
+
+import os
+import sys
+import random
+import warnings
+import argparse
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Validators warn on every reference check made outside of a project, and
+# pyw3d warns about each Blender module it cannot import
+warnings.simplefilter("ignore")
+from pyw3d import headless
+headless.install()
+import pyw3d.triggers
+from pyw3d.project import W3DProject
+from pyw3d.triggers import HeadPositionTrigger, EventBox
+from pyw3d.activators import BlenderPositionTrigger
+from pyw3d.names import generate_trigger_name
+import bpy
+
+
+class LegacyPositionTrigger(BlenderPositionTrigger):
+    """BlenderPositionTrigger as implemented before regions were indexed,
+    with a detection controller for each trigger"""
+
+    def create_enabled_sensor(self):
+        base_object = self.select_base_object()
+        bpy.ops.logic.sensor_add(
+            type="PROPERTY",
+            object=self.name,
+            name="enabled_sensor"
+        )
+        base_object.game.sensors[-1].name = self.name
+        enable_sensor = base_object.game.sensors[self.name]
+        enable_sensor.use_pulse_true_level = True
+        enable_sensor.frequency = 1
+        enable_sensor.property = "enabled"
+        enable_sensor.value = "True"
+        self.enable_sensor = enable_sensor
+        return enable_sensor
+
+    def create_detection_controller(self):
+        bpy.ops.logic.controller_add(
+            type='PYTHON',
+            object=self.name,
+            name="detect")
+        controller = self.base_object.game.controllers["detect"]
+        controller.mode = "MODULE"
+        controller.module = "{}.detect_event".format(self.name)
+        self.detect_controller = controller
+        return controller
+
+    def generate_detection_logic(self):
+        detection_logic = [
+            "\ndef detect_event(cont):",
+            "    scene = bge.logic.getCurrentScene()",
+            "    own = cont.owner",
+            "    position = scene.objects['CAMERA'].position",
+            "    inside = True",
+            "    corners = {}".format(
+                list(zip(self.box["corner1"], self.box["corner2"]))),
+            "    for i in range({}):".format((3, 2)[self.box["ignore_y"]]),
+            "        if (",
+            "                position[i] < min(corners[i]) or",
+            "                position[i] > max(corners[i])):",
+            "            inside = False",
+            "            break",
+            "    if ({} and own['enabled'] and".format(
+                ("not inside", "inside")[
+                    self.box["direction"] == "Inside"]),
+            "            own['status'] == 'Stop'):",
+            "        own['status'] = 'Start'"
+        ]
+        return "\n".join(detection_logic)
+
+    def create_blender_objects(self):
+        super(LegacyPositionTrigger, self).create_blender_objects()
+        self.create_enabled_sensor()
+        self.create_detection_controller()
+
+    def link_logic_bricks(self):
+        super(LegacyPositionTrigger, self).link_logic_bricks()
+        self.detect_controller.link(sensor=self.enable_sensor)
+
+
+def trigger_project(num_triggers):
+    """Return project with boxes scattered around the path of a camera
+    moving forward from the origin, one in ten of which trigger on leaving
+    the box"""
+    rng = random.Random(0)
+    project = W3DProject(allow_movement=True)
+    for index in range(num_triggers):
+        x = rng.uniform(-20, 20)
+        y = rng.uniform(-5, 100)
+        width = rng.uniform(0.5, 4)
+        project["trigger_events"].append(HeadPositionTrigger(
+            name="trigger{}".format(index),
+            box=EventBox(
+                direction=("Inside", "Outside")[index % 10 == 0],
+                corner1=(x, y, -1),
+                corner2=(x + width, y + width, 1)),
+            actions=[]))
+    return project
+
+
+def run(project, num_triggers, seconds):
+    """Return (detection time per tick in seconds, statuses of triggers on
+    each tick)"""
+    trigger_names = [
+        generate_trigger_name("trigger{}".format(index))
+        for index in range(num_triggers)]
+    history = []
+    with headless.simulate(project) as simulation:
+        simulation.set_sensor("CAMERA", "Forward")
+        for _ in range(int(seconds*simulation.tic_rate)):
+            simulation.step()
+            history.append(tuple(
+                simulation.scene.objects[name]["status"]
+                for name in trigger_names))
+        detect_time = sum(
+            timing.seconds for timing in simulation.timings.values()
+            if timing.name.endswith(".detect"))
+        return detect_time/simulation.frame, history
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark detection of position triggers")
+    parser.add_argument(
+        "--triggers", type=int, nargs="+", default=[10, 100, 1000],
+        help="Numbers of position triggers")
+    parser.add_argument(
+        "--seconds", type=float, default=10,
+        help="Simulated seconds to run game logic for")
+    args = parser.parse_args()
+
+    for num_triggers in args.triggers:
+        project = trigger_project(num_triggers)
+        indexed_time, indexed_history = run(
+            project, num_triggers, args.seconds)
+        blend_region_index = W3DProject.blend_region_index
+        pyw3d.triggers.BlenderPositionTrigger = LegacyPositionTrigger
+        W3DProject.blend_region_index = lambda project: None
+        try:
+            legacy_time, legacy_history = run(
+                project, num_triggers, args.seconds)
+        finally:
+            pyw3d.triggers.BlenderPositionTrigger = BlenderPositionTrigger
+            W3DProject.blend_region_index = blend_region_index
+        assert indexed_history == legacy_history
+        starts = sum(
+            statuses.count("Start") for statuses in indexed_history)
+        print("{} position triggers ({} activations)".format(
+            num_triggers, starts))
+        print("     legacy: {:8.1f} us/tick".format(1e6*legacy_time))
+        print("    indexed: {:8.1f} us/tick ({:.1f}x faster)".format(
+            1e6*indexed_time, legacy_time/indexed_time))
+
+
+if __name__ == "__main__":
+    main()
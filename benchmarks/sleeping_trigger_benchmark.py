@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Count controller invocations saved by letting disabled and running
+triggers sleep
+
+A story with position and look triggers is run with the headless stand-ins
+while the camera moves forward and turns. Every trigger moves an object for
+a few seconds when activated, and half of them disable themselves when they
+finish. All triggers start disabled and are enabled together by a timeline
+at regular intervals, so that there are stretches in which every trigger is
+asleep. Detectors which only test awake triggers and stop running while
+every trigger sleeps are compared against detectors which test every trigger
+on every detection tick, as before triggers could sleep.
+
+A sleeping detector sees that a trigger has been woken on the tick after it
+is enabled, as each trigger did when it had its own detection sensor, so
+activations which follow enabling may come a tick later than with polling.
+Activations of each trigger are matched between the two runs and the number
+which do not agree to within two ticks (one tick of delay and one of the
+phase of detection, which runs on every other tick) is reported.
+
+To run this script, use the following command:
+python3 sleeping_trigger_benchmark.py [--triggers N [N ...]] [--seconds S]
+    [--interval S]
+"""
+
+import os
+import sys
+import math
+import random
+import warnings
+import argparse
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Validators warn on every reference check made outside of a project, and
+# pyw3d warns about each Blender module it cannot import
+warnings.simplefilter("ignore")
+from pyw3d import headless
+headless.install()
+import pyw3d.project
+from pyw3d.project import W3DProject
+from pyw3d.placement import W3DPlacement
+from pyw3d.timeline import W3DTimeline
+from pyw3d.actions import ObjectAction, EventTriggerAction
+from pyw3d.triggers import HeadPositionTrigger, LookAtDirection, EventBox
+from pyw3d.names import generate_trigger_name
+from synthetic import synthetic_object
+
+# Detectors test every trigger on every detection tick
+POLLING_RUNTIME = """
+
+class _Everyone(object):
+    def __contains__(self, name):
+        return True
+
+    def __bool__(self):
+        return True
+
+    def isdisjoint(self, names):
+        return False
+
+_EVERYONE = _Everyone()
+
+
+def awake_triggers(detector, property_name, trigger_names):
+    return _EVERYONE
+
+
+def wake_trigger(trigger):
+    pass
+"""
+
+
+def trigger_project(num_triggers, seconds, interval):
+    """Return project with equal numbers of position and look triggers,
+    which are all enabled every interval seconds"""
+    rng = random.Random(0)
+    project = W3DProject(allow_movement=True)
+    num_objects = max(num_triggers//10, 1)
+    for index in range(num_objects):
+        project["objects"].append(synthetic_object(index))
+    names = []
+    for index in range(num_triggers):
+        name = "trigger{}".format(index)
+        names.append(name)
+        if index % 2:
+            x = rng.uniform(-10, 10)
+            y = rng.uniform(-5, 50)
+            width = rng.uniform(0.5, 4)
+            trigger = HeadPositionTrigger(
+                name=name,
+                box=EventBox(
+                    direction=("Inside", "Outside")[index % 10 == 1],
+                    corner1=(x, y, -1),
+                    corner2=(x + width, y + width, 1)))
+        else:
+            azimuth = rng.uniform(0, 2*math.pi)
+            trigger = LookAtDirection(
+                name=name,
+                direction=(math.cos(azimuth), math.sin(azimuth), 0))
+        trigger["enabled"] = False
+        trigger["remain_enabled"] = index % 4 < 2
+        trigger["actions"] = [ObjectAction(
+            object_name="object{}".format(index % num_objects),
+            duration=rng.uniform(1, 3), move_relative=True,
+            placement=W3DPlacement(position=(0, 0, 0.1)))]
+        project["trigger_events"].append(trigger)
+    actions = []
+    time = interval/2
+    while time < seconds:
+        actions.extend(
+            (time, EventTriggerAction(trigger_name=name, enable=True))
+            for name in names)
+        time += interval
+    project["timelines"].append(W3DTimeline(
+        name="enabler", start_immediately=True, actions=actions))
+    return project
+
+
+def activations(history, index):
+    """Return ticks on which trigger with given index was started"""
+    return [
+        tick for tick, statuses in enumerate(history)
+        if statuses[index] == "Start"]
+
+
+def unmatched(ticks, other_ticks, tolerance=2):
+    """Return number of ticks in either list which have no counterpart
+    within tolerance in the other list"""
+    ticks = list(ticks)
+    other_ticks = list(other_ticks)
+    count = 0
+    while ticks and other_ticks:
+        if abs(ticks[0] - other_ticks[0]) <= tolerance:
+            ticks.pop(0)
+            other_ticks.pop(0)
+        elif ticks[0] < other_ticks[0]:
+            ticks.pop(0)
+            count += 1
+        else:
+            other_ticks.pop(0)
+            count += 1
+    return count + len(ticks) + len(other_ticks)
+
+
+def run(project, num_triggers, seconds):
+    """Return (controller invocations per tick, detection invocations per
+    tick, detection time per tick in seconds, statuses of triggers on each
+    tick)"""
+    trigger_names = [
+        generate_trigger_name("trigger{}".format(index))
+        for index in range(num_triggers)]
+    history = []
+    with headless.simulate(project) as simulation:
+        simulation.set_sensor("CAMERA", "Forward")
+        camera = simulation.scene.objects["CAMERA"]
+        ticks = int(seconds*simulation.tic_rate)
+        for _ in range(ticks):
+            camera.applyRotation((0, 0, 4*math.pi/ticks))
+            simulation.step()
+            history.append(tuple(
+                simulation.scene.objects[name]["status"]
+                for name in trigger_names))
+        detection = [
+            timing for timing in simulation.timings.values()
+            if timing.name in ("region_index.detect", "CAMERA.look_index")]
+        return (
+            sum(timing.calls for timing in simulation.timings.values()) /
+            simulation.frame,
+            sum(timing.calls for timing in detection)/simulation.frame,
+            sum(timing.seconds for timing in detection)/simulation.frame,
+            history)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark sleeping of disabled and running triggers")
+    parser.add_argument(
+        "--triggers", type=int, nargs="+", default=[10, 100, 1000],
+        help="Numbers of triggers")
+    parser.add_argument(
+        "--seconds", type=float, default=20,
+        help="Simulated seconds to run game logic for")
+    parser.add_argument(
+        "--interval", type=float, default=8,
+        help="Seconds between enabling all triggers")
+    args = parser.parse_args()
+
+    for num_triggers in args.triggers:
+        project = trigger_project(num_triggers, args.seconds, args.interval)
+        sleeping = run(project, num_triggers, args.seconds)
+        runtime_script = pyw3d.project.RUNTIME_SCRIPT
+        pyw3d.project.RUNTIME_SCRIPT = runtime_script + POLLING_RUNTIME
+        try:
+            polling = run(project, num_triggers, args.seconds)
+        finally:
+            pyw3d.project.RUNTIME_SCRIPT = runtime_script
+        starts = sum(statuses.count("Start") for statuses in polling[3])
+        differing = sum(
+            unmatched(
+                activations(sleeping[3], index),
+                activations(polling[3], index))
+            for index in range(num_triggers))
+        print("{} triggers ({} activations, {} not matched)".format(
+            num_triggers, starts, differing))
+        for label, result in (("polling", polling), ("sleeping", sleeping)):
+            print(
+                "{:>11}: {:6.1f} invocations/tick ({:.2f} detection) "
+                "{:8.1f} us/tick detection".format(
+                    label, result[0], result[1], 1e6*result[2]))
+
+
+if __name__ == "__main__":
+    main()
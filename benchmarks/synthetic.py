@@ -0,0 +1,147 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Synthetic W3D projects of arbitrary size for use in benchmarks
+
+Projects are built deterministically from their size parameters, so that
+repeated runs of a benchmark operate on identical stories.
+"""
+import os
+import sys
+import math
+import xml.etree.ElementTree as ET
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pyw3d.project import W3DProject
+from pyw3d.objects import W3DObject, W3DText, W3DLink
+from pyw3d.placement import W3DPlacement, W3DRotation
+from pyw3d.groups import W3DGroup
+from pyw3d.timeline import W3DTimeline
+from pyw3d.actions import ObjectAction, GroupAction, TimelineAction
+from pyw3d.triggers import HeadPositionTrigger, EventBox
+
+
+def synthetic_object(index):
+    """Return a W3DObject with varied placement, color and content"""
+    angle = 2*math.pi*index/97.
+    new_object = W3DObject(
+        name="object{}".format(index),
+        color=(index % 256, (7*index) % 256, (13*index) % 256),
+        placement=W3DPlacement(
+            relative_to=("Center", "FrontWall", "LeftWall")[index % 3],
+            position=(
+                3*math.cos(angle), 3*math.sin(angle), (index % 11)*0.1),
+        ),
+        content=W3DText(text="Text {}".format(index)),
+    )
+    if index % 5 == 0:
+        new_object["placement"]["rotation"] = W3DRotation(
+            rotation_mode="LookAt", rotation_vector=(0, 0, 0))
+    if index % 10 == 0:
+        new_object["link"] = W3DLink(
+            actions={-1: [ObjectAction(
+                object_name="object{}".format(index), visible=False)]})
+    return new_object
+
+
+def synthetic_timeline(index, num_actions, num_objects):
+    """Return a W3DTimeline with num_actions actions on num_objects objects
+    """
+    actions = []
+    for action_index in range(num_actions):
+        object_name = "object{}".format(
+            (index*num_actions + action_index) % max(num_objects, 1))
+        if action_index % 3 == 0:
+            action = ObjectAction(
+                object_name=object_name,
+                duration=1,
+                placement=W3DPlacement(position=(0, 0.1, 0)),
+                move_relative=True)
+        elif action_index % 3 == 1:
+            action = ObjectAction(
+                object_name=object_name,
+                duration=2,
+                color=(255, action_index % 256, 0))
+        else:
+            action = ObjectAction(
+                object_name=object_name,
+                duration=0.5,
+                scale=1.5)
+        actions.append(((action_index*7) % (num_actions + 1)*0.25, action))
+    return W3DTimeline(
+        name="timeline{}".format(index),
+        start_immediately=(index == 0),
+        actions=actions)
+
+
+def synthetic_project(
+        num_objects=1000, num_groups=10, num_timelines=10,
+        actions_per_timeline=100, num_triggers=10):
+    """Return a W3DProject populated with synthetic features
+
+    :param int num_objects: Number of W3DObjects
+    :param int num_groups: Number of W3DGroups, each containing every
+    num_groups-th object
+    :param int num_timelines: Number of W3DTimelines
+    :param int actions_per_timeline: Number of actions in each timeline
+    :param int num_triggers: Number of position triggers
+    """
+    project = W3DProject(allow_movement=True)
+    for index in range(num_objects):
+        project["objects"].append(synthetic_object(index))
+    for index in range(num_groups):
+        project["groups"].append(W3DGroup(
+            name="group{}".format(index),
+            objects=[
+                "object{}".format(object_index) for object_index in
+                range(index, num_objects, num_groups)]
+        ))
+    for index in range(num_timelines):
+        project["timelines"].append(synthetic_timeline(
+            index, actions_per_timeline, num_objects))
+    for index in range(num_triggers):
+        actions = [
+            TimelineAction(
+                timeline_name="timeline{}".format(index % max(
+                    num_timelines, 1)),
+                change="Start")
+        ] if num_timelines else []
+        if num_groups:
+            actions.append(GroupAction(
+                group_name="group{}".format(index % num_groups),
+                visible=True))
+        project["trigger_events"].append(HeadPositionTrigger(
+            name="trigger{}".format(index),
+            box=EventBox(
+                direction=("Inside", "Outside")[index % 2],
+                corner1=(index, -1, -1),
+                corner2=(index + 1, 1, 1)),
+            actions=actions))
+    return project
+
+
+def write_synthetic_story(filename, **kwargs):
+    """Write synthetic project (see synthetic_project) to W3D XML file
+
+    The story is written without pretty-printing so that large stories can be
+    generated quickly.
+
+    :param str filename: Filename for XML output
+    """
+    project = synthetic_project(**kwargs)
+    ET.ElementTree(project.toXML()).write(filename, encoding="unicode")
+    return project
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Measure the cost of building large timelines
+
+Two workloads are timed, each with the current SortedList and with the
+previous implementation (linear scan on insertion, with actions that start
+at the same time ordered by comparing their reprs):
+    1. Adding actions one at a time to W3DTimeline["actions"]
+    2. Loading a Timeline node with W3DTimeline.fromXML
+
+Start times are drawn from a small set of values so that many actions share
+a start time, as is typical of authored timelines.
+
+To run this script, use the following command:
+python3 timeline_benchmark.py [--actions N]
+"""
+
+import os
+import sys
+import gc
+import time
+import random
+import warnings
+import argparse
+import xml.etree.ElementTree as ET
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Validators warn on every reference check made outside of a project, which
+# would otherwise dominate the timings below
+warnings.simplefilter("ignore")
+import pyw3d.timeline
+from pyw3d.timeline import W3DTimeline
+from pyw3d.actions import ObjectAction
+from pyw3d.placement import W3DPlacement
+
+
+CurrentSortedList = pyw3d.timeline.SortedList
+
+
+class LegacySortedList(pyw3d.timeline.SortedList):
+    """SortedList as implemented before sort keys were cached"""
+
+    def __init__(self, init_list=None, sort_key=None):
+        self.sort_key = None
+        if init_list is None:
+            init_list = []
+        self._data = init_list
+        self.sort()
+
+    def __setitem__(self, index, value):
+        self._data.__setitem__(index, value)
+        self.sort()
+
+    def __delitem__(self, index):
+        del self._data[index]
+
+    def add(self, new_item):
+        for index, item in enumerate(self._data):
+            if new_item < item:
+                self._data.insert(index, new_item)
+                return
+        self._data.append(new_item)
+
+    def sort(self):
+        self._data.sort()
+
+    def extend(self, value_list):
+        for value in value_list:
+            self.add(value)
+
+
+def synthetic_actions(num_actions):
+    """Return list of (start time, ObjectAction) in shuffled order"""
+    rng = random.Random(0)
+    actions = []
+    for index in range(num_actions):
+        start_time = rng.randrange(max(num_actions // 20, 1))*0.5
+        action = ObjectAction(
+            object_name="object{}".format(index % 100),
+            duration=1,
+            placement=W3DPlacement(position=(0, 0.1*(index % 7), 0)),
+            move_relative=True)
+        actions.append((start_time, action))
+    return actions
+
+
+def add_actions(actions):
+    """Add actions to a new timeline one at a time"""
+    timeline = W3DTimeline(name="timeline")
+    for timed_action in actions:
+        timeline["actions"].add(timed_action)
+    return timeline
+
+
+def time_call(function, *args):
+    """Return (result, wall time in seconds) of calling function"""
+    gc.collect()
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def compare(label, function, *args):
+    """Print timings for function with current and legacy SortedList"""
+    current, current_time = time_call(function, *args)
+    pyw3d.timeline.SortedList = LegacySortedList
+    try:
+        legacy, legacy_time = time_call(function, *args)
+    finally:
+        pyw3d.timeline.SortedList = CurrentSortedList
+    times = [entry[0] for entry in current["actions"]]
+    assert times == sorted(times)
+    assert times == [entry[0] for entry in legacy["actions"]]
+    print(label)
+    print("    legacy: {:7.2f} s".format(legacy_time))
+    print("   current: {:7.2f} s ({:.1f}x faster)".format(
+        current_time, legacy_time/current_time))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark timeline construction")
+    parser.add_argument(
+        "--actions", type=int, default=10000,
+        help="Number of actions in timeline")
+    args = parser.parse_args()
+
+    actions = synthetic_actions(args.actions)
+    compare(
+        "Adding {} actions".format(args.actions), add_actions, actions)
+
+    timeline_root = ET.Element("TimelineRoot")
+    add_actions(actions).toXML(timeline_root)
+    compare(
+        "fromXML on timeline with {} actions".format(args.actions),
+        W3DTimeline.fromXML, timeline_root.find("Timeline"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Measure per-tick cost of the BGE logic generated for timelines
+
+The control script generated by BlenderTimeline is executed outside of
+Blender against a minimal stand-in for the bge module, with a simulated clock
+advancing one logic tick (1/60 s) per call. Generated scripts share object
+handles and transitions through the w3d_runtime text block, which is loaded
+alongside them, and the transitions it holds are advanced after every call
+as part of the cost of the tick. The scheduled dispatcher is
+compared against the previous flat script, which tested the conditions of
+every action on every tick, and the final state of all objects is checked
+to agree between the two.
+
+To run this script, use the following command:
+python3 timeline_logic_benchmark.py [--actions N [N ...]]
+"""
+
+import os
+import sys
+import time
+import types
+import warnings
+import argparse
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Validators warn on every reference check made outside of a project, and
+# pyw3d warns about each Blender module it cannot import
+warnings.simplefilter("ignore")
+from pyw3d.actions import ObjectAction
+from pyw3d.placement import W3DPlacement
+from pyw3d.structs import SortedList
+from pyw3d.timeline import action_time
+from pyw3d.names import generate_blender_object_name
+from pyw3d.activators import Activator
+from pyw3d.activators.timelines import BlenderTimeline
+from pyw3d.blender_scripts import RUNTIME_SCRIPT
+from pyw3d.headless import mathutils
+
+TIC_RATE = 60
+NUM_OBJECTS = 50
+
+
+class FlatTimeline(BlenderTimeline):
+    """BlenderTimeline generating the previous flat action logic"""
+
+    def generate_action_logic(self):
+        action_logic = ["        # ACTION LOGIC BEGINS HERE"]
+        if len(self.actions) == 0:
+            max_time = 0
+        else:
+            max_time = self.actions[-1][0]
+        for action_index, (time, action) in enumerate(self.actions):
+            action_logic.extend(
+                action.generate_blender_logic(
+                    time_condition=time,
+                    index_condition=action_index,
+                    offset=2)
+            )
+            max_time = max(max_time, action.end_time)
+        self.script_footer = self.script_footer.format(max_time=max_time)
+        return "\n".join(action_logic)
+
+    generate_python_logic = Activator.generate_python_logic
+
+
+class GameObject(dict):
+    """Stand-in for bge.types.KX_GameObject"""
+
+    def __init__(self, name, **properties):
+        super(GameObject, self).__init__(**properties)
+        self.name = name
+        self.position = mathutils.Vector((0., 0., 0.))
+        self.color = mathutils.Vector((1., 1., 1., 1.))
+        self.scaling = mathutils.Vector((1., 1., 1.))
+        self.visible = True
+        self.invalid = False
+
+    def setVisible(self, visible):
+        self.visible = visible
+
+    def state(self):
+        return (
+            tuple(round(coord, 6) for coord in self.position),
+            tuple(round(channel, 6) for channel in self.color),
+            self.visible)
+
+
+class Scene(object):
+    """Stand-in for bge.types.KX_Scene"""
+
+    def __init__(self):
+        self.objects = {}
+
+    def restart(self):
+        pass
+
+
+def install_stub_modules(scene):
+    """Make stand-ins for the BGE modules imported by generated scripts
+    importable, along with the w3d_runtime text block
+
+    :returns: The w3d_runtime module"""
+    bge = types.ModuleType("bge")
+    bge.logic = types.SimpleNamespace(
+        getCurrentScene=lambda: scene,
+        getLogicTicRate=lambda: TIC_RATE)
+    sys.modules["bge"] = bge
+    sys.modules["group_defs"] = types.ModuleType("group_defs")
+    sys.modules["mathutils"] = mathutils
+    runtime = types.ModuleType("w3d_runtime")
+    exec(compile(RUNTIME_SCRIPT, "w3d_runtime", "exec"), runtime.__dict__)
+    sys.modules["w3d_runtime"] = runtime
+    return runtime
+
+
+def synthetic_actions(num_actions):
+    """Return SortedList of (start time, ObjectAction) with about three
+    actions starting each second"""
+    actions = SortedList(sort_key=action_time)
+    for index in range(num_actions):
+        object_name = "object{}".format(index % NUM_OBJECTS)
+        if index % 3 == 0:
+            action = ObjectAction(
+                object_name=object_name, duration=1,
+                placement=W3DPlacement(position=(0, 0.1, 0)),
+                move_relative=True)
+        elif index % 3 == 1:
+            action = ObjectAction(
+                object_name=object_name, duration=2,
+                color=(255, index % 256, 0))
+        else:
+            action = ObjectAction(
+                object_name=object_name, duration=0.5,
+                visible=bool(index % 2))
+        actions.add((index/3., action))
+    return actions
+
+
+def run_script(script_text):
+    """Execute generated script until timeline stops
+
+    Returns (number of ticks, total seconds spent in activate, final state
+    of objects)"""
+    scene = Scene()
+    runtime = install_stub_modules(scene)
+    for index in range(NUM_OBJECTS):
+        name = generate_blender_object_name("object{}".format(index))
+        scene.objects[name] = GameObject(name)
+    module = types.ModuleType("timeline_script")
+    exec(compile(script_text, "timeline_script", "exec"), module.__dict__)
+    clock = [0.]
+    module.monotonic = runtime.monotonic = lambda: clock[0]
+
+    own = GameObject("timeline", status="Start")
+    scene.objects[own.name] = own
+    controller = types.SimpleNamespace(owner=own)
+    ticks = 0
+    total = 0.
+    while True:
+        start = time.perf_counter()
+        module.activate(controller)
+        runtime.advance_transitions(controller)
+        total += time.perf_counter() - start
+        ticks += 1
+        clock[0] += 1./TIC_RATE
+        if own["status"] == "Stop":
+            break
+    final_state = {
+        name: blender_object.state()
+        for name, blender_object in scene.objects.items()
+        if blender_object is not own}
+    return ticks, total, final_state
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark generated timeline logic")
+    parser.add_argument(
+        "--actions", type=int, nargs="+", default=[100, 1000, 3000],
+        help="Numbers of actions in timeline")
+    args = parser.parse_args()
+
+    for num_actions in args.actions:
+        actions = synthetic_actions(num_actions)
+        results = []
+        for timeline_class in (FlatTimeline, BlenderTimeline):
+            script_text = timeline_class(
+                "timeline", actions).generate_python_logic()
+            results.append(run_script(script_text))
+        (flat_ticks, flat_time, flat_state), (
+            ticks, scheduled_time, state) = results
+        assert flat_ticks == ticks
+        assert flat_state == state
+        print("Timeline with {} actions ({} ticks)".format(
+            num_actions, ticks))
+        print("         flat: {:8.1f} us/tick".format(1e6*flat_time/ticks))
+        print("    scheduled: {:8.1f} us/tick ({:.1f}x faster)".format(
+            1e6*scheduled_time/ticks, flat_time/scheduled_time))
+
+
+if __name__ == "__main__":
+    main()
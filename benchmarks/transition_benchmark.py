@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Measure per-tick cost of continuous moves, color changes, and scaling
+
+A story which moves and turns individual objects while recoloring and then
+rescaling whole groups of objects is run with the headless stand-ins.
+Transitions which add a fixed velocity on every tick, advanced by the shared
+transition engine of w3d_runtime, are compared against the previous
+implementation, in which every running action updated each of its objects on
+every tick, and the position, color, and scale of every object are checked to
+agree between the two on every tick. The time taken by the default
+transitions, which interpolate by the time elapsed, is also reported.
+
+Rotations and vector arithmetic are computed in pure Python by the headless
+mathutils, so the cost of the one move in ten which also turns an object, and
+of interpolation, is much higher than it would be in the BGE.
+
+To run this script, use the following command:
+python3 transition_benchmark.py [--objects N] [--groups N] [--actions N]
+    [--seconds S]
+"""
+
+import os
+import re
+import sys
+import warnings
+import argparse
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Validators warn on every reference check made outside of a project, and
+# pyw3d warns about each Blender module it cannot import
+warnings.simplefilter("ignore")
+from pyw3d import headless
+headless.install()
+import pyw3d.actions
+from pyw3d.actions import ObjectAction, GroupAction
+from pyw3d.placement import W3DPlacement, W3DRotation
+from pyw3d.groups import W3DGroup
+from pyw3d.timeline import W3DTimeline
+from pyw3d.project import W3DProject
+from pyw3d.blender_actions import MoveAction, ColorAction, ScaleAction
+from synthetic import synthetic_object
+
+
+VELOCITY_PROPERTIES = {
+    "position": "linV",
+    "rotation": "angV",
+    "color": "colorV",
+    "scaling": "scaleV"
+}
+START_TRANSITION = re.compile(
+    r"start_transition\(own, '[^']*', blender_object, '(\w+)', (.*)\)$")
+
+
+def velocity_class(action_class):
+    """Return subclass of action_class whose transitions add a fixed
+    velocity on every tick rather than interpolating"""
+
+    class VelocityAction(action_class):
+
+        def __init__(self, *args, **kwargs):
+            kwargs["interpolate"] = False
+            super(VelocityAction, self).__init__(*args, **kwargs)
+    VelocityAction.__name__ = "Velocity{}".format(action_class.__name__)
+    return VelocityAction
+
+
+VelocityMoveAction = velocity_class(MoveAction)
+VelocityColorAction = velocity_class(ColorAction)
+VelocityScaleAction = velocity_class(ScaleAction)
+
+
+def without_transitions(script_text, offset):
+    """Return script_text with velocities registered with the transition
+    engine stored in properties of the object instead, and without any other
+    calls to the transition engine"""
+    lines = []
+    for line in script_text.split("\n"):
+        match = START_TRANSITION.search(line)
+        if match is not None:
+            lines.append("{}blender_object['{}'] = {}".format(
+                line[:match.start()],
+                VELOCITY_PROPERTIES[match.group(1)], match.group(2)))
+        elif "_transition(" not in line:
+            lines.append(line)
+    if not any(line.strip() for line in lines):
+        return "{}pass".format("    "*offset)
+    lines[0] = "{}{}".format("    "*offset, lines[0].lstrip())
+    return "\n".join(lines)
+
+
+class LegacyMoveAction(VelocityMoveAction):
+    """MoveAction as implemented before the transition engine"""
+
+    @property
+    def start_string(self):
+        return without_transitions(
+            super(LegacyMoveAction, self).start_string, self.offset)
+
+    @property
+    def continue_string(self):
+        script_text = []
+        if self.placement["rotation"]["rotation_mode"] != "None":
+            script_text.extend([
+                "delta_rot = blender_object['angV']",
+                "blender_object.applyRotation(delta_rot)"])
+        if "position" in self.placement:
+            script_text.extend([
+                "blender_object.position = [",
+                "    blender_object.position[i] + blender_object['linV'][i]",
+                "    for i in range(len(blender_object.position))]"])
+        if not script_text:
+            return ""
+        return "\n".join(
+            "{}{}".format("    "*self.offset, line) for line in script_text)
+
+    @property
+    def end_string(self):
+        return without_transitions(
+            super(LegacyMoveAction, self).end_string, self.offset)
+
+
+class LegacyColorAction(VelocityColorAction):
+    """ColorAction as implemented before the transition engine"""
+
+    @property
+    def start_string(self):
+        return without_transitions(
+            super(LegacyColorAction, self).start_string, self.offset)
+
+    @property
+    def continue_string(self):
+        return "\n".join("{}{}".format("    "*self.offset, line) for line in (
+            "new_color = blender_object.color",
+            "for i in range(len(blender_object['colorV'])):",
+            "    new_color[i] += blender_object['colorV'][i]",
+            "blender_object.color = new_color"))
+
+    @property
+    def end_string(self):
+        return without_transitions(
+            super(LegacyColorAction, self).end_string, self.offset)
+
+
+class LegacyScaleAction(VelocityScaleAction):
+    """ScaleAction as implemented before the transition engine"""
+
+    @property
+    def start_string(self):
+        return without_transitions(
+            super(LegacyScaleAction, self).start_string, self.offset)
+
+    @property
+    def continue_string(self):
+        return "\n".join("{}{}".format("    "*self.offset, line) for line in (
+            "blender_object.scaling = [",
+            "    (blender_object.scaling[i] + blender_object['scaleV'][i])",
+            "    for i in range(len(blender_object.scaling))]"))
+
+    @property
+    def end_string(self):
+        return without_transitions(
+            super(LegacyScaleAction, self).end_string, self.offset)
+
+
+LEGACY_CLASSES = {
+    "MoveAction": LegacyMoveAction,
+    "ColorAction": LegacyColorAction,
+    "ScaleAction": LegacyScaleAction
+}
+VELOCITY_CLASSES = {
+    "MoveAction": VelocityMoveAction,
+    "ColorAction": VelocityColorAction,
+    "ScaleAction": VelocityScaleAction
+}
+
+
+def transition_project(num_objects, num_groups, num_actions):
+    """Return project whose timelines, which all start immediately, move and
+    turn objects and recolor and then rescale whole groups
+
+    No attribute of an object is changed by more than one action at a
+    time."""
+    project = W3DProject()
+    for index in range(num_objects):
+        project["objects"].append(synthetic_object(index))
+    for index in range(num_groups):
+        project["groups"].append(W3DGroup(
+            name="group{}".format(index),
+            objects=[
+                "object{}".format(object_index) for object_index in
+                range(index, num_objects, num_groups)]))
+    move_actions = []
+    for index in range(num_actions):
+        placement = W3DPlacement(position=(0, 0.1*(index % 5), 0.2))
+        if index % 10 == 0:
+            placement["rotation"] = W3DRotation(
+                rotation_mode="Axis", rotation_vector=(0, 0, 1),
+                rotation_angle=45)
+        move_actions.append((3.5*(index//num_objects), ObjectAction(
+            object_name="object{}".format(index % num_objects),
+            duration=3, placement=placement, move_relative=True)))
+    group_actions = []
+    for index in range(num_groups):
+        group_actions.append((0.25*index, GroupAction(
+            group_name="group{}".format(index), duration=3,
+            color=(0, 255, (40*index) % 256))))
+        group_actions.append((0.25*index + 3.5, GroupAction(
+            group_name="group{}".format(index), duration=2,
+            scale=1 + 0.1*index)))
+    for name, actions in (
+            ("moves", move_actions), ("group_changes", group_actions)):
+        project["timelines"].append(W3DTimeline(
+            name=name, start_immediately=True, actions=actions))
+    return project
+
+
+def run(project, seconds):
+    """Return (controller time per tick in seconds, state of objects on
+    each tick)"""
+    history = []
+    with headless.simulate(project) as simulation:
+        game_objects = [
+            game_object for game_object in simulation.scene.objects
+            if game_object.name.startswith("object_")]
+        for _ in range(int(seconds*simulation.tic_rate)):
+            simulation.step()
+            history.append(tuple(
+                (tuple(game_object.position), tuple(game_object.color),
+                 tuple(game_object.scaling))
+                for game_object in game_objects))
+        total = sum(
+            timing.seconds for timing in simulation.timings.values())
+        return total/simulation.frame, history
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark continuous changes of objects")
+    parser.add_argument(
+        "--objects", type=int, default=200, help="Number of objects")
+    parser.add_argument(
+        "--groups", type=int, default=4, help="Number of groups")
+    parser.add_argument(
+        "--actions", type=int, default=400,
+        help="Number of moves of individual objects")
+    parser.add_argument(
+        "--seconds", type=float, default=10,
+        help="Simulated seconds to run game logic for")
+    args = parser.parse_args()
+
+    project = transition_project(args.objects, args.groups, args.actions)
+    interpolated_time, _ = run(project, args.seconds)
+    current_classes = {
+        name: getattr(pyw3d.actions, name) for name in LEGACY_CLASSES}
+    setup_transition_engine = W3DProject.setup_transition_engine
+    try:
+        for name, action_class in VELOCITY_CLASSES.items():
+            setattr(pyw3d.actions, name, action_class)
+        engine_time, engine_history = run(project, args.seconds)
+        for name, legacy_class in LEGACY_CLASSES.items():
+            setattr(pyw3d.actions, name, legacy_class)
+        W3DProject.setup_transition_engine = lambda project: None
+        legacy_time, legacy_history = run(project, args.seconds)
+    finally:
+        for name, current_class in current_classes.items():
+            setattr(pyw3d.actions, name, current_class)
+        W3DProject.setup_transition_engine = setup_transition_engine
+    assert engine_history == legacy_history
+    print("     legacy: {:8.1f} us/tick".format(1e6*legacy_time))
+    print("     engine: {:8.1f} us/tick ({:.1f}x faster)".format(
+        1e6*engine_time, legacy_time/engine_time))
+    print("interpolated: {:7.1f} us/tick".format(1e6*interpolated_time))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Compare placing objects through WorldTransforms against the former
+placement, object by object
+
+The objects of a synthetic project, some of them rotated about an axis, some
+looking at a point and some rotated to a normal, are placed in the headless
+stand-in for Blender in two ways:
+
+    legacy: as W3DPlacement.place formerly did, creating a set of wall
+    empties for every object and rotating it with mathutils, first by its
+    wall's rotation and then by its own
+    resolved: by resolving the standard walls once into a WorldTransforms,
+    and placing all objects at once from a PlacementTable
+
+The location and rotation of every object are checked to agree, and the time
+taken by each is reported. Since every wall empty is given a unique name,
+legacy placement slows with the number of objects already placed.
+
+The same objects are then placed relative to non-standard walls, some of
+them placed relative to one another, and checked against walls and objects
+placed one at a time with mathutils.
+
+To run this script, use the following command:
+python3 world_transforms_benchmark.py [--objects N [N ...]]
+"""
+
+import os
+import sys
+import math
+import time
+import warnings
+import argparse
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Validators warn on every reference check made outside of a project, and
+# pyw3d warns about each Blender module it cannot import
+warnings.simplefilter("ignore")
+from pyw3d import headless
+headless.install()
+from pyw3d.headless import bpy
+from pyw3d.blender_backend import get_backend
+from pyw3d.placement import W3DPlacement, W3DRotation, WorldTransforms, \
+    convert_to_blender_axes, standard_wall_placements
+from pyw3d.placement_table import PlacementTable
+from synthetic import synthetic_project
+
+LAYERS = [layer == 3 for layer in range(1, 21)]
+LEGACY_WALL_POSITIONS = {
+    "Center": convert_to_blender_axes((0, 0, 0)),
+    "FrontWall": convert_to_blender_axes((0, 0, -4)),
+    "LeftWall": convert_to_blender_axes((-4, 0, 0)),
+    "RightWall": convert_to_blender_axes((4, 0, 0)),
+    "FloorWall": convert_to_blender_axes((0, 0, -4))}
+LEGACY_WALL_ROTATIONS = {
+    "Center": (0, 0, 0),
+    "FrontWall": (0, 0, 0),
+    "LeftWall": (0, 0, math.pi/2),
+    "RightWall": (0, 0, -math.pi/2),
+    "FloorWall": (-math.pi/2, 0, 0)}
+TOLERANCE = 1e-9
+
+
+def rotated_project(num_objects):
+    """Return synthetic project whose objects use every rotation mode"""
+    project = synthetic_project(
+        num_objects=num_objects, num_timelines=0, num_triggers=0)
+    for index, w3d_object in enumerate(project["objects"]):
+        if index % 4 == 1:
+            w3d_object["placement"]["rotation"] = W3DRotation(
+                rotation_mode="Axis", rotation_vector=(0.3, 1, 0.2),
+                rotation_angle=index % 360)
+        elif index % 4 == 3:
+            w3d_object["placement"]["rotation"] = W3DRotation(
+                rotation_mode="Normal", rotation_vector=(0, 1, 0.5))
+    return project
+
+
+def blender_objects(num_objects):
+    """Return new Blender objects to be placed, some of them already
+    rotated"""
+    new_objects = []
+    for index in range(num_objects):
+        new_object = get_backend().add_empty(
+            "placed{}".format(index), LAYERS)
+        if index % 2:
+            new_object.rotation_euler = (math.pi/2, 0, 0)
+        new_objects.append(new_object)
+    return new_objects
+
+
+def place_legacy(placement, blender_object, walls=None):
+    """Place object as W3DPlacement.place formerly did
+
+    :param dict walls: Wall empties, or None to create a set of standard
+    walls for the object"""
+    if walls is None:
+        walls = {
+            wall: get_backend().add_empty(
+                wall, LAYERS, location=position,
+                rotation=LEGACY_WALL_ROTATIONS[wall])
+            for wall, position in LEGACY_WALL_POSITIONS.items()}
+    relative_object = walls[placement["relative_to"]]
+    position = placement["position"]
+    blender_object.location = [
+        position[i] + relative_object.location[i] for i in range(3)]
+    blender_object.rotation_euler.rotate(relative_object.rotation_euler)
+    placement.peek("rotation").rotate(blender_object)
+
+
+def place_resolved(project, placed):
+    transforms = WorldTransforms(project["wall_placements"])
+    transforms.place_table(
+        PlacementTable.from_objects(project["objects"]), placed)
+
+
+def nonstandard_walls():
+    """Return wall placements with walls moved, turned, and placed relative
+    to one another"""
+    walls = standard_wall_placements()
+    walls["Center"] = W3DPlacement(position=(0.5, 0, 0.2))
+    walls["FrontWall"]["rotation"] = W3DRotation(
+        rotation_mode="Axis", rotation_vector=(0, 0, 1), rotation_angle=30)
+    walls["LeftWall"] = W3DPlacement(
+        relative_to="FrontWall", position=(-1, -1, 0),
+        rotation=W3DRotation(
+            rotation_mode="LookAt", rotation_vector=(0.5, 0, 0.2),
+            up_vector=(0, 0, 1)))
+    walls["RightWall"]["relative_to"] = "Center"
+    return walls
+
+
+def legacy_walls(wall_placements):
+    """Return wall empties placed one at a time, each relative to its
+    wall, as an object would formerly be placed"""
+    walls = {}
+
+    def place_wall(wall):
+        if wall not in walls:
+            placement = wall_placements[wall]
+            empty = get_backend().add_empty(wall, LAYERS)
+            parent = placement["relative_to"]
+            if parent != wall:
+                place_wall(parent)
+                place_legacy(placement, empty, walls)
+            else:
+                empty.location = placement["position"]
+                placement.peek("rotation").rotate(empty)
+            walls[wall] = empty
+    for wall in wall_placements:
+        place_wall(wall)
+    return walls
+
+
+def check(legacy, resolved):
+    for legacy_object, resolved_object in zip(legacy, resolved):
+        for axis in range(3):
+            assert abs(
+                legacy_object.location[axis] -
+                resolved_object.location[axis]) < TOLERANCE
+        legacy_matrix = legacy_object.rotation_euler.to_matrix()
+        resolved_matrix = resolved_object.rotation_euler.to_matrix()
+        for row in range(3):
+            for column in range(3):
+                assert abs(
+                    legacy_matrix[row][column] -
+                    resolved_matrix[row][column]) < TOLERANCE
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark placement through WorldTransforms")
+    parser.add_argument(
+        "--objects", type=int, nargs="+", default=[500, 2000],
+        help="Numbers of objects")
+    args = parser.parse_args()
+
+    for num_objects in args.objects:
+        print("{} objects".format(num_objects))
+        project = rotated_project(num_objects)
+        placements = [
+            w3d_object["placement"] for w3d_object in project["objects"]]
+
+        bpy.read_factory_settings()
+        legacy = blender_objects(num_objects)
+        legacy_time = timed(lambda: [
+            place_legacy(placement, placed)
+            for placement, placed in zip(placements, legacy)])[0]
+        num_empties = len(bpy.data.objects) - num_objects
+        resolved = blender_objects(num_objects)
+        resolved_time = timed(place_resolved, project, resolved)[0]
+        check(legacy, resolved)
+        print(
+            "{:>12}: legacy {:7.3f} s ({} wall empties), resolved {:7.3f}"
+            " s".format(
+                "standard", legacy_time, num_empties, resolved_time))
+
+        bpy.read_factory_settings()
+        project["wall_placements"] = nonstandard_walls()
+        walls = legacy_walls(project["wall_placements"])
+        legacy = blender_objects(num_objects)
+        legacy_time = timed(lambda: [
+            place_legacy(placement, placed, walls)
+            for placement, placed in zip(placements, legacy)])[0]
+        resolved = blender_objects(num_objects)
+        resolved_time = timed(place_resolved, project, resolved)[0]
+        check(legacy, resolved)
+        print(
+            "{:>12}: one at a time {:7.3f} s, resolved {:7.3f} s".format(
+                "nonstandard", legacy_time, resolved_time))
+
+
+if __name__ == "__main__":
+    main()
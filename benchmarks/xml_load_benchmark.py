@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Compare peak memory and wall time of W3D XML loaders
+
+Loads a synthetic story (50000 objects by default) once with ET.parse and
+W3DProject.fromXML and once with the streaming W3DProject.fromXML_stream used
+by fromXML_file. Each loader runs in a fresh subprocess so that its peak
+resident set size can be measured independently. The projects produced by
+both loaders are checked for identical XML output.
+
+To run this script, use the following command:
+python3 xml_load_benchmark.py [--objects N]
+
+Peak RSS is read from the resource module and is therefore only reported on
+Unix-like systems.
+"""
+
+import os
+import sys
+import time
+import json
+import warnings
+import hashlib
+import argparse
+import tempfile
+import subprocess
+import xml.etree.ElementTree as ET
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Standalone reference checks warn once per reference; silence them so that
+# they do not dominate timings
+warnings.simplefilter("ignore")
+from pyw3d.project import W3DProject
+try:
+    import resource
+except ImportError:
+    resource = None
+
+LOADERS = {
+    "parse": lambda filename: W3DProject.fromXML(
+        ET.parse(filename).getroot()),
+    "stream": W3DProject.fromXML_stream
+}
+
+
+def peak_rss_kb():
+    """Return peak resident set size of this process in kilobytes"""
+    try:  # Linux; unlike ru_maxrss, this is not inherited across exec
+        with open("/proc/self/status") as status_file:
+            for line in status_file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except IOError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":  # Reported in bytes rather than kilobytes
+        peak //= 1024
+    return peak
+
+
+def run_loader(loader, filename):
+    """Load story with given loader and print timing data as JSON"""
+    baseline = peak_rss_kb()
+    start = time.perf_counter()
+    project = LOADERS[loader](filename)
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_kb()
+    digest = hashlib.sha1(ET.tostring(project.toXML())).hexdigest()
+    print(json.dumps({
+        "loader": loader,
+        "seconds": elapsed,
+        "baseline_kb": baseline,
+        "peak_kb": peak,
+        "objects": len(project["objects"]),
+        "digest": digest
+    }))
+
+
+def benchmark(filename):
+    """Run each loader in a subprocess and return list of results"""
+    results = []
+    for loader in sorted(LOADERS):
+        output = subprocess.check_output([
+            sys.executable, os.path.abspath(__file__), "--run", loader,
+            filename
+        ], universal_newlines=True)
+        results.append(json.loads(output.strip().split("\n")[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark W3D XML loading")
+    parser.add_argument(
+        "--objects", type=int, default=50000,
+        help="Number of objects in synthetic story")
+    parser.add_argument(
+        "--run", nargs=2, metavar=("LOADER", "FILE"),
+        help=argparse.SUPPRESS)
+    parser.add_argument("--write", metavar="FILE", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run is not None:
+        run_loader(*args.run)
+        return
+    if args.write is not None:
+        from synthetic import write_synthetic_story
+        write_synthetic_story(
+            args.write, num_objects=args.objects, num_timelines=20,
+            actions_per_timeline=500)
+        return
+
+    with tempfile.TemporaryDirectory() as story_dir:
+        filename = os.path.join(story_dir, "story.xml")
+        # Written in a subprocess to keep this process small, since peak RSS
+        # may be inherited by the loader subprocesses on some platforms
+        subprocess.check_call([
+            sys.executable, os.path.abspath(__file__), "--objects",
+            str(args.objects), "--write", filename])
+        print("Story: {} objects, {:.1f} MB".format(
+            args.objects, os.path.getsize(filename)/2.**20))
+        results = benchmark(filename)
+
+    for result in results:
+        if result["peak_kb"] is None:
+            memory = "n/a"
+        else:
+            memory = "{:.1f} MB (+{:.1f} MB over imports)".format(
+                result["peak_kb"]/1024.,
+                (result["peak_kb"] - result["baseline_kb"])/1024.)
+        print("{:>8}: {:7.2f} s, peak RSS {}".format(
+            result["loader"], result["seconds"], memory))
+    if len(set(result["digest"] for result in results)) != 1:
+        print("ERROR: loaders produced different projects")
+        sys.exit(1)
+    print("Loaded projects are identical")
+
+
+if __name__ == "__main__":
+    main()
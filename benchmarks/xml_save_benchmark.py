@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Compare W3DProject.save_XML against the former minidom-based serializer
+
+Saves a synthetic project (20000 objects by default) with the streaming
+writer used by save_XML and with the previous implementation, which
+serialized the full ElementTree to a string, re-parsed it with minidom and
+filtered the pretty-printed result. Wall time and peak memory allocated
+during each save (as measured by tracemalloc) are reported, and the two
+output files are checked to be byte-identical.
+
+To run this script, use the following command:
+python3 xml_save_benchmark.py [--objects N]
+"""
+
+import os
+import sys
+import time
+import filecmp
+import warnings
+import argparse
+import tempfile
+import tracemalloc
+import xml.etree.ElementTree as ET
+import xml.dom.minidom as minidom
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+warnings.simplefilter("ignore")
+from synthetic import synthetic_project
+
+
+def save_minidom(project, filename):
+    """Save project using the serializer that predates save_XML streaming"""
+    xml_string = ET.tostring(project.toXML(), encoding="unicode")
+    xml_string = minidom.parseString(xml_string).toprettyxml()
+    xml_string = "\n".join(
+        [line for line in xml_string.split("\n") if line.strip()])
+    with open(filename, "w") as file_:
+        file_.write(xml_string)
+
+
+def save_streaming(project, filename):
+    """Save project using W3DProject.save_XML"""
+    project.save_XML(filename)
+
+
+SAVERS = (("minidom", save_minidom), ("streaming", save_streaming))
+
+
+def measure(saver, project, filename):
+    """Return wall time in seconds and peak traced memory in bytes for
+    saving project with saver"""
+    start = time.perf_counter()
+    saver(project, filename)
+    elapsed = time.perf_counter() - start
+    # Memory is traced in a separate run since tracing slows execution
+    tracemalloc.start()
+    saver(project, filename)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark W3D XML saving")
+    parser.add_argument(
+        "--objects", type=int, default=20000,
+        help="Number of objects in synthetic project")
+    args = parser.parse_args()
+
+    project = synthetic_project(
+        num_objects=args.objects, num_timelines=20, actions_per_timeline=500)
+    with tempfile.TemporaryDirectory() as output_dir:
+        filenames = []
+        for name, saver in SAVERS:
+            filename = os.path.join(output_dir, "{}.xml".format(name))
+            filenames.append(filename)
+            elapsed, peak = measure(saver, project, filename)
+            print("{:>10}: {:7.2f} s, peak allocated {:.1f} MB".format(
+                name, elapsed, peak/2.**20))
+        print("Output size: {:.1f} MB".format(
+            os.path.getsize(filenames[0])/2.**20))
+        if not filecmp.cmp(*filenames, shallow=False):
+            print("ERROR: outputs differ")
+            sys.exit(1)
+    print("Outputs are byte-identical")
+
+
+if __name__ == "__main__":
+    main()
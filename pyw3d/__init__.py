@@ -67,7 +67,8 @@ from .objects import W3DObject, W3DLink, W3DContent, W3DText, W3DImage, \
     W3DStereoImage, W3DModel, W3DLight, W3DPSys
 from .timeline import W3DTimeline
 from .placement import W3DPlacement, W3DRotation, convert_to_blender_axes, \
-    convert_to_legacy_axes
+    convert_to_legacy_axes, convert_to_blender_axes_batch, \
+    convert_to_legacy_axes_batch, matrices_from_look
 from .triggers import W3DTrigger, HeadTrackTrigger, HeadPositionTrigger, \
     LookAtPoint, LookAtDirection, LookAtObject, MovementTrigger, EventBox
 from .actions import W3DAction, ObjectAction, GroupAction, SoundAction, \
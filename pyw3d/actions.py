@@ -57,6 +57,50 @@ class W3DAction(W3DFeature, metaclass=SubRegisteredClass):
 
         return repr(self) < repr(other)
 
+    def generate_blender_phases(self, offset=0, time_condition=0):
+        """Generate Python logic for each phase of action, without conditions
+
+        Returns a tuple of three lists of lines: logic to execute when the
+        action starts, on every logic tick while it continues, and when it
+        ends. Also sets end_time for the action.
+
+        :param int offset: A number of tabs (4 spaces) to add before Python
+        logic strings
+        :param float time_condition: Time at which action should start"""
+        raise NotImplementedError(
+            "Blender logic is not implemented for {}".format(
+                self.__class__.__name__))
+
+    def generate_blender_logic(
+            self, offset=0, time_condition=0, index_condition=None,
+            click_condition=-1):
+        """Generate Python logic for implementing action
+
+        :param int offset: A number of tabs (4 spaces) to add before Python
+        logic strings
+        :param float time_condition: Time at which action should start
+        :param int index_condition: Index used to keep track of what actions
+        have already been triggered, e.g. in a timeline of multiple actions
+        :param int click_condition: If positive, number of clicks required
+        for action to start"""
+        conditions = ActionCondition(offset=offset)
+        start_text, cont_text, end_text = self.generate_blender_phases(
+            offset=conditions.offset + 1, time_condition=time_condition)
+        conditions.add_time_condition(
+            start_time=time_condition, end_time=self.end_time)
+        if index_condition is not None:
+            conditions.add_index_condition(index_condition)
+        if click_condition > 0:
+            conditions.add_click_condition(click_condition)
+
+        start_text = [
+            conditions.start_string,
+            "{}index += 1".format("    "*(conditions.offset + 1))
+        ] + start_text
+        cont_text = [conditions.continue_string] + cont_text
+        end_text = [conditions.end_string] + end_text
+        return start_text + cont_text + end_text
+
     @staticmethod
     def fromXML(action_root):
         """Create W3DAction of appropriate subclass given xml root for any
@@ -82,48 +126,25 @@ class W3DAction(W3DFeature, metaclass=SubRegisteredClass):
                     action_root.tag))
 
 
-def generate_object_action_logic(
-        object_action, offset=0, time_condition=0, index_condition=None,
-        click_condition=-1):
-    """Generate Python logic for implementing action
+def generate_object_action_phases(
+        object_action, offset=0, time_condition=0):
+    """Generate Python logic for each phase of action
 
     :param W3DAction object_action: An ObjectAction or GroupAction
     :param int offset: A number of tabs (4 spaces) to add before Python logic
     strings
-    :param float time_condition: Time at which action should start
-    :param int index_condition: Index used to keep track of what actions
-    have already been triggered, e.g. in a timeline of multiple actions"""
-    start_text = []
-    cont_text = []
-    end_text = []
-
-    conditions = ActionCondition(offset=offset)
+    :param float time_condition: Time at which action should start"""
     object_action.end_time = object_action["duration"] + time_condition
-    conditions.add_time_condition(
-        start_time=time_condition, end_time=object_action.end_time)
-    if index_condition is not None:
-        conditions.add_index_condition(index_condition)
-    if click_condition > 0:
-        conditions.add_click_condition(click_condition)
-
-    offset = conditions.offset + 1
-    start_text.append(conditions.start_string)
-    start_text.append("{}index += 1".format(
-        "    "*(offset)))
-    start_text.extend(object_action._blender_object_selection(
-        offset=offset)
-    )
-    cont_text.append(conditions.continue_string)
-    cont_text.extend(object_action._blender_object_selection(
-        offset=offset)
-    )
-    end_text.append(conditions.end_string)
-    end_text.extend(object_action._blender_object_selection(
-        offset=offset)
-    )
+
+    start_text = object_action._blender_object_selection(offset=offset)
+    cont_text = object_action._blender_object_selection(offset=offset)
+    end_text = object_action._blender_object_selection(offset=offset)
 
     offset += object_action.selection_offset
     # Yeah... I know. It's kinda ugly.
+    # Transitions of an action are identified within its activator by when
+    # the action runs
+    key = "{}-{}".format(time_condition, object_action.end_time)
 
     cont_text.append("{}remaining_time = {} - time".format(
         "    "*(offset),
@@ -144,7 +165,9 @@ def generate_object_action_logic(
             object_action["placement"],
             object_action["duration"],
             object_action["move_relative"],
-            offset=(offset)
+            offset=(offset),
+            key=key,
+            start_time=time_condition
         )
         start_text.append(action.start_string)
         cont_text.append(action.continue_string)
@@ -153,7 +176,9 @@ def generate_object_action_logic(
     if "color" in object_action:
         action = ColorAction(
             object_action["color"], object_action["duration"],
-            offset=(offset)
+            offset=(offset),
+            key=key,
+            start_time=time_condition
         )
         start_text.append(action.start_string)
         cont_text.append(action.continue_string)
@@ -162,7 +187,9 @@ def generate_object_action_logic(
     if "scale" in object_action:
         action = ScaleAction(
             object_action["scale"], object_action["duration"],
-            offset=(offset)
+            offset=(offset),
+            key=key,
+            start_time=time_condition
         )
         start_text.append(action.start_string)
         cont_text.append(action.continue_string)
@@ -181,7 +208,7 @@ def generate_object_action_logic(
         "{}own['random_choice'] = None".format("    "*offset)
     )
 
-    return start_text + cont_text + end_text
+    return start_text, cont_text, end_text
 
 
 class ObjectAction(W3DAction):
@@ -323,16 +350,12 @@ class ObjectAction(W3DAction):
     def _blender_object_selection(self, offset=0):
         blender_object_name = generate_blender_object_name(self["object_name"])
         self.selection_offset = 0
-        return ["{}blender_object = scene.objects['{}']".format(
+        return ["{}blender_object = get_object(scene, '{}')".format(
             "    "*offset, blender_object_name)]
 
-    def generate_blender_logic(
-            self, offset=0, time_condition=0, index_condition=None,
-            click_condition=-1):
-        return generate_object_action_logic(
-            self, offset=offset, time_condition=time_condition,
-            index_condition=index_condition,
-            click_condition=click_condition)
+    def generate_blender_phases(self, offset=0, time_condition=0):
+        return generate_object_action_phases(
+            self, offset=offset, time_condition=time_condition)
 
 
 class GroupAction(W3DAction):
@@ -493,27 +516,23 @@ class GroupAction(W3DAction):
                     "    "*offset),
                 "{}    own['random_choice'] = random.choice({})".format(
                     "    "*offset, blender_group_name),
-                "{}blender_object = scene.objects[".format("    "*offset),
-                "{}    own['random_choice']]".format("    "*offset)
+                "{}blender_object = get_object(".format("    "*offset),
+                "{}    scene, own['random_choice'])".format("    "*offset)
             ]
             self.selection_offset = 0
         else:
             script_text = [
                 "{}for object_name in {}:".format(
                     "    "*offset, blender_group_name),
-                "{}    blender_object = scene.objects[object_name]".format(
+                "{}    blender_object = get_object(scene, object_name)".format(
                     "    "*offset)
             ]
             self.selection_offset = 1
         return script_text
 
-    def generate_blender_logic(
-            self, offset=0, time_condition=0, index_condition=None,
-            click_condition=-1):
-        return generate_object_action_logic(
-            self, offset=offset, time_condition=time_condition,
-            index_condition=index_condition,
-            click_condition=click_condition)
+    def generate_blender_phases(self, offset=0, time_condition=0):
+        return generate_object_action_phases(
+            self, offset=offset, time_condition=time_condition)
 
 
 class TimelineAction(W3DAction):
@@ -581,41 +600,20 @@ class TimelineAction(W3DAction):
 
         return new_action
 
-    def generate_blender_logic(
-            self, offset=0, time_condition=0, index_condition=None,
-            click_condition=-1):
-        start_text = []
-        cont_text = []
-        end_text = []
-
-        conditions = ActionCondition(offset=offset)
+    def generate_blender_phases(self, offset=0, time_condition=0):
         self.end_time = time_condition
-        conditions.add_time_condition(
-            start_time=time_condition, end_time=self.end_time)
-        if index_condition is not None:
-            conditions.add_index_condition(index_condition)
-        if click_condition > 0:
-            conditions.add_click_condition(click_condition)
-
-        start_text.append(conditions.start_string)
-        cont_text.append(conditions.continue_string)
-        end_text.append(conditions.end_string)
-
-        start_text.append("{}index += 1".format(
-            "    "*(conditions.offset + 1)))
-        cont_text.append("{}remaining_time = {} - time".format(
-            "    "*(conditions.offset + 1),
-            self.end_time)
-        )
-
         action = TimelineStarter(
             self["timeline_name"], self["change"],
-            offset=(conditions.offset + 1)
+            offset=offset
         )
-        start_text.append(action.start_string)
-        cont_text.append(action.continue_string)
-        end_text.append(action.end_string)
-        return start_text + cont_text + end_text
+        start_text = [action.start_string]
+        cont_text = [
+            "{}remaining_time = {} - time".format(
+                "    "*offset, self.end_time),
+            action.continue_string
+        ]
+        end_text = [action.end_string]
+        return start_text, cont_text, end_text
 
 
 class SoundAction(W3DAction):
@@ -681,7 +679,7 @@ class EventTriggerAction(W3DAction):
     argument_validators = {
         "trigger_name": ReferenceValidator(
             ValidPyString(),
-            ["triggers"],
+            ["trigger_events"],
             help_string="Must be the name of a trigger"
         ),
         "enable": IsBoolean()
@@ -726,41 +724,20 @@ class EventTriggerAction(W3DAction):
             raise BadW3DXML("Event node must specify enable attribute")
         return new_action
 
-    def generate_blender_logic(
-            self, offset=0, time_condition=0, index_condition=None,
-            click_condition=-1):
-        start_text = []
-        cont_text = []
-        end_text = []
-
-        conditions = ActionCondition(offset=offset)
+    def generate_blender_phases(self, offset=0, time_condition=0):
         self.end_time = time_condition
-        conditions.add_time_condition(
-            start_time=time_condition, end_time=self.end_time)
-        if index_condition is not None:
-            conditions.add_index_condition(index_condition)
-        if click_condition > 0:
-            conditions.add_click_condition(click_condition)
-
-        start_text.append(conditions.start_string)
-        cont_text.append(conditions.continue_string)
-        end_text.append(conditions.end_string)
-
-        start_text.append("{}index += 1".format(
-            "    "*(conditions.offset + 1)))
-        cont_text.append("{}remaining_time = {} - time".format(
-            "    "*(conditions.offset + 1),
-            self.end_time)
-        )
-
         action = TriggerEnabler(
             self["trigger_name"], self["enable"],
-            offset=(conditions.offset + 1)
+            offset=offset
         )
-        start_text.append(action.start_string)
-        cont_text.append(action.continue_string)
-        end_text.append(action.end_string)
-        return start_text + cont_text + end_text
+        start_text = [action.start_string]
+        cont_text = [
+            "{}remaining_time = {} - time".format(
+                "    "*offset, self.end_time),
+            action.continue_string
+        ]
+        end_text = [action.end_string]
+        return start_text, cont_text, end_text
 
 
 class MoveVRAction(W3DAction):
@@ -836,16 +813,12 @@ class MoveVRAction(W3DAction):
 
     def _blender_object_selection(self, offset=0):
         self.selection_offset = 0
-        return ["{}blender_object = scene.objects['CAMERA']".format(
+        return ["{}blender_object = get_object(scene, 'CAMERA')".format(
             "    "*offset)]
 
-    def generate_blender_logic(
-            self, offset=0, time_condition=0, index_condition=None,
-            click_condition=-1):
-        return generate_object_action_logic(
-            self, offset=offset, time_condition=time_condition,
-            index_condition=index_condition,
-            click_condition=click_condition)
+    def generate_blender_phases(self, offset=0, time_condition=0):
+        return generate_object_action_phases(
+            self, offset=offset, time_condition=time_condition)
 
 
 class W3DResetAction(W3DAction):
@@ -869,37 +842,16 @@ class W3DResetAction(W3DAction):
         """
         return action_class()
 
-    def generate_blender_logic(
-            self, offset=0, time_condition=0, index_condition=None,
-            click_condition=-1):
-        start_text = []
-        cont_text = []
-        end_text = []
-
-        conditions = ActionCondition(offset=offset)
+    def generate_blender_phases(self, offset=0, time_condition=0):
         self.end_time = time_condition
-        conditions.add_time_condition(
-            start_time=time_condition, end_time=self.end_time)
-        if index_condition is not None:
-            conditions.add_index_condition(index_condition)
-        if click_condition > 0:
-            conditions.add_click_condition(click_condition)
-
-        start_text.append(conditions.start_string)
-        cont_text.append(conditions.continue_string)
-        end_text.append(conditions.end_string)
-
-        start_text.append("{}index += 1".format(
-            "    "*(conditions.offset + 1)))
-        cont_text.append("{}remaining_time = {} - time".format(
-            "    "*(conditions.offset + 1),
-            self.end_time)
-        )
-
         action = SceneReset(
-            offset=(conditions.offset + 1)
+            offset=offset
         )
-        start_text.append(action.start_string)
-        cont_text.append(action.continue_string)
-        end_text.append(action.end_string)
-        return start_text + cont_text + end_text
+        start_text = [action.start_string]
+        cont_text = [
+            "{}remaining_time = {} - time".format(
+                "    "*offset, self.end_time),
+            action.continue_string
+        ]
+        end_text = [action.end_string]
+        return start_text, cont_text, end_text
@@ -19,4 +19,5 @@ from .activators import Activator
 from .timelines import BlenderTimeline
 from .triggers import BlenderTrigger, BlenderObjectPositionTrigger, \
     BlenderPositionTrigger, BlenderLookAtTrigger, BlenderPointTrigger, \
-    BlenderDirectionTrigger, BlenderLookObjectTrigger, BlenderClickTrigger
+    BlenderDirectionTrigger, BlenderLookObjectTrigger, BlenderClickTrigger, \
+    BlenderRegionIndex, BlenderLookIndex, BlenderDetector
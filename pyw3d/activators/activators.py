@@ -19,6 +19,7 @@
 """
 import warnings
 from pyw3d.errors import EBKAC
+from pyw3d.blender_backend import get_backend
 try:
     import bpy
 except ImportError:
@@ -46,6 +47,9 @@ class Activator(object):
         self.script_header = """
 import bge
 from group_defs import *
+from w3d_runtime import (
+    get_object, start_transition, end_transition, clear_transitions,
+    wake_trigger)
 import mathutils
 from time import monotonic
 import random
@@ -63,6 +67,11 @@ def activate(cont):
         # exactly once
         own['offset_time'] = 0
         own['offset_index'] = 0
+        # running property holds indices of scheduled actions which have
+        # started but not yet ended
+        own['running'] = []
+        # Transitions of actions from any earlier activation stop advancing
+        clear_transitions(own)
         own['status'] = 'Continue'
     if status == 'Stop':
         try:
@@ -111,13 +120,8 @@ def activate(cont):
         an activator, if possible. Continue means that the actions are ongoing,
         and Start is used to initially start the actions associated with this
         activator"""
-        self.select_base_object()
-        bpy.ops.object.game_property_new(
-            type='STRING',
-            name='status'
-        )
-        self.base_object.game.properties["status"].value = initial_value
-        return self.base_object.game.properties["status"]
+        return get_backend().add_game_property(
+            self.base_object, "STRING", "status", initial_value)
 
     def create_enabled_property(self, initial_value=True):
         """Creates a property called "enabled" which defines whether or not
@@ -127,13 +131,8 @@ def activate(cont):
         start an activator. It is NOT checked by the activator itself. This is
         to allow the activator to be immediately disabled after activation but
         still process the remainder of its actions"""
-        self.select_base_object()
-        bpy.ops.object.game_property_new(
-            type='BOOL',
-            name='enabled'
-        )
-        self.base_object.game.properties["enabled"].value = initial_value
-        return self.base_object.game.properties["enabled"]
+        return get_backend().add_game_property(
+            self.base_object, "BOOL", "enabled", initial_value)
 
     def create_status_sensors(self):
         """Creates sensors to detect change in "status" of activator
@@ -143,39 +142,24 @@ def activate(cont):
         long as the status is set to "Continue", and "stop_sensor" which
         detects when the status is set to "Stop"
         """
-        self.select_base_object()
+        backend = get_backend()
         #Create property sensor to initiate actions
-        bpy.ops.logic.sensor_add(
-            type="PROPERTY",
-            object=self.name,
-            name="start_sensor"
-        )
-        self.base_object.game.sensors[-1].name = "start_sensor"
-        start_sensor = self.base_object.game.sensors["start_sensor"]
+        start_sensor = backend.add_sensor(
+            self.base_object, "PROPERTY", "start_sensor")
         start_sensor.property = "status"
         start_sensor.value = "Start"
 
         #Create property sensor to activate actions
-        bpy.ops.logic.sensor_add(
-            type="PROPERTY",
-            object=self.name,
-            name="active_sensor"
-        )
-        self.base_object.game.sensors[-1].name = "active_sensor"
-        active_sensor = self.base_object.game.sensors["active_sensor"]
+        active_sensor = backend.add_sensor(
+            self.base_object, "PROPERTY", "active_sensor")
         active_sensor.use_pulse_true_level = True
         #active_sensor.frequency = 1
         active_sensor.property = "status"
         active_sensor.value = "Continue"
 
         #Create property sensor to pause actions
-        bpy.ops.logic.sensor_add(
-            type="PROPERTY",
-            object=self.name,
-            name="stop_sensor"
-        )
-        self.base_object.game.sensors[-1].name = "stop_sensor"
-        stop_sensor = self.base_object.game.sensors["stop_sensor"]
+        stop_sensor = backend.add_sensor(
+            self.base_object, "PROPERTY", "stop_sensor")
         stop_sensor.property = "status"
         stop_sensor.value = "Stop"
 
@@ -187,14 +171,8 @@ def activate(cont):
     def create_controller(self):
         """Create a Python controller used to effect actions triggered by this
         Activator"""
-        self.select_base_object()
-        bpy.ops.logic.controller_add(
-            type='PYTHON',
-            object=self.name,
-            name="activate")
-        controller = self.base_object.game.controllers["activate"]
-        controller.mode = "MODULE"
-        controller.module = "{}.activate".format(self.name)
+        controller = get_backend().add_python_controller(
+            self.base_object, "activate", "{}.activate".format(self.name))
         self.controller = controller
         return controller
 
@@ -219,11 +197,8 @@ def activate(cont):
     def _create_base_object(self):
         """Create the object which controls the current status of the
         activator"""
-        bpy.ops.object.add(
-            type="EMPTY",
-            layers=[layer == 20 for layer in range(1, 21)]
-        )
-        return bpy.context.scene.objects.active
+        return get_backend().add_empty(
+            self.name, [layer == 20 for layer in range(1, 21)])
 
     @property
     def base_object(self):
@@ -232,9 +207,7 @@ def activate(cont):
         try:
             return bpy.data.objects[self.name]
         except KeyError:
-            blender_object = self._create_base_object()
-            blender_object.name = self.name
-            return blender_object
+            return self._create_base_object()
 
     @property
     def script(self):
@@ -279,12 +252,17 @@ def activate(cont):
         """Link together any Blender "logic bricks" for this activator"""
         self.link_status_sensors()
 
-    def write_python_logic(self):
-        """Write any necessary Python controller scripts for this activator"""
+    def generate_python_logic(self):
+        """Returns the full text of the Python control script for this
+        activator"""
         script_text = [
             self.script_header,
             self.generate_action_logic(),
             self.script_footer
         ]
-        self.script.write("\n".join(script_text))
+        return "\n".join(script_text)
+
+    def write_python_logic(self):
+        """Write any necessary Python controller scripts for this activator"""
+        self.script.write(self.generate_python_logic())
         return self.script
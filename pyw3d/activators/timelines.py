@@ -22,7 +22,38 @@ from .activators import Activator
 
 
 class BlenderTimeline(Activator):
-    """Activates actions at specified times"""
+    """Activates actions at specified times
+
+    Rather than testing the conditions of every action on each logic tick,
+    the generated script contains a schedule table of (start time, end time,
+    start, continue, end) entries sorted by start time, with one function
+    per phase of each action. A dispatcher advances the "index" cursor past
+    actions whose start time has been reached and tracks the actions that
+    are still running, so that each tick only touches actions which are
+    starting, running, or ending."""
+
+    dispatcher = [
+        "        # ACTION LOGIC BEGINS HERE",
+        "        running = []",
+        "        for action_index in own['running']:",
+        "            start_time, end_time, start, cont, end = SCHEDULE[",
+        "                action_index]",
+        "            if time < end_time:",
+        "                cont(own, scene, time)",
+        "                running.append(action_index)",
+        "            else:",
+        "                end(own, scene, time)",
+        "        while index < len(SCHEDULE) and time >= SCHEDULE[index][0]:",
+        "            start_time, end_time, start, cont, end = SCHEDULE[index]",
+        "            start(own, scene, time)",
+        "            if time < end_time:",
+        "                cont(own, scene, time)",
+        "                running.append(index)",
+        "            else:",
+        "                end(own, scene, time)",
+        "            index += 1",
+        "        own['running'] = running"
+    ]
 
     @property
     def name(self):
@@ -33,23 +64,45 @@ class BlenderTimeline(Activator):
             initial_value=("Stop", "Start")[self.start_immediately])
 
     def generate_action_logic(self):
-        action_logic = ["        # ACTION LOGIC BEGINS HERE"]
-        action_index = 0
+        """Returns the dispatcher for scheduled actions
+
+        Also generates the schedule table and phase functions it dispatches
+        to, which are stored in schedule_logic"""
+        schedule_logic = ["", "# SCHEDULE BEGINS HERE"]
+        schedule = ["SCHEDULE = ("]
         if len(self.actions) == 0:
             max_time = 0
         else:
             max_time = self.actions[-1][0]
-        for time, action in self.actions:
-            action_logic.extend(
-                action.generate_blender_logic(
-                    time_condition=time,
-                    index_condition=action_index,
-                    offset=2)
-            )
-            action_index += 1
+        for action_index, (time, action) in enumerate(self.actions):
+            phases = action.generate_blender_phases(
+                offset=1, time_condition=time)
+            for phase, phase_text in zip(
+                    ("start", "continue", "end"), phases):
+                schedule_logic.append(
+                    "def _{}_{}(own, scene, time):".format(
+                        phase, action_index))
+                phase_text = [line for line in phase_text if line]
+                if not phase_text:
+                    phase_text = ["    pass"]
+                schedule_logic.extend(phase_text)
+            schedule.append(
+                "    ({0}, {1}, _start_{2}, _continue_{2}, _end_{2}),".format(
+                    time, action.end_time, action_index))
             max_time = max(max_time, action.end_time)
+        schedule.append(")")
+        self.schedule_logic = "\n".join(schedule_logic + schedule)
         self.script_footer = self.script_footer.format(max_time=max_time)
-        return "\n".join(action_logic)
+        return "\n".join(self.dispatcher)
+
+    def generate_python_logic(self):
+        script_text = [
+            self.script_header,
+            self.generate_action_logic(),
+            self.script_footer,
+            self.schedule_logic
+        ]
+        return "\n".join(script_text)
 
     def __init__(self, name, actions, start_immediately=False):
         super(BlenderTimeline, self).__init__(name, actions)
@@ -19,5 +19,7 @@ from .triggers import BlenderTrigger
 from .object_triggers import BlenderObjectPositionTrigger
 from .user_triggers import BlenderPositionTrigger
 from .look_triggers import BlenderLookAtTrigger, BlenderPointTrigger, \
-    BlenderDirectionTrigger, BlenderLookObjectTrigger
+    BlenderDirectionTrigger, BlenderLookObjectTrigger, BlenderLookIndex
 from .links import BlenderClickTrigger
+from .regions import BlenderRegionIndex
+from .detectors import BlenderDetector
@@ -0,0 +1,142 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Shared detection of events for many triggers, which sleep while they
+cannot be activated
+"""
+import warnings
+from pyw3d.errors import EBKAC
+from pyw3d.blender_backend import get_backend
+try:
+    import bpy
+except ImportError:
+    warnings.warn(
+        "Module bpy not found. Loading "
+        "pyw3d.activators.triggers.detectors as standalone")
+
+
+class BlenderDetector(object):
+    """Base class for objects which detect events for many triggers with a
+    single controller
+
+    Detection scripts only test triggers which are awake, as given by
+    awake_triggers in the w3d_runtime text block. Triggers sleep while they
+    are disabled or running their actions and are woken by generated logic
+    when their "enabled" or "status" property changes. The number of awake
+    triggers is kept in a property of base_object, and the detection sensor
+    stops pulsing while it is zero, so that the detection controller is not
+    run at all while every trigger sleeps.
+
+    Subclasses provide base_object and generate_python_logic, and may rename
+    the detection sensor and controller.
+
+    :param list triggers: BlenderTrigger activators to detect events for
+    """
+    name = "detector"
+    detect_sensor_name = "detect_sensor"
+    detect_controller_name = "detect"
+
+    def __init__(self, triggers):
+        self.triggers = triggers
+
+    @property
+    def base_object(self):
+        """Returns the object on which detection runs
+
+        Dummy property intended to be overridden by subclasses"""
+        raise NotImplementedError(
+            "base_object must be implemented by subclasses")
+
+    @property
+    def script(self):
+        """Returns the Python detection script, creating it if necessary"""
+        script_name = ".".join((self.name, "py"))
+        try:
+            return bpy.data.texts[script_name]
+        except KeyError:
+            bpy.data.texts.new(script_name)
+            return bpy.data.texts[script_name]
+
+    def generate_python_logic(self):
+        """Returns the full text of the Python detection script
+
+        Dummy method intended to be overridden by subclasses"""
+        raise NotImplementedError(
+            "generate_python_logic must be implemented by subclasses")
+
+    @property
+    def awake_property(self):
+        """Name of the property of base_object which counts awake
+        triggers"""
+        return "{}_awake".format(self.name)
+
+    def trigger_names(self):
+        """Return tuple of names of triggers, for use in detection
+        scripts"""
+        return tuple(trigger.name for trigger in self.triggers)
+
+    def create_awake_property(self):
+        """Create property counting awake triggers
+
+        Every trigger counts as awake until the detection script first runs
+        and registers them."""
+        return get_backend().add_game_property(
+            self.base_object, "INT", self.awake_property, len(self.triggers))
+
+    def create_detect_sensor(self):
+        """Create sensor which pulses on every other tick while any trigger
+        is awake"""
+        sensor = get_backend().add_sensor(
+            self.base_object, "PROPERTY", self.detect_sensor_name)
+        sensor.property = self.awake_property
+        sensor.evaluation_type = "PROPNEQUAL"
+        sensor.value = "0"
+        sensor.use_pulse_true_level = True
+        sensor.frequency = 1
+        self.detect_sensor = sensor
+        return sensor
+
+    def create_blender_objects(self):
+        """Create the property, sensor, and controller used for detection
+        on base_object
+
+        As when each trigger had its own controller, detection runs on every
+        other tick"""
+        base_object = self.base_object
+        self.create_awake_property()
+        self.create_detect_sensor()
+        self.detect_controller = get_backend().add_python_controller(
+            base_object, self.detect_controller_name,
+            "{}.detect_events".format(self.name))
+        return base_object
+
+    def link_logic_bricks(self):
+        """Link detection sensor to controller
+
+        :raises EBKAC: if controller or sensor does not exist"""
+        try:
+            self.detect_controller.link(sensor=self.detect_sensor)
+        except AttributeError:
+            raise EBKAC(
+                "Detection sensor and controller must be created before they "
+                "can be linked")
+        return self.detect_controller
+
+    def write_python_logic(self):
+        """Write Python detection script"""
+        self.script.write(self.generate_python_logic())
+        return self.script
@@ -21,6 +21,7 @@ import warnings
 from .triggers import BlenderTrigger
 from pyw3d.errors import EBKAC
 from pyw3d.names import generate_link_name
+from pyw3d.blender_backend import get_backend
 try:
     import bpy
 except ImportError:
@@ -36,9 +37,14 @@ class BlenderClickTrigger(BlenderTrigger):
 
     #TODO: Change color when enabled
 
+    @property
+    def target_object(self):
+        """The clickable object"""
+        return bpy.data.objects[self.object_name]
+
     def select_target_object(self):
         """Select the clickable object for modification"""
-        click_object = bpy.data.objects[self.object_name]
+        click_object = self.target_object
         bpy.context.scene.objects.active = click_object
         return click_object
 
@@ -48,61 +54,36 @@ class BlenderClickTrigger(BlenderTrigger):
 
     def create_primed_property(self):
         """Add property to track if mousedown is followed by mouseup"""
-        click_object = self.select_target_object()
-        bpy.ops.object.game_property_new(
-            type='BOOL',
-            name='click_primed'
-        )
-        click_object.game.properties["click_primed"].value = False
-        return click_object.game.properties["click_primed"]
+        return get_backend().add_game_property(
+            self.target_object, "BOOL", "click_primed", False)
 
     def create_click_property(self):
         """Add property to keep track of how many times link has been
         clicked"""
-        self.select_base_object()
-        bpy.ops.object.game_property_new(
-            type='INT',
-            name='clicks'
-        )
-        self.base_object.game.properties["clicks"].value = 0
-        return self.base_object.game.properties["clicks"]
+        return get_backend().add_game_property(
+            self.base_object, "INT", "clicks", 0)
 
     def create_detection_controller(self):
         """Add controller for detecting mouseclick and mouseover
 
         This controller also changes the color of the selected object on
         mouse-down events."""
-        click_object = self.select_target_object()
-        bpy.ops.logic.controller_add(
-            type='PYTHON',
-            object=self.object_name,
-            name=self.name)
-        controller = click_object.game.controllers[self.name]
-        controller.mode = "MODULE"
-        controller.module = "{}.detect_event".format(self.name)
-        self.detect_controller = controller
+        self.detect_controller = get_backend().add_python_controller(
+            self.target_object, self.name,
+            "{}.detect_event".format(self.name))
         return self.detect_controller
 
     def create_detection_sensors(self):
         """Add mouseclick and mouseover sensors to clickable object"""
-        click_object = self.select_target_object()
+        click_object = self.target_object
+        backend = get_backend()
         if "mouse_click" not in click_object.game.sensors:
-            bpy.ops.logic.sensor_add(
-                type="MOUSE",
-                object=self.object_name,
-                name="mouse_click"
-            )
-            click_object.game.sensors[-1].name = "mouse_click"
-            self.click_sensor = click_object.game.sensors["mouse_click"]
+            self.click_sensor = backend.add_sensor(
+                click_object, "MOUSE", "mouse_click")
             self.click_sensor.mouse_event = "LEFTCLICK"
         if "mouse_over" not in click_object.game.sensors:
-            bpy.ops.logic.sensor_add(
-                type="MOUSE",
-                object=self.object_name,
-                name="mouse_over"
-            )
-            click_object.game.sensors[-1].name = "mouse_over"
-            self.over_sensor = click_object.game.sensors["mouse_over"]
+            self.over_sensor = backend.add_sensor(
+                click_object, "MOUSE", "mouse_over")
             self.over_sensor.mouse_event = "MOUSEOVER"
         return (self.click_sensor, self.over_sensor)
 
@@ -131,7 +112,7 @@ class BlenderClickTrigger(BlenderTrigger):
             "    mouse_click = cont.sensors['mouse_click']",
             "    mouse_over = own.sensors['mouse_over']",
             # TODO: Test the above
-            "    trigger = scene.objects['{}']".format(self.name),
+            "    trigger = get_object(scene, '{}')".format(self.name),
             "    select_color = {}".format(str(
                 [coord/255. for coord in self.select_color])),
             "    enable_color = {}".format(str(
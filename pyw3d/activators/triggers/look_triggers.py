@@ -20,8 +20,9 @@
 import math
 import warnings
 from pyw3d.names import generate_blender_object_name
-from pyw3d.errors import EBKAC
 from .triggers import BlenderTrigger
+from .regions import _format_tuple
+from .detectors import BlenderDetector
 try:
     import bpy
 except ImportError:
@@ -40,121 +41,18 @@ class BlenderLookAtTrigger(BlenderTrigger):
         bpy.context.scene.objects.active = camera_object
         return camera_object
 
-    def create_enabled_copier(self):
-        """Create system to copy enabled value to camera property
-
-        Adds a sensor to detect when "enabled" property is changed on
-        base_object, a trivial "and" controller, and an actuator to copy the
-        "enabled" property to the camera property of the same name as this
-        trigger.This allows camera to only go through costly detection actions
-        when the trigger is enabled.
-        """
-        self.select_base_object()
-        bpy.ops.logic.sensor_add(
-            type="PROPERTY",
-            object=self.name,
-            name="enabled_sensor"
-        )
-        self.base_object.game.sensors[-1].name = "enabled_sensor"
-        enabled_sensor = self.base_object.game.sensors["enabled_sensor"]
-        enabled_sensor.property = "enabled"
-        enabled_sensor.evaluation_type = "PROPCHANGED"
-
-        self.select_base_object()
-        bpy.ops.logic.controller_add(
-            type='LOGIC_AND',
-            object=self.name,
-            name="enable")
-        controller = self.base_object.game.controllers["enable"]
-
-        camera_object = self.select_camera()
-        bpy.ops.logic.actuator_add(
-            type="PROPERTY",
-            object="CAMERA",
-            name=self.name
-        )
-        camera_object.game.actuators[-1].name = self.name
-        property_copier = camera_object.game.actuators[self.name]
-        property_copier.mode = "COPY"
-        property_copier.property = self.name
-        property_copier.object = self.base_object
-        property_copier.object_property = "enabled"
-
-        return (enabled_sensor, controller, property_copier)
-
-    def setup_camera(self):
-        """Create a property, property sensor, and Python controller on the
-        main camera for keeping track of if this trigger is enabled
-
-        This setup is used for efficiency. By having the camera know when this
-        trigger is enabled, we can have it only perform (expensive) checks
-        related to the trigger when it is in fact enabled.
-        """
-        camera_object = self.select_camera()
-        # Property on camera to keep track of when trigger is enabled
-        bpy.ops.object.game_property_new(
-            type='BOOL',
-            name=self.name
-        )
-        camera_object.game.properties[
-            self.name].value = self.enable_immediately
-        # Sensor to fire continuously while trigger is enabled
-        bpy.ops.logic.sensor_add(
-            type="PROPERTY",
-            object="CAMERA",
-            name=self.name
-        )
-        camera_object.game.sensors[-1].name = self.name
-        camera_enable_sensor = camera_object.game.sensors[self.name]
-        camera_enable_sensor.use_pulse_true_level = True
-        camera_enable_sensor.frequency = 1
-        camera_enable_sensor.property = self.name
-        camera_enable_sensor.value = str(self.enable_immediately)
-        self.camera_enable_sensor = camera_enable_sensor
-
-        #Create controller to detect trigger events
-        camera_object = self.select_camera()
-        bpy.ops.logic.controller_add(
-            type='PYTHON',
-            object="CAMERA",
-            name=self.name)
-        camera_object.game.controllers[-1].name = self.name
-        controller = camera_object.game.controllers[self.name]
-        controller.mode = "MODULE"
-        controller.module = "{}.detect_event".format(self.name)
+    def look_target(self):
+        """Return tuple describing what must be looked at to activate this
+        trigger, for use by BlenderLookIndex
 
-        return camera_object
-
-    def link_camera_bricks(self):
-        """Link BGE logic bricks for camera"""
-        camera_object = self.select_camera()
-        camera_controller = camera_object.game.controllers[self.name]
-        try:
-            camera_controller.link(sensor=self.camera_enable_sensor)
-        except AttributeError:
-            raise EBKAC(
-                "Enabled sensor must be created on camera before being linked")
-
-        enabled_sensor = self.base_object.game.sensors["enabled_sensor"]
-        enabled_controller = self.base_object.game.controllers["enable"]
-        property_copier = camera_object.game.actuators[self.name]
-        enabled_controller.link(
-            sensor=enabled_sensor, actuator=property_copier)
-
-        return (enabled_controller, camera_controller)
-
-    def create_blender_objects(self):
-        super(BlenderLookAtTrigger, self).create_blender_objects()
-        self.setup_camera()
-        self.create_enabled_copier()
-
-    def link_logic_bricks(self):
-        super(BlenderLookAtTrigger, self).link_logic_bricks()
-        self.link_camera_bricks()
+        Dummy method intended to be overridden by subclasses"""
+        raise NotImplementedError(
+            "look_target must be implemented by subclasses")
 
 
 class BlenderPointTrigger(BlenderLookAtTrigger):
     """Trigger based on user looking at a point in virtual space"""
+    target_kind = "point"
 
     def __init__(
             self, name, actions, point, duration=0, enable_immediately=True,
@@ -165,32 +63,14 @@ class BlenderPointTrigger(BlenderLookAtTrigger):
             remain_enabled=remain_enabled)
         self.point = point
 
-    def generate_detection_logic(self):
-        """Add a function to Python control script to detect user position"""
-        detection_logic = [
-            "\ndef detect_event(cont):",
-            "    scene = bge.logic.getCurrentScene()",
-            "    own = cont.owner",
-            "    trigger = scene.objects['{}']".format(
-                self.name),
-            "    # Following is total hack since pointInsideFrustum seems to",
-            "    # give false positive on first frame in certain",
-            "    # circumstances",
-            "    if 'initialized' not in trigger:",
-            "        trigger['initialized'] = True",
-            "        return",
-            "    if (own.pointInsideFrustum({})".format(
-                tuple(self.point)),
-            "            and trigger['enabled'] and",
-            "            trigger['status'] == 'Stop'):",
-            "        trigger['status'] = 'Start'"
-        ]
-        detection_logic = "\n".join(detection_logic)
-        return detection_logic
+    def look_target(self):
+        """Return (point,)"""
+        return (tuple(float(coord) for coord in self.point),)
 
 
 class BlenderDirectionTrigger(BlenderLookAtTrigger):
     """Trigger based on user looking in a direction in virtual space"""
+    target_kind = "direction"
 
     def __init__(
             self, name, actions, direction, duration=0,
@@ -202,32 +82,31 @@ class BlenderDirectionTrigger(BlenderLookAtTrigger):
         self.direction = direction
         self.angle = angle
 
-    def generate_detection_logic(self):
-        """Add a function to Python control script to detect user position"""
-        detection_logic = [
-            "\ndef detect_event(cont):",
-            "    scene = bge.logic.getCurrentScene()",
-            "    own = cont.owner",
-            "    cam_dir = (own.getCameraToWorld().to_quaternion() *",
-            "        mathutils.Vector((0, 0, -1)))",
-            "    target_dir = mathutils.Vector({})".format(
-                tuple(self.direction)),
-            "    angle = abs(cam_dir.angle(target_dir, 3.14))",
-            "    trigger = scene.objects['{}']".format(
-                self.name),
-            "    if (angle < {}".format(math.radians(self.angle)),
-            "            and trigger['enabled'] and",
-            "            trigger['status'] == 'Stop'):",
-            "        trigger['status'] = 'Start'"
-        ]
-        detection_logic = "\n".join(detection_logic)
-        return detection_logic
+    def look_target(self):
+        """Return (unit direction, cosine of largest angle from direction)
+
+        The camera looks in the direction when the dot product of its unit
+        view direction with the unit direction exceeds the cosine. Cosines
+        outside [-1, 1] are used for angles which are never or always
+        satisfied."""
+        max_angle = math.radians(self.angle)
+        length = math.sqrt(sum(coord**2 for coord in self.direction))
+        # As in mathutils, the angle to a zero vector is taken to be 3.14
+        if length == 0:
+            return ((0., 0., 0.), (2., -2.)[max_angle > 3.14])
+        direction = tuple(coord/length for coord in self.direction)
+        if max_angle <= 0:
+            return (direction, 2.)
+        if max_angle > math.pi:
+            return (direction, -2.)
+        return (direction, math.cos(max_angle))
 
 
 class BlenderLookObjectTrigger(BlenderLookAtTrigger):
     """Trigger based on user looking at an object in virtual space
 
     :param str look_at_object: Name of the W3DObject to be looked at"""
+    target_kind = "object"
 
     def __init__(
             self, name, actions, look_at_object, duration=0,
@@ -239,26 +118,149 @@ class BlenderLookObjectTrigger(BlenderLookAtTrigger):
         self.look_at_object = generate_blender_object_name(look_at_object)
         self.angle = angle
 
-    def generate_detection_logic(self):
-        """Add a function to Python control script to detect user position"""
-        detection_logic = [
-            "\ndef detect_event(cont):",
-            "    scene = bge.logic.getCurrentScene()",
-            "    own = cont.owner",
-            "    position = scene.objects['{}'].position".format(
-                self.look_at_object),
-            "    trigger = scene.objects['{}']".format(
-                self.name),
-            "    # Following is total hack since pointInsideFrustum seems to",
-            "    # give false positive on first frame in certain",
-            "    # circumstances",
-            "    if 'initialized' not in trigger:",
-            "        trigger['initialized'] = True",
-            "        return",
-            "    if (own.pointInsideFrustum(position)",
-            "            and trigger['enabled']",
-            "            and trigger['status'] == 'Stop'):",
-            "        trigger['status'] = 'Start'"
-        ]
-        detection_logic = "\n".join(detection_logic)
-        return detection_logic
+    def look_target(self):
+        """Return (name of Blender object,)"""
+        return (self.look_at_object,)
+
+
+LOOK_INDEX_SCRIPT = """
+import bge
+from w3d_runtime import get_object, awake_triggers, wake_trigger
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Use NumPy only for enough targets to outweigh the cost of building arrays
+NUMPY_MINIMUM = {numpy_minimum}
+AWAKE_PROPERTY = {awake_property!r}
+TRIGGER_NAMES = {trigger_names}
+# Each target is (trigger name, point), (trigger name, unit direction, cosine
+# of largest angle from direction), or (trigger name, object name)
+POINT_TARGETS = {point_targets}
+DIRECTION_TARGETS = {direction_targets}
+OBJECT_TARGETS = {object_targets}
+
+
+def awake_targets(awake, targets):
+    return [target for target in targets if target[0] in awake]
+
+
+# Return whether view direction is within angle of each target direction
+def facing(view, targets):
+    if numpy is not None and len(targets) >= NUMPY_MINIMUM:
+        directions = numpy.array([target[1] for target in targets])
+        cosines = numpy.array([target[2] for target in targets])
+        return (directions.dot(numpy.array(view)) > cosines).tolist()
+    return [
+        (view[0]*target[1][0] + view[1]*target[1][1] +
+         view[2]*target[1][2]) > target[2]
+        for target in targets]
+
+
+# Return whether each position is inside the view frustum, given matrix
+# from world to clip coordinates
+def inside_frustum(matrix, positions):
+    if numpy is not None and len(positions) >= NUMPY_MINIMUM:
+        clip = numpy.array([tuple(row) for row in matrix]).dot(
+            numpy.vstack((
+                numpy.array([tuple(position) for position in positions]).T,
+                numpy.ones(len(positions)))))
+        return (numpy.abs(clip[:3]) <= clip[3]).all(axis=0).tolist()
+    rows = [tuple(row) for row in matrix]
+    w_row = rows[3]
+    inside = []
+    for position in positions:
+        x, y, z = position[0], position[1], position[2]
+        w = w_row[0]*x + w_row[1]*y + w_row[2]*z + w_row[3]
+        for row in rows[:3]:
+            if abs(row[0]*x + row[1]*y + row[2]*z + row[3]) > w:
+                inside.append(False)
+                break
+        else:
+            inside.append(True)
+    return inside
+
+
+def start(scene, trigger_name):
+    trigger = get_object(scene, trigger_name)
+    if trigger['enabled'] and trigger['status'] == 'Stop':
+        trigger['status'] = 'Start'
+        wake_trigger(trigger)
+
+
+def detect_events(cont):
+    own = cont.owner
+    scene = bge.logic.getCurrentScene()
+    awake = awake_triggers(own, AWAKE_PROPERTY, TRIGGER_NAMES)
+    targets = awake_targets(awake, DIRECTION_TARGETS)
+    if targets:
+        orientation = own.worldOrientation
+        view = (-orientation[0][2], -orientation[1][2], -orientation[2][2])
+        for target, hit in zip(targets, facing(view, targets)):
+            if hit:
+                start(scene, target[0])
+    # Following is total hack since pointInsideFrustum seems to give false
+    # positive on first frame in certain circumstances
+    if 'look_initialized' not in own:
+        own['look_initialized'] = True
+        return
+    targets = awake_targets(awake, POINT_TARGETS)
+    positions = [target[1] for target in targets]
+    for target in awake_targets(awake, OBJECT_TARGETS):
+        targets.append(target)
+        positions.append(get_object(scene, target[1]).position)
+    if targets:
+        matrix = own.projection_matrix * own.world_to_camera
+        for target, hit in zip(targets, inside_frustum(matrix, positions)):
+            if hit:
+                start(scene, target[0])
+"""
+
+
+class BlenderLookIndex(BlenderDetector):
+    """Detects events for all triggers based on where the user is looking
+    with a single controller on the main camera
+
+    Once per detection tick, the view direction and the transformation from
+    world to clip coordinates are computed once, and the target of every
+    awake trigger is tested against them in a single pass, using NumPy when
+    it is available (see :py:class:`BlenderDetector`).
+
+    :param list triggers: BlenderLookAtTrigger activators to detect events
+    for
+    :param int numpy_minimum: Smallest number of targets of one kind for
+    which NumPy is used
+    """
+    name = "look_index"
+    detect_sensor_name = detect_controller_name = name
+
+    def __init__(self, triggers, numpy_minimum=16):
+        super(BlenderLookIndex, self).__init__(triggers)
+        self.numpy_minimum = numpy_minimum
+
+    def targets(self):
+        """Return dictionary mapping each kind of target to tuple of targets
+        of that kind"""
+        targets = {"point": [], "direction": [], "object": []}
+        for trigger in self.triggers:
+            targets[trigger.target_kind].append(
+                (trigger.name,) + trigger.look_target())
+        return {kind: tuple(value) for kind, value in targets.items()}
+
+    def generate_python_logic(self):
+        """Returns the full text of the Python detection script"""
+        targets = self.targets()
+        return LOOK_INDEX_SCRIPT.format(
+            numpy_minimum=self.numpy_minimum,
+            awake_property=self.awake_property,
+            trigger_names=_format_tuple(self.trigger_names()),
+            point_targets=_format_tuple(targets["point"]),
+            direction_targets=_format_tuple(targets["direction"]),
+            object_targets=_format_tuple(targets["object"]))
+
+    @property
+    def base_object(self):
+        """Returns the main camera, on which detection runs"""
+        return bpy.data.objects["CAMERA"]
+
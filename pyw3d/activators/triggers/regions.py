@@ -0,0 +1,282 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Shared detection of movement into or out of boxes for all position
+triggers
+"""
+import math
+import warnings
+from pyw3d.blender_backend import get_backend
+from .detectors import BlenderDetector
+try:
+    import bpy
+except ImportError:
+    warnings.warn(
+        "Module bpy not found. Loading "
+        "pyw3d.activators.triggers.regions as standalone")
+
+REGION_INDEX_SCRIPT = """
+import bge
+import math
+from group_defs import *
+from w3d_runtime import get_object, awake_triggers, wake_trigger
+
+AWAKE_PROPERTY = {awake_property!r}
+TRIGGER_NAMES = {trigger_names}
+CELL_SIZE = {cell_size}
+# Each region is (trigger name, True if triggered inside box, lower corner,
+# upper corner, number of axes to check[, tracked objects, detect any])
+CAMERA_REGIONS = {camera_regions}
+CAMERA_GRID = {camera_grid}
+CAMERA_LARGE = {camera_large}
+CAMERA_OUTSIDE = {camera_outside}
+OBJECT_REGIONS = {object_regions}
+OBJECT_GRID = {object_grid}
+OBJECT_LARGE = {object_large}
+OBJECT_OUTSIDE = {object_outside}
+
+# Map each tracked object to the regions which track it and the names of
+# their triggers, and each region to the number of distinct objects it tracks
+TRACKED = {{}}
+TRACKED_TRIGGERS = {{}}
+TRACKED_COUNT = []
+for _index, _region in enumerate(OBJECT_REGIONS):
+    _names = set(_region[5])
+    TRACKED_COUNT.append(len(_names))
+    for _name in _names:
+        TRACKED.setdefault(_name, set()).add(_index)
+        TRACKED_TRIGGERS.setdefault(_name, set()).add(_region[0])
+
+
+def containing(position, regions, grid, large):
+    key = (
+        int(math.floor(position[0]/CELL_SIZE)),
+        int(math.floor(position[1]/CELL_SIZE)))
+    found = set()
+    for candidates in (grid.get(key, ()), large):
+        for index in candidates:
+            region = regions[index]
+            lower = region[2]
+            upper = region[3]
+            for i in range(region[4]):
+                if position[i] < lower[i] or position[i] > upper[i]:
+                    break
+            else:
+                found.add(index)
+    return found
+
+
+def start(scene, trigger_name):
+    trigger = get_object(scene, trigger_name)
+    if trigger['enabled'] and trigger['status'] == 'Stop':
+        trigger['status'] = 'Start'
+        wake_trigger(trigger)
+
+
+def detect_events(cont):
+    scene = bge.logic.getCurrentScene()
+    awake = awake_triggers(cont.owner, AWAKE_PROPERTY, TRIGGER_NAMES)
+    if not awake:
+        return
+    if CAMERA_REGIONS:
+        found = containing(
+            get_object(scene, 'CAMERA').position, CAMERA_REGIONS, CAMERA_GRID,
+            CAMERA_LARGE)
+        for index in found:
+            region = CAMERA_REGIONS[index]
+            if region[1] and region[0] in awake:
+                start(scene, region[0])
+        for index in CAMERA_OUTSIDE:
+            if index not in found and CAMERA_REGIONS[index][0] in awake:
+                start(scene, CAMERA_REGIONS[index][0])
+    if OBJECT_REGIONS:
+        counts = {{}}
+        for object_name, tracking in TRACKED.items():
+            if awake.isdisjoint(TRACKED_TRIGGERS[object_name]):
+                continue
+            found = containing(
+                get_object(scene, object_name).position, OBJECT_REGIONS, OBJECT_GRID,
+                OBJECT_LARGE)
+            for index in found & tracking:
+                counts[index] = counts.get(index, 0) + 1
+        for index, count in counts.items():
+            region = OBJECT_REGIONS[index]
+            if (region[1] and region[0] in awake and
+                    (region[6] or count == TRACKED_COUNT[index])):
+                start(scene, region[0])
+        for index in OBJECT_OUTSIDE:
+            region = OBJECT_REGIONS[index]
+            if region[0] not in awake:
+                continue
+            count = counts.get(index, 0)
+            if (
+                    (region[6] and count < TRACKED_COUNT[index]) or
+                    (not region[6] and count == 0)):
+                start(scene, region[0])
+"""
+
+
+def region_bounds(box):
+    """Return (lower corner, upper corner, number of axes checked) for
+    EventBox
+
+    If box is None, no axes are checked, so that the region contains every
+    position. The third axis is not checked if the box ignores vertical
+    position."""
+    if box is None:
+        return (None, None, 0)
+    lower = tuple(
+        float(min(coords)) for coords in zip(box["corner1"], box["corner2"]))
+    upper = tuple(
+        float(max(coords)) for coords in zip(box["corner1"], box["corner2"]))
+    return (lower, upper, (3, 2)[box["ignore_y"]])
+
+
+class BlenderRegionIndex(BlenderDetector):
+    """Detects movement into or out of the boxes of all position triggers
+    with a single controller
+
+    Boxes are placed in a uniform grid over the first two axes. Once per
+    detection tick, the cells containing the camera and each tracked object
+    are looked up, and only the regions in those cells (and regions too
+    large to grid) are checked exactly. Triggers are started under the same
+    conditions as when each trigger checked its own box. Only the boxes of
+    awake triggers are checked, and objects tracked only by sleeping
+    triggers are not looked up (see :py:class:`BlenderDetector`).
+
+    :param list triggers: BlenderPositionTrigger and
+    BlenderObjectPositionTrigger activators to detect events for
+    :param float cell_size: Width of grid cells. Defaults to the median
+    width of the boxes.
+    :param int max_cells: Regions which overlap more grid cells than this are
+    checked on every tick rather than being placed in the grid
+    """
+    name = "region_index"
+
+    def __init__(self, triggers, cell_size=None, max_cells=64):
+        super(BlenderRegionIndex, self).__init__(triggers)
+        self.max_cells = max_cells
+        if cell_size is None:
+            cell_size = self.default_cell_size()
+        self.cell_size = float(cell_size)
+
+    def default_cell_size(self):
+        """Return median width of boxes of triggers, or 1 if there are no
+        boxes"""
+        widths = sorted(
+            max(abs(trigger.box["corner1"][i] - trigger.box["corner2"][i])
+                for i in range(2))
+            for trigger in self.triggers if trigger.box is not None)
+        widths = [width for width in widths if width > 0]
+        if not widths:
+            return 1.
+        return widths[len(widths)//2]
+
+    def _cell_range(self, lower, upper):
+        return [
+            range(
+                int(math.floor(lower[i]/self.cell_size)),
+                int(math.floor(upper[i]/self.cell_size)) + 1)
+            for i in range(2)]
+
+    def build_grid(self, regions):
+        """Return (grid, large, outside) for list of regions
+
+        grid maps cell coordinates to indices of regions which overlap that
+        cell, large lists indices of regions which are not gridded, and
+        outside lists indices of regions which trigger outside their box"""
+        grid = {}
+        large = []
+        outside = []
+        for index, region in enumerate(regions):
+            lower, upper, axes = region[2:5]
+            if not region[1]:
+                outside.append(index)
+            if axes == 0:
+                large.append(index)
+                continue
+            x_range, y_range = self._cell_range(lower, upper)
+            if len(x_range)*len(y_range) > self.max_cells:
+                large.append(index)
+                continue
+            for x in x_range:
+                for y in y_range:
+                    grid.setdefault((x, y), []).append(index)
+        grid = {key: tuple(value) for key, value in grid.items()}
+        return grid, tuple(large), tuple(outside)
+
+    def regions(self):
+        """Return (camera regions, object regions) for triggers"""
+        camera_regions = []
+        object_regions = []
+        for trigger in self.triggers:
+            region = (trigger.name, trigger.box is None or
+                      trigger.box["direction"] == "Inside") + region_bounds(
+                          trigger.box)
+            if trigger.tracked_objects is None:
+                camera_regions.append(region)
+            else:
+                object_regions.append(
+                    region + (_Expression(trigger.tracked_objects),
+                              trigger.detect_any))
+        return camera_regions, object_regions
+
+    def generate_python_logic(self):
+        """Returns the full text of the Python detection script"""
+        camera_regions, object_regions = self.regions()
+        camera_grid, camera_large, camera_outside = self.build_grid(
+            camera_regions)
+        object_grid, object_large, object_outside = self.build_grid(
+            object_regions)
+        return REGION_INDEX_SCRIPT.format(
+            awake_property=self.awake_property,
+            trigger_names=_format_tuple(self.trigger_names()),
+            cell_size=self.cell_size,
+            camera_regions=_format_tuple(camera_regions),
+            camera_grid=camera_grid,
+            camera_large=camera_large,
+            camera_outside=camera_outside,
+            object_regions=_format_tuple(object_regions),
+            object_grid=object_grid,
+            object_large=object_large,
+            object_outside=object_outside)
+
+    @property
+    def base_object(self):
+        """Returns the object which runs detection, creating it if
+        necessary"""
+        try:
+            return bpy.data.objects[self.name]
+        except KeyError:
+            return get_backend().add_empty(
+                self.name, [layer == 20 for layer in range(1, 21)])
+
+
+class _Expression(str):
+    """String which is written into generated scripts without quotes (e.g.
+    the name of a list defined in group_defs)"""
+
+    def __repr__(self):
+        return str(self)
+
+
+def _format_tuple(items):
+    """Return Python literal for tuple of items, one per line"""
+    if not items:
+        return "()"
+    return "(\n{},\n)".format(",\n".join(
+        "    {!r}".format(item) for item in items))
@@ -47,7 +47,8 @@ class BlenderTrigger(Activator):
         self.script_footer = "\n".join(
             [
                 self.script_footer,
-                "            own['enabled'] = {}".format(self.remain_enabled)
+                "            own['enabled'] = {}".format(self.remain_enabled),
+                "            wake_trigger(own)"
             ]
         )
         return "\n".join(action_logic)
@@ -58,16 +59,14 @@ class BlenderTrigger(Activator):
         Dummy method intended to be overridden by subclasses"""
         return ""
 
-    def write_python_logic(self):
-        """Write any necessary Python controller scripts for this activator"""
+    def generate_python_logic(self):
         script_text = [
             self.script_header,
             self.generate_action_logic(),
             self.script_footer,
             self.generate_detection_logic()
         ]
-        self.script.write("\n".join(script_text))
-        return self.script
+        return "\n".join(script_text)
 
     def create_enabled_property(self):
         return super(BlenderTrigger, self).create_enabled_property(
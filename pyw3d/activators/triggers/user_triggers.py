@@ -18,97 +18,19 @@
 """A Blender-based implementation of triggers based on the state of the user in
 virtual space
 """
-import warnings
-from pyw3d.errors import EBKAC
 from .triggers import BlenderTrigger
-try:
-    import bpy
-except ImportError:
-    warnings.warn(
-        "Module bpy not found. Loading "
-        "pyw3d.activators.triggers.object_triggers as standalone")
-
-# TODO: There's some code reuse happening between this and object_triggers
 
 
 class BlenderPositionTrigger(BlenderTrigger):
-    """Activator based on position of user in virtual space"""
-
-    def create_enabled_sensor(self):
-        """Add a sensor to fire continuously while trigger is enabled"""
-        base_object = self.select_base_object()
-        bpy.ops.logic.sensor_add(
-            type="PROPERTY",
-            object=self.name,
-            name="enabled_sensor"
-        )
-        base_object.game.sensors[-1].name = self.name
-        enable_sensor = base_object.game.sensors[self.name]
-        enable_sensor.use_pulse_true_level = True
-        enable_sensor.frequency = 1
-        enable_sensor.property = "enabled"
-        enable_sensor.value = "True"
-        self.enable_sensor = enable_sensor
-        return enable_sensor
-
-    def create_detection_controller(self):
-        """Add a controller for detecting specified event"""
-
-        bpy.ops.logic.controller_add(
-            type='PYTHON',
-            object=self.name,
-            name="detect")
-        controller = self.base_object.game.controllers["detect"]
-        controller.mode = "MODULE"
-        controller.module = "{}.detect_event".format(self.name)
-        self.detect_controller = controller
-        return controller
-
-    def link_detection_bricks(self):
-        """Link necessary logic bricks for event detection
-
-        :raises EBKAC: if controller or sensor does not exist"""
-        try:
-            self.detect_controller.link(sensor=self.enable_sensor)
-        except AttributeError:
-            raise EBKAC(
-                "Detection sensor and controller must be created before they "
-                "can be linked")
-        return self.detect_controller
-
-    def generate_detection_logic(self):
-        """Add a function to Python control script to detect user position"""
-        detection_logic = [
-            "\ndef detect_event(cont):",
-            "    scene = bge.logic.getCurrentScene()",
-            "    own = cont.owner",
-            "    position = scene.objects['CAMERA'].position",
-            "    inside = True",
-            "    corners = {}".format(
-                list(zip(self.box["corner1"], self.box["corner2"]))),
-            "    for i in range({}):".format((3, 2)[self.box["ignore_y"]]),
-            "        if (",
-            "                position[i] < min(corners[i]) or",
-            "                position[i] > max(corners[i])):",
-            "            inside = False",
-            "            break",
-            "    if ({} and own['enabled'] and".format(
-                ("not inside", "inside")[
-                    self.box["direction"] == "Inside"]),
-            "            own['status'] == 'Stop'):",
-            "        own['status'] = 'Start'"
-        ]
-        detection_logic = "\n".join(detection_logic)
-        return detection_logic
+    """Activator based on position of user in virtual space
 
-    def create_blender_objects(self):
-        super(BlenderPositionTrigger, self).create_blender_objects()
-        self.create_enabled_sensor()
-        self.create_detection_controller()
+    Movement into or out of box is detected for all position triggers at
+    once by :py:class:`BlenderRegionIndex`
 
-    def link_logic_bricks(self):
-        super(BlenderPositionTrigger, self).link_logic_bricks()
-        self.link_detection_bricks()
+    :param EventBox box: Box user must move into or out of. If None, trigger
+    may be activated anywhere"""
+    tracked_objects = None
+    detect_any = True
 
     def __init__(
             self, name, actions, box, duration=0, enable_immediately=True,
@@ -0,0 +1,202 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Cache of Blender datablocks loaded from files, shared by all objects of
+an export
+
+Images, fonts, materials, and the meshes of imported models are cached by
+the content of the file they come from, so that every object which uses the
+same file, under any path, shares a single datablock. The meshes of
+W3DContent are cached by the content feature, so that objects with identical
+content are linked duplicates of one mesh. W3DProject.blend starts each
+export with an empty cache (see :py:func:`set_asset_cache`).
+"""
+import os
+import hashlib
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+class AssetCache(object):
+    """Datablocks loaded from files, by kind of datablock and content of
+    file
+
+    Every lookup is counted as a hit or a miss for its kind of datablock,
+    and the counts are summarized by :py:meth:`report`."""
+
+    def __init__(self):
+        self._assets = {}
+        self._keys = {}
+        self._shared = set()
+        self._variants = {}
+        self.hits = {}
+        self.misses = {}
+
+    def content_key(self, filepath):
+        """Return key identifying the content of file at filepath
+
+        Files are hashed once per export. Paths which cannot be read are
+        identified by their absolute path instead, so that loading them
+        raises the usual error."""
+        path = os.path.abspath(filepath)
+        try:
+            return self._keys[path]
+        except KeyError:
+            pass
+        try:
+            digest = hashlib.sha1()
+            with open(path, "rb") as asset_file:
+                for chunk in iter(
+                        lambda: asset_file.read(HASH_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+            key = digest.hexdigest()
+        except (IOError, OSError):
+            key = path
+        self._keys[path] = key
+        return key
+
+    def get(self, kind, filepath, *variant):
+        """Return cached datablock of given kind for file, or None if it
+        has not been loaded
+
+        :param str kind: Kind of datablock (e.g. "image", "font")
+        :param str filepath: Path to file from which datablock is loaded
+        :param variant: Any further settings with which datablock was
+        loaded"""
+        return self._get(kind, (kind, self.content_key(filepath)) + variant)
+
+    def _get(self, kind, key):
+        try:
+            datablock = self._assets[key]
+        except KeyError:
+            self.misses[kind] = self.misses.get(kind, 0) + 1
+            return None
+        self.hits[kind] = self.hits.get(kind, 0) + 1
+        return datablock
+
+    def add(self, kind, filepath, datablock, *variant):
+        """Cache datablock of given kind loaded from file
+
+        :returns: datablock"""
+        key = (kind, self.content_key(filepath)) + variant
+        self._assets[key] = datablock
+        return self.share(datablock)
+
+    def load(self, kind, filepath, loader, *variant):
+        """Return cached datablock of given kind for file, calling
+        loader(filepath, \\*variant) to load it if it has not been loaded"""
+        datablock = self.get(kind, filepath, *variant)
+        if datablock is None:
+            datablock = self.add(
+                kind, filepath, loader(filepath, *variant), *variant)
+        return datablock
+
+    def get_instance(self, content):
+        """Return mesh of W3DContent equal to content which was blended
+        earlier, or None if there is none
+
+        :param W3DContent content: The content to be blended"""
+        return self._get("instance", ("instance", content.hashable()))
+
+    def add_instance(self, content, mesh):
+        """Cache mesh created for content, to be shared by objects with
+        equal content
+
+        :returns: mesh"""
+        self._assets[("instance", content.hashable())] = mesh
+        return self.share(mesh)
+
+    def share(self, datablock):
+        """Mark datablock as used by more than one object, without caching
+        it
+
+        :returns: datablock"""
+        self._shared.add(datablock)
+        return datablock
+
+    def is_shared(self, datablock):
+        """Return True if datablock is cached and may be used by more than
+        one object"""
+        return datablock in self._shared
+
+    def material_variant(self, material, settings):
+        """Return the copy of a cached material shared by objects which
+        change its settings in the same way
+
+        The first settings requested for a material are given the material
+        itself.
+
+        :param material: Cached material
+        :param tuple settings: Hashable description of settings which will
+        be applied to the returned material
+        :returns: Material to apply settings to"""
+        variants = self._variants.setdefault(material, {})
+        try:
+            return variants[settings]
+        except KeyError:
+            pass
+        if variants:
+            variant = material.copy()
+        else:
+            variant = material
+        variants[settings] = variant
+        return self.share(variant)
+
+    def hit_rate(self, kind=None):
+        """Return fraction of lookups which were hits, for one kind of
+        datablock or for all kinds if kind is None"""
+        if kind is None:
+            hits = sum(self.hits.values())
+            lookups = hits + sum(self.misses.values())
+        else:
+            hits = self.hits.get(kind, 0)
+            lookups = hits + self.misses.get(kind, 0)
+        if lookups == 0:
+            return 0.
+        return hits/lookups
+
+    def report(self):
+        """Return summary of hits, misses, and hit rates by kind of
+        datablock"""
+        lines = []
+        for kind in sorted(set(self.hits) | set(self.misses)):
+            lines.append("{}: {} hits, {} misses ({:.1%} hit rate)".format(
+                kind, self.hits.get(kind, 0), self.misses.get(kind, 0),
+                self.hit_rate(kind)))
+        lines.append("total: {} hits, {} misses ({:.1%} hit rate)".format(
+            sum(self.hits.values()), sum(self.misses.values()),
+            self.hit_rate()))
+        return "\n".join(lines)
+
+
+_asset_cache = AssetCache()
+
+
+def get_asset_cache():
+    """Return the cache of datablocks for the current export"""
+    return _asset_cache
+
+
+def set_asset_cache(asset_cache):
+    """Use asset_cache for the current export
+
+    :param AssetCache asset_cache: The new cache
+    :returns: The previous cache"""
+    global _asset_cache
+    previous = _asset_cache
+    _asset_cache = asset_cache
+    return previous
@@ -0,0 +1,573 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Compact binary format for W3D projects
+
+A project is stored as a sequence of sections, located by a table of
+contents at the start of the file:
+
+* A header of the magic bytes "W3DB", the format version, and the number of
+  sections, as little-endian unsigned 16-bit integers
+* For each section, its name (one byte of length followed by ASCII), and its
+  offset from the start of the file and length in bytes, as little-endian
+  unsigned 32-bit integers
+
+The "strings" section interns every string in the project, including option
+names, so that each is stored once. The "types" section lists the classes of
+all features in the project by module and qualified name. Only classes
+defined within pyw3d are loaded, so that, unlike a pickle, a file can
+construct nothing but W3D features. The "project" section holds the project
+itself, with every option other than its lists of features, each of which
+(objects, groups, timelines, sounds, and trigger_events) has a section of its
+own.
+
+Values are stored as a tag byte followed by the data of the value. Integers
+and counts are stored as variable-length integers of 7 bits per byte, and
+strings by their index in the string table. Tuples and lists of floats, as in
+positions and rotations, are packed as arrays of doubles, and those of
+integers from 0 to 255, as in colors, as arrays of bytes. A feature is stored
+as its class's index in the type table followed by the options which have
+been set on it (see :py:meth:`W3DFeature.option_items`), from which it is
+constructed again when loaded. SortedLists are stored as lists, which the
+features holding them sort again when they are constructed. Attributes
+other than options, such as the activators made by blending, are not
+stored.
+
+Loaded lazily, the lists of features of a project are each decoded the
+first time they are used.
+"""
+import struct
+import importlib
+from collections import defaultdict
+from .features import W3DFeature
+from .structs import SortedList, VersionedList
+from .errors import BadW3DBinary, InvalidArgument
+
+MAGIC = b"W3DB"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHH")
+SECTION_LOCATION = struct.Struct("<II")
+DOUBLE = struct.Struct("<d")
+
+(NONE, FALSE, TRUE, INTEGER, FLOAT, STRING, LIST, TUPLE, DICT,
+ LIST_DEFAULTDICT, FEATURE, FLOAT_LIST, FLOAT_TUPLE, BYTE_LIST,
+ BYTE_TUPLE) = range(15)
+"""Tags identifying the type of each stored value"""
+
+
+def _write_varint(out, number):
+    while number > 0x7f:
+        out.append((number & 0x7f) | 0x80)
+        number >>= 7
+    out.append(number)
+
+
+def _read_varint(data, offset):
+    """Return (number, offset of next byte)"""
+    number = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        number |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return number, offset
+        shift += 7
+
+
+def _packed_tag(sequence, float_tag, byte_tag):
+    """Return tag with which sequence may be stored packed, or None if it
+    may not"""
+    if not sequence:
+        return None
+    if all(type(item) is float for item in sequence):
+        return float_tag
+    if all(type(item) is int and 0 <= item <= 255 for item in sequence):
+        return byte_tag
+    return None
+
+
+class _Encoder(object):
+    """Encode values into bytes, interning strings and feature classes"""
+
+    def __init__(self):
+        self.strings = {}
+        self.types = {}
+
+    def string_index(self, string):
+        try:
+            return self.strings[string]
+        except KeyError:
+            index = self.strings[string] = len(self.strings)
+            return index
+
+    def type_index(self, feature_class):
+        try:
+            return self.types[feature_class]
+        except KeyError:
+            index = self.types[feature_class] = len(self.types)
+            return index
+
+    def encode(self, value, out):
+        """Append encoded value to bytearray out"""
+        value_type = type(value)
+        if value is None:
+            out.append(NONE)
+        elif value_type is bool:
+            out.append(TRUE if value else FALSE)
+        elif value_type is int:
+            out.append(INTEGER)
+            _write_varint(out, value << 1 if value >= 0 else (~value << 1) | 1)
+        elif value_type is float:
+            out.append(FLOAT)
+            out += DOUBLE.pack(value)
+        elif value_type is str:
+            out.append(STRING)
+            _write_varint(out, self.string_index(value))
+        elif value_type is tuple:
+            self.encode_sequence(value, TUPLE, FLOAT_TUPLE, BYTE_TUPLE, out)
+        elif value_type is list or value_type is SortedList:
+            self.encode_sequence(value, LIST, FLOAT_LIST, BYTE_LIST, out)
+        elif value_type is dict:
+            out.append(DICT)
+            self.encode_items(value, out)
+        elif value_type is defaultdict and value.default_factory is list:
+            out.append(LIST_DEFAULTDICT)
+            self.encode_items(value, out)
+        elif isinstance(value, W3DFeature):
+            out.append(FEATURE)
+            self.encode_feature(value, value.option_items(), out)
+        else:
+            raise BadW3DBinary(
+                "Cannot store value {!r} of type {} in W3D binary"
+                " format".format(value, value_type.__name__))
+
+    def encode_sequence(self, sequence, tag, float_tag, byte_tag, out):
+        packed_tag = _packed_tag(sequence, float_tag, byte_tag)
+        if packed_tag is None:
+            out.append(tag)
+            _write_varint(out, len(sequence))
+            for item in sequence:
+                self.encode(item, out)
+            return
+        out.append(packed_tag)
+        _write_varint(out, len(sequence))
+        if packed_tag == float_tag:
+            out += struct.pack("<{}d".format(len(sequence)), *sequence)
+        else:
+            out += bytes(sequence)
+
+    def encode_items(self, dictionary, out):
+        _write_varint(out, len(dictionary))
+        for key, item in dictionary.items():
+            self.encode(key, out)
+            self.encode(item, out)
+
+    def encode_feature(self, feature, items, out):
+        """Append type index of feature and the given (option, value) pairs
+        to out"""
+        _write_varint(out, self.type_index(type(feature)))
+        _write_varint(out, len(items))
+        for key, value in items:
+            _write_varint(out, self.string_index(key))
+            self.encode(value, out)
+
+    def string_section(self):
+        out = bytearray()
+        _write_varint(out, len(self.strings))
+        for string in sorted(self.strings, key=self.strings.__getitem__):
+            encoded = string.encode("utf-8")
+            _write_varint(out, len(encoded))
+            out += encoded
+        return out
+
+    def type_section(self):
+        out = bytearray()
+        _write_varint(out, len(self.types))
+        for feature_class in sorted(self.types, key=self.types.__getitem__):
+            _write_varint(out, self.string_index("{}:{}".format(
+                feature_class.__module__, feature_class.__qualname__)))
+        return out
+
+
+def dumps(project):
+    """Return project in W3D binary format
+
+    :param W3DProject project: The project to store
+    :raises BadW3DBinary: If the project holds a value which cannot be
+    stored"""
+    encoder = _Encoder()
+    sections = []
+    out = bytearray()
+    encoder.encode_feature(project, [
+        (key, value) for key, value in project.option_items()
+        if key not in project.indexed_keys], out)
+    sections.append(("project", out))
+    for key in project.indexed_keys:
+        out = bytearray()
+        _write_varint(out, len(project[key]))
+        for feature in project[key]:
+            encoder.encode(feature, out)
+        sections.append((key, out))
+    # The type table adds the names of classes to the string table
+    sections.insert(0, ("types", encoder.type_section()))
+    sections.insert(0, ("strings", encoder.string_section()))
+
+    header = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, len(sections)))
+    offset = HEADER.size + sum(
+        1 + len(name) + SECTION_LOCATION.size for name, _ in sections)
+    for name, data in sections:
+        header.append(len(name))
+        header += name.encode("ascii")
+        header += SECTION_LOCATION.pack(offset, len(data))
+        offset += len(data)
+    return bytes(header + b"".join(data for _, data in sections))
+
+
+def save(project, filename):
+    """Save project to file in W3D binary format"""
+    data = dumps(project)
+    with open(filename, "wb") as file_:
+        file_.write(data)
+
+
+def _feature_class(qualified_name):
+    """Return W3DFeature subclass of given "module:qualname" name"""
+    module_name, _, class_name = qualified_name.partition(":")
+    if module_name.split(".")[0] != "pyw3d":
+        raise BadW3DBinary(
+            "Feature class {} is not defined by pyw3d".format(qualified_name))
+    try:
+        feature_class = importlib.import_module(module_name)
+        for name in class_name.split("."):
+            feature_class = getattr(feature_class, name)
+    except (ImportError, AttributeError):
+        raise BadW3DBinary(
+            "Feature class {} not found".format(qualified_name))
+    if not (isinstance(feature_class, type) and
+            issubclass(feature_class, W3DFeature)):
+        raise BadW3DBinary(
+            "{} is not a W3D feature class".format(qualified_name))
+    return feature_class
+
+
+class _Decoder(object):
+    """Decode values from the sections of a W3D binary file
+
+    :param bytes data: Content of the file
+    :param bool trusted: Construct features without validating their values
+    (see W3DFeature.deferred_validation)"""
+
+    def __init__(self, data, trusted):
+        self.data = data
+        self.trusted = trusted
+        try:
+            magic, version, num_sections = HEADER.unpack_from(data)
+        except struct.error:
+            raise BadW3DBinary("File is too short for a W3D binary project")
+        if magic != MAGIC:
+            raise BadW3DBinary("File is not a W3D binary project")
+        if version > FORMAT_VERSION:
+            raise BadW3DBinary(
+                "W3D binary format version {} is newer than supported version"
+                " {}".format(version, FORMAT_VERSION))
+        self.sections = {}
+        offset = HEADER.size
+        try:
+            for _ in range(num_sections):
+                name_end = offset + 1 + data[offset]
+                name = data[offset + 1:name_end].decode("ascii")
+                self.sections[name] = SECTION_LOCATION.unpack_from(
+                    data, name_end)
+                offset = name_end + SECTION_LOCATION.size
+        except (IndexError, UnicodeDecodeError, struct.error):
+            raise BadW3DBinary("Table of contents is truncated or corrupt")
+        for name, (offset, length) in self.sections.items():
+            if offset + length > len(data):
+                raise BadW3DBinary("Section {} is truncated".format(name))
+        self.strings = self.section("strings", self._read_strings)
+        self.types = [
+            _feature_class(qualified_name) for qualified_name in
+            self.section("types", self._read_types)]
+        self.readers = [
+            self._read_none, self._read_false, self._read_true,
+            self._read_integer, self._read_float, self._read_string,
+            self._read_list, self._read_tuple, self._read_dict,
+            self._read_list_defaultdict, self.read_feature,
+            self._read_float_list, self._read_float_tuple,
+            self._read_byte_list, self._read_byte_tuple]
+
+    def section(self, name, read):
+        """Return value read from the start of named section by read, a
+        function taking the offset at which to start and returning (value,
+        offset after value)"""
+        try:
+            offset, length = self.sections[name]
+        except KeyError:
+            raise BadW3DBinary("File has no {} section".format(name))
+        try:
+            if self.trusted:
+                with W3DFeature.deferred_validation():
+                    value, end = read(offset)
+            else:
+                value, end = read(offset)
+        except (IndexError, UnicodeDecodeError, struct.error):
+            raise BadW3DBinary("Section {} is truncated or corrupt".format(
+                name))
+        if end != offset + length:
+            raise BadW3DBinary("Section {} has wrong length".format(name))
+        return value
+
+    def _read_strings(self, offset):
+        data = self.data
+        count, offset = _read_varint(data, offset)
+        strings = []
+        for _ in range(count):
+            length, offset = _read_varint(data, offset)
+            strings.append(data[offset:offset + length].decode("utf-8"))
+            offset += length
+        return strings, offset
+
+    def _read_types(self, offset):
+        count, offset = _read_varint(self.data, offset)
+        names = []
+        for _ in range(count):
+            index, offset = _read_varint(self.data, offset)
+            names.append(self.strings[index])
+        return names, offset
+
+    def read_features(self, offset):
+        """Return (list of stored values, offset after list), as stored in
+        the section of each list of features"""
+        return self._read_list(offset)
+
+    def read_value(self, offset):
+        tag = self.data[offset]
+        try:
+            reader = self.readers[tag]
+        except IndexError:
+            raise BadW3DBinary("Unknown value tag {}".format(tag))
+        return reader(offset + 1)
+
+    def _read_none(self, offset):
+        return None, offset
+
+    def _read_false(self, offset):
+        return False, offset
+
+    def _read_true(self, offset):
+        return True, offset
+
+    def _read_integer(self, offset):
+        number, offset = _read_varint(self.data, offset)
+        if number & 1:
+            return ~(number >> 1), offset
+        return number >> 1, offset
+
+    def _read_float(self, offset):
+        return DOUBLE.unpack_from(self.data, offset)[0], offset + DOUBLE.size
+
+    def _read_string(self, offset):
+        index, offset = _read_varint(self.data, offset)
+        return self.strings[index], offset
+
+    def _read_list(self, offset):
+        count, offset = _read_varint(self.data, offset)
+        items = []
+        read_value = self.read_value
+        for _ in range(count):
+            item, offset = read_value(offset)
+            items.append(item)
+        return items, offset
+
+    def _read_tuple(self, offset):
+        items, offset = self._read_list(offset)
+        return tuple(items), offset
+
+    def _read_items(self, dictionary, offset):
+        count, offset = _read_varint(self.data, offset)
+        read_value = self.read_value
+        for _ in range(count):
+            key, offset = read_value(offset)
+            dictionary[key], offset = read_value(offset)
+        return dictionary, offset
+
+    def _read_dict(self, offset):
+        return self._read_items({}, offset)
+
+    def _read_list_defaultdict(self, offset):
+        return self._read_items(defaultdict(list), offset)
+
+    def read_feature(self, offset):
+        """Return (feature, offset after feature) for feature stored at
+        offset without a tag, as in the project section"""
+        data = self.data
+        strings = self.strings
+        read_value = self.read_value
+        type_index, offset = _read_varint(data, offset)
+        count, offset = _read_varint(data, offset)
+        items = []
+        for _ in range(count):
+            key_index, offset = _read_varint(data, offset)
+            value, offset = read_value(offset)
+            items.append((strings[key_index], value))
+        return self.types[type_index](*items), offset
+
+    def _read_float_tuple(self, offset):
+        count, offset = _read_varint(self.data, offset)
+        return (
+            struct.unpack_from("<{}d".format(count), self.data, offset),
+            offset + count*DOUBLE.size)
+
+    def _read_float_list(self, offset):
+        items, offset = self._read_float_tuple(offset)
+        return list(items), offset
+
+    def _read_byte_tuple(self, offset):
+        count, offset = _read_varint(self.data, offset)
+        return tuple(self.data[offset:offset + count]), offset + count
+
+    def _read_byte_list(self, offset):
+        count, offset = _read_varint(self.data, offset)
+        return list(self.data[offset:offset + count]), offset + count
+
+
+def _loading(method_name):
+    """Return version of VersionedList method which first loads the section
+    it is called on"""
+    list_method = getattr(VersionedList, method_name)
+
+    def loading_method(self, *args, **kwargs):
+        self.load()
+        return list_method(self, *args, **kwargs)
+    loading_method.__name__ = method_name
+    loading_method.__doc__ = list_method.__doc__
+    return loading_method
+
+
+class LazySection(VersionedList):
+    """A list of features which is decoded from a W3D binary file the first
+    time it is used
+
+    Once loaded, the list becomes a plain VersionedList.
+
+    :param _Decoder decoder: Decoder of the file
+    :param str name: Name of the section holding the list
+    :param validator: If not None, the project's validator for the list,
+    which the loaded list must pass"""
+
+    def __init__(self, decoder, name, validator=None):
+        super(LazySection, self).__init__()
+        self._decoder = decoder
+        self._name = name
+        self._validator = validator
+
+    def load(self):
+        """Decode the features of this section, if they have not been"""
+        self.__class__ = VersionedList
+        try:
+            features = self._decoder.section(
+                self._name, self._decoder.read_features)
+            if self._validator is not None and not self._validator(
+                    features):
+                raise InvalidArgument(
+                    "Section {} holds an invalid value for option {}".format(
+                        self._name, self._name))
+        except:
+            self.__class__ = LazySection
+            raise
+        list.extend(self, features)
+        del self._decoder, self._name, self._validator
+
+    def __reduce_ex__(self, protocol):
+        self.load()
+        return self.__reduce_ex__(protocol)
+
+    __len__ = _loading("__len__")
+    __iter__ = _loading("__iter__")
+    __reversed__ = _loading("__reversed__")
+    __getitem__ = _loading("__getitem__")
+    __contains__ = _loading("__contains__")
+    __eq__ = _loading("__eq__")
+    __ne__ = _loading("__ne__")
+    __lt__ = _loading("__lt__")
+    __le__ = _loading("__le__")
+    __gt__ = _loading("__gt__")
+    __ge__ = _loading("__ge__")
+    __add__ = _loading("__add__")
+    __mul__ = _loading("__mul__")
+    __rmul__ = _loading("__rmul__")
+    __repr__ = _loading("__repr__")
+    __setitem__ = _loading("__setitem__")
+    __delitem__ = _loading("__delitem__")
+    __iadd__ = _loading("__iadd__")
+    __imul__ = _loading("__imul__")
+    append = _loading("append")
+    extend = _loading("extend")
+    insert = _loading("insert")
+    pop = _loading("pop")
+    remove = _loading("remove")
+    clear = _loading("clear")
+    sort = _loading("sort")
+    reverse = _loading("reverse")
+    index = _loading("index")
+    count = _loading("count")
+    copy = _loading("copy")
+
+
+def loads(data, lazy=True, trusted=False):
+    """Return project stored in W3D binary format
+
+    :param bytes data: The stored project
+    :param bool lazy: Decode each list of features of the project (see
+    W3DProject.indexed_keys) only when it is first used, rather than now.
+    Errors in a list are then raised when it is first used.
+    :param bool trusted: If True, skip validation of individual values
+    while loading (see W3DFeature.deferred_validation). The returned
+    project's validate method may be called to check it afterwards.
+    :raises BadW3DBinary: If data is not a valid W3D binary project"""
+    decoder = _Decoder(bytes(data), trusted)
+    new_project = decoder.section("project", decoder.read_feature)
+    if not hasattr(new_project, "indexed_keys"):
+        raise BadW3DBinary("File does not hold a W3D project")
+    for key in new_project.indexed_keys:
+        if key not in decoder.sections:
+            continue
+        if not lazy:
+            features = decoder.section(key, decoder.read_features)
+            if trusted:
+                with W3DFeature.deferred_validation():
+                    new_project[key] = features
+            else:
+                new_project[key] = features
+            continue
+        validator = None
+        if not trusted:
+            validator = new_project.argument_validators[key]
+        # Assigned directly, since validating the list would load it
+        dict.__setitem__(
+            new_project, key, LazySection(decoder, key, validator))
+    return new_project
+
+
+def load(filename, lazy=True, trusted=False):
+    """Return project stored in W3D binary file of given filename
+
+    See :py:func:`loads` for parameters"""
+    with open(filename, "rb") as file_:
+        data = file_.read()
+    return loads(data, lazy=lazy, trusted=trusted)
@@ -16,6 +16,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>
 
 """Tools for changing the color of a Blender object"""
+from .transitions import start_transition_string
 
 
 class ColorAction(object):
@@ -26,19 +27,27 @@ class ColorAction(object):
     list of integers between 0 and 255
     :param float duration: Time for action to complete in seconds
     :param int offset: A number of tabs (4 spaces) to add before Python logic
-    strings"""
+    strings
+    :param str key: Identifies the action among those of its activator when
+    its transitions are registered with the w3d_runtime transition engine
+    :param float start_time: Time at which action starts, relative to
+    activation of its activator
+    :param bool interpolate: If True, interpolate between start and target
+    values by the time elapsed since start_time, rather than adding a fixed
+    change on every logic tick"""
 
     @property
     def start_string(self):
-        script_text = []
-        script_text.extend([
+        if not self.duration:
+            return ""
+        # Alpha is left unchanged
+        script_text = [
             "new_color = {}".format(self.color),
-            "blender_object['colorV'] = [",
-            "    (new_color[i] - blender_object.color[i])/{}".format(
-                ("({}*bge.logic.getLogicTicRate())".format(self.duration), 1)[
-                    self.duration == 0]),
-            "    for i in range(len(new_color))]"]
-        )
+            start_transition_string(
+                self, "color",
+                "[new_color[i] - blender_object.color[i] for i in "
+                "range(len(new_color))] + [0.]")
+        ]
 
         try:
             script_text[0] = "{}{}".format("    "*self.offset, script_text[0])
@@ -48,32 +57,34 @@ class ColorAction(object):
 
     @property
     def continue_string(self):
-        script_text = [
-            "new_color = blender_object.color",
-            "for i in range(len(blender_object['colorV'])):",
-            "    new_color[i] += blender_object['colorV'][i]",
-            "blender_object.color = new_color"
-        ]
-        try:
-            script_text[0] = "{}{}".format("    "*self.offset, script_text[0])
-        except IndexError:
-            return ""
-        return "\n{}".format("    "*self.offset).join(script_text)
+        # Transitions registered by start_string are advanced on every tick
+        # by the transition engine rather than by the action itself
+        return ""
 
     @property
     def end_string(self):
-        script_text = [
+        script_text = []
+        if self.duration:
+            script_text.append(
+                "end_transition(own, {!r}, blender_object, 'color')".format(
+                    self.key))
+        script_text.extend([
             "new_color = {}".format(self.color),
             "if len(new_color) < 4:",
             "    new_color.append(blender_object.color[3])",
-            "blender_object.color = new_color"]
+            "blender_object.color = new_color"])
         try:
             script_text[0] = "{}{}".format("    "*self.offset, script_text[0])
         except IndexError:
             return ""
         return "\n{}".format("    "*self.offset).join(script_text)
 
-    def __init__(self, color, duration, offset=0):
+    def __init__(
+            self, color, duration, offset=0, key="", start_time=0,
+            interpolate=True):
         self.color = [channel/255. for channel in color]
         self.duration = duration
         self.offset = offset
+        self.key = key
+        self.start_time = start_time
+        self.interpolate = interpolate
@@ -18,6 +18,7 @@
 """Tools for moving a Blender object in virtual space"""
 import math
 import warnings
+from .transitions import start_transition_string
 try:
     import mathutils
 except ImportError:
@@ -36,7 +37,14 @@ class MoveAction(object):
     location
     :param float duration: Time for action to complete in seconds
     :param int offset: A number of tabs (4 spaces) to add before Python logic
-    strings"""
+    strings
+    :param str key: Identifies the action among those of its activator when
+    its transitions are registered with the w3d_runtime transition engine
+    :param float start_time: Time at which action starts, relative to
+    activation of its activator
+    :param bool interpolate: If True, interpolate between start and target
+    values by the time elapsed since start_time, rather than adding a fixed
+    change on every logic tick"""
 
     @property
     def start_string(self):
@@ -142,37 +150,30 @@ class MoveAction(object):
                         "rotation = rotation_matrix.to_quaternion()"]
                     )
 
-            script_text.extend([
-                "blender_object['angV'] = (",
-                "    rotation.angle /",
-                "    {}".format(
-                    ("({}*bge.logic.getLogicTicRate()) *".format(
-                        self.duration), 1)[
-                        self.duration == 0]),
-                "    rotation.axis)"]
-            )
+            # Change in orientation is given by rotation axis scaled by
+            # angle
+            if self.duration:
+                script_text.append(start_transition_string(
+                    self, "rotation", "rotation.angle*rotation.axis"))
+            else:
+                script_text.append(
+                    "blender_object['angV'] = rotation.angle*rotation.axis")
         # ...and now take care of object position
         if "position" in self.placement:
             if self.move_relative:
-                script_text.extend([
-                    "blender_object['linV'] = [",
-                    "    coord/{} for coord in {}]".format(
-                        ("({}*bge.logic.getLogicTicRate())".format(
-                            self.duration), 1)[self.duration == 0],
-                        self.placement["position"]
-                    )]
-                )
+                change = str(list(self.placement["position"]))
             else:
-                script_text.extend([
-                    "target_pos = {}".format(
-                        list(self.placement["position"])),
-                    "delta_pos = [target_pos[i] - blender_object.position[i]",
-                    "    for i in range(len(blender_object.position))]",
-                    "blender_object['linV'] = [",
-                    "    coord/{} for coord in delta_pos]".format(
-                        ("({}*bge.logic.getLogicTicRate())".format(
-                            self.duration), 1)[self.duration == 0])]
-                )
+                script_text.append("target_pos = {}".format(
+                    list(self.placement["position"])))
+                change = (
+                    "[target_pos[i] - blender_object.position[i] for i in "
+                    "range(len(blender_object.position))]")
+            if self.duration:
+                script_text.append(
+                    start_transition_string(self, "position", change))
+            else:
+                script_text.append(
+                    "blender_object['linV'] = {}".format(change))
 
         try:
             script_text[0] = "{}{}".format("    "*self.offset, script_text[0])
@@ -182,26 +183,9 @@ class MoveAction(object):
 
     @property
     def continue_string(self):
-        script_text = []
-        if self.placement["rotation"]["rotation_mode"] != "None":
-            script_text.append(
-                "delta_rot = blender_object['angV']"
-            )
-            script_text.append(
-                "blender_object.applyRotation(delta_rot)")
-
-        if "position" in self.placement:
-            script_text.extend([
-                "blender_object.position = [",
-                "    blender_object.position[i] + blender_object['linV'][i]",
-                "    for i in range(len(blender_object.position))]"]
-            )
-
-        try:
-            script_text[0] = "{}{}".format("    "*self.offset, script_text[0])
-        except IndexError:
-            return ""
-        return "\n{}".format("    "*self.offset).join(script_text)
+        # Transitions registered by start_string are advanced on every tick
+        # by the transition engine rather than by the action itself
+        return ""
 
     @property
     def end_string(self):
@@ -221,6 +205,15 @@ class MoveAction(object):
                     "    blender_object['linV'][i]",
                     "    for i in range(len(blender_object.position))]"]
                 )
+        else:
+            if self.placement["rotation"]["rotation_mode"] != "None":
+                script_text.append(
+                    "end_transition(own, {!r}, blender_object, "
+                    "'rotation')".format(self.key))
+            if "position" in self.placement:
+                script_text.append(
+                    "end_transition(own, {!r}, blender_object, "
+                    "'position')".format(self.key))
 
         try:
             script_text[0] = "{}{}".format("    "*self.offset, script_text[0])
@@ -228,8 +221,13 @@ class MoveAction(object):
             return "{}pass".format("    "*self.offset)
         return "\n{}".format("    "*self.offset).join(script_text)
 
-    def __init__(self, placement, duration, move_relative=False, offset=0):
+    def __init__(
+            self, placement, duration, move_relative=False, offset=0,
+            key="", start_time=0, interpolate=True):
         self.placement = placement
         self.duration = duration
         self.move_relative = move_relative
         self.offset = offset
+        self.key = key
+        self.start_time = start_time
+        self.interpolate = interpolate
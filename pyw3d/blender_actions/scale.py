@@ -16,6 +16,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>
 
 """Tools for scaling Blender objects"""
+from .transitions import start_transition_string
 
 
 class ScaleAction(object):
@@ -25,19 +26,26 @@ class ScaleAction(object):
     :param float scale: The scale to transition to
     :param float duration: Time for action to complete in seconds
     :param int offset: A number of tabs (4 spaces) to add before Python logic
-    strings"""
+    strings
+    :param str key: Identifies the action among those of its activator when
+    its transitions are registered with the w3d_runtime transition engine
+    :param float start_time: Time at which action starts, relative to
+    activation of its activator
+    :param bool interpolate: If True, interpolate between start and target
+    values by the time elapsed since start_time, rather than adding a fixed
+    change on every logic tick"""
 
     @property
     def start_string(self):
-        script_text = []
-        script_text.extend([
+        if not self.duration:
+            return ""
+        script_text = [
             "new_scale = {}".format(self.scale),
-            "blender_object['scaleV'] = [",
-            "    (new_scale - blender_object.scaling[i])/{}".format(
-                ("({}*bge.logic.getLogicTicRate())".format(self.duration), 1)[
-                    self.duration == 0]),
-            "    for i in range(len(blender_object.scaling))]"]
-        )
+            start_transition_string(
+                self, "scaling",
+                "[new_scale - blender_object.scaling[i] for i in "
+                "range(len(blender_object.scaling))]")
+        ]
 
         try:
             script_text[0] = "{}{}".format("    "*self.offset, script_text[0])
@@ -47,28 +55,31 @@ class ScaleAction(object):
 
     @property
     def continue_string(self):
-        script_text = [
-            "blender_object.scaling = [",
-            "    (blender_object.scaling[i] + blender_object['scaleV'][i])",
-            "    for i in range(len(blender_object.scaling))]"
-        ]
-        try:
-            script_text[0] = "{}{}".format("    "*self.offset, script_text[0])
-        except IndexError:
-            return ""
-        return "\n{}".format("    "*self.offset).join(script_text)
+        # Transitions registered by start_string are advanced on every tick
+        # by the transition engine rather than by the action itself
+        return ""
 
     @property
     def end_string(self):
-        script_text = [
-            "blender_object.scaling = {}".format([self.scale]*3)]
+        script_text = []
+        if self.duration:
+            script_text.append(
+                "end_transition(own, {!r}, blender_object, 'scaling')".format(
+                    self.key))
+        script_text.append(
+            "blender_object.scaling = {}".format([self.scale]*3))
         try:
             script_text[0] = "{}{}".format("    "*self.offset, script_text[0])
         except IndexError:
             return ""
         return "\n{}".format("    "*self.offset).join(script_text)
 
-    def __init__(self, scale, duration, offset=0):
+    def __init__(
+            self, scale, duration, offset=0, key="", start_time=0,
+            interpolate=True):
         self.scale = scale
         self.duration = duration
         self.offset = offset
+        self.key = key
+        self.start_time = start_time
+        self.interpolate = interpolate
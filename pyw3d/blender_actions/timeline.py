@@ -32,7 +32,7 @@ class TimelineStarter(object):
     @property
     def start_string(self):
         script_text = [
-            "trigger = scene.objects['{}']".format(self.timeline)
+            "trigger = get_object(scene, '{}')".format(self.timeline)
             ]
         if self.change == "Start":
             script_text.append(
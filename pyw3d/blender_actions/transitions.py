@@ -0,0 +1,46 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Tools for registering continuous changes of Blender objects with the
+transition engine of the w3d_runtime text block"""
+
+
+def start_transition_string(action, attribute, change):
+    """Return Python logic registering a transition of an attribute of
+    blender_object
+
+    If action.interpolate is True, the attribute is interpolated over the
+    duration of the action by the time since action.start_time. Otherwise, a
+    fixed velocity is added to the attribute on every logic tick.
+
+    :param action: A MoveAction, ColorAction, or ScaleAction with duration
+    greater than zero
+    :param str attribute: One of "position", "rotation", "color", or
+    "scaling"
+    :param str change: Python expression for the total change of the
+    attribute over the action. For rotations, this is the axis of rotation
+    scaled by the angle."""
+    if action.interpolate:
+        return (
+            "start_transition(own, {!r}, blender_object, {!r}, {}, {}, "
+            "{})".format(
+                action.key, attribute, change, action.start_time,
+                action.duration))
+    return (
+        "start_transition(own, {!r}, blender_object, {!r}, [component/({}*"
+        "bge.logic.getLogicTicRate()) for component in {}])".format(
+            action.key, attribute, action.duration, change))
@@ -31,11 +31,12 @@ class TriggerEnabler(object):
     @property
     def start_string(self):
         script_text = [
-            "trigger = scene.objects['{}']".format(self.trigger)
+            "trigger = get_object(scene, '{}')".format(self.trigger)
             ]
-        script_text.append(
-            "trigger['enabled'] = {}".format(self.enable)
-        )
+        script_text.extend([
+            "trigger['enabled'] = {}".format(self.enable),
+            "wake_trigger(trigger)"
+        ])
 
         try:
             script_text[0] = "{}{}".format("    "*self.offset, script_text[0])
@@ -0,0 +1,318 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Backends through which objects, game properties, and logic bricks are
+constructed in Blender
+
+Everything that W3DProject.blend and the activators build in the scene goes
+through the current backend, which may be changed with
+:py:func:`set_backend`. :py:class:`OperatorBackend`, the default, builds
+the scene through bpy.ops, changing the active object before each call, as
+pyw3d did before backends were introduced. :py:class:`DataBackend` works on
+bpy.data wherever Blender allows it, and may be chosen for one export with
+the backend argument of :py:meth:`W3DProject.blend`.
+"""
+import warnings
+try:
+    import bpy
+except ImportError:
+    warnings.warn(
+        "Module bpy not found. Loading pyw3d.blender_backend as standalone")
+
+
+class BlenderBackend(object):
+    """Base class for ways of constructing Blender objects and their game
+    engine logic
+
+    All methods are dummy methods intended to be overridden by subclasses.
+    Objects are linked to the current scene, and logic bricks and properties
+    are given exactly the names requested."""
+
+    def clear_scene(self, keep=()):
+        """Remove all objects from the current scene
+
+        :param keep: Names of objects which should not be removed"""
+        raise NotImplementedError(
+            "clear_scene must be implemented by subclasses")
+
+    def add_empty(self, name, layers, location=None, rotation=None):
+        """Create an empty object
+
+        :param str name: Name of the new object
+        :param list layers: 20 booleans giving the layers of the object
+        :param location: Location of the object, if not the origin
+        :param rotation: Euler rotation of the object, if not zero
+        :returns: The new object"""
+        raise NotImplementedError(
+            "add_empty must be implemented by subclasses")
+
+    def add_camera(self, name, rotation=None):
+        """Create a camera object with its own camera data
+
+        :param str name: Name of the new object
+        :param rotation: Euler rotation of the camera, if not zero
+        :returns: The new object"""
+        raise NotImplementedError(
+            "add_camera must be implemented by subclasses")
+
+    def add_lamp(self, name, lamp_type, rotation=None):
+        """Create a lamp object with its own lamp data
+
+        :param str name: Name of the new object
+        :param str lamp_type: Blender lamp type (e.g. "POINT", "SUN")
+        :param rotation: Euler rotation of the lamp, if not zero
+        :returns: The new object"""
+        raise NotImplementedError(
+            "add_lamp must be implemented by subclasses")
+
+    def add_mesh_object(self, name, mesh):
+        """Create an object which uses existing mesh data
+
+        :param str name: Name of the new object
+        :param mesh: Mesh data, which may be shared with other objects
+        :returns: The new object"""
+        raise NotImplementedError(
+            "add_mesh_object must be implemented by subclasses")
+
+    def add_game_property(self, blender_object, property_type, name, value):
+        """Create a game property
+
+        :param blender_object: Object to add property to
+        :param str property_type: Blender game property type (e.g. "BOOL")
+        :param str name: Name of the property
+        :param value: Initial value of the property
+        :returns: The new property"""
+        raise NotImplementedError(
+            "add_game_property must be implemented by subclasses")
+
+    def add_sensor(self, blender_object, sensor_type, name):
+        """Create a sensor
+
+        :param blender_object: Object to add sensor to
+        :param str sensor_type: Blender sensor type (e.g. "PROPERTY")
+        :param str name: Name of the sensor
+        :returns: The new sensor"""
+        raise NotImplementedError(
+            "add_sensor must be implemented by subclasses")
+
+    def add_controller(self, blender_object, controller_type, name):
+        """Create a controller
+
+        :param blender_object: Object to add controller to
+        :param str controller_type: Blender controller type (e.g. "PYTHON")
+        :param str name: Name of the controller
+        :returns: The new controller"""
+        raise NotImplementedError(
+            "add_controller must be implemented by subclasses")
+
+    def add_actuator(self, blender_object, actuator_type, name):
+        """Create an actuator
+
+        :param blender_object: Object to add actuator to
+        :param str actuator_type: Blender actuator type (e.g. "MOTION")
+        :param str name: Name of the actuator
+        :returns: The new actuator"""
+        raise NotImplementedError(
+            "add_actuator must be implemented by subclasses")
+
+    def add_python_controller(self, blender_object, name, module):
+        """Create a Python controller in module mode
+
+        :param blender_object: Object to add controller to
+        :param str name: Name of the controller
+        :param str module: Function run by the controller, as
+        "module.function"
+        :returns: The new controller"""
+        controller = self.add_controller(blender_object, "PYTHON", name)
+        controller.mode = "MODULE"
+        controller.module = module
+        return controller
+
+
+class OperatorBackend(BlenderBackend):
+    """Backend which constructs everything through bpy.ops
+
+    Each object which is modified is first made the active object, and every
+    object, property, and logic brick costs an operator call, with the
+    context checks and scene updates which that entails."""
+
+    def clear_scene(self, keep=()):
+        for blender_object in bpy.context.scene.objects:
+            blender_object.select = blender_object.name not in keep
+        bpy.ops.object.delete()
+
+    @staticmethod
+    def _new_object(name):
+        blender_object = bpy.context.scene.objects.active
+        blender_object.name = name
+        return blender_object
+
+    def add_empty(self, name, layers, location=None, rotation=None):
+        kwargs = {}
+        if location is not None:
+            kwargs["location"] = location
+        if rotation is not None:
+            kwargs["rotation"] = rotation
+        bpy.ops.object.add(type="EMPTY", layers=layers, **kwargs)
+        return self._new_object(name)
+
+    def add_camera(self, name, rotation=None):
+        if rotation is None:
+            bpy.ops.object.camera_add()
+        else:
+            bpy.ops.object.camera_add(rotation=rotation)
+        return self._new_object(name)
+
+    def add_lamp(self, name, lamp_type, rotation=None):
+        if rotation is None:
+            bpy.ops.object.lamp_add(type=lamp_type)
+        else:
+            bpy.ops.object.lamp_add(type=lamp_type, rotation=rotation)
+        return self._new_object(name)
+
+    def add_mesh_object(self, name, mesh):
+        bpy.ops.object.add(type="MESH")
+        blender_object = self._new_object(name)
+        blender_object.data = mesh
+        return blender_object
+
+    def add_game_property(self, blender_object, property_type, name, value):
+        bpy.context.scene.objects.active = blender_object
+        bpy.ops.object.game_property_new(type=property_type, name=name)
+        game_property = blender_object.game.properties[name]
+        game_property.value = value
+        return game_property
+
+    def add_sensor(self, blender_object, sensor_type, name):
+        bpy.context.scene.objects.active = blender_object
+        bpy.ops.logic.sensor_add(
+            type=sensor_type, object=blender_object.name, name=name)
+        blender_object.game.sensors[-1].name = name
+        return blender_object.game.sensors[name]
+
+    def add_controller(self, blender_object, controller_type, name):
+        bpy.context.scene.objects.active = blender_object
+        bpy.ops.logic.controller_add(
+            type=controller_type, object=blender_object.name, name=name)
+        blender_object.game.controllers[-1].name = name
+        return blender_object.game.controllers[name]
+
+    def add_actuator(self, blender_object, actuator_type, name):
+        bpy.context.scene.objects.active = blender_object
+        bpy.ops.logic.actuator_add(
+            type=actuator_type, object=blender_object.name, name=name)
+        blender_object.game.actuators[-1].name = name
+        return blender_object.game.actuators[name]
+
+
+class DataBackend(BlenderBackend):
+    """Backend which constructs objects directly in bpy.data and never
+    changes the active object
+
+    Objects and their camera and lamp data are created with the new methods
+    of bpy.data and linked to the scene without any operator. The Python API
+    of Blender 2.76 has no constructors for game properties or logic bricks,
+    so these are still added by operators, but the object to modify is named
+    in each call (or given in an overriding context, for game properties)
+    rather than selected first.
+
+    Only the creation of empties, cameras, lamps, and objects sharing mesh
+    data differs from OperatorBackend. Game properties, logic bricks, and
+    the content of objects (such as text) still cost an operator call each,
+    and these make up most of the operator calls of a typical project. As
+    this backend has not been measured to blend projects faster, it is not
+    the default."""
+
+    def clear_scene(self, keep=()):
+        scene = bpy.context.scene
+        for blender_object in list(scene.objects):
+            if blender_object.name in keep:
+                continue
+            scene.objects.unlink(blender_object)
+            bpy.data.objects.remove(blender_object)
+
+    @staticmethod
+    def _link_object(name, object_data, layers=None, location=None,
+                     rotation=None):
+        blender_object = bpy.data.objects.new(name, object_data)
+        if location is not None:
+            blender_object.location = location
+        if rotation is not None:
+            blender_object.rotation_euler = rotation
+        if layers is not None:
+            blender_object.layers = layers
+        bpy.context.scene.objects.link(blender_object)
+        return blender_object
+
+    def add_empty(self, name, layers, location=None, rotation=None):
+        return self._link_object(
+            name, None, layers=layers, location=location, rotation=rotation)
+
+    def add_camera(self, name, rotation=None):
+        return self._link_object(
+            name, bpy.data.cameras.new(name), rotation=rotation)
+
+    def add_lamp(self, name, lamp_type, rotation=None):
+        return self._link_object(
+            name, bpy.data.lamps.new(name, lamp_type), rotation=rotation)
+
+    def add_mesh_object(self, name, mesh):
+        return self._link_object(name, mesh)
+
+    def add_game_property(self, blender_object, property_type, name, value):
+        bpy.ops.object.game_property_new(
+            {"object": blender_object}, type=property_type, name=name)
+        game_property = blender_object.game.properties[name]
+        game_property.value = value
+        return game_property
+
+    def add_sensor(self, blender_object, sensor_type, name):
+        bpy.ops.logic.sensor_add(
+            type=sensor_type, object=blender_object.name, name=name)
+        blender_object.game.sensors[-1].name = name
+        return blender_object.game.sensors[name]
+
+    def add_controller(self, blender_object, controller_type, name):
+        bpy.ops.logic.controller_add(
+            type=controller_type, object=blender_object.name, name=name)
+        blender_object.game.controllers[-1].name = name
+        return blender_object.game.controllers[name]
+
+    def add_actuator(self, blender_object, actuator_type, name):
+        bpy.ops.logic.actuator_add(
+            type=actuator_type, object=blender_object.name, name=name)
+        blender_object.game.actuators[-1].name = name
+        return blender_object.game.actuators[name]
+
+
+_backend = OperatorBackend()
+
+
+def get_backend():
+    """Return the backend through which Blender objects are constructed"""
+    return _backend
+
+
+def set_backend(backend):
+    """Construct Blender objects through backend from now on
+
+    :param BlenderBackend backend: The new backend
+    :returns: The previous backend"""
+    global _backend
+    previous = _backend
+    _backend = backend
+    return previous
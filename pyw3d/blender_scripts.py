@@ -47,6 +47,182 @@ def look(cont):
         cont.activate(actuator_y)
         bge.render.setMousePosition(*center)"""
 
+RUNTIME_SCRIPT = """
+import bge
+import mathutils
+from time import monotonic
+
+# Handles to game objects shared by all generated logic, so that each object
+# is looked up by name once rather than on every tick. A handle is looked up
+# again once the object it refers to has been removed from the scene, and all
+# handles are discarded when the scene is restarted.
+_handles = {}
+_handle_scene = [None]
+
+
+def get_object(scene, name):
+    if _handle_scene[0] is not scene:
+        _handles.clear()
+        _handle_scene[0] = scene
+    game_object = _handles.get(name)
+    if game_object is None or game_object.invalid:
+        game_object = _handles[name] = scene.objects[name]
+    return game_object
+
+
+# Triggers detected by a shared detector, such as the region or look index,
+# sleep while they cannot be activated: while they are disabled or running
+# their actions. Detectors only test triggers which are awake. Generated
+# logic calls wake_trigger whenever it changes the 'enabled' or 'status'
+# property of a trigger, which wakes or parks the trigger. The number of
+# awake triggers of each detector is kept in a property of the detector's
+# object, whose sensor stops pulsing while all of its triggers sleep.
+# Triggers are registered as (awake trigger names, detector name, property
+# name) by trigger name.
+_sleepers = {}
+_sleeper_scene = [None]
+
+
+def _check_sleeper_scene():
+    scene = bge.logic.getCurrentScene()
+    if _sleeper_scene[0] is not scene:
+        _sleepers.clear()
+        _sleeper_scene[0] = scene
+    return scene
+
+
+def awake_triggers(detector, property_name, trigger_names):
+    scene = _check_sleeper_scene()
+    try:
+        return _sleepers[trigger_names[0]][0]
+    except (IndexError, KeyError):
+        pass
+    awake = set()
+    for name in trigger_names:
+        trigger = get_object(scene, name)
+        if trigger['enabled'] and trigger['status'] == 'Stop':
+            awake.add(name)
+        _sleepers[name] = (awake, detector.name, property_name)
+    detector[property_name] = len(awake)
+    return awake
+
+
+def wake_trigger(trigger):
+    scene = _check_sleeper_scene()
+    try:
+        awake, detector_name, property_name = _sleepers[trigger.name]
+    except KeyError:
+        # Detector has not yet registered its triggers and will read their
+        # state when it does
+        return
+    if trigger['enabled'] and trigger['status'] == 'Stop':
+        awake.add(trigger.name)
+    else:
+        awake.discard(trigger.name)
+    get_object(scene, detector_name)[property_name] = len(awake)
+
+# Continuous changes of position, rotation, color, and scale, registered by
+# the actions of each activator when they start and advanced together once
+# per tick by advance_transitions. Each activator's transitions are packed as
+# [key, object name, game object, attribute, change, fraction applied, start
+# time, duration] and only advance while the activator's status is
+# 'Continue'.
+#
+# If start time is None, change is a velocity added on every tick. Otherwise
+# the fraction of the total change to have been applied is the activator's
+# time since start time as a fraction of duration, so that dropped or late
+# ticks do not make objects overshoot or undershoot. Only the part of the
+# change not yet applied is added on each tick, so that the changes of
+# overlapping transitions, and any other changes made to the object, add
+# together.
+_transitions = {}
+_transition_scene = [None]
+
+
+def _check_transition_scene():
+    scene = bge.logic.getCurrentScene()
+    if _transition_scene[0] is not scene:
+        _transitions.clear()
+        _transition_scene[0] = scene
+    return scene
+
+
+def _activator_time(owner):
+    # Time as computed by the activator, which may not yet have resumed from
+    # a pause on this tick
+    if owner['offset_time'] != 0:
+        return owner['offset_time']
+    return monotonic() - owner['start_time']
+
+
+def _interpolate(transition, fraction):
+    game_object, attribute, change, applied = transition[2:6]
+    step = fraction - applied
+    if not step:
+        return
+    transition[5] = fraction
+    if attribute == 'rotation':
+        angle = change.length
+        if angle:
+            game_object.orientation = mathutils.Matrix.Rotation(
+                angle*step, 3, change.normalized())*game_object.orientation
+    else:
+        # Vectors of game objects write changes made in place back to the
+        # object
+        value = getattr(game_object, attribute)
+        value += change*step
+
+
+def start_transition(
+        owner, key, game_object, attribute, change, start_time=None,
+        duration=None):
+    _check_transition_scene()
+    _transitions.setdefault(owner.name, []).append([
+        key, game_object.name, game_object, attribute,
+        mathutils.Vector(change), 0., start_time, duration])
+
+
+def end_transition(owner, key, game_object, attribute):
+    transitions = _transitions.get(owner.name, ())
+    for index, transition in enumerate(transitions):
+        if (transition[0] == key and transition[1] == game_object.name and
+                transition[3] == attribute):
+            if transition[6] is not None:
+                _interpolate(transition, 1)
+            del transitions[index]
+            return
+
+
+def clear_transitions(owner):
+    _transitions.pop(owner.name, None)
+
+
+def advance_transitions(cont):
+    scene = _check_transition_scene()
+    for owner_name, transitions in _transitions.items():
+        if not transitions:
+            continue
+        owner = get_object(scene, owner_name)
+        if owner['status'] != 'Continue':
+            continue
+        time = None
+        for transition in transitions:
+            game_object, attribute, change, applied, start_time, duration = (
+                transition[2:])
+            if start_time is not None:
+                if time is None:
+                    time = _activator_time(owner)
+                _interpolate(transition, max(0., min(
+                    1., (time - start_time)/duration)))
+            elif attribute == 'rotation':
+                game_object.applyRotation(change)
+            else:
+                # Vectors of game objects write changes made in place back
+                # to the object
+                value = getattr(game_object, attribute)
+                value += change
+"""
+
 MOVE_TOGGLE_SCRIPT = """
 import bge
 import mathutils
@@ -56,3 +232,145 @@ def move_toggle(cont):
         cont.owner["toggle_movement"] = not cont.owner["toggle_movement"]
         bge.render.showMouse(not cont.owner["toggle_movement"])
 """
+
+PROFILER_SCRIPT = """
+import atexit
+import json
+from collections import deque
+from time import perf_counter
+import bge
+try:
+    import bgl
+    import blf
+except ImportError:
+    blf = None
+
+# Number of recent ticks whose logic time is shown by the overlay and saved
+# with the profile
+HISTORY = 300
+# Number of controller entry points listed by the overlay
+OVERLAY_ROWS = 8
+# Number of ticks between updates of the overlay text
+OVERLAY_INTERVAL = 30
+
+# Calls and total and worst time in seconds of each controller entry point
+# since the game started, by name
+_totals = {}
+# Time spent in each controller entry point on the current tick, by name
+_tick_times = {}
+# (Total time, time by name) of each recent tick
+_history = deque(maxlen=HISTORY)
+# Ticks run and ticks whose logic took longer than one tick
+_ticks = [0, 0]
+_overlay_lines = []
+_started = [False]
+
+
+def profiled(name, function):
+    # The BGE passes the controller only to functions which take one
+    # argument, so the wrapper must take the same number of arguments
+    totals = _totals.setdefault(name, [0, 0., 0.])
+
+    def record(start):
+        elapsed = perf_counter() - start
+        totals[0] += 1
+        totals[1] += elapsed
+        if elapsed > totals[2]:
+            totals[2] = elapsed
+        _tick_times[name] = _tick_times.get(name, 0.) + elapsed
+
+    if function.__code__.co_argcount:
+        def wrapper(cont):
+            start = perf_counter()
+            try:
+                return function(cont)
+            finally:
+                record(start)
+    else:
+        def wrapper():
+            start = perf_counter()
+            try:
+                return function()
+            finally:
+                record(start)
+    return wrapper
+
+
+def budget():
+    return 1./bge.logic.getLogicTicRate()
+
+
+def _update_overlay():
+    if not _history:
+        return
+    recent = {}
+    for total, times in _history:
+        for name, seconds in times.items():
+            recent[name] = recent.get(name, 0.) + seconds
+    totals = [total for total, times in _history]
+    lines = [
+        'logic {:.2f} ms/tick, worst {:.2f} ms, {} of {} ticks over '
+        '{:.1f} ms'.format(
+            1e3*sum(totals)/len(totals), 1e3*max(totals), _ticks[1],
+            _ticks[0], 1e3*budget())]
+    for name in sorted(recent, key=recent.get, reverse=True)[:OVERLAY_ROWS]:
+        lines.append('{:8.3f} ms/tick  {}'.format(
+            1e3*recent[name]/len(_history), name))
+    _overlay_lines[:] = lines
+
+
+def draw_overlay():
+    width = bge.render.getWindowWidth()
+    height = bge.render.getWindowHeight()
+    bgl.glMatrixMode(bgl.GL_PROJECTION)
+    bgl.glLoadIdentity()
+    bgl.gluOrtho2D(0, width, 0, height)
+    bgl.glMatrixMode(bgl.GL_MODELVIEW)
+    bgl.glLoadIdentity()
+    blf.size(0, 12, 72)
+    for row, line in enumerate(_overlay_lines):
+        blf.position(0, 10, height - 20*(row + 1), 0)
+        blf.draw(0, line)
+
+
+def end_tick(cont):
+    if not _started[0]:
+        _started[0] = True
+        atexit.register(dump_profile)
+        if blf is not None:
+            bge.logic.getCurrentScene().post_draw.append(draw_overlay)
+    total = sum(_tick_times.values())
+    _history.append((total, dict(_tick_times)))
+    _tick_times.clear()
+    _ticks[0] += 1
+    if total > budget():
+        _ticks[1] += 1
+    if _ticks[0] % OVERLAY_INTERVAL == 0:
+        _update_overlay()
+
+
+def dump_profile(path='//w3d_profile'):
+    path = bge.logic.expandPath(path)
+    controllers = [
+        {
+            'name': name,
+            'calls': calls,
+            'total_ms': 1e3*seconds,
+            'mean_ms': 1e3*seconds/max(calls, 1),
+            'worst_ms': 1e3*worst
+        } for name, (calls, seconds, worst) in sorted(
+            _totals.items(), key=lambda item: -item[1][1])]
+    with open('{}.json'.format(path), 'w') as profile_file:
+        json.dump({
+            'tic_rate': bge.logic.getLogicTicRate(),
+            'ticks': _ticks[0],
+            'ticks_over_budget': _ticks[1],
+            'controllers': controllers,
+            'recent_ticks_ms': [1e3*total for total, times in _history]
+        }, profile_file, indent=2)
+    with open('{}.csv'.format(path), 'w') as profile_file:
+        profile_file.write('name,calls,total_ms,mean_ms,worst_ms\\n')
+        for controller in controllers:
+            profile_file.write('{name},{calls},{total_ms:.6f},{mean_ms:.6f},'
+                               '{worst_ms:.6f}\\n'.format(**controller))
+"""
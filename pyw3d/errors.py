@@ -56,3 +56,38 @@ class EBKAC(Exception):
     """
     def __init__(self, message):
         super(EBKAC, self).__init__(message)
+
+
+class ValidationError(InvalidArgument):
+    """Exception thrown when deferred validation of a W3D feature finds one
+    or more invalid values
+
+    :ivar list errors: List of (path, message) tuples, where path is a tuple
+    of keys and indices locating each invalid value within the validated
+    feature"""
+    def __init__(self, errors):
+        self.errors = errors
+        message = "{} invalid value(s) found:\n{}".format(
+            len(errors), "\n".join(
+                "{}: {}".format(
+                    "/".join(str(step) for step in path), error_message)
+                for path, error_message in errors))
+        super(ValidationError, self).__init__(message)
+
+
+class ExportError(Exception):
+    """Exception thrown when an export worker fails to export a project
+
+    This may be raised either because the worker process could not be
+    started or stopped responding, or because exporting the project raised
+    an error in the worker, in which case the message includes the
+    traceback from the worker."""
+    def __init__(self, message):
+        super(ExportError, self).__init__(message)
+
+
+class BadW3DBinary(Exception):
+    """Exception thrown for attempting to load a malformed W3D binary project
+    file, or to save a project containing values the format cannot store"""
+    def __init__(self, message):
+        super(BadW3DBinary, self).__init__(message)
@@ -0,0 +1,140 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Manifest of the features blended into a scene, for incremental export
+
+Every export saves an :py:class:`ExportManifest` in a text block of the
+.blend file. It holds a content hash of each object, timeline, and trigger,
+and one of all other settings of the project. An incremental export (see
+:py:meth:`W3DProject.blend`) compares its own manifest with the one in the
+scene. The Blender objects, logic bricks, and scripts of objects, timelines,
+and triggers whose hash is unchanged are kept. Everything else is deleted and
+blended again. That includes the camera, the controls, group definitions, and
+the indices of position and look triggers, all of which are cheap to rebuild
+and may depend on every feature of the project.
+
+If the project settings have changed, or the previous export was profiled,
+nothing is kept.
+"""
+import json
+import warnings
+from .names import generate_blender_object_name, \
+    generate_blender_timeline_name, generate_trigger_name, generate_link_name
+try:
+    import bpy
+except ImportError:
+    warnings.warn(
+        "Module bpy not found. Loading pyw3d.export_manifest as standalone")
+
+MANIFEST_TEXT = "w3d_manifest.json"
+MANIFEST_VERSION = 1
+FEATURE_LISTS = ("objects", "timelines", "trigger_events")
+"""Lists of project features whose Blender datablocks may be kept"""
+
+
+def datablock_names(list_name, feature):
+    """Return (names of Blender objects, names of text blocks) created for
+    feature and not shared with any other feature
+
+    :param str list_name: The list of the project containing feature, one of
+    FEATURE_LISTS
+    :param W3DFeature feature: The object, timeline, or trigger"""
+    if list_name == "objects":
+        object_name = generate_blender_object_name(feature["name"])
+        if feature["link"] is None:
+            return [object_name], []
+        link_name = generate_link_name(object_name)
+        return [object_name, link_name], ["{}.py".format(link_name)]
+    if list_name == "timelines":
+        name = generate_blender_timeline_name(feature["name"])
+    else:
+        name = generate_trigger_name(feature["name"])
+    return [name], ["{}.py".format(name)]
+
+
+class ExportManifest(object):
+    """Content hashes of the features of an exported project
+
+    :param str project_hash: Hash of all options of the project other than
+    its objects, timelines, triggers, and groups
+    :param bool profile: Was the export instrumented by the profiler?
+    :param dict hashes: Dictionary mapping each of FEATURE_LISTS to a
+    dictionary mapping names of features to their content hashes"""
+
+    def __init__(self, project_hash, profile, hashes):
+        self.project_hash = project_hash
+        self.profile = profile
+        self.hashes = hashes
+
+    @classmethod
+    def from_project(cls, project, profile=False):
+        """Return manifest of project as it is about to be blended
+
+        Groups only define names used by scripts at runtime, and group
+        definitions are always rewritten, so that groups do not enter the
+        manifest."""
+        return cls(
+            project.content_hash(exclude=FEATURE_LISTS + ("groups",)),
+            profile, {
+                list_name: {
+                    feature["name"]: feature.content_hash()
+                    for feature in project[list_name]}
+                for list_name in FEATURE_LISTS})
+
+    @classmethod
+    def read(cls):
+        """Return the manifest saved in the current scene, or None if there
+        is none or it was written by another version of pyw3d"""
+        text = bpy.data.texts.get(MANIFEST_TEXT)
+        if text is None:
+            return None
+        try:
+            data = json.loads(text.as_string())
+        except ValueError:
+            return None
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        return cls(data["project"], data["profile"], data["hashes"])
+
+    def write(self):
+        """Save manifest in the current scene, replacing any earlier one"""
+        text = bpy.data.texts.get(MANIFEST_TEXT)
+        if text is None:
+            text = bpy.data.texts.new(MANIFEST_TEXT)
+        text.clear()
+        text.write(json.dumps({
+            "version": MANIFEST_VERSION,
+            "project": self.project_hash,
+            "profile": self.profile,
+            "hashes": self.hashes}, sort_keys=True))
+        return text
+
+    def unchanged(self, previous):
+        """Return dictionary mapping each of FEATURE_LISTS to the set of
+        names of features with the same hash as in previous
+
+        :param ExportManifest previous: Manifest of the scene being
+        updated, or None if there is none"""
+        if (previous is None or self.profile or previous.profile or
+                previous.project_hash != self.project_hash):
+            return {list_name: set() for list_name in FEATURE_LISTS}
+        return {
+            list_name: set(
+                name for name, content_hash in hashes.items()
+                if previous.hashes.get(list_name, {}).get(name) ==
+                content_hash)
+            for list_name, hashes in self.hashes.items()}
@@ -0,0 +1,314 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""A long-lived Blender process which exports W3D projects to .blend files
+
+Starting Blender and importing pyw3d takes several seconds, which used to be
+paid for every export made from outside of Blender. An
+:py:class:`ExportWorker` instead starts Blender once, running this script,
+and sends it each project to be exported over a local socket. The worker
+returns Blender to the state of a fresh start before each export, so that
+every export produces the same .blend file as it would in a new process.
+
+Requests and responses are pickled tuples sent through
+multiprocessing.connection, authenticated with a key which the client passes
+to the worker in its environment. A request is either::
+
+    ("export", project in W3D binary format, .blend path, working directory,
+     profile, incremental)
+
+which is answered with ("done", .blend path) or ("error", traceback), or
+("quit",), which stops the worker. The worker also stops when the client
+closes the connection. An incremental export to the file which the worker
+saved last updates the scene of that export (see
+:py:mod:`pyw3d.export_manifest`) instead of resetting Blender.
+
+Passing headless=True to :py:class:`ExportWorker` runs the worker with the
+headless stand-ins for Blender in the current Python interpreter, for testing
+without Blender.
+
+To start a worker by hand, use the following command:
+blender --background --python export_worker.py -- --address-file FILE
+"""
+
+import os
+import sys
+import time
+import atexit
+import shutil
+import binascii
+import argparse
+import tempfile
+import warnings
+import traceback
+import subprocess
+from multiprocessing.connection import Listener, Client
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+    from pyw3d import BLENDER_EXEC
+    from pyw3d import binary_format
+    from pyw3d.errors import ExportError
+try:
+    import bpy
+except ImportError:
+    warnings.warn(
+        "Module bpy not found. Loading pyw3d.export_worker as standalone")
+
+WORKER_SCRIPT = os.path.abspath(__file__)
+AUTHKEY_VARIABLE = "W3D_EXPORT_WORKER_KEY"
+
+
+def reset_scene():
+    """Return Blender to the state in which it starts, discarding all objects
+    and datablocks of the previous export"""
+    bpy.ops.wm.read_homefile()
+
+
+def export_project(
+        serialized_project, filename, directory, profile, incremental=False):
+    """Export serialized project to .blend file
+
+    :param bytes serialized_project: The W3DProject in W3D binary format (see
+    :py:mod:`pyw3d.binary_format`)
+    :param str filename: Absolute path of .blend file to export to
+    :param str directory: Working directory of the client, against which
+    relative paths in the project are resolved
+    :param bool profile: Passed to :py:meth:`W3DProject.blend`
+    :param bool incremental: Update the scene as it was left by the previous
+    export, rather than a fresh scene
+    :returns: filename"""
+    os.chdir(directory)
+    # Projects are validated by the client before they are sent
+    input_project = binary_format.loads(
+        serialized_project, lazy=False, trusted=True)
+    if not incremental:
+        reset_scene()
+    input_project.blend(profile=profile, incremental=incremental)
+    if os.path.exists(filename):
+        os.remove(filename)
+    bpy.ops.wm.save_as_mainfile(filepath=filename)
+    return filename
+
+
+def serve(connection):
+    """Answer export requests from connection until the client quits or
+    closes it"""
+    saved_filename = None
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            return
+        if request[0] == "quit":
+            return
+        serialized_project, filename, directory, profile, incremental = (
+            request[1:])
+        try:
+            response = ("done", export_project(
+                serialized_project, filename, directory, profile,
+                incremental=incremental and filename == saved_filename))
+            saved_filename = filename
+        except Exception:
+            response = ("error", traceback.format_exc())
+            saved_filename = None
+        connection.send(response)
+
+
+class ExportWorker(object):
+    """A worker process which keeps Blender and pyw3d loaded between exports
+
+    The process is started by :py:meth:`start` or by the first export, and
+    is restarted by the next export if it dies. It runs until
+    :py:meth:`stop` is called, or until the worker is used as a context
+    manager and the context is left.
+
+    :param bool headless: Run the worker in this Python interpreter with the
+    headless stand-ins for Blender, rather than in Blender. The .blend files
+    it saves are the plain-text summaries written by the stand-ins.
+    :param float timeout: Seconds to wait for the worker to start or stop"""
+
+    def __init__(self, headless=False, timeout=60):
+        self.headless = headless
+        self.timeout = timeout
+        self.process = None
+        self.connection = None
+
+    def command(self, address_file):
+        """Return command which starts the worker, writing the address at
+        which it listens to address_file"""
+        worker_args = ["--address-file", address_file]
+        if self.headless:
+            return [sys.executable, WORKER_SCRIPT, "--headless"] + worker_args
+        return [
+            BLENDER_EXEC, "--background", "--python", WORKER_SCRIPT,
+            "--"] + worker_args
+
+    @property
+    def running(self):
+        """True if the worker process has been started and not exited"""
+        return self.process is not None and self.process.poll() is None
+
+    def _wait_for_address(self, address_file):
+        deadline = time.time() + self.timeout
+        while not os.path.exists(address_file):
+            if self.process.poll() is not None:
+                raise ExportError(
+                    "Export worker exited with status {} before it"
+                    " started".format(self.process.returncode))
+            if time.time() > deadline:
+                self.process.kill()
+                raise ExportError(
+                    "Export worker did not start within {} s".format(
+                        self.timeout))
+            time.sleep(0.05)
+        with open(address_file) as address:
+            host, port = address.read().split()
+        return (host, int(port))
+
+    def start(self):
+        """Start the worker process if it is not running"""
+        if self.running:
+            return
+        self.stop()
+        authkey = os.urandom(32)
+        env = dict(os.environ)
+        env[AUTHKEY_VARIABLE] = binascii.hexlify(authkey).decode("ascii")
+        if self.headless:
+            env["PYTHONPATH"] = os.pathsep.join(
+                path for path in (
+                    os.path.dirname(os.path.dirname(WORKER_SCRIPT)),
+                    env.get("PYTHONPATH")) if path)
+        directory = tempfile.mkdtemp()
+        try:
+            self.process = subprocess.Popen(
+                self.command(os.path.join(directory, "address")), env=env)
+            address = self._wait_for_address(
+                os.path.join(directory, "address"))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        try:
+            self.connection = Client(address, authkey=authkey)
+        except OSError as error:
+            self.stop()
+            raise ExportError(
+                "Could not connect to export worker: {}".format(error))
+
+    def export(
+            self, input_project, filename="run.blend", profile=False,
+            incremental=False):
+        """Export project to .blend file
+
+        :param W3DProject input_project: The project to export
+        :param str filename: Name of .blend file to export to
+        :param bool profile: Passed to :py:meth:`W3DProject.blend`
+        :param bool incremental: If the last export of the worker was to the
+        same file, only rebuild the features which have changed since
+        :returns: Absolute path of the .blend file
+        :raises ExportError: If the worker fails to export the project"""
+        self.start()
+        request = (
+            "export", binary_format.dumps(input_project),
+            os.path.abspath(filename),
+            os.getcwd(), profile, incremental)
+        try:
+            self.connection.send(request)
+            status, result = self.connection.recv()
+        except (EOFError, OSError) as error:
+            self.stop()
+            raise ExportError(
+                "Export worker stopped responding: {}".format(error))
+        if status == "error":
+            raise ExportError("Export failed in worker:\n{}".format(result))
+        return result
+
+    def stop(self):
+        """Stop the worker process, if it was started"""
+        if self.connection is not None:
+            try:
+                self.connection.send(("quit",))
+            except (OSError, ValueError):
+                pass
+            self.connection.close()
+            self.connection = None
+        if self.process is not None:
+            try:
+                self.process.wait(self.timeout)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.stop()
+
+
+_export_worker = None
+
+
+def get_export_worker():
+    """Return the worker shared by all exports from this process, which is
+    stopped when the process exits"""
+    global _export_worker
+    if _export_worker is None:
+        _export_worker = ExportWorker()
+        atexit.register(_export_worker.stop)
+    return _export_worker
+
+
+def main(argv):
+    """Serve exports to the client which started this worker"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--address-file", required=True,
+        help="file to write the address of the worker to")
+    parser.add_argument(
+        "--headless", default=False, action="store_true",
+        help="use the headless stand-ins for Blender")
+    args = parser.parse_args(argv)
+
+    if args.headless:
+        global bpy
+        from pyw3d import headless
+        headless.install()
+        from pyw3d.headless import bpy
+    authkey = binascii.unhexlify(os.environ[AUTHKEY_VARIABLE])
+    listener = Listener(("localhost", 0), authkey=authkey)
+    try:
+        partial_file = "{}.partial".format(args.address_file)
+        with open(partial_file, "w") as address:
+            address.write("{} {}".format(*listener.address))
+        os.replace(partial_file, args.address_file)
+        connection = listener.accept()
+    finally:
+        listener.close()
+    try:
+        serve(connection)
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    argv = sys.argv
+    if "--" in argv:
+        argv = argv[argv.index("--") + 1:]
+    else:
+        argv = argv[1:]
+    main(argv)
@@ -23,7 +23,28 @@ may appear in such a project. This may be as sophisticated as a "Timeline" or
 as simple as a "Placement" for an object (since Placement features define
 position, and potentially multiple kinds of rotation).
 """
-from .errors import InvalidArgument
+import hashlib
+from collections.abc import Sequence
+from contextlib import contextmanager
+from .errors import InvalidArgument, ValidationError, EBKAC
+from .validators import FeatureValidator, ListValidator, DictValidator
+
+
+class _SortedOptions(object):
+    """Default ui_order of feature classes which do not define one: the
+    sorted names of their options
+
+    The list is computed once per class and rebuilt only if the class's
+    argument_validators is replaced."""
+
+    def __get__(self, instance, owner):
+        cached = owner.__dict__.get("_sorted_options")
+        if cached is None or cached[0] is not owner.argument_validators:
+            cached = (
+                owner.argument_validators,
+                sorted(owner.argument_validators.keys()))
+            owner._sorted_options = cached
+        return cached[1]
 
 
 class W3DFeature(dict):
@@ -41,39 +62,122 @@ class W3DFeature(dict):
 
     :cvar blender_scaling: Scaling factor used to convert back and forth
         between Blender and legacy units
+
+    :cvar ui_order: Names of options in the order in which they are presented
+        for editing, by default sorted by name
     """
 
+    # Features hold their options in the dict itself. Subclasses which set
+    # no other attributes on their instances declare empty __slots__ too, so
+    # that those instances carry no attribute dictionary.
+    __slots__ = ()
+
     argument_validators = {}
     default_arguments = {}
     blender_scaling = 1
+    ui_order = _SortedOptions()
+    _deferral_depth = 0
+    _rename_count = 0
+    _shared_features = {}
 
     def __init__(self, *args, **kwargs):
         super(W3DFeature, self).__init__()
         self.update(args)
         self.update(kwargs.items())
-        try:
-            self.ui_order
-        except AttributeError:
-            self.ui_order = sorted(self.argument_validators.keys())
 
     def __setitem__(self, key, value):
-        if key not in self.argument_validators:
-            raise InvalidArgument(
-                "{} not a valid option for this W3D feature".format(key))
-        if not self.argument_validators[key](value):
+        if id(self) in W3DFeature._shared_features:
+            raise EBKAC(
+                "Cannot modify a shared default {}; set a new feature in its"
+                " place".format(type(self).__name__))
+        try:
+            check = type(self).__dict__["_validator_plan"][key]
+        except KeyError:
+            check = type(self)._compile_validator(key)
+        if key == "name" and key in self:
+            # Allows indices of feature names to detect that they are stale
+            W3DFeature._rename_count += 1
+        if W3DFeature._deferral_depth:
+            super(W3DFeature, self).__setitem__(key, value)
+            return
+        if not check(value):
             try:
                 value = self.argument_validators[key].coerce(value)
             except:
                 raise InvalidArgument(
                     "{} is not a valid value for option {}".format(value, key))
-        if not self.argument_validators[key](value):
+        if not check(value):
             raise InvalidArgument(
                 "{} is not a valid value for option {}".format(value, key))
         super(W3DFeature, self).__setitem__(key, value)
 
+    @classmethod
+    def _compile_validator(feature_class, key):
+        """Compile validator for given option and add it to this class's
+        validator plan
+
+        The validator plan maps option names to the compiled form of the
+        corresponding validators in argument_validators (see
+        Validator.compile) and is built up lazily, one option at a time.
+        Alongside it, the nesting plan maps each option to the function which
+        validates any features held by its value, or to None if its
+        validator cannot hold features. Each class keeps its own plans, so
+        argument_validators should not be modified after instances of the
+        class have been created.
+
+        :raises InvalidArgument: if key is not a valid option for this class
+        """
+        if key not in feature_class.argument_validators:
+            raise InvalidArgument(
+                "{} not a valid option for this W3D feature".format(key))
+        if feature_class.__dict__.get(
+                "_validator_plan_source") is not \
+                feature_class.argument_validators:
+            feature_class._validator_plan = {}
+            feature_class._nesting_plan = {}
+            feature_class._validator_plan_source = \
+                feature_class.argument_validators
+        validator = feature_class.argument_validators[key]
+        check = validator.compile()
+        feature_class._validator_plan[key] = check
+        feature_class._nesting_plan[key] = _nested_validation(validator)
+        return check
+
     def __missing__(self, key):
         return self.default_arguments[key]
 
+    def __reduce_ex__(self, protocol):
+        try:
+            # Shared features are pickled and copied by reference
+            return (getattr, W3DFeature._shared_features[id(self)])
+        except KeyError:
+            return super(W3DFeature, self).__reduce_ex__(protocol)
+
+    def peek(self, key):
+        """Return value of option as self[key] does, but without taking a
+        private copy of a shared default value (see :py:meth:`share`)
+
+        Use this where the value will only be read."""
+        return self[key]
+
+    def share(self, owner_class, attribute):
+        """Make this feature immutable and store it as a class attribute
+        of owner_class, so that instances of owner_class may share it as
+        the default value of an option
+
+        Setting any option of a shared feature raises EBKAC. Classes which
+        store a shared feature should give each instance its own copy
+        when the option is accessed through __getitem__, since the caller
+        may modify it, and return the shared feature itself from
+        :py:meth:`peek`. A shared feature is pickled and copied by
+        reference to owner_class, so that it remains shared.
+
+        :returns: This feature
+        """
+        W3DFeature._shared_features[id(self)] = (owner_class, attribute)
+        setattr(owner_class, attribute, self)
+        return self
+
     def __eq__(self, other):
         # TODO: Not sure if this is best OOP
         if type(self) != type(other):
@@ -82,7 +186,7 @@ class W3DFeature(dict):
         all_keys.update(other.keys())
         for key in all_keys:
             try:
-                if self[key] != other[key]:
+                if self.peek(key) != other.peek(key):
                     return False
             except KeyError:
                 return False
@@ -92,6 +196,73 @@ class W3DFeature(dict):
         for key, value in other:
             self.__setitem__(key, value)
 
+    @staticmethod
+    @contextmanager
+    def deferred_validation():
+        """Context manager within which values assigned to any W3DFeature are
+        stored without validation or coercion
+
+        Only option names are checked. This allows trusted input (e.g. XML
+        written by Writing3D or features generated by a script) to be loaded
+        quickly. Call validate on the resulting features to check and coerce
+        all values in a single pass.
+        """
+        W3DFeature._deferral_depth += 1
+        try:
+            yield
+        finally:
+            W3DFeature._deferral_depth -= 1
+
+    def validate(self):
+        """Validate and coerce all values of this feature and of any features
+        contained within it
+
+        :raises ValidationError: if any value is invalid. All invalid values
+        are reported together.
+        """
+        errors = []
+        self._collect_validation_errors((), errors)
+        if errors:
+            raise ValidationError(errors)
+
+    def _collect_validation_errors(self, path, errors):
+        """Validate and coerce values, appending (path, message) tuples to
+        errors for any that are invalid"""
+        feature_class = type(self)
+        validator_plan = feature_class.__dict__.get("_validator_plan", {})
+        nesting_plan = feature_class.__dict__.get("_nesting_plan", {})
+        # Coerced values replace existing ones, so the size of self does not
+        # change while it is iterated over
+        for key, value in self.items():
+            try:
+                check = validator_plan[key]
+                nested = nesting_plan[key]
+            except KeyError:
+                check = feature_class._compile_validator(key)
+                nested = feature_class._nesting_plan[key]
+                validator_plan = feature_class._validator_plan
+                nesting_plan = feature_class._nesting_plan
+            try:
+                valid = check(value)
+            except (ValueError, TypeError):
+                valid = False
+            if not valid:
+                try:
+                    value = self.argument_validators[key].coerce(value)
+                except:
+                    pass
+                failure = _check_failure(check, value)
+                if failure is None:
+                    super(W3DFeature, self).__setitem__(key, value)
+                else:
+                    errors.append((
+                        path + (key,),
+                        "{} is not a valid value for option {}{}".format(
+                            value, key, failure)))
+                    continue
+            if nested is not None:
+                nested(value, path + (key,), errors)
+
     def toXML(self, parent_root):
         """Store data in W3D XML format within parent_root
 
@@ -119,3 +290,98 @@ class W3DFeature(dict):
         """Return true if value has not been set for key and default exists,
         false otherwise"""
         return (key not in self and key in self.default_arguments)
+
+    def option_items(self):
+        """Return list of (option, value) pairs for every option which has
+        been set, from which an equal feature may be constructed"""
+        return list(self.items())
+
+    def hashable(self, exclude=()):
+        """Return a hashable representation of this feature, which is equal
+        for any two features that compare equal
+
+        Options which have not been set are represented by their defaults.
+
+        :param exclude: Names of options to leave out of the representation
+        """
+        items = []
+        for key in sorted(self.argument_validators):
+            if key in exclude:
+                continue
+            try:
+                value = self.peek(key)
+            except KeyError:
+                continue
+            items.append((key, _hashable(value)))
+        return (type(self), tuple(items))
+
+    def content_hash(self, exclude=()):
+        """Return hex digest of :py:meth:`hashable`, which is the same in any
+        process for features that compare equal
+
+        :param exclude: Names of options to leave out of the hash"""
+        return hashlib.sha1(
+            repr(self.hashable(exclude=exclude)).encode("utf-8")).hexdigest()
+
+
+def _hashable(value):
+    """Return hashable representation of value, which may be a feature or
+    a container of features"""
+    if isinstance(value, W3DFeature):
+        return value.hashable()
+    if isinstance(value, dict):
+        return tuple(sorted(
+            ((key, _hashable(item)) for key, item in value.items()),
+            key=repr))
+    if isinstance(value, Sequence) and not isinstance(value, str):
+        return tuple(_hashable(item) for item in value)
+    return value
+
+
+def _check_failure(check, value):
+    """Return None if value passes check, or else a description of the
+    failure to be appended to the error message
+
+    Validators which convert values, such as IsNumeric, may raise rather
+    than return False for values of the wrong type, so that is also treated
+    as a failure."""
+    try:
+        if check(value):
+            return None
+    except (ValueError, TypeError) as error:
+        return " ({})".format(error)
+    return ""
+
+
+def _nested_validation(validator):
+    """Return function validating the features held by a value which passes
+    validator, called with the value, its path, and the list of errors, or
+    None if no value which passes validator can hold a feature"""
+    if isinstance(validator, FeatureValidator):
+        def validate_feature(value, path, errors):
+            value._collect_validation_errors(path, errors)
+        return validate_feature
+    if isinstance(validator, ListValidator):
+        item_validations = [
+            _nested_validation(base_validator)
+            for base_validator in validator.base_validators]
+        if not any(item_validations):
+            return None
+        num_validations = len(item_validations)
+
+        def validate_items(value, path, errors):
+            for index, item in enumerate(value):
+                validate_item = item_validations[index % num_validations]
+                if validate_item is not None:
+                    validate_item(item, path + (index,), errors)
+        return validate_items
+    if isinstance(validator, DictValidator):
+        validate_value = _nested_validation(validator.value_validator)
+        if validate_value is None:
+            return None
+
+        def validate_values(value, path, errors):
+            for key, item in value.items():
+                validate_value(item, path + (key,), errors)
+        return validate_values
+    return None
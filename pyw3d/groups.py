@@ -92,7 +92,7 @@ class W3DGroup(W3DFeature):
             group["name"] = group_node.attrib["name"]
         except KeyError:
             raise BadW3DXML("Group node has no name attrib")
-        for child in group_node.getchildren():
+        for child in group_node:
             if child.tag == "Objects":
                 try:
                     group["objects"].append(child.attrib["name"])
@@ -0,0 +1,66 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Stand-ins for Blender's bpy, bge, and mathutils modules, for blending
+projects and running their game logic on machines without Blender
+
+Typical use::
+
+    from pyw3d import headless
+    headless.install()
+    project = W3DProject.fromXML_file("story.xml")
+    with headless.simulate(project) as simulation:
+        simulation.run(10)
+        print(simulation.report())
+"""
+import sys
+from . import mathutils
+from . import bpy
+from . import bge
+from .simulation import Simulation
+
+
+def install():
+    """Make the stand-ins importable as bpy, bge, and mathutils
+
+    Modules of pyw3d which were imported before the stand-ins were available
+    are also given the names bpy and mathutils, which they failed to import.
+
+    .. warning:: Do not call this from within Blender, where it would
+    replace the real modules"""
+    for name, module in (("bpy", bpy), ("bge", bge), ("mathutils", mathutils)):
+        sys.modules[name] = module
+    for module_name, module in list(sys.modules.items()):
+        if (module is None or not module_name.startswith("pyw3d.") or
+                module_name.startswith(__name__)):
+            continue
+        for name, stand_in in (("bpy", bpy), ("mathutils", mathutils)):
+            if not hasattr(module, name):
+                setattr(module, name, stand_in)
+
+
+def simulate(project, strict=True, profile=False):
+    """Blend project into fresh headless data and return a
+    :py:class:`Simulation` of its game logic
+
+    :param W3DProject project: The project to simulate
+    :param bool strict: Passed to :py:class:`Simulation`
+    :param bool profile: Passed to :py:meth:`W3DProject.blend`"""
+    install()
+    bpy.read_factory_settings()
+    project.blend(profile=profile)
+    return Simulation(strict=strict)
@@ -0,0 +1,581 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""A stand-in for the Blender Game Engine's bge module
+
+Provides the game objects, cameras, and logic bricks used by the control
+scripts which pyw3d generates. The game loop itself is run by
+:py:class:`pyw3d.headless.Simulation`, which builds a scene from the
+objects recorded by :py:mod:`pyw3d.headless.bpy`.
+"""
+import os
+import math
+from .mathutils import Vector, Matrix, Euler
+
+
+def _invalidating(method_name):
+    """Return version of list method which discards the name index of the
+    list it is called on"""
+    list_method = getattr(list, method_name)
+
+    def invalidating_method(self, *args, **kwargs):
+        self._index = None
+        return list_method(self, *args, **kwargs)
+    invalidating_method.__name__ = method_name
+    return invalidating_method
+
+
+class CListValue(list):
+    """List of game objects or logic bricks which may also be indexed by
+    name
+
+    Names are looked up in an index which is rebuilt after the list is
+    modified, since scripts look objects up by name on every tick."""
+    _index = None
+
+    def _name_index(self):
+        if self._index is None:
+            self._index = {}
+            for item in reversed(self):
+                self._index[item.name] = item
+        return self._index
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._name_index()[key]
+        return super(CListValue, self).__getitem__(key)
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return key in self._name_index()
+        return super(CListValue, self).__contains__(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    __setitem__ = _invalidating("__setitem__")
+    __delitem__ = _invalidating("__delitem__")
+    __iadd__ = _invalidating("__iadd__")
+    append = _invalidating("append")
+    extend = _invalidating("extend")
+    insert = _invalidating("insert")
+    pop = _invalidating("pop")
+    remove = _invalidating("remove")
+    clear = _invalidating("clear")
+
+
+def _live_property(attribute_name):
+    """Return property whose value is modified in place on assignment, so
+    that scripts which alter a fetched vector or matrix alter the object"""
+
+    def getter(self):
+        return getattr(self, attribute_name)
+
+    def setter(self, value):
+        target = getattr(self, attribute_name)
+        for index, component in enumerate(value):
+            target[index] = component
+    return property(getter, setter)
+
+
+class KX_GameObject(object):
+    """A game object
+
+    Game properties are accessed by indexing the object, as in the BGE.
+
+    :param str name: Name of object"""
+
+    def __init__(self, name):
+        self.name = name
+        self._properties = {}
+        self._position = Vector((0., 0., 0.))
+        self._orientation = Matrix.Identity(3)
+        self._scaling = Vector((1., 1., 1.))
+        self._color = Vector((1., 1., 1., 1.))
+        self.visible = True
+        self.invalid = False
+        self.sensors = CListValue()
+        self.controllers = CListValue()
+        self.actuators = CListValue()
+
+    def __repr__(self):
+        return "<{} '{}'>".format(self.__class__.__name__, self.name)
+
+    def __getitem__(self, property_name):
+        return self._properties[property_name]
+
+    def __setitem__(self, property_name, value):
+        self._properties[property_name] = value
+
+    def __delitem__(self, property_name):
+        del self._properties[property_name]
+
+    def __contains__(self, property_name):
+        return property_name in self._properties
+
+    def get(self, property_name, default=None):
+        return self._properties.get(property_name, default)
+
+    def getPropertyNames(self):
+        return list(self._properties.keys())
+
+    position = _live_property("_position")
+    worldPosition = position
+    localPosition = position
+    scaling = _live_property("_scaling")
+    worldScale = scaling
+    localScale = scaling
+    color = _live_property("_color")
+
+    @property
+    def orientation(self):
+        return self._orientation
+
+    @orientation.setter
+    def orientation(self, value):
+        if not isinstance(value, Matrix):
+            value = value.to_matrix()
+        self._orientation = value.to_3x3()
+
+    worldOrientation = orientation
+    localOrientation = orientation
+
+    def setVisible(self, visible, recursive=False):
+        self.visible = bool(visible)
+
+    def applyRotation(self, rotation, local=False):
+        """Rotate object by Euler angles given as a 3-element sequence"""
+        rotation_matrix = Euler(rotation).to_matrix()
+        if local:
+            self._orientation = self._orientation*rotation_matrix
+        else:
+            self._orientation = rotation_matrix*self._orientation
+
+    def applyMovement(self, movement, local=False):
+        movement = Vector(movement)
+        if local:
+            movement = self._orientation*movement
+        for index in range(3):
+            self._position[index] += movement[index]
+
+
+class KX_Camera(KX_GameObject):
+    """A camera object, looking down its local negative z-axis
+
+    :param str name: Name of camera
+    :param float fov: Horizontal field of view in degrees
+    :param float aspect: Ratio of width to height of view
+    :param float near: Near clipping distance
+    :param float far: Far clipping distance"""
+
+    def __init__(self, name, fov=49.1343, aspect=4./3, near=0.1, far=100.):
+        super(KX_Camera, self).__init__(name)
+        self.fov = fov
+        self.aspect = aspect
+        self.near = near
+        self.far = far
+
+    def getCameraToWorld(self):
+        matrix = self._orientation.to_4x4()
+        matrix.translation = self._position
+        return matrix
+
+    def getWorldToCamera(self):
+        return self.getCameraToWorld().inverted()
+
+    camera_to_world = property(getCameraToWorld)
+    world_to_camera = property(getWorldToCamera)
+
+    @property
+    def projection_matrix(self):
+        """Perspective projection to OpenGL clip coordinates, in which a
+        point is inside the frustum if each of x, y, and z lies within
+        [-w, w]"""
+        focal = 1/math.tan(math.radians(self.fov)/2)
+        return Matrix((
+            (focal, 0., 0., 0.),
+            (0., focal*self.aspect, 0., 0.),
+            (0., 0., (self.far + self.near)/(self.near - self.far),
+             2*self.far*self.near/(self.near - self.far)),
+            (0., 0., -1., 0.)))
+
+    def pointInsideFrustum(self, point):
+        """Return True if point lies within view of camera"""
+        relative = self._orientation.transposed()*(
+            Vector(point) - self._position)
+        depth = -relative[2]
+        if depth < self.near or depth > self.far:
+            return False
+        half_width = math.tan(math.radians(self.fov)/2)
+        half_height = half_width/self.aspect
+        return (
+            abs(relative[0]) <= half_width*depth and
+            abs(relative[1]) <= half_height*depth)
+
+
+class SCA_ISensor(object):
+    """A sensor, whose state is determined by the game loop
+
+    :ivar bool positive: Current state of sensor
+    :ivar bool triggered: Whether sensor triggered its controllers on this
+    tick"""
+
+    def __init__(self, name, owner):
+        self.name = name
+        self.owner = owner
+        self.positive = False
+        self.triggered = False
+        self.usePosPulseMode = False
+        self.useNegPulseMode = False
+        self.skippedTicks = 0
+        self.invert = False
+        self.controllers = CListValue()
+        self._ticks_since_pulse = 0
+
+    def __repr__(self):
+        return "<{} '{}'>".format(self.__class__.__name__, self.name)
+
+    def evaluate(self):
+        """Return current state of sensor, before inversion"""
+        return False
+
+    def update(self):
+        """Evaluate sensor and return True if it should trigger its
+        controllers on this tick"""
+        state = bool(self.evaluate()) != self.invert
+        changed = state != self.positive
+        self.positive = state
+        self._ticks_since_pulse += 1
+        pulse = (
+            (state and self.usePosPulseMode) or
+            (not state and self.useNegPulseMode)) and (
+                self._ticks_since_pulse > self.skippedTicks)
+        self.triggered = changed or pulse
+        if self.triggered:
+            self._ticks_since_pulse = 0
+        return self.triggered
+
+
+class SCA_AlwaysSensor(SCA_ISensor):
+    def evaluate(self):
+        return True
+
+
+class SCA_PropertySensor(SCA_ISensor):
+    """Sensor which detects the value of a game property
+
+    :param str mode: One of "PROPEQUAL", "PROPNEQUAL", "PROPINTERVAL",
+    "PROPCHANGED"
+    """
+
+    def __init__(self, name, owner, mode="PROPEQUAL", propName="", value="",
+                 min="", max=""):
+        super(SCA_PropertySensor, self).__init__(name, owner)
+        self.mode = mode
+        self.propName = propName
+        self.value = value
+        self.min = min
+        self.max = max
+        self._previous = owner.get(propName)
+
+    @staticmethod
+    def _matches(property_value, string_value):
+        """Compare property value with value given as string, as the BGE
+        does"""
+        if isinstance(property_value, bool) or isinstance(property_value, str):
+            return str(property_value) == string_value
+        try:
+            return property_value == float(string_value)
+        except (TypeError, ValueError):
+            return False
+
+    def evaluate(self):
+        if self.propName not in self.owner:
+            return False
+        value = self.owner[self.propName]
+        if self.mode == "PROPCHANGED":
+            changed = value != self._previous
+            self._previous = value
+            return changed
+        if self.mode == "PROPEQUAL":
+            return self._matches(value, self.value)
+        if self.mode == "PROPNEQUAL":
+            return not self._matches(value, self.value)
+        if self.mode == "PROPINTERVAL":
+            try:
+                return float(self.min) <= value <= float(self.max)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+
+class SCA_InputSensor(SCA_ISensor):
+    """Keyboard or mouse sensor, whose state is set by the caller of the game
+    loop rather than by a device"""
+
+    def __init__(self, name, owner, event=""):
+        super(SCA_InputSensor, self).__init__(name, owner)
+        self.event = event
+        self.input_state = False
+
+    @property
+    def position(self):
+        """Current mouse position in window"""
+        return list(render.mouse_position)
+
+    def evaluate(self):
+        return self.input_state
+
+
+class SCA_PythonController(object):
+    """A controller which runs a Python module function or script
+
+    :param str mode: "MODULE" or "SCRIPT"
+    :param str module: Module function to call as "module.function"
+    :param str script: Source of script (SCRIPT mode)"""
+
+    def __init__(self, name, owner, mode="SCRIPT", module="", script=""):
+        self.name = name
+        self.owner = owner
+        self.mode = mode
+        self.module = module
+        self.script = script
+        self.sensors = CListValue()
+        self.actuators = CListValue()
+        self.activated = []
+        self.deactivated = []
+
+    def __repr__(self):
+        return "<{} '{}'>".format(self.__class__.__name__, self.name)
+
+    def _actuator(self, actuator):
+        if isinstance(actuator, str):
+            return self.actuators[actuator]
+        return actuator
+
+    def activate(self, actuator):
+        self.activated.append(self._actuator(actuator))
+
+    def deactivate(self, actuator):
+        self.deactivated.append(self._actuator(actuator))
+
+
+class SCA_LogicController(SCA_PythonController):
+    """AND, OR, NAND, NOR, XOR, or XNOR controller
+
+    :param str operator: One of "AND", "OR", "NAND", "NOR", "XOR", "XNOR"
+    """
+
+    def __init__(self, name, owner, operator="AND"):
+        super(SCA_LogicController, self).__init__(name, owner, mode="LOGIC")
+        self.operator = operator
+
+    def evaluate(self):
+        """Activate or deactivate all actuators according to the state of
+        linked sensors"""
+        states = [sensor.positive for sensor in self.sensors]
+        result = {
+            "AND": all(states),
+            "OR": any(states),
+            "NAND": not all(states),
+            "NOR": not any(states),
+            "XOR": sum(states) == 1,
+            "XNOR": sum(states) != 1}[self.operator]
+        for actuator in self.actuators:
+            if result:
+                self.activate(actuator)
+            else:
+                self.deactivate(actuator)
+
+
+class SCA_IActuator(object):
+    """An actuator
+
+    :ivar bool active: Whether actuator will run on each tick until
+    deactivated"""
+    continuous = False
+
+    def __init__(self, name, owner):
+        self.name = name
+        self.owner = owner
+        self.active = False
+
+    def __repr__(self):
+        return "<{} '{}'>".format(self.__class__.__name__, self.name)
+
+    def run(self, scene):
+        pass
+
+
+class SCA_PropertyActuator(SCA_IActuator):
+    """Actuator which sets a game property
+
+    :param str mode: One of "ASSIGN", "ADD", "COPY", "TOGGLE"
+    :param str object: Name of object to copy property from (COPY mode)"""
+
+    def __init__(self, name, owner, mode="ASSIGN", propName="", value="",
+                 object=None, objectPropName=""):
+        super(SCA_PropertyActuator, self).__init__(name, owner)
+        self.mode = mode
+        self.propName = propName
+        self.value = value
+        self.object = object
+        self.objectPropName = objectPropName
+
+    def _evaluate_value(self):
+        try:
+            return eval(self.value, {}, dict(self.owner._properties))
+        except Exception:
+            return self.value
+
+    def run(self, scene):
+        if self.mode == "COPY":
+            source = scene.objects[self.object]
+            self.owner[self.propName] = source[self.objectPropName]
+        elif self.mode == "ASSIGN":
+            self.owner[self.propName] = self._evaluate_value()
+        elif self.mode == "ADD":
+            self.owner[self.propName] += self._evaluate_value()
+        elif self.mode == "TOGGLE":
+            self.owner[self.propName] = not self.owner[self.propName]
+
+
+class KX_ObjectActuator(SCA_IActuator):
+    """Actuator which moves and rotates its owner on every tick while
+    active"""
+    continuous = True
+
+    def __init__(self, name, owner, dLoc=(0., 0., 0.), dRot=(0., 0., 0.),
+                 useLocalDLoc=False, useLocalDRot=False):
+        super(KX_ObjectActuator, self).__init__(name, owner)
+        self.dLoc = list(dLoc)
+        self.dRot = list(dRot)
+        self.useLocalDLoc = useLocalDLoc
+        self.useLocalDRot = useLocalDRot
+
+    def run(self, scene):
+        if any(self.dLoc):
+            self.owner.applyMovement(self.dLoc, self.useLocalDLoc)
+        if any(self.dRot):
+            self.owner.applyRotation(self.dRot, self.useLocalDRot)
+
+
+class KX_Scene(object):
+    """A game scene
+
+    :param str name: Name of scene
+    :param restart: Callable used to implement restart()"""
+
+    def __init__(self, name, restart=None):
+        self.name = name
+        self.objects = CListValue()
+        self.active_camera = None
+        # Draw callbacks are kept but never called, since nothing is drawn
+        self.pre_draw = []
+        self.post_draw = []
+        self._restart = restart
+
+    def restart(self):
+        if self._restart is not None:
+            self._restart()
+
+
+class _Types(object):
+    """Stand-in for bge.types"""
+    CListValue = CListValue
+    KX_GameObject = KX_GameObject
+    KX_Camera = KX_Camera
+    KX_Scene = KX_Scene
+    SCA_ISensor = SCA_ISensor
+    SCA_AlwaysSensor = SCA_AlwaysSensor
+    SCA_PropertySensor = SCA_PropertySensor
+    SCA_KeyboardSensor = SCA_InputSensor
+    SCA_MouseSensor = SCA_InputSensor
+    SCA_PythonController = SCA_PythonController
+    SCA_IActuator = SCA_IActuator
+    SCA_PropertyActuator = SCA_PropertyActuator
+    KX_ObjectActuator = KX_ObjectActuator
+
+types = _Types()
+
+
+class _Logic(object):
+    """Stand-in for bge.logic, whose state is set by the game loop"""
+
+    def __init__(self):
+        self.globalDict = {}
+        self._scene = None
+        self._controller = None
+        self._tic_rate = 60.
+        self._clock = 0.
+
+    def getCurrentScene(self):
+        return self._scene
+
+    def getSceneList(self):
+        return CListValue([self._scene])
+
+    def getCurrentController(self):
+        return self._controller
+
+    def getLogicTicRate(self):
+        return self._tic_rate
+
+    def setLogicTicRate(self, tic_rate):
+        self._tic_rate = tic_rate
+
+    def getClockTime(self):
+        return self._clock
+
+    getFrameTime = getClockTime
+    getRealTime = getClockTime
+
+    def expandPath(self, path):
+        # Paths relative to the blend file are taken relative to the working
+        # directory
+        if path.startswith("//"):
+            path = path[2:]
+        return os.path.abspath(path)
+
+logic = _Logic()
+
+
+class _Render(object):
+    """Stand-in for bge.render, for a window of fixed size"""
+
+    def __init__(self):
+        self.width = 640
+        self.height = 480
+        self.mouse_visible = False
+        self.mouse_position = (self.width//2, self.height//2)
+
+    def getWindowWidth(self):
+        return self.width
+
+    def getWindowHeight(self):
+        return self.height
+
+    def showMouse(self, visible):
+        self.mouse_visible = bool(visible)
+
+    def setMousePosition(self, x, y):
+        self.mouse_position = (x, y)
+
+render = _Render()
@@ -0,0 +1,849 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""A stand-in for Blender's bpy module
+
+Records the objects, game properties, logic bricks, and text blocks that
+pyw3d creates while blending a project, so that the result can be inspected
+or run by :py:class:`pyw3d.headless.Simulation` without a Blender install.
+Only the parts of the bpy API used by pyw3d are provided.
+"""
+import os
+import struct
+from .mathutils import Vector, Euler
+
+
+def _default_layers():
+    return [layer == 0 for layer in range(20)]
+
+
+class IDCollection(object):
+    """Collection of named data blocks, as in bpy.data
+
+    Names are kept unique in the same way as Blender, by appending a numeric
+    suffix to a name that is already in use."""
+
+    def __init__(self, factory=None):
+        self._items = []
+        self._index = {}
+        self._factory = factory
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._index[key]
+        return self._items[key]
+
+    def get(self, name, default=None):
+        return self._index.get(name, default)
+
+    def keys(self):
+        return [item.name for item in self._items]
+
+    def values(self):
+        return list(self._items)
+
+    def items(self):
+        return [(item.name, item) for item in self._items]
+
+    def unique_name(self, name):
+        """Return name, or name with numeric suffix if name is in use"""
+        if name not in self._index:
+            return name
+        suffix = 1
+        while "{}.{:03d}".format(name, suffix) in self._index:
+            suffix += 1
+        return "{}.{:03d}".format(name, suffix)
+
+    def link(self, item):
+        item._name = self.unique_name(item._name)
+        item._collections.append(self)
+        self._items.append(item)
+        self._index[item._name] = item
+        return item
+
+    def unlink(self, item):
+        self._items.remove(item)
+        del self._index[item._name]
+        item._collections.remove(self)
+
+    def remove(self, item):
+        for collection in list(item._collections):
+            collection.unlink(item)
+
+    def _rename(self, item, old_name):
+        del self._index[old_name]
+        self._index[item._name] = item
+
+    def new(self, name, *args, **kwargs):
+        return self.link(self._factory(name, *args, **kwargs))
+
+
+class ID(object):
+    """Base class for named Blender data blocks"""
+
+    def __init__(self, name):
+        self._name = name
+        self._collections = []
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, new_name):
+        if new_name == self._name:
+            return
+        old_name = self._name
+        if self._collections:
+            new_name = self._collections[0].unique_name(new_name)
+        self._name = new_name
+        for collection in self._collections:
+            collection._rename(self, old_name)
+
+    def __repr__(self):
+        return "<{} '{}'>".format(self.__class__.__name__, self._name)
+
+
+class Text(ID):
+    """A text block"""
+
+    def __init__(self, name):
+        super(Text, self).__init__(name)
+        self._chunks = []
+
+    def write(self, text):
+        self._chunks.append(text)
+
+    def clear(self):
+        self._chunks = []
+
+    def from_string(self, text):
+        self._chunks = [text]
+
+    def as_string(self):
+        return "".join(self._chunks)
+
+
+class Image(ID):
+    """An image data block
+
+    :param str filepath: Path to image file. The size of PNG files is read
+    from their header; other formats are given a nominal size."""
+
+    def __init__(self, filepath):
+        super(Image, self).__init__(os.path.basename(filepath))
+        if not os.path.isfile(filepath):
+            raise RuntimeError(
+                "Error: Cannot read image file '{}'".format(filepath))
+        self.filepath = filepath
+        self.use_alpha = False
+        self.size = [1, 1]
+        with open(filepath, "rb") as image_file:
+            header = image_file.read(24)
+        if header[:8] == b"\x89PNG\r\n\x1a\n":
+            self.size = list(struct.unpack(">II", header[16:24]))
+
+
+class VectorFont(ID):
+    """A font data block"""
+
+    def __init__(self, filepath):
+        super(VectorFont, self).__init__(os.path.basename(filepath))
+        self.filepath = filepath
+
+
+class GameSettings(object):
+    """Material game settings"""
+
+    def __init__(self):
+        self.use_backface_culling = True
+        self.alpha_blend = "OPAQUE"
+
+
+class TextureSlot(object):
+    def __init__(self):
+        self.texture = None
+        self.texture_coords = "ORCO"
+
+
+class TextureSlots(list):
+    def add(self):
+        slot = TextureSlot()
+        self.append(slot)
+        return slot
+
+
+class Material(ID):
+    def __init__(self, name):
+        super(Material, self).__init__(name)
+        self.texture_slots = TextureSlots()
+        self.game_settings = GameSettings()
+        self.diffuse_color = [0.8, 0.8, 0.8]
+        self.use_shadeless = False
+        self.use_transparency = False
+        self.use_nodes = False
+        self.use_object_color = False
+
+    def copy(self):
+        """Return copy of material which shares its textures"""
+        material = Material(self.name)
+        material.texture_slots.extend(self.texture_slots)
+        material.game_settings.use_backface_culling = (
+            self.game_settings.use_backface_culling)
+        material.game_settings.alpha_blend = self.game_settings.alpha_blend
+        for attribute in (
+                "diffuse_color", "use_shadeless", "use_transparency",
+                "use_nodes", "use_object_color"):
+            setattr(material, attribute, getattr(self, attribute))
+        return data.materials.link(material)
+
+
+class Texture(ID):
+    def __init__(self, name, type="IMAGE"):
+        super(Texture, self).__init__(name)
+        self.type = type
+        self.image = None
+
+
+class UVTextureFace(object):
+    def __init__(self):
+        self.image = None
+
+
+class UVTexture(object):
+    def __init__(self):
+        self.data = [UVTextureFace()]
+
+
+class UVTextures(list):
+    def new(self, name="UVMap"):
+        texture = UVTexture()
+        self.append(texture)
+        return texture
+
+
+class Mesh(ID):
+    def __init__(self, name):
+        super(Mesh, self).__init__(name)
+        self.uv_textures = UVTextures()
+        self.materials = []
+
+
+class TextCurve(ID):
+    def __init__(self, name):
+        super(TextCurve, self).__init__(name)
+        self.materials = []
+        self.body = "Text"
+        self.font = None
+        self.extrude = 0
+        self.fill_mode = "FRONT"
+        self.align = "LEFT"
+        self.offset_y = 0
+
+
+class Lamp(ID):
+    def __init__(self, name, type="POINT"):
+        super(Lamp, self).__init__(name)
+        self.type = type
+        self.energy = 1.0
+        self.use_diffuse = True
+        self.use_specular = True
+        self.falloff_type = "INVERSE_SQUARE"
+        self.linear_attenuation = 0.
+        self.quadratic_attenuation = 0.
+        self.distance = 25
+        self.spot_size = 0.785398
+
+
+class Camera(ID):
+    def __init__(self, name):
+        super(Camera, self).__init__(name)
+        self.clip_start = 0.1
+        self.clip_end = 100.
+        self.lens = 35.
+        self.sensor_width = 32.
+
+
+class GameProperty(object):
+    """A game property on an object"""
+
+    defaults = {
+        "BOOL": False, "INT": 0, "FLOAT": 0., "STRING": "", "TIMER": 0.}
+
+    def __init__(self, name, type):
+        self.name = name
+        self.type = type
+        self.value = self.defaults[type]
+
+
+class LogicBrick(object):
+    """Base class for sensors, controllers, and actuators"""
+
+    def __init__(self, type, name):
+        self.type = type
+        self.name = name
+
+
+class Sensor(LogicBrick):
+    def __init__(self, type, name):
+        super(Sensor, self).__init__(type, name)
+        self.property = ""
+        self.value = ""
+        self.value_min = ""
+        self.value_max = ""
+        self.evaluation_type = "PROPEQUAL"
+        self.use_pulse_true_level = False
+        self.use_pulse_false_level = False
+        self.frequency = 0
+        self.invert = False
+        self.use_tap = False
+        self.key = ""
+        self.mouse_event = "LEFTCLICK"
+
+
+class Controller(LogicBrick):
+    def __init__(self, type, name):
+        super(Controller, self).__init__(type, name)
+        self.mode = "SCRIPT"
+        self.module = ""
+        self.text = None
+        self.sensors = []
+        self.actuators = []
+
+    def link(self, sensor=None, actuator=None):
+        if sensor is not None and sensor not in self.sensors:
+            self.sensors.append(sensor)
+        if actuator is not None and actuator not in self.actuators:
+            self.actuators.append(actuator)
+
+    def unlink(self, sensor=None, actuator=None):
+        if sensor in self.sensors:
+            self.sensors.remove(sensor)
+        if actuator in self.actuators:
+            self.actuators.remove(actuator)
+
+
+class Actuator(LogicBrick):
+    def __init__(self, type, name):
+        super(Actuator, self).__init__(type, name)
+        self.mode = ""
+        self.property = ""
+        self.value = ""
+        self.object = None
+        self.object_property = ""
+        self.offset_location = [0., 0., 0.]
+        self.offset_rotation = [0., 0., 0.]
+        self.use_local_location = False
+        self.use_local_rotation = False
+
+
+class NamedList(list):
+    """List of logic bricks or properties which may also be indexed by
+    name"""
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            for item in self:
+                if item.name == key:
+                    return item
+            raise KeyError(key)
+        return super(NamedList, self).__getitem__(key)
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return any(item.name == key for item in self)
+        return super(NamedList, self).__contains__(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+class GameObjectSettings(object):
+    """Game engine settings and logic bricks of an object"""
+
+    def __init__(self):
+        self.properties = NamedList()
+        self.sensors = NamedList()
+        self.controllers = NamedList()
+        self.actuators = NamedList()
+        self.physics_type = "STATIC"
+        self.use_ghost = False
+
+
+class MaterialSlot(object):
+    """A material slot of an object, which shows the material at the same
+    index of the object's data unless it is linked to the object
+
+    :param blender_object: The object
+    :param int index: Index of slot"""
+
+    def __init__(self, blender_object, index):
+        self._object = blender_object
+        self._index = index
+
+    @property
+    def link(self):
+        return self._object._slot_links[self._index]
+
+    @link.setter
+    def link(self, value):
+        self._object._slot_links[self._index] = value
+
+    @property
+    def material(self):
+        if self.link == "OBJECT":
+            return self._object._slot_materials[self._index]
+        return self._object.data.materials[self._index]
+
+    @material.setter
+    def material(self, value):
+        if self.link == "OBJECT":
+            self._object._slot_materials[self._index] = value
+        else:
+            self._object.data.materials[self._index] = value
+
+
+class Object(ID):
+    """A Blender object
+
+    :param str name: Name of object
+    :param str type: Object type (e.g. "EMPTY", "MESH", "FONT")
+    :param data: Data block for object"""
+
+    def __init__(self, name, type="EMPTY", data=None):
+        super(Object, self).__init__(name)
+        self.type = type
+        self.data = data
+        self._location = Vector()
+        self._rotation_euler = Euler()
+        self._scale = Vector((1., 1., 1.))
+        self.dimensions = Vector((2., 2., 0.))
+        self.color = [1., 1., 1., 1.]
+        self.layers = _default_layers()
+        self.hide_render = False
+        self.select = False
+        self._slot_links = []
+        self._slot_materials = []
+        self.game = GameObjectSettings()
+
+    @property
+    def material_slots(self):
+        """Slots of object, one for each material of its data, as in
+        Blender"""
+        materials = getattr(self.data, "materials", ())
+        while len(self._slot_links) < len(materials):
+            self._slot_links.append("DATA")
+            self._slot_materials.append(None)
+        return [MaterialSlot(self, index) for index in range(len(materials))]
+
+    @property
+    def active_material(self):
+        """Material of first slot. Setting it adds the material to the
+        materials of the object's data if there are no slots, and objects
+        whose data has no materials, such as empties, cannot be given one."""
+        material_slots = self.material_slots
+        if not material_slots:
+            return None
+        return material_slots[0].material
+
+    @active_material.setter
+    def active_material(self, value):
+        if getattr(self.data, "materials", None) is None:
+            return
+        material_slots = self.material_slots
+        if material_slots:
+            material_slots[0].material = value
+        else:
+            self.data.materials.append(value)
+
+    @property
+    def location(self):
+        return self._location
+
+    @location.setter
+    def location(self, value):
+        self._location = Vector(value)
+
+    @property
+    def rotation_euler(self):
+        return self._rotation_euler
+
+    @rotation_euler.setter
+    def rotation_euler(self, value):
+        self._rotation_euler = Euler(value)
+
+    @property
+    def scale(self):
+        return self._scale
+
+    @scale.setter
+    def scale(self, value):
+        self._scale = Vector(value)
+
+
+class SceneObjects(IDCollection):
+    """Objects linked to a scene, with an active object"""
+
+    def __init__(self):
+        super(SceneObjects, self).__init__()
+        self.active = None
+
+    def link(self, item):
+        self._items.append(item)
+        self._index[item.name] = item
+        item._collections.append(self)
+        return item
+
+    def unlink(self, item):
+        super(SceneObjects, self).unlink(item)
+        if self.active is item:
+            self.active = None
+
+
+class SceneGameSettings(object):
+    def __init__(self):
+        self.physics_gravity = 9.8
+        self.material_mode = "GLSL"
+        self.fps = 60
+
+
+class Scene(ID):
+    def __init__(self, name):
+        super(Scene, self).__init__(name)
+        self.objects = SceneObjects()
+        self.layers = _default_layers()
+        self.camera = None
+        self.game_settings = SceneGameSettings()
+
+
+class World(ID):
+    def __init__(self, name):
+        super(World, self).__init__(name)
+        self.horizon_color = [0.05, 0.05, 0.05]
+        self.ambient_color = [0., 0., 0.]
+
+
+class Screen(ID):
+    pass
+
+
+_OBJECT_TYPES = (
+    (Mesh, "MESH"), (TextCurve, "FONT"), (Lamp, "LAMP"), (Camera, "CAMERA"))
+
+
+class BlendData(object):
+    """Stand-in for bpy.data"""
+
+    def __init__(self):
+        self.objects = IDCollection(Object)
+        self.texts = IDCollection(Text)
+        self.materials = IDCollection(Material)
+        self.textures = IDCollection(Texture)
+        self.images = IDCollection()
+        self.fonts = IDCollection()
+        self.meshes = IDCollection(Mesh)
+        self.curves = IDCollection(TextCurve)
+        self.lamps = IDCollection(Lamp)
+        self.cameras = IDCollection(Camera)
+        self.scenes = IDCollection(Scene)
+        self.worlds = IDCollection(World)
+        self.screens = IDCollection(Screen)
+        self.objects.new = self._new_object
+        self.images.load = self._load_image
+        self.fonts.load = self._load_font
+        self.scenes.new("Scene")
+        self.worlds.new("World")
+        for screen_name in ("Default", "Game Logic", "Scripting"):
+            self.screens.new(screen_name)
+
+    def _new_object(self, name, object_data):
+        """Create object whose type is given by object_data, without
+        linking it to any scene"""
+        object_type = "EMPTY"
+        for data_class, data_type in _OBJECT_TYPES:
+            if isinstance(object_data, data_class):
+                object_type = data_type
+        return self.objects.link(Object(name, object_type, object_data))
+
+    def _load_image(self, filepath):
+        return self.images.link(Image(filepath))
+
+    def _load_font(self, filepath):
+        return self.fonts.link(VectorFont(filepath))
+
+
+class Window(object):
+    def __init__(self, screen):
+        self.screen = screen
+
+
+class Context(object):
+    """Stand-in for bpy.context"""
+
+    def __init__(self, blend_data):
+        self.scene = blend_data.scenes["Scene"]
+        self.window = Window(blend_data.screens["Default"])
+
+    @property
+    def object(self):
+        return self.scene.objects.active
+
+    @property
+    def active_object(self):
+        return self.scene.objects.active
+
+    @property
+    def selected_objects(self):
+        return [
+            blender_object for blender_object in self.scene.objects
+            if blender_object.select]
+
+
+data = BlendData()
+context = Context(data)
+
+
+def read_factory_settings():
+    """Reset all data to its initial state"""
+    global data, context
+    data = BlendData()
+    context = Context(data)
+
+
+class _Path(object):
+    """Stand-in for bpy.path"""
+
+    @staticmethod
+    def display_name_from_filepath(filepath):
+        return os.path.splitext(os.path.basename(filepath))[0]
+
+    @staticmethod
+    def abspath(path):
+        return os.path.abspath(path)
+
+path = _Path()
+
+
+def _add_object(type, name, data_block=None, location=None, rotation=None,
+                layers=None):
+    """Add object to data and current scene, making it the only selected
+    object and the active object"""
+    for blender_object in context.scene.objects:
+        blender_object.select = False
+    blender_object = data.objects.link(Object(name, type, data_block))
+    if location is not None:
+        blender_object.location = location
+    if rotation is not None:
+        blender_object.rotation_euler = rotation
+    if layers is not None:
+        blender_object.layers = list(layers)
+    blender_object.select = True
+    context.scene.objects.link(blender_object)
+    context.scene.objects.active = blender_object
+    return blender_object
+
+
+def _target_object(object_name):
+    if object_name:
+        return data.objects[object_name]
+    return context.scene.objects.active
+
+
+class _ObjectOps(object):
+    """Stand-in for bpy.ops.object"""
+
+    @staticmethod
+    def add(type="EMPTY", location=None, rotation=None, layers=None,
+            **kwargs):
+        _add_object(
+            type, type.capitalize(), location=location, rotation=rotation,
+            layers=layers)
+        return {"FINISHED"}
+
+    @staticmethod
+    def camera_add(location=None, rotation=None, layers=None, **kwargs):
+        _add_object(
+            "CAMERA", "Camera", data.cameras.new("Camera"),
+            location=location, rotation=rotation, layers=layers)
+        return {"FINISHED"}
+
+    @staticmethod
+    def text_add(location=None, rotation=None, layers=None, **kwargs):
+        _add_object(
+            "FONT", "Text", data.curves.new("Text"),
+            location=location, rotation=rotation, layers=layers)
+        context.object.dimensions = Vector((1., 0.7, 0.))
+        return {"FINISHED"}
+
+    @staticmethod
+    def lamp_add(type="POINT", location=None, rotation=None, layers=None,
+                 **kwargs):
+        _add_object(
+            "LAMP", type.capitalize(), data.lamps.new(type.capitalize(), type),
+            location=location, rotation=rotation, layers=layers)
+        return {"FINISHED"}
+
+    @staticmethod
+    def delete(**kwargs):
+        for blender_object in context.selected_objects:
+            data.objects.remove(blender_object)
+        return {"FINISHED"}
+
+    @staticmethod
+    def convert(target="MESH", keep_original=False, **kwargs):
+        for blender_object in context.selected_objects:
+            if blender_object.type != target:
+                materials = getattr(blender_object.data, "materials", [])
+                blender_object.type = target
+                blender_object.data = data.meshes.new(blender_object.name)
+                blender_object.data.materials.extend(materials)
+        return {"FINISHED"}
+
+    @staticmethod
+    def transform_apply(location=False, rotation=False, scale=False,
+                        **kwargs):
+        for blender_object in context.selected_objects:
+            if location:
+                blender_object.location = (0., 0., 0.)
+            if rotation:
+                blender_object.rotation_euler = (0., 0., 0.)
+            if scale:
+                blender_object.scale = (1., 1., 1.)
+        return {"FINISHED"}
+
+    @staticmethod
+    def join(**kwargs):
+        active = context.object
+        for blender_object in context.selected_objects:
+            if blender_object is not active:
+                data.objects.remove(blender_object)
+        return {"FINISHED"}
+
+    @staticmethod
+    def game_property_new(context_override=None, type="FLOAT", name="prop",
+                          **kwargs):
+        target = context.object
+        if context_override is not None:
+            target = context_override.get("object", target)
+        target.game.properties.append(GameProperty(name, type))
+        return {"FINISHED"}
+
+
+class _MeshOps(object):
+    """Stand-in for bpy.ops.mesh"""
+
+    @staticmethod
+    def primitive_plane_add(location=None, rotation=None, layers=None,
+                            **kwargs):
+        _add_object(
+            "MESH", "Plane", data.meshes.new("Plane"),
+            location=location, rotation=rotation, layers=layers)
+        return {"FINISHED"}
+
+
+class _LogicOps(object):
+    """Stand-in for bpy.ops.logic"""
+
+    @staticmethod
+    def sensor_add(type="ALWAYS", name="", object="", **kwargs):
+        _target_object(object).game.sensors.append(
+            Sensor(type, name or type.capitalize()))
+        return {"FINISHED"}
+
+    @staticmethod
+    def controller_add(type="LOGIC_AND", name="", object="", **kwargs):
+        _target_object(object).game.controllers.append(
+            Controller(type, name or type.capitalize()))
+        return {"FINISHED"}
+
+    @staticmethod
+    def actuator_add(type="MOTION", name="", object="", **kwargs):
+        _target_object(object).game.actuators.append(
+            Actuator(type, name or type.capitalize()))
+        return {"FINISHED"}
+
+
+class _ImportSceneOps(object):
+    """Stand-in for bpy.ops.import_scene"""
+
+    @staticmethod
+    def obj(filepath="", **kwargs):
+        if not os.path.isfile(filepath):
+            raise RuntimeError(
+                "Error: Cannot read file '{}'".format(filepath))
+        name = os.path.splitext(os.path.basename(filepath))[0]
+        _add_object("MESH", name, data.meshes.new(name))
+        return {"FINISHED"}
+
+
+class _FileOps(object):
+    """Stand-in for bpy.ops.file"""
+
+    @staticmethod
+    def pack_all(**kwargs):
+        return {"FINISHED"}
+
+
+class _WMOps(object):
+    """Stand-in for bpy.ops.wm"""
+
+    @staticmethod
+    def read_factory_settings(**kwargs):
+        read_factory_settings()
+        return {"FINISHED"}
+
+    @staticmethod
+    def read_homefile(**kwargs):
+        """Reset all data, as there is no startup file to load"""
+        read_factory_settings()
+        return {"FINISHED"}
+
+    @staticmethod
+    def save_as_mainfile(filepath="", **kwargs):
+        """Write a plain-text summary of objects and texts to filepath"""
+        with open(filepath, "w") as blend_file:
+            blend_file.write("# Headless pyw3d export\n")
+            for blender_object in data.objects:
+                blend_file.write("object {} {}\n".format(
+                    blender_object.name, blender_object.type))
+            for text in data.texts:
+                blend_file.write("text {}\n".format(text.name))
+        return {"FINISHED"}
+
+
+class _Ops(object):
+    """Stand-in for bpy.ops"""
+    object = _ObjectOps()
+    mesh = _MeshOps()
+    logic = _LogicOps()
+    import_scene = _ImportSceneOps()
+    file = _FileOps()
+    wm = _WMOps()
+
+ops = _Ops()
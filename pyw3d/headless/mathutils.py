@@ -0,0 +1,541 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""A pure-Python stand-in for Blender's mathutils module
+
+Implements the subset of Vector, Matrix, Quaternion, and Euler used by pyw3d
+and by the game logic it generates, following the conventions of the
+mathutils shipped with Blender 2.7x (e.g. Matrix * Vector and Vector *
+Vector for the dot product).
+"""
+import math
+from numbers import Number
+
+EPSILON = 1e-12
+
+
+class Vector(object):
+    """A vector of floats
+
+    :param seq: Sequence of components"""
+
+    def __init__(self, seq=(0., 0., 0.)):
+        self._data = [float(component) for component in seq]
+
+    @classmethod
+    def _wrap(cls, data):
+        """Return Vector sharing storage with the list data"""
+        vector = cls.__new__(cls)
+        vector._data = data
+        return vector
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __getitem__(self, index):
+        return self._data[index]
+
+    def __setitem__(self, index, value):
+        self._data[index] = float(value)
+
+    def __repr__(self):
+        return "Vector({})".format(tuple(self._data))
+
+    def __eq__(self, other):
+        try:
+            return len(self) == len(other) and all(
+                a == b for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def _get_component(index):
+        def getter(self):
+            return self._data[index]
+
+        def setter(self, value):
+            self._data[index] = float(value)
+        return property(getter, setter)
+
+    x = _get_component(0)
+    y = _get_component(1)
+    z = _get_component(2)
+    w = _get_component(3)
+    del _get_component
+
+    def __add__(self, other):
+        return Vector(a + b for a, b in zip(self, other))
+
+    __radd__ = __add__
+
+    def __iadd__(self, other):
+        data = self._data
+        for index, component in enumerate(other):
+            data[index] += component
+        return self
+
+    def __sub__(self, other):
+        return Vector(a - b for a, b in zip(self, other))
+
+    def __rsub__(self, other):
+        return Vector(b - a for a, b in zip(self, other))
+
+    def __neg__(self):
+        return Vector(-a for a in self)
+
+    def __mul__(self, other):
+        if isinstance(other, Number):
+            return Vector(a*other for a in self)
+        if isinstance(other, Vector):
+            return self.dot(other)
+        return NotImplemented
+
+    def __rmul__(self, other):
+        if isinstance(other, Number):
+            return Vector(a*other for a in self)
+        return NotImplemented
+
+    def __truediv__(self, other):
+        return Vector(a/other for a in self)
+
+    def copy(self):
+        return Vector(self)
+
+    def to_tuple(self, precision=None):
+        if precision is None:
+            return tuple(self._data)
+        return tuple(round(a, precision) for a in self)
+
+    def to_3d(self):
+        return Vector((list(self) + [0., 0., 0.])[:3])
+
+    def to_4d(self):
+        return Vector((list(self) + [0., 0., 0.])[:3] + [1.])
+
+    def resized(self, size):
+        return Vector((list(self) + [0.]*size)[:size])
+
+    @property
+    def length_squared(self):
+        return sum(a*a for a in self)
+
+    @property
+    def length(self):
+        return math.sqrt(self.length_squared)
+
+    def dot(self, other):
+        return sum(a*b for a, b in zip(self, other))
+
+    def cross(self, other):
+        a, b = self, other
+        return Vector((
+            a[1]*b[2] - a[2]*b[1],
+            a[2]*b[0] - a[0]*b[2],
+            a[0]*b[1] - a[1]*b[0]))
+
+    def normalize(self):
+        length = self.length
+        if length > EPSILON:
+            self._data = [a/length for a in self._data]
+
+    def normalized(self):
+        vector = self.copy()
+        vector.normalize()
+        return vector
+
+    def angle(self, other, fallback=None):
+        other = Vector(other)
+        lengths = self.length*other.length
+        if lengths < EPSILON:
+            if fallback is None:
+                raise ValueError(
+                    "Vector.angle(other): zero length vectors have no valid"
+                    " angle")
+            return fallback
+        cosine = max(-1., min(1., self.dot(other)/lengths))
+        return math.acos(cosine)
+
+    def rotation_difference(self, other):
+        """Return Quaternion rotating this vector onto other"""
+        start = self.normalized().to_3d()
+        end = Vector(other).normalized().to_3d()
+        axis = start.cross(end)
+        cosine = max(-1., min(1., start.dot(end)))
+        if axis.length < EPSILON:
+            if cosine > 0:
+                return Quaternion()
+            # Antiparallel; rotate half a turn about any perpendicular axis
+            axis = start.cross(Vector((1., 0., 0.)))
+            if axis.length < EPSILON:
+                axis = start.cross(Vector((0., 1., 0.)))
+        return Quaternion(axis.normalized(), math.acos(cosine))
+
+    def rotate(self, rotation):
+        """Rotate vector in place by Matrix, Quaternion, or Euler"""
+        matrix = _rotation_matrix(rotation)
+        self._data[:3] = list(matrix*self.to_3d())
+
+
+class Matrix(object):
+    """A square matrix of floats, stored by rows
+
+    :param rows: Sequence of rows. Defaults to 4x4 identity."""
+
+    def __init__(self, rows=None):
+        if rows is None:
+            rows = [[float(i == j) for j in range(4)] for i in range(4)]
+        self._rows = [[float(a) for a in row] for row in rows]
+
+    @classmethod
+    def Identity(cls, size):
+        return cls([[float(i == j) for j in range(size)] for i in range(size)])
+
+    @classmethod
+    def Rotation(cls, angle, size, axis):
+        """Return rotation matrix of given size for rotation by angle about
+        axis, which is either one of "X", "Y", "Z" or a vector"""
+        if isinstance(axis, str):
+            axis = {"X": (1, 0, 0), "Y": (0, 1, 0), "Z": (0, 0, 1)}[axis]
+        x, y, z = Vector(axis).normalized()
+        cosine = math.cos(angle)
+        sine = math.sin(angle)
+        one_minus = 1 - cosine
+        rows = [
+            [cosine + x*x*one_minus, x*y*one_minus - z*sine,
+             x*z*one_minus + y*sine],
+            [y*x*one_minus + z*sine, cosine + y*y*one_minus,
+             y*z*one_minus - x*sine],
+            [z*x*one_minus - y*sine, z*y*one_minus + x*sine,
+             cosine + z*z*one_minus]]
+        matrix = cls(rows)
+        if size == 4:
+            return matrix.to_4x4()
+        return matrix
+
+    @classmethod
+    def Translation(cls, vector):
+        matrix = cls()
+        for i in range(3):
+            matrix._rows[i][3] = float(vector[i])
+        return matrix
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        return Vector._wrap(self._rows[index])
+
+    def __setitem__(self, index, row):
+        self._rows[index] = [float(a) for a in row]
+
+    def __iter__(self):
+        for row in self._rows:
+            yield Vector._wrap(row)
+
+    def __repr__(self):
+        return "Matrix({})".format(
+            tuple(tuple(row) for row in self._rows))
+
+    def __eq__(self, other):
+        if not isinstance(other, Matrix):
+            return NotImplemented
+        return self._rows == other._rows
+
+    __hash__ = None
+
+    @property
+    def col(self):
+        return _ColumnAccess(self)
+
+    @property
+    def row(self):
+        return self
+
+    @property
+    def translation(self):
+        return Vector(row[3] for row in self._rows[:3])
+
+    @translation.setter
+    def translation(self, vector):
+        for i in range(3):
+            self._rows[i][3] = float(vector[i])
+
+    def copy(self):
+        return Matrix(self._rows)
+
+    def to_3x3(self):
+        return Matrix([row[:3] for row in self._rows[:3]])
+
+    def to_4x4(self):
+        rows = [row[:3] + [0.] for row in self.to_3x3()._rows]
+        rows.append([0., 0., 0., 1.])
+        if len(self) == 4:
+            for i in range(3):
+                rows[i][3] = self._rows[i][3]
+        return Matrix(rows)
+
+    def transposed(self):
+        return Matrix(zip(*self._rows))
+
+    def inverted(self):
+        """Return inverse of matrix by Gauss-Jordan elimination"""
+        size = len(self)
+        work = [
+            row[:] + [float(i == j) for j in range(size)]
+            for i, row in enumerate(self._rows)]
+        for column in range(size):
+            pivot = max(range(column, size), key=lambda r: abs(work[r][column]))
+            if abs(work[pivot][column]) < EPSILON:
+                raise ValueError("Matrix.inverted(): matrix is singular")
+            work[column], work[pivot] = work[pivot], work[column]
+            scale = work[column][column]
+            work[column] = [a/scale for a in work[column]]
+            for row in range(size):
+                if row != column:
+                    factor = work[row][column]
+                    work[row] = [
+                        a - factor*b for a, b in zip(work[row], work[column])]
+        return Matrix(row[size:] for row in work)
+
+    def __mul__(self, other):
+        if isinstance(other, Number):
+            return Matrix([[a*other for a in row] for row in self._rows])
+        if isinstance(other, Matrix):
+            columns = list(zip(*other._rows))
+            return Matrix([
+                [sum(a*b for a, b in zip(row, column)) for column in columns]
+                for row in self._rows])
+        other = Vector(other)
+        if len(self) == 4 and len(other) == 3:
+            result = self*other.to_4d()
+            return result.to_3d()
+        return Vector(
+            sum(a*b for a, b in zip(row, other)) for row in self._rows)
+
+    def to_quaternion(self):
+        """Return Quaternion for rotation part of matrix"""
+        m = self.to_3x3()._rows
+        trace = m[0][0] + m[1][1] + m[2][2]
+        if trace > 0:
+            s = 0.5/math.sqrt(trace + 1.)
+            w = 0.25/s
+            x = (m[2][1] - m[1][2])*s
+            y = (m[0][2] - m[2][0])*s
+            z = (m[1][0] - m[0][1])*s
+        elif m[0][0] > m[1][1] and m[0][0] > m[2][2]:
+            s = 2.*math.sqrt(max(1. + m[0][0] - m[1][1] - m[2][2], 0.))
+            w = (m[2][1] - m[1][2])/s
+            x = 0.25*s
+            y = (m[0][1] + m[1][0])/s
+            z = (m[0][2] + m[2][0])/s
+        elif m[1][1] > m[2][2]:
+            s = 2.*math.sqrt(max(1. + m[1][1] - m[0][0] - m[2][2], 0.))
+            w = (m[0][2] - m[2][0])/s
+            x = (m[0][1] + m[1][0])/s
+            y = 0.25*s
+            z = (m[1][2] + m[2][1])/s
+        else:
+            s = 2.*math.sqrt(max(1. + m[2][2] - m[0][0] - m[1][1], 0.))
+            w = (m[1][0] - m[0][1])/s
+            x = (m[0][2] + m[2][0])/s
+            y = (m[1][2] + m[2][1])/s
+            z = 0.25*s
+        return Quaternion((w, x, y, z)).normalized()
+
+    def to_euler(self, order="XYZ"):
+        """Return XYZ Euler angles for rotation part of matrix"""
+        m = self.to_3x3()._rows
+        cos_y = math.hypot(m[0][0], m[1][0])
+        if cos_y > 16*EPSILON:
+            return Euler((
+                math.atan2(m[2][1], m[2][2]),
+                math.atan2(-m[2][0], cos_y),
+                math.atan2(m[1][0], m[0][0])))
+        return Euler((
+            math.atan2(-m[1][2], m[1][1]),
+            math.atan2(-m[2][0], cos_y),
+            0.))
+
+
+class _ColumnAccess(object):
+    """Column view of a Matrix supporting item access and assignment"""
+
+    def __init__(self, matrix):
+        self._matrix = matrix
+
+    def __len__(self):
+        return len(self._matrix._rows[0])
+
+    def __getitem__(self, index):
+        return Vector(row[index] for row in self._matrix._rows)
+
+    def __setitem__(self, index, column):
+        for row, value in zip(self._matrix._rows, column):
+            row[index] = float(value)
+
+
+class Quaternion(object):
+    """A rotation quaternion
+
+    :param seq: (w, x, y, z) components, or rotation axis if angle is given
+    :param float angle: Rotation angle in radians"""
+
+    def __init__(self, seq=(1., 0., 0., 0.), angle=None):
+        if angle is None:
+            self.w, self.x, self.y, self.z = (float(a) for a in seq)
+        else:
+            axis = Vector(seq).normalized()
+            sine = math.sin(angle/2.)
+            self.w = math.cos(angle/2.)
+            self.x, self.y, self.z = (a*sine for a in axis)
+
+    def __iter__(self):
+        return iter((self.w, self.x, self.y, self.z))
+
+    def __len__(self):
+        return 4
+
+    def __getitem__(self, index):
+        return tuple(self)[index]
+
+    def __repr__(self):
+        return "Quaternion({})".format(tuple(self))
+
+    @property
+    def angle(self):
+        return 2.*math.acos(max(-1., min(1., self.w)))
+
+    @property
+    def axis(self):
+        sine = math.sqrt(max(1. - self.w*self.w, 0.))
+        if sine < EPSILON:
+            return Vector((1., 0., 0.))
+        return Vector((self.x/sine, self.y/sine, self.z/sine))
+
+    @property
+    def magnitude(self):
+        return math.sqrt(sum(a*a for a in self))
+
+    def copy(self):
+        return Quaternion(tuple(self))
+
+    def normalized(self):
+        magnitude = self.magnitude
+        if magnitude < EPSILON:
+            return Quaternion()
+        return Quaternion(tuple(a/magnitude for a in self))
+
+    def normalize(self):
+        self.w, self.x, self.y, self.z = self.normalized()
+
+    def conjugated(self):
+        return Quaternion((self.w, -self.x, -self.y, -self.z))
+
+    def inverted(self):
+        norm = sum(a*a for a in self)
+        return Quaternion(tuple(a/norm for a in self.conjugated()))
+
+    def __mul__(self, other):
+        if isinstance(other, Quaternion):
+            w1, x1, y1, z1 = self
+            w2, x2, y2, z2 = other
+            return Quaternion((
+                w1*w2 - x1*x2 - y1*y2 - z1*z2,
+                w1*x2 + x1*w2 + y1*z2 - z1*y2,
+                w1*y2 - x1*z2 + y1*w2 + z1*x2,
+                w1*z2 + x1*y2 - y1*x2 + z1*w2))
+        if isinstance(other, Number):
+            return Quaternion(tuple(a*other for a in self))
+        return self.to_matrix()*Vector(other)
+
+    def rotation_difference(self, other):
+        """Return Quaternion rotating this orientation onto other"""
+        return (other*self.conjugated()).normalized()
+
+    def to_matrix(self):
+        w, x, y, z = self.normalized()
+        return Matrix([
+            [1 - 2*(y*y + z*z), 2*(x*y - w*z), 2*(x*z + w*y)],
+            [2*(x*y + w*z), 1 - 2*(x*x + z*z), 2*(y*z - w*x)],
+            [2*(x*z - w*y), 2*(y*z + w*x), 1 - 2*(x*x + y*y)]])
+
+    def to_euler(self, order="XYZ"):
+        return self.to_matrix().to_euler(order)
+
+
+class Euler(object):
+    """XYZ Euler angles in radians
+
+    :param angles: (x, y, z) rotation angles
+    :param str order: Rotation order (only "XYZ" is supported)"""
+
+    def __init__(self, angles=(0., 0., 0.), order="XYZ"):
+        self._data = [float(angle) for angle in angles]
+        self.order = order
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, index):
+        return self._data[index]
+
+    def __setitem__(self, index, value):
+        self._data[index] = float(value)
+
+    def __repr__(self):
+        return "Euler({}, '{}')".format(tuple(self._data), self.order)
+
+    x = Vector.x
+    y = Vector.y
+    z = Vector.z
+
+    def copy(self):
+        return Euler(self._data, self.order)
+
+    def to_matrix(self):
+        x, y, z = self._data
+        return (
+            Matrix.Rotation(z, 3, "Z")*Matrix.Rotation(y, 3, "Y") *
+            Matrix.Rotation(x, 3, "X"))
+
+    def to_quaternion(self):
+        return self.to_matrix().to_quaternion()
+
+    def rotate(self, rotation):
+        """Rotate in place by Matrix, Quaternion, or Euler"""
+        matrix = _rotation_matrix(rotation)*self.to_matrix()
+        self._data = list(matrix.to_euler())
+
+
+def _rotation_matrix(rotation):
+    """Return 3x3 rotation Matrix for Matrix, Quaternion, or Euler"""
+    if isinstance(rotation, Matrix):
+        return rotation.to_3x3()
+    return rotation.to_matrix()
@@ -0,0 +1,385 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""A game loop for running generated BGE logic without Blender
+
+The loop follows the order of a BGE logic tick: every sensor is evaluated,
+then each controller linked to a sensor which triggered is run, and finally
+the actuators activated by those controllers are run. Time is simulated,
+advancing by exactly one logic tick per step, so that runs are repeatable.
+"""
+import sys
+import math
+import time
+import traceback
+import importlib.abc
+import importlib.util
+from collections import OrderedDict
+from . import bpy as headless_bpy
+from . import bge
+
+
+class TextBlockFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    """Import hook which makes text blocks importable as modules, as in the
+    BGE
+
+    The name "monotonic" in each imported module is replaced with the
+    simulation clock, since generated scripts use it to time actions.
+
+    :param Simulation simulation: The simulation whose text blocks and clock
+    should be used"""
+
+    def __init__(self, simulation):
+        self.simulation = simulation
+        self.module_names = set()
+
+    def _text(self, module_name):
+        return self.simulation.blend_data.texts.get(
+            "{}.py".format(module_name))
+
+    def find_spec(self, fullname, path=None, target=None):
+        if self._text(fullname) is None:
+            return None
+        return importlib.util.spec_from_loader(fullname, self)
+
+    def create_module(self, spec):
+        return None
+
+    def exec_module(self, module):
+        text = self._text(module.__name__)
+        module.__file__ = text.name
+        self.module_names.add(module.__name__)
+        exec(compile(text.as_string(), text.name, "exec"), module.__dict__)
+        if "monotonic" in module.__dict__:
+            module.monotonic = self.simulation.clock
+
+    def unload(self):
+        """Remove all modules imported from text blocks"""
+        for module_name in self.module_names:
+            sys.modules.pop(module_name, None)
+        self.module_names = set()
+
+
+class ControllerTiming(object):
+    """Time spent in a single controller
+
+    :param str name: Name of controller, as "object_name.controller_name"
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.
+
+
+class Simulation(object):
+    """Run the game logic recorded by the headless bpy module
+
+    Only objects on active scene layers are placed in the game scene, as in
+    the BGE. Property sensors, Python and logic controllers, and property
+    and motion actuators behave as in the BGE; keyboard and mouse sensors
+    are negative unless set with :py:meth:`set_sensor`.
+
+    :param blend_data: Data to build the game scene from. Defaults to the
+    current data of :py:mod:`pyw3d.headless.bpy`
+    :param bool strict: If True, exceptions raised by controllers propagate.
+    Otherwise, they are recorded in errors and the loop continues, as in the
+    BGE.
+    """
+
+    def __init__(self, blend_data=None, strict=True):
+        if blend_data is None:
+            blend_data = headless_bpy.data
+        self.blend_data = blend_data
+        self.strict = strict
+        self.frame = 0
+        self.errors = []
+        self.timings = OrderedDict()
+        self.tic_rate = float(blend_data.scenes["Scene"].game_settings.fps)
+        self.finder = TextBlockFinder(self)
+        sys.meta_path.insert(0, self.finder)
+        self._scripts = {}
+        self._restart_pending = False
+        self.build_scene()
+        self.load_seconds = self.load_scripts()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Remove import hook and modules imported from text blocks"""
+        if self.finder in sys.meta_path:
+            sys.meta_path.remove(self.finder)
+        self.finder.unload()
+
+    @property
+    def time(self):
+        """Simulated time in seconds since start of game"""
+        return self.frame/self.tic_rate
+
+    def clock(self):
+        """Stand-in for time.monotonic in generated scripts"""
+        return self.time
+
+    def build_scene(self):
+        """Create game scene from blend data"""
+        blender_scene = self.blend_data.scenes["Scene"]
+        self.scene = bge.KX_Scene(blender_scene.name, restart=self.restart)
+        self._timers = []
+        self._sensors = []
+        self._controllers = []
+        self._actuators = []
+        bricks = {}
+        active_objects = [
+            blender_object for blender_object in blender_scene.objects
+            if any(
+                object_layer and scene_layer for object_layer, scene_layer in
+                zip(blender_object.layers, blender_scene.layers))
+        ]
+        for blender_object in active_objects:
+            game_object = self._create_game_object(blender_object, bricks)
+            self.scene.objects.append(game_object)
+            if blender_object is blender_scene.camera:
+                self.scene.active_camera = game_object
+        for blender_object in active_objects:
+            for controller in blender_object.game.controllers:
+                game_controller = bricks[id(controller)]
+                for sensor in controller.sensors:
+                    if id(sensor) in bricks:
+                        game_controller.sensors.append(bricks[id(sensor)])
+                        bricks[id(sensor)].controllers.append(
+                            game_controller)
+                for actuator in controller.actuators:
+                    if id(actuator) in bricks:
+                        game_controller.actuators.append(bricks[id(actuator)])
+        bge.logic._scene = self.scene
+        bge.logic._tic_rate = self.tic_rate
+        bge.logic._clock = self.time
+        return self.scene
+
+    def load_scripts(self):
+        """Import the modules used by Python controllers, so that the cost
+        of compiling generated scripts is not counted against the first tick
+
+        :returns: Time in seconds spent loading modules"""
+        start = time.perf_counter()
+        for controller in self._controllers:
+            if controller.mode == "MODULE":
+                importlib.import_module(controller.module.rsplit(".", 1)[0])
+        return time.perf_counter() - start
+
+    def restart(self):
+        """Rebuild game scene from blend data at end of current tick"""
+        self._restart_pending = True
+
+    def _create_game_object(self, blender_object, bricks):
+        if blender_object.type == "CAMERA":
+            camera = blender_object.data
+            game_object = bge.KX_Camera(
+                blender_object.name,
+                fov=math.degrees(
+                    2*math.atan(camera.sensor_width/(2*camera.lens))),
+                aspect=bge.render.width/bge.render.height,
+                near=camera.clip_start,
+                far=camera.clip_end)
+        else:
+            game_object = bge.KX_GameObject(blender_object.name)
+        game_object.position = blender_object.location
+        game_object.orientation = blender_object.rotation_euler.to_matrix()
+        game_object.scaling = blender_object.scale
+        game_object.color = blender_object.color
+        game_object.visible = not blender_object.hide_render
+        for game_property in blender_object.game.properties:
+            game_object[game_property.name] = game_property.value
+            if game_property.type == "TIMER":
+                self._timers.append((game_object, game_property.name))
+
+        for sensor in blender_object.game.sensors:
+            game_sensor = self._create_sensor(game_object, sensor)
+            game_object.sensors.append(game_sensor)
+            self._sensors.append(game_sensor)
+            bricks[id(sensor)] = game_sensor
+        for controller in blender_object.game.controllers:
+            game_controller = self._create_controller(game_object, controller)
+            game_object.controllers.append(game_controller)
+            self._controllers.append(game_controller)
+            bricks[id(controller)] = game_controller
+        for actuator in blender_object.game.actuators:
+            game_actuator = self._create_actuator(game_object, actuator)
+            game_object.actuators.append(game_actuator)
+            self._actuators.append(game_actuator)
+            bricks[id(actuator)] = game_actuator
+        return game_object
+
+    def _create_sensor(self, game_object, sensor):
+        if sensor.type == "PROPERTY":
+            game_sensor = bge.SCA_PropertySensor(
+                sensor.name, game_object, mode=sensor.evaluation_type,
+                propName=sensor.property, value=sensor.value,
+                min=sensor.value_min, max=sensor.value_max)
+        elif sensor.type == "ALWAYS":
+            game_sensor = bge.SCA_AlwaysSensor(sensor.name, game_object)
+        elif sensor.type == "KEYBOARD":
+            game_sensor = bge.SCA_InputSensor(
+                sensor.name, game_object, event=sensor.key)
+        elif sensor.type == "MOUSE":
+            game_sensor = bge.SCA_InputSensor(
+                sensor.name, game_object, event=sensor.mouse_event)
+        else:
+            game_sensor = bge.SCA_ISensor(sensor.name, game_object)
+        game_sensor.usePosPulseMode = sensor.use_pulse_true_level
+        game_sensor.useNegPulseMode = sensor.use_pulse_false_level
+        game_sensor.skippedTicks = sensor.frequency
+        game_sensor.invert = sensor.invert
+        return game_sensor
+
+    def _create_controller(self, game_object, controller):
+        if controller.type == "PYTHON":
+            script = ""
+            if controller.text is not None:
+                script = controller.text.as_string()
+            return bge.SCA_PythonController(
+                controller.name, game_object, mode=controller.mode,
+                module=controller.module, script=script)
+        return bge.SCA_LogicController(
+            controller.name, game_object,
+            operator=controller.type[len("LOGIC_"):])
+
+    def _create_actuator(self, game_object, actuator):
+        if actuator.type == "PROPERTY":
+            source_name = None
+            if actuator.object is not None:
+                source_name = actuator.object.name
+            return bge.SCA_PropertyActuator(
+                actuator.name, game_object, mode=actuator.mode,
+                propName=actuator.property, value=actuator.value,
+                object=source_name, objectPropName=actuator.object_property)
+        if actuator.type == "MOTION":
+            return bge.KX_ObjectActuator(
+                actuator.name, game_object, dLoc=actuator.offset_location,
+                dRot=actuator.offset_rotation,
+                useLocalDLoc=actuator.use_local_location,
+                useLocalDRot=actuator.use_local_rotation)
+        return bge.SCA_IActuator(actuator.name, game_object)
+
+    def set_sensor(self, object_name, sensor_name, positive=True):
+        """Set state of keyboard or mouse sensor from next tick onward"""
+        sensor = self.scene.objects[object_name].sensors[sensor_name]
+        sensor.input_state = positive
+        return sensor
+
+    def _timing(self, controller):
+        name = "{}.{}".format(controller.owner.name, controller.name)
+        try:
+            return self.timings[name]
+        except KeyError:
+            self.timings[name] = ControllerTiming(name)
+            return self.timings[name]
+
+    def _execute_controller(self, controller):
+        if controller.mode == "LOGIC":
+            controller.evaluate()
+        elif controller.mode == "MODULE":
+            module_name, function_name = controller.module.rsplit(".", 1)
+            getattr(importlib.import_module(module_name), function_name)(
+                controller)
+        else:
+            if controller.script not in self._scripts:
+                self._scripts[controller.script] = compile(
+                    controller.script, controller.name, "exec")
+            exec(self._scripts[controller.script], {"__name__": "__main__"})
+
+    def _run_controller(self, controller):
+        bge.logic._controller = controller
+        controller.activated = []
+        controller.deactivated = []
+        timing = self._timing(controller)
+        start = time.perf_counter()
+        try:
+            self._execute_controller(controller)
+        except Exception:
+            if self.strict:
+                raise
+            self.errors.append((self.frame, timing.name, traceback.format_exc()))
+        finally:
+            timing.seconds += time.perf_counter() - start
+            timing.calls += 1
+            bge.logic._controller = None
+        for actuator in controller.deactivated:
+            actuator.active = False
+        for actuator in controller.activated:
+            actuator.active = True
+
+    def step(self, frames=1):
+        """Run given number of logic ticks"""
+        for _ in range(frames):
+            bge.logic._clock = self.time
+            for game_object, property_name in self._timers:
+                game_object[property_name] += 1./self.tic_rate
+            triggered = set()
+            for sensor in self._sensors:
+                if sensor.update():
+                    triggered.update(id(controller) for controller in
+                                     sensor.controllers)
+            for controller in self._controllers:
+                if id(controller) in triggered:
+                    self._run_controller(controller)
+            for actuator in self._actuators:
+                if actuator.active:
+                    actuator.run(self.scene)
+                    if not actuator.continuous:
+                        actuator.active = False
+            self.frame += 1
+            if self._restart_pending:
+                self._restart_pending = False
+                self.build_scene()
+        return self
+
+    def skip(self, frames=1):
+        """Let given number of logic ticks elapse without running any logic,
+        as when the BGE falls behind under load
+
+        Timer properties still advance, since they follow the clock."""
+        for game_object, property_name in self._timers:
+            game_object[property_name] += frames/self.tic_rate
+        self.frame += frames
+        return self
+
+    def run(self, seconds):
+        """Run logic ticks covering given number of simulated seconds"""
+        return self.step(int(round(seconds*self.tic_rate)))
+
+    def report(self):
+        """Return table of time spent in each controller, most expensive
+        first"""
+        frames = max(self.frame, 1)
+        lines = [
+            "{} ticks ({:.2f} s simulated at {:g} ticks/s)".format(
+                self.frame, self.time, self.tic_rate),
+            "Scripts loaded in {:.3f} s".format(self.load_seconds),
+            "{:>10} {:>10} {:>8}  {}".format(
+                "us/tick", "us/call", "calls", "controller")]
+        for timing in sorted(
+                self.timings.values(), key=lambda entry: -entry.seconds):
+            lines.append("{:10.2f} {:10.2f} {:8d}  {}".format(
+                1e6*timing.seconds/frames,
+                1e6*timing.seconds/max(timing.calls, 1),
+                timing.calls, timing.name))
+        return "\n".join(lines)
@@ -34,6 +34,8 @@ from .names import generate_blender_object_name,\
     generate_blender_material_name
 from .metaclasses import SubRegisteredClass
 from .activators import BlenderClickTrigger
+from .blender_backend import get_backend
+from .asset_cache import get_asset_cache
 import warnings
 try:
     import bpy
@@ -43,7 +45,10 @@ except ImportError:
 
 
 def generate_material_from_image(filename, double_sided=True):
-    """Generate Blender material from image for texturing"""
+    """Generate Blender material from image for texturing
+
+    The image is loaded through the asset cache, so that materials generated
+    from the same file share one image datablock."""
     material_name = bpy.path.display_name_from_filepath(filename)
     material = bpy.data.materials.new(name=material_name)
     texture_slot = material.texture_slots.add()
@@ -53,7 +58,8 @@ def generate_material_from_image(filename, double_sided=True):
     )
     #TODO: Get image directory
     image_texture = bpy.data.textures.new(name=texture_name, type="IMAGE")
-    image_texture.image = bpy.data.images.load(filename)
+    image_texture.image = get_asset_cache().load(
+        "image", filename, bpy.data.images.load)
     # NOTE: The above already raises a sensible RuntimeError if file is not
     # found
     image_texture.image.use_alpha = True
@@ -226,10 +232,34 @@ class W3DLink(W3DFeature):
 
 
 class W3DContent(W3DFeature, metaclass=SubRegisteredClass):
-    """Represents content of a W3D object"""
+    """Represents content of a W3D object
+
+    :cvar instanced: True if objects with equal content may share the mesh
+        data created by blend
+    """
 
     blender_scaling = 1
+    __slots__ = ()
     ui_order = []
+    instanced = False
+
+    def blend_instance(self):
+        """Create representation of content in Blender, as a linked
+        duplicate of any equal content blended earlier in this export
+
+        Content which is not instanced is blended anew each time. Only the
+        object is created for a linked duplicate, so that transforms and
+        colors may differ but all mesh data is shared."""
+        if not self.instanced:
+            return self.blend()
+        asset_cache = get_asset_cache()
+        mesh = asset_cache.get_instance(self)
+        if mesh is not None:
+            return get_backend().add_mesh_object(
+                type(self).__name__[3:], mesh)
+        blender_object = self.blend()
+        asset_cache.add_instance(self, blender_object.data)
+        return blender_object
 
     @staticmethod
     def fromXML(content_root):
@@ -263,7 +293,9 @@ class W3DText(W3DContent):
     :param str font: Name of font to be used
     :param float depth: Depth to extrude each letter
     """
+    __slots__ = ()
     ui_order = ["text", "halign", "depth", "font"]
+    instanced = True
     argument_validators = {
         "text": TextValidator(),
         "halign": OptionValidator(
@@ -340,7 +372,8 @@ class W3DText(W3DContent):
         new_text_object.data.body = self["text"]
         #TODO: Get proper font directory
         if self["font"] is not None:
-            new_text_object.data.font = bpy.data.fonts.load(self["font"])
+            new_text_object.data.font = get_asset_cache().load(
+                "font", self["font"], bpy.data.fonts.load)
         new_text_object.data.extrude = self["depth"]
         new_text_object.data.fill_mode = "BOTH"
         new_text_object.data.align = self["halign"].upper()
@@ -359,7 +392,9 @@ class W3DImage(W3DContent):
     """Represent a flat image in 3D space
 
     :param str filename: Filename of image to be displayed"""
+    __slots__ = ()
     ui_order=["filename"]
+    instanced = True
     argument_validators = {
         "filename": ValidFile()}
 
@@ -399,7 +434,8 @@ class W3DImage(W3DContent):
         bpy.ops.object.transform_apply(rotation=True)
         new_image_object = bpy.context.object
 
-        material = generate_material_from_image(self["filename"])
+        material = get_asset_cache().load(
+            "material", self["filename"], generate_material_from_image)
         material.use_nodes = False
         image = material.texture_slots[0].texture.image
 
@@ -420,6 +456,7 @@ class W3DStereoImage(W3DContent):
     :param str left_file: Filename of image to be displayed to left eye
     :param str right_file: Filename of image to be displayed to right eye
     """
+    __slots__ = ()
     ui_order=["left_file", "right_file"]
     argument_validators = {
         "left_file": ValidFile(help_string="Filename of left-eye image"),
@@ -472,7 +509,9 @@ class W3DModel(W3DContent):
     :param bool check_collisions: TODO Clarify what this does
     """
     #TODO: Does not seem to play nice with GLSL shader. FIX THIS.
+    __slots__ = ()
     ui_order=["filename"]
+    instanced = True
     argument_validators = {
         "filename": ValidFile(),
         "check_collisions": IsBoolean()}
@@ -518,7 +557,15 @@ class W3DModel(W3DContent):
             "W3DModel object")
 
     def blend(self):
-        """Create representation of W3DModel in Blender"""
+        """Create representation of W3DModel in Blender
+
+        Each file is imported only once per export. Later models from the
+        same file share the mesh of the first."""
+        asset_cache = get_asset_cache()
+        mesh = asset_cache.get("model", self["filename"])
+        if mesh is not None:
+            return get_backend().add_mesh_object(
+                bpy.path.display_name_from_filepath(self["filename"]), mesh)
         #TODO: Get proper directory
         bpy.ops.import_scene.obj(filepath=self["filename"])
         model_pieces = bpy.context.selected_objects
@@ -527,6 +574,10 @@ class W3DModel(W3DContent):
             bpy.ops.object.convert(target='MESH', keep_original=False)
         bpy.ops.object.join()
         new_model = bpy.context.object
+        asset_cache.add("model", self["filename"], new_model.data)
+        for material in new_model.data.materials:
+            if material is not None:
+                asset_cache.share(material)
         return new_model
 
 
@@ -543,6 +594,7 @@ class W3DLight(W3DContent):
     :param float angle: Angle in degrees specifying spread of spot light
     source
     """
+    __slots__ = ()
     ui_order = ["light_type", "diffuse", "specular", "angle", "attenuation"]
     argument_validators = {
         "light_type": OptionValidator("Point", "Directional", "Spot"),
@@ -620,13 +672,12 @@ class W3DLight(W3DContent):
         light_type_conversion = {
             "Point": "POINT", "Directional": "SUN", "Spot": "SPOT"
         }
-        bpy.ops.object.lamp_add(
-            type=light_type_conversion[self["light_type"]],
+        new_light_object = get_backend().add_lamp(
+            self["light_type"], light_type_conversion[self["light_type"]],
             rotation=(-math.pi/2, 0, 0)
         )
         # TODO: Why isn't the following working?
         # bpy.ops.object.transform_apply(rotation=True)
-        new_light_object = bpy.context.object
         new_light_object.data.use_diffuse = self["diffuse"]
         new_light_object.data.use_specular = self["specular"]
         new_light_object.data.energy = (
@@ -651,6 +702,7 @@ class W3DPSys(W3DContent):
     """Represents a particle system in virtual space
 
     NOT YET IMPLEMENTED AT ALL"""
+    __slots__ = ()
     # TODO: everything
 
 
@@ -672,8 +724,13 @@ class W3DObject(W3DFeature):
     W3DStereoImage, W3DModel, W3DLight, W3DPSys
     """
 
-    ui_order = ["name", "placement", "scale", "visible", "lighting", "color",
-            "click_through", "around_own_axis", "content"]
+    __slots__ = ()
+    ui_order = [
+        "name", "visible", "color", "lighting", "scale", "click_through",
+        "around_own_axis",
+        #"sound",
+        "placement", "link", "content"
+    ]
     #TODO: Add sound
     argument_validators = {
         "name": ValidPyString(),
@@ -706,15 +763,6 @@ class W3DObject(W3DFeature):
         "double_sided": True
         }
 
-    def __init__(self, *args, **kwargs):
-        super(W3DObject, self).__init__(*args, **kwargs)
-        self.ui_order = [
-            "name", "visible", "color", "lighting", "scale", "click_through",
-            "around_own_axis",
-            #"sound",
-            "placement", "link", "content"
-        ]
-
     def toXML(self, all_objects_root):
         """Store W3DObject as Object node within ObjectRoot node
 
@@ -800,7 +848,29 @@ class W3DObject(W3DFeature):
         return new_object
 
     def apply_material(self, blender_object):
-        """Apply properties of object to material for Blender object"""
+        """Apply properties of object to material for Blender object
+
+        Objects whose material or mesh is shared through the asset cache are
+        given the copy of the material shared by all objects with the same
+        lighting and sidedness."""
+        asset_cache = get_asset_cache()
+        settings = (self["lighting"], self["double_sided"])
+        if asset_cache.is_shared(blender_object.data):
+            if blender_object.active_material is None:
+                # The first object to show a shared mesh gives it the
+                # material which later objects are given copies of
+                blender_object.active_material = bpy.data.materials.new(
+                    generate_blender_material_name(self["name"]))
+            # Let each object choose its own materials for the shared mesh
+            for material_slot in blender_object.material_slots:
+                material = material_slot.material
+                material_slot.link = 'OBJECT'
+                material_slot.material = material
+                if material is not None:
+                    asset_cache.share(material)
+        if asset_cache.is_shared(blender_object.active_material):
+            blender_object.active_material = asset_cache.material_variant(
+                blender_object.active_material, settings)
         if blender_object.active_material is None:
             blender_object.active_material = bpy.data.materials.new(
                 generate_blender_material_name(self["name"]))
@@ -822,14 +892,19 @@ class W3DObject(W3DFeature):
         blender_object.color = color
         return blender_object
 
-    def blend(self):
-        """Create representation of W3DObject in Blender"""
-        blender_object = self["content"].blend()
+    def blend(self, place=True):
+        """Create representation of W3DObject in Blender
+
+        :param bool place: If False, leave the Blender object where it was
+        created, to be placed later (as by
+        :py:meth:`WorldTransforms.place_table`)"""
+        blender_object = self["content"].blend_instance()
         blender_object.name = generate_blender_object_name(self["name"])
         blender_object.hide_render = not self["visible"]
         blender_object.scale = [self["scale"], ] * 3
 
-        self["placement"].place(blender_object)
+        if place:
+            self["placement"].place(blender_object)
         #TODO: Apply link
         if self["link"] is not None:
             self["link"].blend(generate_blender_object_name(self["name"]))
@@ -18,11 +18,14 @@
 """Tools for working with placement of objects within W3D"""
 import xml.etree.ElementTree as ET
 import math
+from array import array
+from itertools import chain, repeat
 from .features import W3DFeature
 from .validators import OptionValidator, ListValidator, IsNumeric, \
     FeatureValidator
-from .errors import BadW3DXML, ConsistencyError
+from .errors import BadW3DXML, ConsistencyError, EBKAC
 from .xml_tools import text2tuple
+from .blender_backend import get_backend
 import warnings
 try:
     import bpy
@@ -32,13 +35,25 @@ except ImportError:
         "Module bpy not found. Loading pyw3d.objects as standalone")
 
 
+FEET_TO_METERS = 0.3048
+"""Length in meters of one legacy unit"""
+
+RELATIVE_TO = ("Center", "FrontWall", "LeftWall", "RightWall", "FloorWall")
+"""Walls to which positions may be relative, in the order of the codes
+stored in PlacementTable.relative_to"""
+ROTATION_MODES = ("None", "Axis", "LookAt", "Normal")
+"""Rotation modes, in the order of the codes stored in
+PlacementTable.rotation_modes"""
+
+
 def convert_to_blender_axes(vector):
     """Convert from legacy axis orientation and scale to Blender
 
     In Blender, positive z-axis points up"""
     if vector is None:
         return None
-    return list((vector[0]*0.3048, -vector[2]*0.3048, vector[1]*0.3048))
+    return list((vector[0]*FEET_TO_METERS, -vector[2]*FEET_TO_METERS,
+                 vector[1]*FEET_TO_METERS))
 
 
 def convert_to_legacy_axes(vector):
@@ -47,7 +62,8 @@ def convert_to_legacy_axes(vector):
     In Blender, positive z-axis points up"""
     if vector is None:
         return None
-    return list((vector[0]/0.3048, vector[2]/0.3048, -vector[1]/0.3048))
+    return list((vector[0]/FEET_TO_METERS, vector[2]/FEET_TO_METERS,
+                 -vector[1]/FEET_TO_METERS))
 
 
 def matrix_from_look(look_direction, up_direction=None):
@@ -65,13 +81,238 @@ def matrix_from_look(look_direction, up_direction=None):
     return rotation_matrix
 
 
+def _components(vectors):
+    """Return vectors as a flat array of doubles holding x, y, z of each
+    vector in turn
+
+    :raises EBKAC: If vectors is a flat array whose length is not a multiple
+    of three"""
+    if isinstance(vectors, array):
+        if len(vectors) % 3:
+            raise EBKAC(
+                "Flat array of {} components does not hold 3D vectors".format(
+                    len(vectors)))
+        if vectors.typecode == "d":
+            return vectors
+        return array("d", vectors)
+    return array("d", chain.from_iterable(vectors))
+
+
+def convert_to_blender_axes_batch(vectors):
+    """Convert many vectors from legacy axes to Blender axes at once
+
+    Gives the same result as convert_to_blender_axes applied to each vector.
+
+    :param vectors: Sequence of x, y, z vectors (such as a list of tuples or
+    an N x 3 NumPy array), or a flat array of doubles holding x, y, z of each
+    vector in turn
+    :returns: Flat array of doubles holding x, y, z of each converted vector
+    """
+    components = _components(vectors)
+    converted = array("d", components)
+    converted[0::3] = array(
+        "d", [x*FEET_TO_METERS for x in components[0::3]])
+    converted[1::3] = array(
+        "d", [-z*FEET_TO_METERS for z in components[2::3]])
+    converted[2::3] = array(
+        "d", [y*FEET_TO_METERS for y in components[1::3]])
+    return converted
+
+
+def convert_to_legacy_axes_batch(vectors):
+    """Convert many vectors from Blender axes to legacy axes at once
+
+    Gives the same result as convert_to_legacy_axes applied to each vector.
+
+    :param vectors: Vectors, as for convert_to_blender_axes_batch
+    :returns: Flat array of doubles holding x, y, z of each converted vector
+    """
+    components = _components(vectors)
+    converted = array("d", components)
+    converted[0::3] = array(
+        "d", [x/FEET_TO_METERS for x in components[0::3]])
+    converted[1::3] = array(
+        "d", [z/FEET_TO_METERS for z in components[2::3]])
+    converted[2::3] = array(
+        "d", [-y/FEET_TO_METERS for y in components[1::3]])
+    return converted
+
+
+def matrices_from_look(look_directions, up_directions=None):
+    """Create rotation matrices from many look-at directions at once
+
+    Gives the same matrices as matrix_from_look applied to each look
+    direction, without requiring mathutils. As there, directions are not
+    normalized.
+
+    :param look_directions: Look-at directions, as for
+    convert_to_blender_axes_batch
+    :param up_directions: Up direction for each look-at direction, or a
+    single up direction for all of them. Defaults to (0, 1, 0), as for
+    matrix_from_look
+    :returns: Flat array of doubles holding the nine elements of each matrix
+    in turn, row by row
+    :raises EBKAC: If there are neither as many up directions as look-at
+    directions nor a single one"""
+    looks = _components(look_directions)
+    num_matrices = len(looks) // 3
+    if up_directions is None:
+        up_directions = (0, 1, 0)
+    try:
+        ups = _components(up_directions)
+    except TypeError:  # A single up direction
+        ups = array("d", up_directions)
+    if len(ups) == 3:
+        up_x, up_y, up_z = (repeat(component) for component in ups)
+    elif len(ups) == len(looks):
+        up_x, up_y, up_z = ups[0::3], ups[1::3], ups[2::3]
+    else:
+        raise EBKAC(
+            "Cannot pair {} up directions with {} look-at directions".format(
+                len(ups) // 3, num_matrices))
+    look_x, look_y, look_z = looks[0::3], looks[1::3], looks[2::3]
+
+    # frame_x = look x up, frame_z = frame_x x look
+    frame_x = [
+        (l_y*u_z - l_z*u_y, l_z*u_x - l_x*u_z, l_x*u_y - l_y*u_x)
+        for l_x, l_y, l_z, u_x, u_y, u_z in zip(
+            look_x, look_y, look_z, up_x, up_y, up_z)]
+    frame_z = [
+        (x_y*l_z - x_z*l_y, x_z*l_x - x_x*l_z, x_x*l_y - x_y*l_x)
+        for (x_x, x_y, x_z), l_x, l_y, l_z in zip(
+            frame_x, look_x, look_y, look_z)]
+
+    # Frames are the columns of each matrix
+    matrices = array("d", bytes(72*num_matrices))
+    for axis in range(3):
+        matrices[3*axis::9] = array(
+            "d", [frame[axis] for frame in frame_x])
+        matrices[3*axis + 1::9] = (look_x, look_y, look_z)[axis]
+        matrices[3*axis + 2::9] = array(
+            "d", [frame[axis] for frame in frame_z])
+    return matrices
+
+
+def matrices_from_axis(angles, axes):
+    """Create rotation matrices from many angles and axes at once
+
+    Gives the same matrices as mathutils.Matrix.Rotation(angle, 3, axis)
+    for each angle and axis, without requiring mathutils. Axes are
+    normalized.
+
+    :param angles: Sequence of rotation angles in radians
+    :param axes: Rotation axis for each angle, as for
+    convert_to_blender_axes_batch
+    :returns: Flat array of doubles holding the nine elements of each matrix
+    in turn, row by row
+    :raises EBKAC: If there are not as many axes as angles"""
+    components = _components(axes)
+    if len(components) != 3*len(angles):
+        raise EBKAC("Cannot pair {} axes with {} angles".format(
+            len(components) // 3, len(angles)))
+    matrices = array("d")
+    for index, angle in enumerate(angles):
+        matrices.extend(_axis_matrix(
+            angle, *components[3*index:3*index + 3]))
+    return matrices
+
+
+EPSILON = 1e-12
+IDENTITY = (1., 0., 0., 0., 1., 0., 0., 0., 1.)
+"""Elements of the 3x3 identity matrix, row by row"""
+
+
+def _normalized(x, y, z):
+    """Return unit vector in direction of (x, y, z), or (x, y, z) itself if
+    it has no length, as Vector.normalized does"""
+    length = math.sqrt(x*x + y*y + z*z)
+    if length > EPSILON:
+        return x/length, y/length, z/length
+    return x, y, z
+
+
+def _axis_matrix(angle, x, y, z):
+    """Return elements of matrix for rotation by angle in radians about
+    axis, row by row"""
+    x, y, z = _normalized(x, y, z)
+    cosine = math.cos(angle)
+    sine = math.sin(angle)
+    one_minus = 1 - cosine
+    return (
+        cosine + x*x*one_minus, x*y*one_minus - z*sine,
+        x*z*one_minus + y*sine,
+        y*x*one_minus + z*sine, cosine + y*y*one_minus,
+        y*z*one_minus - x*sine,
+        z*x*one_minus - y*sine, z*y*one_minus + x*sine,
+        cosine + z*z*one_minus)
+
+
+def _multiplied(left, right):
+    """Return product of 3x3 matrices given by their elements, row by row"""
+    return tuple(
+        left[row]*right[column] + left[row + 1]*right[column + 3] +
+        left[row + 2]*right[column + 6]
+        for row in (0, 3, 6) for column in (0, 1, 2))
+
+
+def _transformed(matrix, vector):
+    """Return vector multiplied by 3x3 matrix given by its elements"""
+    return tuple(
+        matrix[row]*vector[0] + matrix[row + 1]*vector[1] +
+        matrix[row + 2]*vector[2]
+        for row in (0, 3, 6))
+
+
+def _euler_matrix(euler):
+    """Return elements of rotation matrix for XYZ Euler angles, as
+    Euler.to_matrix"""
+    x, y, z = euler
+    return _multiplied(
+        _multiplied(_axis_matrix(z, 0, 0, 1), _axis_matrix(y, 0, 1, 0)),
+        _axis_matrix(x, 1, 0, 0))
+
+
+def _matrix_euler(matrix):
+    """Return XYZ Euler angles for rotation matrix, as Matrix.to_euler"""
+    cos_y = math.hypot(matrix[0], matrix[3])
+    if cos_y > 16*EPSILON:
+        return (
+            math.atan2(matrix[7], matrix[8]),
+            math.atan2(-matrix[6], cos_y),
+            math.atan2(matrix[3], matrix[0]))
+    return (
+        math.atan2(-matrix[5], matrix[4]),
+        math.atan2(-matrix[6], cos_y),
+        0.)
+
+
+def _difference_matrix(start, end):
+    """Return elements of matrix rotating start onto end, as
+    Vector.rotation_difference(end).to_matrix()"""
+    start = _normalized(*start)
+    end = _normalized(*end)
+    axis = (
+        start[1]*end[2] - start[2]*end[1],
+        start[2]*end[0] - start[0]*end[2],
+        start[0]*end[1] - start[1]*end[0])
+    cosine = max(-1., min(1., sum(a*b for a, b in zip(start, end))))
+    if math.sqrt(sum(a*a for a in axis)) < EPSILON:
+        if cosine > 0:
+            return IDENTITY
+        # Antiparallel; rotate half a turn about any perpendicular axis
+        axis = (0., start[2], -start[1])
+        if math.sqrt(sum(a*a for a in axis)) < EPSILON:
+            axis = (-start[2], 0., start[0])
+    return _axis_matrix(math.acos(cosine), *axis)
+
+
 class W3DRotation(W3DFeature):
     """Stores data on rotation of objects within W3D"""
+    __slots__ = ()
     ui_order = [
         "rotation_mode", "rotation_vector", "up_vector", "rotation_angle"]
     argument_validators = {
-        "rotation_mode": OptionValidator(
-            "None", "Axis", "LookAt", "Normal"),
+        "rotation_mode": OptionValidator(*ROTATION_MODES),
         "rotation_vector": ListValidator(IsNumeric(), required_length=3),
         "up_vector": ListValidator(IsNumeric(), required_length=3),
         "rotation_angle": IsNumeric()}
@@ -174,11 +415,14 @@ class W3DPlacement(W3DFeature):
     :param tuple position: Tuple of three numbers specifying x, y, z position
     :param py:class:W3DRotation rotation: py:class:W3DRotation object
     specifying rotation
+
+    :cvar W3DRotation default_rotation: Rotation shared by all placements
+    whose rotation has not been set or accessed
     """
+    __slots__ = ()
     ui_order = ["position", "relative_to", "rotation"]
     argument_validators = {
-        "relative_to": OptionValidator(
-            "Center", "FrontWall", "LeftWall", "RightWall", "FloorWall"),
+        "relative_to": OptionValidator(*RELATIVE_TO),
         "position": ListValidator(
             IsNumeric(), required_length=3),
         "rotation": FeatureValidator(W3DRotation)}
@@ -186,17 +430,26 @@ class W3DPlacement(W3DFeature):
         "relative_to": "Center",
         "position": (0, 0, 0),
         }
-    relative_to_objects = {}
-    """Dictionary mapping names of relative_to options to Blender
-    representations
-
-    In default W3DWriting, these are simply the four walls, but this can be
-    overridden to provide additional functionality"""
-
     def __init__(self, *args, **kwargs):
         super(W3DPlacement, self).__init__(*args, **kwargs)
         if "rotation" not in self:
-            self["rotation"] = W3DRotation()
+            self["rotation"] = self.default_rotation
+
+    def __getitem__(self, key):
+        value = super(W3DPlacement, self).__getitem__(key)
+        if value is self.default_rotation:
+            # Copied on first access, since the caller may modify it
+            value = W3DRotation()
+            super(W3DPlacement, self).__setitem__(key, value)
+        return value
+
+    def peek(self, key):
+        return super(W3DPlacement, self).__getitem__(key)
+
+    def option_items(self):
+        return [
+            (key, value) for key, value in self.items()
+            if value is not self.default_rotation]
 
     def toXML(self, parent_root):
         place_root = ET.SubElement(parent_root, "Placement")
@@ -207,7 +460,7 @@ class W3DPlacement(W3DFeature):
             pos_root.text = str(tuple(
                 convert_to_legacy_axes(self["position"])))
         if not self.is_default("rotation"):
-            self["rotation"].toXML(place_root)
+            self.peek("rotation").toXML(place_root)
         return place_root
 
     @classmethod
@@ -227,52 +480,223 @@ class W3DPlacement(W3DFeature):
                 return placement
         return placement
 
-    #TODO: Deal with non-standard wall placements
-    def _create_relative_to_objects(
-            self,
-            wall_positions={
-                "Center": convert_to_blender_axes((0, 0, 0)),
-                "FrontWall": convert_to_blender_axes((0, 0, -4)),
-                "LeftWall": convert_to_blender_axes((-4, 0, 0)),
-                "RightWall": convert_to_blender_axes((4, 0, 0)),
-                "FloorWall": convert_to_blender_axes((0, 0, -4))},
-            wall_rotations={
-                "Center": (0, 0, 0),
-                "FrontWall": (0, 0, 0),
-                "LeftWall": (0, 0, math.pi/2),
-                "RightWall": (0, 0, -math.pi/2),
-                "FloorWall": (-math.pi/2, 0, 0)}
-            ):
-        """Create Blender objects corresponding to relative_to options if
-        necessary"""
-        if len(self.relative_to_objects) != len(
-                self.argument_validators["relative_to"].valid_options) - 1:
-            for wall_name, position in wall_positions.items():
-                bpy.ops.object.add(
-                    type="EMPTY",
-                    location=position,
-                    rotation=wall_rotations[wall_name],
-                    layers=[layer == 3 for layer in range(1, 21)]
-                )
-                self.relative_to_objects[wall_name] = bpy.context.object
-                self.relative_to_objects[wall_name].name = wall_name
-
-        return self.relative_to_objects
-
-    def place(self, blender_object):
+    def place(self, blender_object, world_transforms=None):
         """Place Blender object in specified position and orientation
+
+        :param WorldTransforms world_transforms: Transforms of the walls to
+        which the placement may be relative. If None, the walls are placed
+        as standard (see :py:func:`standard_wall_placements`).
         """
-        self._create_relative_to_objects()
-        relative_object = self.relative_to_objects[self["relative_to"]]
-
-        position = self["position"]
-        position = [
-            position[i] + relative_object.location[i]
-            for i in range(len(position))
-        ]
+        if world_transforms is None:
+            world_transforms = WorldTransforms.standard()
         blender_object.layers = [layer == 1 for layer in range(1, 21)]
-
-        blender_object.location = position
-        blender_object.rotation_euler.rotate(relative_object.rotation_euler)
-        self["rotation"].rotate(blender_object)
+        world_transforms.place(self, blender_object)
         return blender_object
+
+
+W3DRotation().share(W3DPlacement, "default_rotation")
+
+
+def standard_wall_placements():
+    """Return dictionary mapping the name of each wall to a new W3DPlacement
+    of that wall as in a standard W3D
+
+    The front, left and right walls and the floor stand four (legacy) feet
+    from the center, facing it. Each wall is oriented so that an unrotated
+    object placed relative to it faces away from it."""
+    placements = {"Center": W3DPlacement(
+        position=convert_to_blender_axes((0, 0, 0)),
+        rotation=W3DRotation(
+            rotation_mode="Axis",
+            rotation_vector=convert_to_blender_axes((0, 1, 0)),
+            rotation_angle=0))}
+    for wall, position, up_vector in (
+            ("FrontWall", (0, 0, -4), (0, 1, 0)),
+            ("LeftWall", (-4, 0, 0), (0, 1, 0)),
+            ("RightWall", (4, 0, 0), (0, 1, 0)),
+            ("FloorWall", (0, -4, 0), (0, 0, -1))):
+        placements[wall] = W3DPlacement(
+            position=convert_to_blender_axes(position),
+            rotation=W3DRotation(
+                rotation_mode="LookAt",
+                rotation_vector=convert_to_blender_axes((0, 0, 0)),
+                up_vector=convert_to_blender_axes(up_vector)))
+    return placements
+
+
+class WorldTransforms(object):
+    """Locations and orientations in world space of the walls to which W3D
+    objects are placed relative, from which objects are placed
+
+    Walls are resolved once, when the WorldTransforms is created. Each wall
+    is placed like an unrotated object, relative to the wall named by its
+    relative_to option, or to the origin if that is the wall itself. An
+    object placed relative to a wall is located at its position offset by
+    the wall's location, and oriented by its own rotation applied after that
+    of the wall.
+
+    If the up vector of a LookAt wall is parallel to the direction in which
+    it looks, as for the floor of a project saved without up vectors, the
+    wall is oriented with its up vector pointing toward the front wall.
+
+    :param dict wall_placements: Dictionary mapping names of walls to their
+    W3DPlacements, as the wall_placements of a W3DProject. Walls not given
+    are placed as standard (see :py:func:`standard_wall_placements`).
+    :raises ConsistencyError: If walls are placed relative to one another in
+    a cycle
+
+    :ivar dict wall_locations: Dictionary mapping names of walls to x, y, z
+    of their locations
+    :ivar dict wall_rotations: Dictionary mapping names of walls to the nine
+    elements, row by row, of their rotation matrices
+    :ivar dict wall_objects: Dictionary mapping names of walls to the Blender
+    empties marking them, once created by :py:meth:`create_wall_objects`
+    """
+    fallback_up_vector = tuple(convert_to_blender_axes((0, 0, -1)))
+    _standard = None
+
+    def __init__(self, wall_placements=None):
+        placements = standard_wall_placements()
+        if wall_placements is not None:
+            placements.update(wall_placements)
+        self.wall_locations = {}
+        self.wall_rotations = {}
+        self.wall_objects = {}
+        for wall in placements:
+            self._resolve_wall(wall, placements, ())
+
+    @classmethod
+    def standard(transforms_class):
+        """Return WorldTransforms of the standard walls, created once"""
+        if transforms_class._standard is None:
+            transforms_class._standard = transforms_class()
+        return transforms_class._standard
+
+    def _resolve_wall(self, wall, placements, pending):
+        """Compute location and rotation of wall, after those of the wall to
+        which it is relative
+
+        :param tuple pending: Walls whose placements depend on this one"""
+        if wall in self.wall_locations:
+            return
+        if wall in pending:
+            raise ConsistencyError(
+                "Walls {} are placed relative to one another".format(
+                    ", ".join(pending)))
+        placement = placements[wall]
+        parent = placement["relative_to"]
+        if parent == wall:
+            parent_location = (0., 0., 0.)
+            parent_rotation = IDENTITY
+        else:
+            self._resolve_wall(parent, placements, pending + (wall,))
+            parent_location = self.wall_locations[parent]
+            parent_rotation = self.wall_rotations[parent]
+        location = tuple(
+            component + offset for component, offset in zip(
+                placement["position"], parent_location))
+        self.wall_locations[wall] = location
+        self.wall_rotations[wall] = self._rotation(
+            placement.peek("rotation"), location, parent_rotation,
+            fallback_up_vector=self.fallback_up_vector)
+
+    @staticmethod
+    def _rotation(rotation, location, base, fallback_up_vector=None):
+        """Return elements of rotation matrix of an object at location and
+        with orientation base, once rotated by rotation, as W3DRotation.rotate
+
+        :param tuple fallback_up_vector: Up vector for a LookAt rotation
+        whose up vector is parallel to the direction it looks, or None to
+        use the given up vector regardless"""
+        mode = rotation["rotation_mode"]
+        if mode == "None":
+            return base
+        vector = rotation["rotation_vector"]
+        if vector is None:
+            raise ConsistencyError(
+                "{} rotation *must* specify rotation_vector".format(mode))
+        if mode == "Axis":
+            own = _axis_matrix(
+                math.radians(rotation["rotation_angle"]), *vector)
+        elif mode == "LookAt":
+            look = _normalized(*(
+                component - target for component, target in zip(
+                    location, vector)))
+            own = tuple(matrices_from_look(
+                [look], _normalized(*rotation["up_vector"])))
+            if (fallback_up_vector is not None and
+                    math.sqrt(own[0]**2 + own[3]**2 + own[6]**2) < EPSILON):
+                own = tuple(matrices_from_look(
+                    [look], _normalized(*fallback_up_vector)))
+        else:  # Normal
+            own = _difference_matrix(vector, _transformed(base, (1, 0, 0)))
+        return _multiplied(own, base)
+
+    def create_wall_objects(self):
+        """Create a Blender empty marking each wall, on layer 3
+
+        :returns: wall_objects"""
+        backend = get_backend()
+        for wall, location in self.wall_locations.items():
+            self.wall_objects[wall] = backend.add_empty(
+                wall, [layer == 3 for layer in range(1, 21)],
+                location=location,
+                rotation=_matrix_euler(self.wall_rotations[wall]))
+        return self.wall_objects
+
+    def place(self, placement, blender_object):
+        """Set location and rotation of Blender object as given by placement
+
+        The object's rotation before it is placed is applied first.
+
+        :param W3DPlacement placement: The placement
+        :param blender_object: The Blender object"""
+        wall = placement["relative_to"]
+        location = tuple(
+            component + offset for component, offset in zip(
+                placement["position"], self.wall_locations[wall]))
+        rotation = self._rotation(
+            placement.peek("rotation"), location, _multiplied(
+                self.wall_rotations[wall],
+                _euler_matrix(blender_object.rotation_euler)))
+        blender_object.location = location
+        blender_object.rotation_euler = _matrix_euler(rotation)
+
+    def place_table(self, table, blender_objects):
+        """Place each of blender_objects as given by the corresponding row of
+        a PlacementTable, computing locations and rotation matrices for all
+        rows at once and then setting each object's location and rotation
+
+        The same as :py:meth:`place` for each row, with the object's rotation
+        before it is placed applied first.
+
+        :param PlacementTable table: Placements of the objects
+        :param blender_objects: Sequence of Blender objects, one for each row
+        of table
+        :raises EBKAC: If there are not as many objects as rows"""
+        if len(blender_objects) != len(table):
+            raise EBKAC("Cannot place {} objects with {} placements".format(
+                len(blender_objects), len(table)))
+        locations = table.world_locations(self.wall_locations)
+        matrices = table.rotation_matrices(locations)
+        wall_rotations = [
+            self.wall_rotations[wall] for wall in RELATIVE_TO]
+        none_code = ROTATION_MODES.index("None")
+        normal_code = ROTATION_MODES.index("Normal")
+        for index, blender_object in enumerate(blender_objects):
+            start = 3*index
+            base = _multiplied(
+                wall_rotations[table.relative_to[index]],
+                _euler_matrix(blender_object.rotation_euler))
+            mode = table.rotation_modes[index]
+            if mode == none_code:
+                rotation = base
+            elif mode == normal_code:
+                rotation = _multiplied(_difference_matrix(
+                    table.rotation_vectors[start:start + 3],
+                    _transformed(base, (1, 0, 0))), base)
+            else:
+                rotation = _multiplied(
+                    matrices[9*index:9*index + 9], base)
+            blender_object.location = tuple(locations[start:start + 3])
+            blender_object.rotation_euler = _matrix_euler(rotation)
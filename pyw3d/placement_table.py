@@ -0,0 +1,358 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Placements of many objects stored as columns, for bulk transforms
+
+A :py:class:`PlacementTable` holds the placement and scale of each of a
+list of objects as one row of a set of columns. Vectors are stored as
+consecutive x, y, z triples in arrays of doubles, and other values in
+arrays of their own, so that an operation on every object (converting
+axes, offsetting by walls, computing rotation matrices) runs over the
+columns at once rather than over nested W3DPlacement and W3DRotation
+features. The arrays support the buffer protocol, so they may be viewed
+without copying by libraries such as NumPy.
+
+A table is built from the objects of a project
+(:py:meth:`W3DProject.placement_table`), and any changes made to it are
+written back with :py:meth:`PlacementTable.store`. Individual rows may be
+read and modified through :py:class:`PlacementRow` views.
+"""
+import math
+from array import array
+from .placement import W3DPlacement, W3DRotation, RELATIVE_TO, \
+    ROTATION_MODES, IDENTITY, convert_to_blender_axes_batch, \
+    convert_to_legacy_axes_batch, matrices_from_axis, matrices_from_look, \
+    _normalized
+from .errors import EBKAC, ConsistencyError
+
+_RELATIVE_TO_CODES = {name: code for code, name in enumerate(RELATIVE_TO)}
+_ROTATION_MODE_CODES = {
+    name: code for code, name in enumerate(ROTATION_MODES)}
+_NO_VECTOR = (float("nan"),)*3
+
+
+class PlacementTable(object):
+    """Placements and scales of a list of objects, stored by column
+
+    Vectors are in Blender axes, as in W3DPlacement, unless converted with
+    :py:meth:`convert_to_legacy_axes`.
+
+    :ivar array positions: x, y, z of the position of each row
+    :ivar array relative_to: Index in RELATIVE_TO of the wall to which
+    each position is relative
+    :ivar array rotation_modes: Index in ROTATION_MODES of the rotation mode
+    of each row
+    :ivar array rotation_vectors: x, y, z of the rotation vector of each
+    row, or NaN if it has none
+    :ivar array up_vectors: x, y, z of the up vector of each row
+    :ivar array rotation_angles: Rotation angle of each row in degrees
+    :ivar array scales: Scale of the object of each row
+    :ivar list names: Name of the object of each row, or None
+    """
+
+    def __init__(self):
+        self.positions = array("d")
+        self.relative_to = array("B")
+        self.rotation_modes = array("B")
+        self.rotation_vectors = array("d")
+        self.up_vectors = array("d")
+        self.rotation_angles = array("d")
+        self.scales = array("d")
+        self.names = []
+
+    def __len__(self):
+        return len(self.scales)
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError("PlacementTable row out of range")
+        return PlacementRow(self, index % len(self))
+
+    def __iter__(self):
+        return (PlacementRow(self, index) for index in range(len(self)))
+
+    def append(self, placement, scale=1, name=None):
+        """Add row for placement and return its index
+
+        :param W3DPlacement placement: The placement to store
+        :param float scale: Scale of the placed object
+        :param str name: Name of the placed object"""
+        rotation = placement.peek("rotation")
+        self.positions.extend(placement["position"])
+        self.relative_to.append(_RELATIVE_TO_CODES[placement["relative_to"]])
+        self.rotation_modes.append(
+            _ROTATION_MODE_CODES[rotation["rotation_mode"]])
+        rotation_vector = rotation["rotation_vector"]
+        self.rotation_vectors.extend(
+            _NO_VECTOR if rotation_vector is None else rotation_vector)
+        self.up_vectors.extend(rotation["up_vector"])
+        self.rotation_angles.append(rotation["rotation_angle"])
+        self.scales.append(scale)
+        self.names.append(name)
+        return len(self) - 1
+
+    @classmethod
+    def from_objects(table_class, objects):
+        """Create table with a row for the placement and scale of each of
+        objects
+
+        :param objects: Sequence of W3DObjects"""
+        table = table_class()
+        for w3d_object in objects:
+            table.append(
+                w3d_object["placement"], scale=w3d_object["scale"],
+                name=w3d_object["name"])
+        return table
+
+    def store(self, objects):
+        """Write each row back to the corresponding one of objects
+
+        Only options whose values differ from those in the table are set,
+        so that objects whose rows are unchanged are left untouched.
+
+        :param objects: Sequence of W3DObjects from which the table was
+        created
+        :raises EBKAC: If objects has a different number of objects than
+        the table has rows"""
+        if len(objects) != len(self):
+            raise EBKAC(
+                "Cannot store {} placements in {} objects".format(
+                    len(self), len(objects)))
+        for index, w3d_object in enumerate(objects):
+            self._store_row(index, w3d_object)
+
+    def _store_row(self, index, w3d_object):
+        """Set placement and scale of w3d_object to those of row index,
+        setting only options whose values differ"""
+        start = 3*index
+        placement = w3d_object["placement"]
+        relative_to = RELATIVE_TO[self.relative_to[index]]
+        if placement["relative_to"] != relative_to:
+            placement["relative_to"] = relative_to
+        position = tuple(self.positions[start:start + 3])
+        if tuple(placement["position"]) != position:
+            placement["position"] = position
+        rotation_vector = tuple(self.rotation_vectors[start:start + 3])
+        if math.isnan(rotation_vector[0]):
+            rotation_vector = None
+        rotation = placement.peek("rotation")
+        for key, value, is_vector in (
+                ("rotation_mode",
+                 ROTATION_MODES[self.rotation_modes[index]], False),
+                ("rotation_vector", rotation_vector, True),
+                ("up_vector", tuple(self.up_vectors[start:start + 3]), True),
+                ("rotation_angle", self.rotation_angles[index], False)):
+            current = rotation[key]
+            if is_vector and current is not None:
+                current = tuple(current)
+            if current != value:
+                # Takes the placement's own copy of a shared rotation
+                rotation = placement["rotation"]
+                rotation[key] = value
+        if w3d_object["scale"] != self.scales[index]:
+            w3d_object["scale"] = self.scales[index]
+
+    def convert_to_blender_axes(self):
+        """Convert all vectors in table from legacy axes to Blender axes (see
+        :py:func:`pyw3d.placement.convert_to_blender_axes`)"""
+        for column in (self.positions, self.rotation_vectors, self.up_vectors):
+            column[:] = convert_to_blender_axes_batch(column)
+
+    def convert_to_legacy_axes(self):
+        """Convert all vectors in table from Blender axes to legacy axes (see
+        :py:func:`pyw3d.placement.convert_to_legacy_axes`)"""
+        for column in (self.positions, self.rotation_vectors, self.up_vectors):
+            column[:] = convert_to_legacy_axes_batch(column)
+
+    def world_locations(self, wall_locations):
+        """Return array of x, y, z of each row's position offset by the
+        location of the wall to which it is relative
+
+        :param dict wall_locations: Dictionary mapping each of RELATIVE_TO to
+        the location of that wall"""
+        offsets = [
+            tuple(wall_locations[name]) for name in RELATIVE_TO]
+        locations = array("d", self.positions)
+        for index, code in enumerate(self.relative_to):
+            offset = offsets[code]
+            start = 3*index
+            locations[start] += offset[0]
+            locations[start + 1] += offset[1]
+            locations[start + 2] += offset[2]
+        return locations
+
+    def rotation_matrices(self, locations):
+        """Return array of the nine elements, by row, of the rotation matrix
+        of each row, as :py:meth:`W3DRotation.get_rotation_matrix` computes
+        for an object at the given location
+
+        Rows without rotation have the identity matrix. Rotations in Normal
+        mode depend on the orientation of the object before it is rotated,
+        which the table does not hold, so that their matrices are NaN.
+
+        :param locations: x, y, z of the location of each row's object, as
+        returned by :py:meth:`world_locations`
+        :raises ConsistencyError: If an Axis or LookAt rotation has no rotation
+        vector"""
+        matrices = array("d", IDENTITY)*len(self)
+        vectors = self.rotation_vectors
+        up_vectors = self.up_vectors
+        axis_code = _ROTATION_MODE_CODES["Axis"]
+        look_code = _ROTATION_MODE_CODES["LookAt"]
+        normal_code = _ROTATION_MODE_CODES["Normal"]
+        axis_rows = []
+        angles = []
+        axes = array("d")
+        look_rows = []
+        looks = array("d")
+        ups = array("d")
+        for index, mode in enumerate(self.rotation_modes):
+            start = 3*index
+            if mode == normal_code:
+                matrices[3*start:3*start + 9] = array("d", _NO_VECTOR*3)
+            elif mode == axis_code or mode == look_code:
+                vector = vectors[start:start + 3]
+                if math.isnan(vector[0]):
+                    raise ConsistencyError(
+                        "{} rotation of row {} has no rotation vector".format(
+                            ROTATION_MODES[mode], index))
+                if mode == axis_code:
+                    axis_rows.append(index)
+                    angles.append(math.radians(self.rotation_angles[index]))
+                    axes.extend(vector)
+                else:
+                    look_rows.append(index)
+                    looks.extend(_normalized(
+                        locations[start] - vector[0],
+                        locations[start + 1] - vector[1],
+                        locations[start + 2] - vector[2]))
+                    ups.extend(_normalized(*up_vectors[start:start + 3]))
+        for rows, batch in (
+                (axis_rows, matrices_from_axis(angles, axes)),
+                (look_rows, matrices_from_look(looks, ups))):
+            for batch_index, index in enumerate(rows):
+                matrices[9*index:9*index + 9] = batch[
+                    9*batch_index:9*batch_index + 9]
+        return matrices
+
+
+def _vector_property(column_name, doc):
+    def getter(self):
+        start = 3*self.index
+        vector = tuple(getattr(self.table, column_name)[start:start + 3])
+        if math.isnan(vector[0]):
+            return None
+        return vector
+
+    def setter(self, vector):
+        start = 3*self.index
+        getattr(self.table, column_name)[start:start + 3] = array(
+            "d", _NO_VECTOR if vector is None else vector)
+    return property(getter, setter, doc=doc)
+
+
+def _scalar_property(column_name, doc):
+    def getter(self):
+        return getattr(self.table, column_name)[self.index]
+
+    def setter(self, value):
+        getattr(self.table, column_name)[self.index] = value
+    return property(getter, setter, doc=doc)
+
+
+def _code_property(column_name, names, codes, doc):
+    def getter(self):
+        return names[getattr(self.table, column_name)[self.index]]
+
+    def setter(self, name):
+        getattr(self.table, column_name)[self.index] = codes[name]
+    return property(getter, setter, doc=doc)
+
+
+class PlacementRow(object):
+    """View of one row of a PlacementTable
+
+    Reading an attribute reads the table, and setting it changes the
+    table.
+
+    :param PlacementTable table: The table
+    :param int index: Index of the row"""
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    position = _vector_property("positions", "Position as x, y, z")
+    relative_to = _code_property(
+        "relative_to", RELATIVE_TO, _RELATIVE_TO_CODES,
+        "Wall to which position is relative")
+    rotation_mode = _code_property(
+        "rotation_modes", ROTATION_MODES, _ROTATION_MODE_CODES,
+        "Rotation mode")
+    rotation_vector = _vector_property(
+        "rotation_vectors", "Rotation vector as x, y, z, or None")
+    up_vector = _vector_property("up_vectors", "Up vector as x, y, z")
+    rotation_angle = _scalar_property(
+        "rotation_angles", "Rotation angle in degrees")
+    scale = _scalar_property("scales", "Scale of object")
+
+    @property
+    def name(self):
+        """Name of the object of this row, or None"""
+        return self.table.names[self.index]
+
+    def rotation(self):
+        """Return W3DRotation with the rotation of this row
+
+        Options are set only where they differ from their defaults."""
+        options = []
+        for key, value in (
+                ("rotation_mode", self.rotation_mode),
+                ("rotation_vector", self.rotation_vector),
+                ("up_vector", self.up_vector),
+                ("rotation_angle", self.rotation_angle)):
+            if value != _default_value(W3DRotation, key):
+                options.append((key, value))
+        return W3DRotation(*options)
+
+    def placement(self):
+        """Return new W3DPlacement with the placement of this row
+
+        Options are set only where they differ from their defaults."""
+        placement = W3DPlacement()
+        if self.relative_to != W3DPlacement.default_arguments["relative_to"]:
+            placement["relative_to"] = self.relative_to
+        if self.position != _default_value(W3DPlacement, "position"):
+            placement["position"] = self.position
+        rotation = self.rotation()
+        if len(rotation):
+            placement["rotation"] = rotation
+        return placement
+
+    def store(self, w3d_object):
+        """Set placement and scale of w3d_object to those of this row,
+        setting only options whose values differ"""
+        self.table._store_row(self.index, w3d_object)
+
+
+def _default_value(feature_class, key):
+    """Return default of option as stored in a table"""
+    value = feature_class.default_arguments[key]
+    if isinstance(value, list):
+        return tuple(value)
+    return value
@@ -18,22 +18,34 @@
 """Tools for working with W3D projects
 """
 import xml.etree.ElementTree as ET
-import xml.dom.minidom as minidom
 import warnings
 import math
 import os
+import io
 from .features import W3DFeature
-from .placement import W3DPlacement, W3DRotation, convert_to_blender_axes
+from .placement import W3DPlacement, convert_to_blender_axes, \
+    standard_wall_placements, WorldTransforms
 from .validators import ListValidator, IsNumeric, OptionValidator,\
     IsBoolean, FeatureValidator, IsInteger, DictValidator
-from .xml_tools import bool2text, text2tuple, attrib2bool
+from .xml_tools import bool2text, text2tuple, attrib2bool, \
+    PrettyXMLWriter
 from .objects import W3DObject
 from .sounds import W3DSound
 from .timeline import W3DTimeline
 from .groups import W3DGroup
 from .triggers import W3DTrigger
-from .errors import BadW3DXML
-from .blender_scripts import MOUSE_LOOK_SCRIPT, MOVE_TOGGLE_SCRIPT
+from .activators import BlenderPositionTrigger, \
+    BlenderObjectPositionTrigger, BlenderRegionIndex, BlenderLookAtTrigger, \
+    BlenderLookIndex
+from .errors import BadW3DXML, BadW3DBinary
+from .structs import VersionedList
+from . import binary_format
+from .placement_table import PlacementTable
+from .blender_backend import get_backend, set_backend
+from .asset_cache import AssetCache, set_asset_cache
+from .export_manifest import ExportManifest, FEATURE_LISTS, datablock_names
+from .blender_scripts import MOUSE_LOOK_SCRIPT, MOVE_TOGGLE_SCRIPT, \
+    RUNTIME_SCRIPT, PROFILER_SCRIPT
 try:
     import bpy
 except ImportError:
@@ -41,10 +53,15 @@ except ImportError:
         "Module bpy not found. Loading pyw3d.objects as standalone")
 
 
-def clear_blender_scene():
-    for obj in bpy.context.scene.objects:
-        obj.select = True
-    bpy.ops.object.delete()
+def clear_blender_scene(keep=()):
+    get_backend().clear_scene(keep=keep)
+
+
+def clear_blender_texts(keep=()):
+    """Remove all text blocks except those named in keep"""
+    for text in list(bpy.data.texts):
+        if text.name not in keep:
+            bpy.data.texts.remove(text)
 
 
 def setup_blender_layout():
@@ -67,29 +84,12 @@ def add_key_movement(
     :param str key: Key used to activate motion
     :param int direction: 0, 1, 2 for x, y, z
     :param float speed: Speed of motion"""
-    bpy.context.scene.objects.active = blender_object
-    bpy.ops.logic.sensor_add(
-        type="KEYBOARD",
-        object=blender_object.name,
-        name=move_name
-    )
-    blender_object.game.sensors[-1].name = move_name
-    sensor = blender_object.game.sensors[move_name]
+    backend = get_backend()
+    sensor = backend.add_sensor(blender_object, "KEYBOARD", move_name)
     sensor.key = key
-    bpy.ops.logic.controller_add(
-        type='LOGIC_AND',
-        object=blender_object.name,
-        name=move_name
-    )
-    blender_object.game.controllers[-1].name = move_name
-    controller = blender_object.game.controllers[move_name]
-    bpy.ops.logic.actuator_add(
-        type="MOTION",
-        object=blender_object.name,
-        name=move_name
-    )
-    blender_object.game.actuators[-1].name = move_name
-    actuator = blender_object.game.actuators[move_name]
+    controller = backend.add_controller(
+        blender_object, "LOGIC_AND", move_name)
+    actuator = backend.add_actuator(blender_object, "MOTION", move_name)
     actuator.mode = "OBJECT_NORMAL"
     actuator.offset_location[direction] = speed
     actuator.use_local_location = True
@@ -172,7 +172,13 @@ class W3DProject(W3DFeature):
         "allow_rotation": False
         }
 
+    indexed_keys = (
+        "objects", "groups", "timelines", "sounds", "trigger_events")
+    """Keys of lists of named features, which are stored as VersionedLists
+    so that an index of their names can be maintained"""
+
     def __init__(self, *args, **kwargs):
+        self._name_indices = {}
         super(W3DProject, self).__init__(*args, **kwargs)
         if "objects" not in self:
             self["objects"] = []
@@ -190,72 +196,84 @@ class W3DProject(W3DFeature):
         if "desktop_camera_placement" not in self:
             self["desktop_camera_placement"] = W3DPlacement(
                 position=convert_to_blender_axes((0, 0, 0)))
-        # NOTE: This currently does nothing. Need to call
-        # _create_relative_to_objects for W3DPlacement in order to change
-        # placements
         if "wall_placements" not in self:
-            self["wall_placements"] = {
-                "Center": W3DPlacement(
-                    position=convert_to_blender_axes((0, 0, 0)),
-                    rotation=W3DRotation(
-                        rotation_mode="Axis",
-                        rotation_vector=convert_to_blender_axes((0, 1, 0)),
-                        rotation_angle=0
-                    )
-                ),
-                "FrontWall": W3DPlacement(
-                    position=convert_to_blender_axes((0, 0, -4)),
-                    rotation=W3DRotation(
-                        rotation_mode="LookAt",
-                        rotation_vector=convert_to_blender_axes((0, 0, 0)),
-                        up_vector=convert_to_blender_axes((0, 1, 0))
-                    )
-                ),
-                "LeftWall": W3DPlacement(
-                    position=convert_to_blender_axes((-4, 0, 0)),
-                    rotation=W3DRotation(
-                        rotation_mode="LookAt",
-                        rotation_vector=convert_to_blender_axes((0, 0, 0)),
-                        up_vector=convert_to_blender_axes((0, 1, 0))
-                    )
-                ),
-                "RightWall": W3DPlacement(
-                    position=convert_to_blender_axes((4, 0, 0)),
-                    rotation=W3DRotation(
-                        rotation_mode="LookAt",
-                        rotation_vector=convert_to_blender_axes((0, 0, 0)),
-                        up_vector=convert_to_blender_axes((0, 1, 0))
-                    )
-                ),
-                "FloorWall": W3DPlacement(
-                    position=convert_to_blender_axes((0, -4, 0)),
-                    rotation=W3DRotation(
-                        rotation_mode="LookAt",
-                        rotation_vector=convert_to_blender_axes((0, 0, 0)),
-                        up_vector=convert_to_blender_axes((0, 1, 0))
-                    )
-                )
-            }
+            self["wall_placements"] = standard_wall_placements()
+
+    section_tags = (
+        ("ObjectRoot", "Object", "objects", W3DObject),
+        ("GroupRoot", "Group", "groups", W3DGroup),
+        ("TimelineRoot", "Timeline", "timelines", W3DTimeline),
+        ("SoundRoot", "Sound", "sounds", W3DSound),
+        ("EventRoot", "EventTrigger", "trigger_events", W3DTrigger)
+    )
+    """Tuple of (section tag, child tag, project key, feature class) for each
+    list of features stored in a W3D story"""
+
+    def __setitem__(self, key, value):
+        # NOTE: Plain lists are copied into a VersionedList, so later changes
+        # must be made through the project rather than the original list
+        if key in self.indexed_keys and type(value) is list:
+            value = VersionedList(value)
+        super(W3DProject, self).__setitem__(key, value)
+
+    def name_index(self, key, refresh=False):
+        """Return set of names of features in the list stored under key
+
+        The index is cached and rebuilt only if the list has been modified
+        (through any means, including ProjectPath.insert_index_element and
+        remove_index_element) or any feature has been renamed since it was
+        built.
+
+        :param str key: One of indexed_keys
+        :param bool refresh: If True, rebuild index regardless of whether it
+        appears to be up to date. Since a feature which is given a name for the
+        first time after being added to a list does not mark the index as
+        stale, this should be used to confirm that a name is absent.
+        :rtype: frozenset
+        """
+        features = self[key]
+        try:
+            name_indices = self._name_indices
+        except AttributeError:  # e.g. unpickled from older version
+            name_indices = self._name_indices = {}
+        state = (
+            getattr(features, "version", None), len(features),
+            W3DFeature._rename_count)
+        try:
+            cached_features, cached_state, names = name_indices[key]
+            if not refresh and cached_features is features and \
+                    cached_state == state:
+                return names
+        except KeyError:
+            pass
+        names = set()
+        for feature in features:
+            try:
+                names.add(feature["name"])
+            except KeyError:  # Name not yet set
+                pass
+        names = frozenset(names)
+        name_indices[key] = (features, state, names)
+        return names
 
     def toXML(self):
         """Store W3DProject as W3D XML tree
         """
         project_root = ET.Element("Story", attrib={"version": "8"})
-        object_root = ET.SubElement(project_root, "ObjectRoot")
-        for object_ in self["objects"]:
-            object_.toXML(object_root)
-        group_root = ET.SubElement(project_root, "GroupRoot")
-        for group in self["groups"]:
-            group.toXML(group_root)
-        timeline_root = ET.SubElement(project_root, "TimelineRoot")
-        for timeline in self["timelines"]:
-            timeline.toXML(timeline_root)
-        sound_root = ET.SubElement(project_root, "SoundRoot")
-        for sound in self["sounds"]:
-            sound.toXML(sound_root)
-        event_root = ET.SubElement(project_root, "EventRoot")
-        for trigger in self["trigger_events"]:
-            trigger.toXML(event_root)
+        for section_tag, child_tag, key, feature_class in self.section_tags:
+            section_root = ET.SubElement(project_root, section_tag)
+            for feature in self[key]:
+                feature.toXML(section_root)
+        self._global_toXML(project_root)
+        self._walls_toXML(project_root)
+        return project_root
+
+    def _global_toXML(self, project_root):
+        """Store camera, background and navigation options as Global node of
+        W3D XML
+
+        :param :py:class:xml.etree.ElementTree.Element project_root
+        """
         global_node = ET.SubElement(project_root, "Global")
         # CameraPos corresponds to position when run in Cave mode
         # CaveCameraPos corresponds to position when run in Desktop mode
@@ -275,12 +293,18 @@ class W3DProject(W3DFeature):
             "allow-movement": bool2text(self["allow_movement"])
             }
         )
+        return global_node
+
+    def _walls_toXML(self, project_root):
+        """Store wall placements as PlacementRoot node of W3D XML
+
+        :param :py:class:xml.etree.ElementTree.Element project_root
+        """
         wall_root = ET.SubElement(project_root, "PlacementRoot")
         for wall, placement in self["wall_placements"].items():
             place_root = placement.toXML(wall_root)
             place_root.attrib["name"] = wall
-
-        return project_root
+        return wall_root
 
     @classmethod
     def fromXML(project_class, project_root):
@@ -289,57 +313,52 @@ class W3DProject(W3DFeature):
         :param :py:class:xml.etree.ElementTree.Element project_root
         """
         new_project = project_class()
-        object_root = project_root.find("ObjectRoot")
-        if object_root is not None:
-            for child in object_root.findall("Object"):
-                new_project["objects"].append(W3DObject.fromXML(child))
-        group_root = project_root.find("GroupRoot")
-        if group_root is not None:
-            for child in group_root.findall("Group"):
-                new_project["groups"].append(W3DGroup.fromXML(child))
-        timeline_root = project_root.find("TimelineRoot")
-        if timeline_root is not None:
-            for child in timeline_root.findall("Timeline"):
-                new_project["timelines"].append(W3DTimeline.fromXML(child))
-        sound_root = project_root.find("SoundRoot")
-        if sound_root is not None:
-            for child in sound_root.findall("Sound"):
-                new_project["sounds"].append(W3DSound.fromXML(child))
-        trigger_root = project_root.find("EventRoot")
-        if trigger_root is not None:
-            for child in trigger_root.findall("EventTrigger"):
-                new_project["trigger_events"].append(W3DTrigger.fromXML(child))
+        for section_tag, child_tag, key, feature_class in \
+                project_class.section_tags:
+            section_root = project_root.find(section_tag)
+            if section_root is not None:
+                for child in section_root.findall(child_tag):
+                    new_project[key].append(feature_class.fromXML(child))
 
         global_root = project_root.find("Global")
         if global_root is None:
             raise BadW3DXML("Story root has no Global node")
+        new_project._global_fromXML(global_root)
 
+        new_project._walls_fromXML(project_root.find("PlacementRoot"))
+        return new_project
+
+    def _global_fromXML(self, global_root):
+        """Set camera, background and navigation options from Global node of
+        W3D XML
+
+        :param :py:class:xml.etree.ElementTree.Element global_root
+        """
         camera_node = global_root.find("CaveCameraPos")
         if camera_node is None:
             raise BadW3DXML("Global node has no CaveCameraPos child")
         if "far-clip" in camera_node.attrib:
-            new_project["far_clip"] = float(camera_node.attrib["far-clip"])
+            self["far_clip"] = float(camera_node.attrib["far-clip"])
         place_node = camera_node.find("Placement")
         if camera_node is None:
             raise BadW3DXML("CameraPos node has no Placement child")
-        new_project["desktop_camera_placement"] = W3DPlacement.fromXML(
-            place_node)
+        self["desktop_camera_placement"] = W3DPlacement.fromXML(place_node)
 
         camera_node = global_root.find("CameraPos")
         if camera_node is None:
             raise BadW3DXML("Global node has no CameraPos child")
         if "far-clip" in camera_node.attrib:
-            new_project["far_clip"] = float(camera_node.attrib["far-clip"])
+            self["far_clip"] = float(camera_node.attrib["far-clip"])
         place_node = camera_node.find("Placement")
         if camera_node is None:
             raise BadW3DXML("CameraPos node has no Placement child")
-        new_project["camera_placement"] = W3DPlacement.fromXML(place_node)
+        self["camera_placement"] = W3DPlacement.fromXML(place_node)
 
         bg_node = global_root.find("Background")
         if bg_node is None:
             raise BadW3DXML("Global node has no Background child")
         if "color" in bg_node.attrib:
-            new_project["background"] = text2tuple(
+            self["background"] = text2tuple(
                 bg_node.attrib["color"],
                 evaluator=int
             )
@@ -347,44 +366,168 @@ class W3DProject(W3DFeature):
         wand_node = global_root.find("WandNavigation")
         if wand_node is None:
             raise BadW3DXML("Global node has no WandNavigation child")
-        new_project["allow_rotation"] = attrib2bool(
+        self["allow_rotation"] = attrib2bool(
             wand_node, "allow-rotation", default=False)
-        new_project["allow_movement"] = attrib2bool(
+        self["allow_movement"] = attrib2bool(
             wand_node, "allow-movement", default=False)
 
-        wall_root = project_root.find("PlacementRoot")
+    def _walls_fromXML(self, wall_root):
+        """Set wall placements from PlacementRoot node of W3D XML
+
+        :param :py:class:xml.etree.ElementTree.Element wall_root
+        """
         for placement in wall_root.findall("Placement"):
             try:
                 wall_name = placement.attrib["name"]
             except KeyError:
                 raise BadW3DXML(
                     "Placements within PlacementRoot must specify name")
-            new_project["wall_placements"][
-                wall_name] = W3DPlacement.fromXML(placement)
+            self["wall_placements"][wall_name] = W3DPlacement.fromXML(
+                placement)
+
+    @classmethod
+    def fromXML_stream(project_class, source):
+        """Create W3DProject by incrementally parsing W3D XML
+
+        Unlike fromXML, the full document tree is never held in memory. Each
+        Object, Group, Timeline, Sound and EventTrigger is converted to a
+        feature as soon as its closing tag is parsed, after which its XML
+        element is discarded. The resulting project is identical to that
+        produced by fromXML.
+
+        :param source: Filename or file object containing W3D XML
+        """
+        new_project = project_class()
+        sections = {
+            section_tag: (child_tag, key, feature_class)
+            for section_tag, child_tag, key, feature_class in
+            project_class.section_tags
+        }
+        seen_tags = set()
+        first_section = False
+        global_found = False
+        open_elements = []
+        for event, element in ET.iterparse(source, events=("start", "end")):
+            if event == "start":
+                if len(open_elements) == 1:
+                    # As with find in fromXML, only the first section with a
+                    # given tag is used
+                    first_section = element.tag not in seen_tags
+                    seen_tags.add(element.tag)
+                open_elements.append(element)
+                continue
+
+            open_elements.pop()
+            depth = len(open_elements)
+            if depth == 2:
+                section_root = open_elements[1]
+                if section_root.tag in sections:
+                    child_tag, key, feature_class = sections[section_root.tag]
+                    if first_section and element.tag == child_tag:
+                        new_project[key].append(
+                            feature_class.fromXML(element))
+                    section_root.remove(element)
+            elif depth == 1:
+                if first_section:
+                    if element.tag == "Global":
+                        new_project._global_fromXML(element)
+                        global_found = True
+                    elif element.tag == "PlacementRoot":
+                        new_project._walls_fromXML(element)
+                open_elements[0].remove(element)
+
+        if not global_found:
+            raise BadW3DXML("Story root has no Global node")
         return new_project
 
     @classmethod
-    def fromXML_file(project_class, filename):
+    def fromXML_file(project_class, filename, trusted=False):
         """Create W3DProject from XML file of given filename
 
+        The file is parsed incrementally with fromXML_stream, so that memory
+        use is bounded by the size of the resulting project rather than that
+        of the XML document.
+
         :param str filename: Filename of XML file for project
+        :param bool trusted: If True, skip validation of individual values
+        while loading (see W3DFeature.deferred_validation). The returned
+        project's validate method may be called to check it afterwards.
         """
         os.chdir(os.path.dirname(filename))  # For relative paths...
-        return project_class.fromXML(ET.parse(filename).getroot())
+        if trusted:
+            with W3DFeature.deferred_validation():
+                return project_class.fromXML_stream(filename)
+        return project_class.fromXML_stream(filename)
+
+    def write_XML(self, file_):
+        """Write W3DProject as indented W3D XML to file object
+
+        Features are converted to XML and written one at a time, so the XML
+        tree for the full project is never held in memory.
+
+        :param file_: File object to write to
+        """
+        writer = PrettyXMLWriter(file_)
+        writer.write_header()
+        writer.start("Story", attrib={"version": "8"})
+        for section_tag, child_tag, key, feature_class in self.section_tags:
+            writer.start(section_tag)
+            for feature in self[key]:
+                section_root = ET.Element(section_tag)
+                feature.toXML(section_root)
+                for child in section_root:
+                    writer.write_element(child)
+            writer.end()
+        project_root = ET.Element("Story")
+        writer.write_element(self._global_toXML(project_root))
+        writer.write_element(self._walls_toXML(project_root))
+        writer.close()
 
     def toprettyxml(self):
-        tree = self.toXML()
-        xml_string = ET.tostring(tree, encoding="unicode")
-        xml_string = minidom.parseString(xml_string).toprettyxml()
-        # WARNING: Need to make sure that this doesn't miss up paragraphs of
-        # text
-        xml_string = "\n".join(
-            [line for line in xml_string.split("\n") if line.strip()])
-        return xml_string
+        """Return W3DProject as a string of indented W3D XML"""
+        xml_buffer = io.StringIO()
+        self.write_XML(xml_buffer)
+        return xml_buffer.getvalue()
 
     def save_XML(self, filename):
         with open(filename, "w") as file_:
-            file_.write(self.toprettyxml())
+            self.write_XML(file_)
+
+    @classmethod
+    def fromBinary_file(project_class, filename, lazy=True, trusted=False):
+        """Create W3DProject from W3D binary file of given filename
+
+        See :py:mod:`pyw3d.binary_format`. As with fromXML_file, the working
+        directory is changed to that of the file, against which relative
+        paths in the project are resolved.
+
+        :param str filename: Filename of binary file for project
+        :param bool lazy: Decode each list of features only when it is first
+        used
+        :param bool trusted: If True, skip validation of individual values
+        while loading (see W3DFeature.deferred_validation)
+        """
+        filename = os.path.abspath(filename)
+        os.chdir(os.path.dirname(filename))
+        new_project = binary_format.load(
+            filename, lazy=lazy, trusted=trusted)
+        if not isinstance(new_project, project_class):
+            raise BadW3DBinary("{} does not hold a {}".format(
+                filename, project_class.__name__))
+        return new_project
+
+    def save_binary(self, filename):
+        """Save W3DProject to file in W3D binary format (see
+        :py:mod:`pyw3d.binary_format`)"""
+        binary_format.save(self, filename)
+
+    def placement_table(self):
+        """Return PlacementTable of the placements and scales of all objects
+        in project, in order (see :py:mod:`pyw3d.placement_table`)
+
+        Changes to the table are written back with
+        ``table.store(project["objects"])``."""
+        return PlacementTable.from_objects(self["objects"])
 
     def sort_groups(self):
         """Sort groups such that no group contains a later group"""
@@ -401,52 +544,28 @@ class W3DProject(W3DFeature):
         self["groups"] = new_groups
 
     def setup_camera(self):
-        bpy.ops.object.camera_add(rotation=(math.pi/2, 0, 0))
-        bpy.data.cameras[-1].clip_end = self["far_clip"]
-        self.main_camera = bpy.context.object
-        self.main_camera.name = "CAMERA"
+        self.main_camera = get_backend().add_camera(
+            "CAMERA", rotation=(math.pi/2, 0, 0))
+        self.main_camera.data.clip_end = self["far_clip"]
         self.main_camera.layers = [layer == 1 for layer in range(1, 21)]
-        self["desktop_camera_placement"].place(self.main_camera)
+        self["desktop_camera_placement"].place(
+            self.main_camera, self.world_transforms)
         bpy.data.scenes['Scene'].camera = self.main_camera
 
     def setup_controls(self):
-        bpy.context.scene.objects.active = self.main_camera
+        backend = get_backend()
         # TODO: if self["allow_rotation"]:
-        bpy.ops.logic.sensor_add(
-            type="MOUSE",
-            object=self.main_camera.name,
-            name="Look"
-        )
-        self.main_camera.game.sensors[-1].name = "Look"
-        sensor = self.main_camera.game.sensors["Look"]
+        sensor = backend.add_sensor(self.main_camera, "MOUSE", "Look")
         sensor.mouse_event = "MOVEMENT"
-        bpy.ops.logic.controller_add(
-            type='PYTHON',
-            object=self.main_camera.name,
-            name="Look")
-        self.main_camera.game.controllers[-1].name = "Look"
-        controller = self.main_camera.game.controllers["Look"]
-        controller.mode = "MODULE"
-        controller.module = "mouse.look"
+        controller = backend.add_python_controller(
+            self.main_camera, "Look", "mouse.look")
         controller.link(sensor=sensor)
-        bpy.ops.logic.actuator_add(
-            type="MOTION",
-            object=self.main_camera.name,
-            name="Look_x"
-        )
-        self.main_camera.game.actuators[-1].name = "Look_x"
-        actuator = self.main_camera.game.actuators["Look_x"]
+        actuator = backend.add_actuator(self.main_camera, "MOTION", "Look_x")
         actuator.mode = "OBJECT_NORMAL"
         actuator.use_local_rotation = True
         controller.link(actuator=actuator)
 
-        bpy.ops.logic.actuator_add(
-            type="MOTION",
-            object=self.main_camera.name,
-            name="Look_y"
-        )
-        self.main_camera.game.actuators[-1].name = "Look_y"
-        actuator = self.main_camera.game.actuators["Look_y"]
+        actuator = backend.add_actuator(self.main_camera, "MOTION", "Look_y")
         actuator.mode = "OBJECT_NORMAL"
         actuator.use_local_rotation = False
         controller.link(actuator=actuator)
@@ -465,28 +584,14 @@ class W3DProject(W3DFeature):
             add_key_movement(self.main_camera, "Right", "D", 0, 0.15)
 
     def add_move_toggle(self):
-        bpy.context.scene.objects.active = self.main_camera
-        bpy.ops.logic.controller_add(
-            type='PYTHON',
-            object=self.main_camera.name,
-            name="move_toggle")
-        self.main_camera.game.controllers[-1].name = "move_toggle"
-        controller = self.main_camera.game.controllers["move_toggle"]
-        controller.mode = "MODULE"
-        controller.module = "move.move_toggle"
-
-        bpy.ops.object.game_property_new(
-            type="BOOL",
-            name="toggle_movement"
-        )
-        self.main_camera.game.properties["toggle_movement"].value = False
-        bpy.ops.logic.sensor_add(
-            type="KEYBOARD",
-            object=self.main_camera.name,
-            name="toggle_movement"
-        )
-        self.main_camera.game.sensors[-1].name = "toggle_movement"
-        sensor = self.main_camera.game.sensors["toggle_movement"]
+        backend = get_backend()
+        controller = backend.add_python_controller(
+            self.main_camera, "move_toggle", "move.move_toggle")
+
+        backend.add_game_property(
+            self.main_camera, "BOOL", "toggle_movement", False)
+        sensor = backend.add_sensor(
+            self.main_camera, "KEYBOARD", "toggle_movement")
         sensor.key = "TAB"
 
         bpy.data.texts.new("move.py")
@@ -495,9 +600,168 @@ class W3DProject(W3DFeature):
 
         controller.link(sensor=sensor)
 
-    def blend(self):
-        """Create representation of W3DProject in Blender"""
-        clear_blender_scene()
+    def setup_transition_engine(self):
+        """Create the object whose controller advances the transitions of all
+        game objects once per tick
+
+        Actions register continuous changes of position, rotation, color, and
+        scale with the transition engine of the w3d_runtime text block, which
+        is run by this object."""
+        backend = get_backend()
+        engine_object = backend.add_empty(
+            "transition_engine", [layer == 20 for layer in range(1, 21)])
+        sensor = backend.add_sensor(engine_object, "ALWAYS", "tick")
+        sensor.use_pulse_true_level = True
+
+        controller = backend.add_python_controller(
+            engine_object, "advance", "w3d_runtime.advance_transitions")
+        controller.link(sensor=sensor)
+        return engine_object
+
+    def setup_profiler(self):
+        """Instrument every Python controller with the timing hooks of the
+        w3d_profiler text block
+
+        Each function called by a controller in module mode is replaced by a
+        wrapper which records its calls and running time. An object on layer
+        20 closes the record of each tick. While the game runs, the slowest
+        controllers are shown in an overlay. When it exits, a profile is
+        saved as w3d_profile.json and w3d_profile.csv next to the .blend
+        file.
+
+        This must be called after all game logic has been written."""
+        entry_points = set()
+        for blender_object in bpy.data.objects:
+            for controller in blender_object.game.controllers:
+                if controller.type == "PYTHON" and controller.mode == "MODULE":
+                    entry_points.add(controller.module)
+        modules = {}
+        for entry_point in sorted(entry_points):
+            module_name, function_name = entry_point.rsplit(".", 1)
+            modules.setdefault(module_name, []).append(function_name)
+        for module_name, function_names in modules.items():
+            script = bpy.data.texts["{}.py".format(module_name)]
+            script.write("\n".join(
+                ["", "from w3d_profiler import profiled as _profiled"] + [
+                    "{0} = _profiled('{1}.{0}', {0})".format(
+                        function_name, module_name)
+                    for function_name in function_names] + [""]))
+        bpy.data.texts.new("w3d_profiler.py")
+        bpy.data.texts["w3d_profiler.py"].write(PROFILER_SCRIPT)
+
+        backend = get_backend()
+        profiler_object = backend.add_empty(
+            "profiler", [layer == 20 for layer in range(1, 21)])
+        sensor = backend.add_sensor(profiler_object, "ALWAYS", "tick")
+        sensor.use_pulse_true_level = True
+
+        controller = backend.add_python_controller(
+            profiler_object, "end_tick", "w3d_profiler.end_tick")
+        controller.link(sensor=sensor)
+        return profiler_object
+
+    def blend_region_index(self):
+        """Create a single BlenderRegionIndex to detect events for all
+        position triggers, after those triggers have been blended
+
+        :returns: The BlenderRegionIndex, or None if there are no position
+        triggers"""
+        position_triggers = [
+            trigger.activator for trigger in self["trigger_events"]
+            if isinstance(trigger.activator, (
+                BlenderPositionTrigger, BlenderObjectPositionTrigger))
+        ]
+        if not position_triggers:
+            return None
+        region_index = BlenderRegionIndex(position_triggers)
+        region_index.create_blender_objects()
+        return region_index
+
+    def blend_look_index(self):
+        """Create a single BlenderLookIndex on the camera to detect events
+        for all triggers based on where the user is looking, after those
+        triggers have been blended
+
+        :returns: The BlenderLookIndex, or None if there are no such
+        triggers"""
+        look_triggers = [
+            trigger.activator for trigger in self["trigger_events"]
+            if isinstance(trigger.activator, BlenderLookAtTrigger)
+        ]
+        if not look_triggers:
+            return None
+        look_index = BlenderLookIndex(look_triggers)
+        look_index.create_blender_objects()
+        return look_index
+
+    def blend(self, profile=False, backend=None, incremental=False):
+        """Create representation of W3DProject in Blender
+
+        :param bool profile: If True, instrument game logic with timing hooks
+        (see :py:meth:`setup_profiler`). Otherwise, game logic is left
+        untouched.
+        :param BlenderBackend backend: Backend through which to construct
+        objects and logic bricks (see :py:mod:`pyw3d.blender_backend`). If
+        None, the current backend is used.
+        :param bool incremental: If True, update the scene left by an
+        earlier export of this project, keeping the Blender objects and
+        scripts of every object, timeline, and trigger which has not changed
+        since (see :py:mod:`pyw3d.export_manifest`). Otherwise, the scene is
+        built from scratch.
+
+        Images, fonts, materials, and models loaded from files are shared
+        through a new :py:class:`AssetCache`, which is kept as asset_cache
+        to report its hit rate. Walls are resolved from wall_placements
+        once, into the :py:class:`WorldTransforms` kept as world_transforms,
+        and every object is then placed in a single pass. The names of the
+        features which were kept by
+        an incremental export are stored in kept_features, a dictionary
+        mapping names of lists of the project to sets of names."""
+        if backend is None:
+            self._blend(profile, incremental)
+            return
+        previous_backend = set_backend(backend)
+        try:
+            self._blend(profile, incremental)
+        finally:
+            set_backend(previous_backend)
+
+    def _blend(self, profile, incremental):
+        self.asset_cache = AssetCache()
+        set_asset_cache(self.asset_cache)
+        manifest = ExportManifest.from_project(self, profile=profile)
+        if incremental:
+            kept = manifest.unchanged(ExportManifest.read())
+            kept_objects = set()
+            kept_texts = set()
+            for list_name in FEATURE_LISTS:
+                for feature in self[list_name]:
+                    if feature["name"] in kept[list_name]:
+                        object_names, text_names = datablock_names(
+                            list_name, feature)
+                        kept_objects.update(object_names)
+                        kept_texts.update(text_names)
+            clear_blender_scene(keep=kept_objects)
+            clear_blender_texts(keep=kept_texts)
+        else:
+            kept = manifest.unchanged(None)
+            clear_blender_scene()
+        self.kept_features = kept
+        self.world_transforms = WorldTransforms(self["wall_placements"])
+        self.world_transforms.create_wall_objects()
+        objects = [
+            object_ for object_ in self["objects"]
+            if object_["name"] not in kept["objects"]]
+        timelines = [
+            timeline for timeline in self["timelines"]
+            if timeline["name"] not in kept["timelines"]]
+        triggers = []
+        for trigger in self["trigger_events"]:
+            if trigger["name"] in kept["trigger_events"]:
+                # Kept triggers are still needed by the trigger indices
+                trigger.activator = trigger.create_activator()
+            else:
+                triggers.append(trigger)
         bpy.data.scenes["Scene"].game_settings.physics_gravity = 0
         bpy.data.scenes["Scene"].game_settings.material_mode = "MULTITEXTURE"
         bpy.data.scenes["Scene"].layers = [
@@ -506,6 +770,8 @@ class W3DProject(W3DFeature):
         self.setup_controls()
         self.sort_groups()
         bpy.data.texts.new("group_defs.py")
+        bpy.data.texts.new("w3d_runtime.py")
+        bpy.data.texts["w3d_runtime.py"].write(RUNTIME_SCRIPT)
         bpy.data.worlds["World"].horizon_color = self["background"]
         #bpy.data.worlds["World"].ambient_color = self["background"]
 
@@ -514,32 +780,47 @@ class W3DProject(W3DFeature):
             group.blend_objects()
         for group in self["groups"]:
             group.blend_groups()
-        for object_ in self["objects"]:
-            object_.blend()
+        blender_objects = [object_.blend(place=False) for object_ in objects]
+        self.world_transforms.place_table(
+            PlacementTable.from_objects(objects), blender_objects)
         # TODO: Call methods to add links
         for sound in self["sounds"]:
             sound.blend()
 
         # Create Activators
-        for timeline in self["timelines"]:
+        for timeline in timelines:
             timeline.blend()
-        for trigger in self["trigger_events"]:
+        for trigger in triggers:
             trigger.blend()
+        region_index = self.blend_region_index()
+        look_index = self.blend_look_index()
         # Link game engine logic bricks for Activators
-        for timeline in self["timelines"]:
+        for timeline in timelines:
             timeline.link_blender_logic()
-        for object_ in self["objects"]:
+        for object_ in objects:
             if object_["link"] is not None:
                 object_["link"].link_blender_logic()
-        for trigger in self["trigger_events"]:
+        for trigger in triggers:
             trigger.link_blender_logic()
+        if region_index is not None:
+            region_index.link_logic_bricks()
+        if look_index is not None:
+            look_index.link_logic_bricks()
         # Write any necessary game engine logic for Activators
-        for timeline in self["timelines"]:
+        for timeline in timelines:
             timeline.write_blender_logic()
-        for object_ in self["objects"]:
+        for object_ in objects:
             if object_["link"] is not None:
                 object_["link"].write_blender_logic()
-        for trigger in self["trigger_events"]:
+        for trigger in triggers:
             trigger.write_blender_logic()
+        if region_index is not None:
+            region_index.write_python_logic()
+        if look_index is not None:
+            look_index.write_python_logic()
+        self.setup_transition_engine()
+        if profile:
+            self.setup_profiler()
+        manifest.write()
         setup_blender_layout()
         bpy.ops.file.pack_all()
@@ -17,25 +17,46 @@
 
 """Non-feature data structures used by Writing3D
 """
-from collections import MutableSequence
+from bisect import bisect_right
+from collections.abc import MutableSequence
 
 
 class SortedList(MutableSequence):
     """A list that is guaranteed to remain sorted
 
-    :param init_list: Initial list of elements (not necessarily sorted)
+    The sort key of each element is computed once, when the element is added,
+    and cached. New elements are placed by binary search after any elements
+    with an equal key, so elements with equal keys remain in the order in
+    which they were added.
+
+    :param init_list: Initial list of elements (not necessarily sorted). This
+    list is copied rather than modified.
     :param sort_key: Key function for sorting"""
-    def __init__(self, init_list=[], sort_key=None):
+    def __init__(self, init_list=None, sort_key=None):
         self.sort_key = sort_key
-        self._data = init_list
+        if init_list is None:
+            self._data = []
+        else:
+            self._data = list(init_list)
+        self._keys = []
         self.sort()
 
+    def _key(self, item):
+        if self.sort_key is None:
+            return item
+        return self.sort_key(item)
+
     def __setitem__(self, index, value):
-        self._data.__setitem__(index, value)
-        self.sort()
+        if isinstance(index, slice):
+            self._data.__setitem__(index, value)
+            self.sort()
+        else:
+            del self[index]
+            self.add(value)
 
     def __delitem__(self, index):
         del self._data[index]
+        del self._keys[index]
 
     def __len__(self):
         return len(self._data)
@@ -43,31 +64,79 @@ class SortedList(MutableSequence):
     def __getitem__(self, index):
         return self._data[index]
 
+    def __iter__(self):
+        return iter(self._data)
+
+    def __reversed__(self):
+        return reversed(self._data)
+
+    def __repr__(self):
+        return "{}({!r})".format(self.__class__.__name__, self._data)
+
     def insert(self, index, new_item):
-        self._data.insert(index, new_item)
+        """Add new_item to list, maintaining proper ordering
+
+        The index is ignored, since the position of new_item is determined by
+        its sort key"""
+        self.add(new_item)
 
     def add(self, new_item):
         """Add new_item to list, maintaining proper ordering"""
-        for index, item in enumerate(self):
-            if self.sort_key is None:
-                if new_item < item:
-                    self._data.insert(index, new_item)
-                    return
-            else:
-                if self.sort_key(new_item) < self.sort_key(item):
-                    self._data.insert(index, new_item)
-                    return
-        self._data.insert(len(self), new_item)
+        key = self._key(new_item)
+        index = bisect_right(self._keys, key)
+        self._keys.insert(index, key)
+        self._data.insert(index, new_item)
 
     def sort(self):
-        self._data.sort(key=self.sort_key)
+        keys = [self._key(item) for item in self._data]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self._keys = [keys[i] for i in order]
+        self._data = [self._data[i] for i in order]
 
     def append(self, value):
         self.add(value)
 
     def extend(self, value_list):
-        for value in value_list:
-            self.add(value)
+        # Stable sorting places new values after existing values with equal
+        # keys, exactly as adding them one at a time would
+        self._data.extend(value_list)
+        self.sort()
 
     def reverse(self):
         raise NotImplementedError("Cannot reverse a SortedList")
+
+
+def _versioned(method_name):
+    """Return version of list method which increments the version of the
+    list it is called on"""
+    list_method = getattr(list, method_name)
+
+    def versioned_method(self, *args, **kwargs):
+        self.version += 1
+        return list_method(self, *args, **kwargs)
+    versioned_method.__name__ = method_name
+    versioned_method.__doc__ = list_method.__doc__
+    return versioned_method
+
+
+class VersionedList(list):
+    """A list which counts modifications made to it
+
+    Any operation which may modify the list increments its version, so that
+    data derived from its contents can be cheaply checked for staleness.
+
+    :ivar int version: Number of modifying operations performed on list"""
+    version = 0
+
+    __setitem__ = _versioned("__setitem__")
+    __delitem__ = _versioned("__delitem__")
+    __iadd__ = _versioned("__iadd__")
+    __imul__ = _versioned("__imul__")
+    append = _versioned("append")
+    extend = _versioned("extend")
+    insert = _versioned("insert")
+    pop = _versioned("pop")
+    remove = _versioned("remove")
+    clear = _versioned("clear")
+    sort = _versioned("sort")
+    reverse = _versioned("reverse")
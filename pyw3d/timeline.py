@@ -29,6 +29,14 @@ from .errors import EBKAC
 from .structs import SortedList
 
 
+def action_time(timed_action):
+    """Sort key for (start time, W3DAction) entries of a timeline
+
+    Actions which start at the same time are kept in the order in which they
+    were added."""
+    return timed_action[0]
+
+
 class W3DTimeline(W3DFeature):
     """Represent timeline for choreography of actions in the W3D
 
@@ -56,9 +64,10 @@ class W3DTimeline(W3DFeature):
     def __init__(self, *args, **kwargs):
         super(W3DTimeline, self).__init__(*args, **kwargs)
         if "actions" not in self:
-            self["actions"] = SortedList()
+            self["actions"] = SortedList(sort_key=action_time)
         else:
-            self["actions"] = SortedList(self["actions"])
+            self["actions"] = SortedList(
+                self["actions"], sort_key=action_time)
 
     def toXML(self, all_timelines_root):
         """Store W3DTimeline as Timeline node within TimelineRoot node
@@ -102,7 +111,7 @@ class W3DTimeline(W3DFeature):
                 raise BadW3DXML(
                     "TimedActions node must specify numeric seconds-time "
                     "attribute")
-            for child in timed_action.getchildren():
+            for child in timed_action:
                 new_timeline["actions"].add(
                     (action_time, W3DAction.fromXML(child)))
 
@@ -28,6 +28,7 @@ from .validators import IsNumeric, ListValidator, \
 from .errors import ConsistencyError, BadW3DXML, InvalidArgument, \
     EBKAC
 from .xml_tools import bool2text, text2tuple, text2bool
+from .names import generate_blender_object_name, generate_group_name
 from .activators import BlenderTrigger, BlenderPositionTrigger, \
     BlenderPointTrigger, BlenderDirectionTrigger, BlenderLookObjectTrigger, \
     BlenderObjectPositionTrigger
@@ -62,6 +63,20 @@ class W3DTrigger(W3DFeature):
             except KeyError:
                 raise not_found_error
 
+    def _collect_validation_errors(self, path, errors):
+        super(W3DTrigger, self)._collect_validation_errors(path, errors)
+        self.base_trigger._collect_validation_errors(path, errors)
+
+    def hashable(self, exclude=()):
+        return (
+            super(W3DTrigger, self).hashable(exclude=exclude) +
+            (self.base_trigger.hashable(exclude=exclude),))
+
+    def option_items(self):
+        return (
+            super(W3DTrigger, self).option_items() +
+            self.base_trigger.option_items())
+
     @staticmethod
     def fromXML(trigger_root):
         """Create W3DTrigger from EventTrigger node
@@ -77,13 +92,18 @@ class W3DTrigger(W3DFeature):
                 return trigger_class.fromXML(trigger_root)
         return BareTrigger.fromXML(trigger_root)
 
-    def blend(self):
-        """Create representation of W3DTrigger in Blender"""
-        self.activator = BlenderTrigger(
+    def create_activator(self):
+        """Return the activator which implements this W3DTrigger in Blender,
+        without creating any Blender objects"""
+        return BlenderTrigger(
             self["name"],
             self["actions"],
             enable_immediately=self["enabled"],
             remain_enabled=self["remain_enabled"])
+
+    def blend(self):
+        """Create representation of W3DTrigger in Blender"""
+        self.activator = self.create_activator()
         self.activator.create_blender_objects()
         return self.activator.base_object
 
@@ -172,7 +192,7 @@ class BareTrigger(W3DFeature):
             new_trigger["duration"] = float(trigger_root.attrib["duration"])
         action_root = trigger_root.find("Actions")
         if action_root is not None:
-            for child in action_root.getchildren():
+            for child in action_root:
                 new_trigger["actions"].append(W3DAction.fromXML(child))
         return new_trigger
 
@@ -335,16 +355,15 @@ class HeadPositionTrigger(HeadTrackTrigger):
             new_trigger["box"] = EventBox.fromXML(box_node)
         return new_trigger
 
-    def blend(self):
-        """Create representation of W3DTrigger in Blender"""
-        self.activator = BlenderPositionTrigger(
+    def create_activator(self):
+        """Return the activator which implements this W3DTrigger in Blender,
+        without creating any Blender objects"""
+        return BlenderPositionTrigger(
             self["name"],
             self["actions"],
             self["box"],
             enable_immediately=self["enabled"],
             remain_enabled=self["remain_enabled"])
-        self.activator.create_blender_objects()
-        return self.activator.base_object
 
 
 class LookAtPoint(HeadTrackTrigger):
@@ -399,16 +418,15 @@ class LookAtPoint(HeadTrackTrigger):
         new_trigger["angle"] = float(node.attrib["angle"])
         return new_trigger
 
-    def blend(self):
-        """Create representation of W3DTrigger in Blender"""
-        self.activator = BlenderPointTrigger(
+    def create_activator(self):
+        """Return the activator which implements this W3DTrigger in Blender,
+        without creating any Blender objects"""
+        return BlenderPointTrigger(
             self["name"],
             self["actions"],
             self["point"],
             enable_immediately=self["enabled"],
             remain_enabled=self["remain_enabled"])
-        self.activator.create_blender_objects()
-        return self.activator.base_object
 
 
 class LookAtDirection(HeadTrackTrigger):
@@ -465,16 +483,15 @@ class LookAtDirection(HeadTrackTrigger):
         new_trigger["angle"] = float(node.attrib["angle"])
         return new_trigger
 
-    def blend(self):
-        """Create representation of W3DTrigger in Blender"""
-        self.activator = BlenderDirectionTrigger(
+    def create_activator(self):
+        """Return the activator which implements this W3DTrigger in Blender,
+        without creating any Blender objects"""
+        return BlenderDirectionTrigger(
             self["name"],
             self["actions"],
             self["direction"],
             enable_immediately=self["enabled"],
             remain_enabled=self["remain_enabled"])
-        self.activator.create_blender_objects()
-        return self.activator.base_object
 
 
 class LookAtObject(HeadTrackTrigger):
@@ -525,16 +542,15 @@ class LookAtObject(HeadTrackTrigger):
         new_trigger["object"] = node.attrib["name"].strip()
         return new_trigger
 
-    def blend(self):
-        """Create representation of W3DTrigger in Blender"""
-        self.activator = BlenderLookObjectTrigger(
+    def create_activator(self):
+        """Return the activator which implements this W3DTrigger in Blender,
+        without creating any Blender objects"""
+        return BlenderLookObjectTrigger(
             self["name"],
             self["actions"],
             self["object"],
             enable_immediately=self["enabled"],
             remain_enabled=self["remain_enabled"])
-        self.activator.create_blender_objects()
-        return self.activator.base_object
 
 
 class MovementTrigger(W3DTrigger):
@@ -621,15 +637,16 @@ class MovementTrigger(W3DTrigger):
         new_trigger["box"] = EventBox.fromXML(node)
         return new_trigger
 
-    def blend(self):
-        """Create representation of W3DTrigger in Blender"""
+    def create_activator(self):
+        """Return the activator which implements this W3DTrigger in Blender,
+        without creating any Blender objects"""
         if self["type"] == "Single Object":
-            objects_string = "['{}']".format(self["object_name"])
+            objects_string = "['{}']".format(
+                generate_blender_object_name(self["object_name"]))
         else:
-            objects_string = self["object_name"]
-        if "All" in self["type"]:
-            detect_any = False
-        self.activator = BlenderObjectPositionTrigger(
+            objects_string = generate_group_name(self["object_name"])
+        detect_any = "All" not in self["type"]
+        return BlenderObjectPositionTrigger(
             self["name"],
             self["actions"],
             self["box"],
@@ -637,5 +654,3 @@ class MovementTrigger(W3DTrigger):
             enable_immediately=self["enabled"],
             remain_enabled=self["remain_enabled"],
             detect_any=detect_any)
-        self.activator.create_blender_objects()
-        return self.activator.base_object
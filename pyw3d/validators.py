@@ -26,6 +26,10 @@ from .path import ProjectPath, UnsetValueError
 PY_ID_REGEX = re.compile(r"^[A-Za-z0-9_]+$")
 
 
+def _always_valid(value):
+    return True
+
+
 class Validator(object):
     """Callable object for validating input
 
@@ -50,6 +54,22 @@ class Validator(object):
         """Attempt to coerce input to a valid value for this validator"""
         return value
 
+    def compile(self):
+        """Return a function of one argument which gives the same result as
+        calling this validator
+
+        Validator subclasses may define a _compile method returning a
+        specialized (faster) function. It is used only if the class defining
+        _compile also defines the __call__ in effect for this validator, so
+        that subclasses which change __call__ fall back to calling the
+        validator itself."""
+        for validator_class in type(self).__mro__:
+            if "__call__" in validator_class.__dict__:
+                if "_compile" in validator_class.__dict__:
+                    return validator_class.__dict__["_compile"](self)
+                break
+        return self.__call__
+
     def help(self):
         """Provide information on valid options for this validator"""
         return self.help_string
@@ -65,6 +85,9 @@ class TextValidator(Validator):
     def __call__(self, value):
         return True
 
+    def _compile(self):
+        return _always_valid
+
     def __repr__(self):
         return "{}()".format(super().__repr__())
 
@@ -85,6 +108,14 @@ class ValidPyString(Validator):
     def __call__(self, value):
         return bool(PY_ID_REGEX.match(str(value))) or not len(str(value))
 
+    def _compile(self):
+        match = PY_ID_REGEX.match
+
+        def valid_py_string(value):
+            value = str(value)
+            return bool(match(value)) or not len(value)
+        return valid_py_string
+
     def __repr__(self):
         return "{}()".format(super().__repr__())
 
@@ -132,6 +163,20 @@ class OptionValidator(Validator):
     def __call__(self, value):
         return value in self.valid_options
 
+    def _compile(self):
+        valid_options = self.valid_options
+        try:
+            option_set = frozenset(valid_options)
+        except TypeError:  # Unhashable options
+            return self.__call__
+
+        def valid_option(value):
+            try:
+                return value in option_set
+            except TypeError:  # Unhashable value
+                return value in valid_options
+        return valid_option
+
     def __repr__(self):
         return "{}{}".format(super().__repr__(), tuple(self.valid_menu_items))
 
@@ -195,6 +240,33 @@ class ListValidator(Validator):
                 return False
         return True
 
+    def _compile(self):
+        # NOTE: As in __call__, required_length is not enforced
+        if len(self.base_validators) != 1:
+            checks = [validator.compile() for validator in
+                      self.base_validators]
+            num_checks = len(checks)
+
+            def valid_list(iterable):
+                for i in range(len(iterable)):
+                    if not checks[i % num_checks](iterable[i]):
+                        return False
+                return True
+            return valid_list
+
+        base_validator = self.base_validators[0]
+        if type(base_validator) in (IsNumeric, IsInteger):
+            return base_validator._compile_sequence()
+
+        check = base_validator.compile()
+
+        def valid_list(iterable):
+            for i in range(len(iterable)):
+                if not check(iterable[i]):
+                    return False
+            return True
+        return valid_list
+
 
 class SortedListValidator(ListValidator):
     """Check if input is sorted iterable"""
@@ -245,6 +317,17 @@ class DictValidator(Validator):
                 return False
         return True
 
+    def _compile(self):
+        check_key = self.key_validator.compile()
+        check_value = self.value_validator.compile()
+
+        def valid_dict(dictionary):
+            for key, value in dictionary.items():
+                if not check_key(key) or not check_value(value):
+                    return False
+            return True
+        return valid_dict
+
 
 class ReferenceValidator(Validator):
     """OptionValidator populated with options specified in a W3DProject
@@ -272,12 +355,30 @@ class ReferenceValidator(Validator):
         return "{}<{}, {}>".format(
             super().__repr__(), self.ref_path, self.fallback_validator)
 
+    def _name_index(self, refresh=False):
+        """Return index of names available for reference if the project
+        provides one for the referenced element, else None"""
+        path = self.ref_path.path
+        if len(path) != 1:
+            return None
+        try:
+            return self.ref_path.project.name_index(path[0], refresh=refresh)
+        except (AttributeError, KeyError):
+            return None
+
     def __call__(self, value):
         if self.ref_path.project is None:
             warnings.warn("Cannot check relative reference to {}".format(
                 value))
             return self.fallback_validator(value)
-        return value in self.valid_options
+        name_index = self._name_index()
+        if name_index is None:
+            return value in self.valid_options
+        try:
+            return value in name_index or value in self._name_index(
+                refresh=True)
+        except TypeError:  # Unhashable value
+            return False
 
     def coerce(self, value):
         try:
@@ -297,22 +398,21 @@ class ReferenceValidator(Validator):
 
     @property
     def valid_menu_items(self):
-        menu = []
-        project_element = self.path.get_element()
-        for option in self.valid_options:
-            try:
-                menu.append(project_element[option]["name"])
-            except KeyError:
-                menu.append(str(project_element[option]))
+        return [str(option) for option in self.valid_options]
 
     @property
     def valid_options(self):
-        _valid_options = []
+        """Sorted list of names which may be referenced"""
+        name_index = self._name_index()
+        if name_index is not None:
+            return sorted(name_index)
+        _valid_options = set()
         for option in self.ref_path.get_element():
-            if option not in _valid_options:
-                _valid_options.append(option)
-        _valid_options.sort()
-        return _valid_options
+            try:
+                _valid_options.add(option["name"])
+            except (KeyError, TypeError):
+                _valid_options.add(option)
+        return sorted(_valid_options)
 
 
 class IsBoolean(OptionValidator):
@@ -332,6 +432,9 @@ class IsBoolean(OptionValidator):
     def __call__(self, value):
         return True
 
+    def _compile(self):
+        return _always_valid
+
 
 class IsNumeric(Validator):
     """Return true if value can be interpreted as a numeric type
@@ -375,6 +478,60 @@ class IsNumeric(Validator):
         except TypeError:
             return False
 
+    def _in_range(self):
+        """Return function checking if a float lies within the bounds of this
+        validator"""
+        min_value = self.min_value
+        max_value = self.max_value
+        if min_value is None and max_value is None:
+            return _always_valid
+        if max_value is None:
+            return lambda value: value >= min_value
+        if min_value is None:
+            return lambda value: value <= max_value
+        return lambda value: min_value <= value <= max_value
+
+    def _compile(self):
+        min_value = self.min_value
+        max_value = self.max_value
+        if min_value is None and max_value is None:
+            def is_numeric(value):
+                try:
+                    float(value)
+                except TypeError:
+                    return False
+                return True
+            return is_numeric
+
+        in_range = self._in_range()
+
+        def is_numeric(value):
+            try:
+                return in_range(float(value))
+            except TypeError:
+                return False
+        return is_numeric
+
+    def _compile_sequence(self):
+        """Return function checking every item of a sequence with this
+        validator, equivalent to compiling a ListValidator with this validator
+        as its only base validator"""
+        in_range = self._in_range()
+        check_integer = isinstance(self, IsInteger)
+
+        def all_numeric(iterable):
+            for i in range(len(iterable)):
+                value = iterable[i]
+                try:
+                    if not in_range(float(value)):
+                        return False
+                except TypeError:
+                    return False
+                if check_integer and value != int(value):
+                    return False
+            return True
+        return all_numeric
+
     def coerce(self, value):
         try:
             if value == int(value):
@@ -392,6 +549,15 @@ class IsInteger(IsNumeric):
             return False
         return value == int(value)
 
+    def _compile(self):
+        is_numeric = super(IsInteger, self)._compile()
+
+        def is_integer(value):
+            if not is_numeric(value):
+                return False
+            return value == int(value)
+        return is_integer
+
 
 class FeatureValidator(Validator):
     """Check if value is a W3DFeature of specified type"""
@@ -411,6 +577,13 @@ class FeatureValidator(Validator):
     def __call__(self, value):
         return isinstance(value, self.correct_class)
 
+    def _compile(self):
+        correct_class = self.correct_class
+
+        def is_feature(value):
+            return isinstance(value, correct_class)
+        return is_feature
+
     def coerce(self, value):
         return self.correct_class(**value)
 
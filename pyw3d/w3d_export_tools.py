@@ -28,7 +28,9 @@ with warnings.catch_warnings():
     warnings.simplefilter("ignore")
     from pyw3d import BLENDER_EXEC, BLENDER_PLAY
     from pyw3d import project
+    from pyw3d import binary_format
     from pyw3d import EXPORT_SCRIPT
+    from pyw3d.export_worker import get_export_worker
 
 
 def pickle_w3dproject(input_project, filename="run.p"):
@@ -42,29 +44,54 @@ def unpickle_w3dproject(filename="run.p"):
 
 
 def export_to_blender(
-        input_project, filename="run.blend", display=True, fullscreen=False):
+        input_project, filename="run.blend", display=True, fullscreen=False,
+        profile=False, persistent=True, incremental=False):
     """Save project as .blend file
 
     :param str filename: Name of .blend file to export to
     :param bool display: Display project in standalone player after export?
+    :param bool profile: Instrument game logic with timing hooks, which show
+    the slowest controllers in an overlay and save a profile next to the
+    .blend file on exit?
+    :param bool persistent: Outside of Blender, export through a Blender
+    process which is kept running for later exports (see
+    :py:func:`pyw3d.export_worker.get_export_worker`) rather than starting
+    a new one?
+    :param bool incremental: Only rebuild the features which have changed
+    since the export left in the scene, when run in Blender, or since the
+    last export to the same file by the persistent Blender process (see
+    :py:meth:`W3DProject.blend`)?
     """
     try:
         import bpy  # Check if we're in Blender environment
-        input_project.blend()
+        input_project.blend(profile=profile, incremental=incremental)
         if os.path.exists(filename):
             os.remove(filename)
         bpy.ops.wm.save_as_mainfile(filepath=filename)
     except ImportError:
-        pickle_w3dproject(input_project)
-        subprocess.call([
-            BLENDER_EXEC, "--background", "--python", EXPORT_SCRIPT, "--", "-f"
-            "pickle", "run.p", "-o", os.path.abspath(filename)]
-        )
+        if persistent:
+            get_export_worker().export(
+                input_project, filename=filename, profile=profile,
+                incremental=incremental)
+        else:
+            _export_in_new_process(input_project, filename, profile)
     if display:
         display_blender_output(
             filename=os.path.abspath(filename), fullscreen=fullscreen)
 
 
+def _export_in_new_process(input_project, filename, profile):
+    """Export project by saving it in W3D binary format and starting Blender
+    to run this script on the saved project"""
+    binary_format.save(input_project, "run.w3db")
+    export_call = [
+        BLENDER_EXEC, "--background", "--python", EXPORT_SCRIPT, "--", "-f",
+        "binary", "run.w3db", "-o", os.path.abspath(filename)]
+    if profile:
+        export_call.append("--profile")
+    subprocess.call(export_call)
+
+
 def display_blender_output(filename="run.blend", fullscreen=False):
     """Display exported project using blenderplayer"""
     blender_play_call = [BLENDER_PLAY]
@@ -82,7 +109,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("project_file")
     parser.add_argument(
-        "-f", "--filetype", default="xml", choices=["xml", "pickle"],
+        "-f", "--filetype", default="xml",
+        choices=["xml", "pickle", "binary"],
         help="input filetype")
     parser.add_argument(
         "-o", "--output", default="run.blend",
@@ -91,12 +119,18 @@ if __name__ == "__main__":
         "-d", "--display", default=False, action="store_true")
     parser.add_argument(
         "-s", "--fullscreen", default=False, action="store_true")
+    parser.add_argument(
+        "-p", "--profile", default=False, action="store_true",
+        help="instrument game logic with timing hooks")
     args = parser.parse_args(argv)
 
     if args.filetype == "xml":
         input_project = project.W3DProject.fromXML_file(args.project_file)
     elif args.filetype == "pickle":
         input_project = unpickle_w3dproject(args.project_file)
+    elif args.filetype == "binary":
+        input_project = project.W3DProject.fromBinary_file(
+            args.project_file, lazy=False)
     export_to_blender(
         input_project, filename=args.output, display=args.display,
-        fullscreen=args.fullscreen)
+        fullscreen=args.fullscreen, profile=args.profile)
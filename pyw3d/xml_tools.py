@@ -17,6 +17,7 @@
 
 """Convenience tools for working with W3D xml"""
 import re
+import sys
 from .errors import BadW3DXML
 
 
@@ -85,3 +86,152 @@ def find_xml_text(root, search):
         return search_root.text
     except AttributeError:
         return None
+
+
+def escape_pretty_xml(data):
+    """Escape character data in the same way as xml.dom.minidom"""
+    return data.replace("&", "&amp;").replace("<", "&lt;").replace(
+        "\"", "&quot;").replace(">", "&gt;")
+
+
+class PrettyXMLWriter(object):
+    """Write indented XML directly to a file object
+
+    Output is identical to that of serializing an ElementTree, pretty-printing
+    it with xml.dom.minidom's toprettyxml and then removing all lines which
+    contain only whitespace, but no intermediate copies of the document are
+    created. Elements may be written whole with write_element, or opened and
+    closed with start and end so that their children can be generated one at a
+    time.
+
+    :param file_: File object to write to
+    :param str indent: String used for each level of indentation
+    """
+
+    sort_attributes = sys.version_info < (3, 8)
+    """Before Python 3.8, both ElementTree and minidom sort attributes"""
+
+    def __init__(self, file_, indent="\t"):
+        self.file_ = file_
+        self.indent = indent
+        self._line = []
+        self._lines_written = False
+        # Stack of [tag, attrib, opened] for elements started but not ended
+        self._open_elements = []
+
+    def _write(self, data):
+        """Write data which may contain newlines"""
+        if "\n" in data:
+            lines = data.split("\n")
+            self._line.append(lines[0])
+            for line in lines[1:]:
+                self._newline()
+                self._line.append(line)
+        else:
+            self._line.append(data)
+
+    def _newline(self):
+        """End current line, dropping it if it contains only whitespace"""
+        line = "".join(self._line)
+        self._line = []
+        if line.strip():
+            if self._lines_written:
+                self.file_.write("\n")
+            self.file_.write(line)
+            self._lines_written = True
+
+    def _write_start_tag(self, tag, attrib, indent):
+        self._line.append("{}<{}".format(indent, tag))
+        if self.sort_attributes:
+            attrib_items = sorted(attrib.items())
+        else:
+            attrib_items = attrib.items()
+        for name, value in attrib_items:
+            self._line.append(' {}="'.format(name))
+            self._write(escape_pretty_xml(value))
+            self._line.append('"')
+
+    def _write_text(self, text, indent):
+        """Write text node on its own line"""
+        self._write_data(text, indent)
+        self._newline()
+
+    def _write_data(self, text, indent=""):
+        if "\r" in text:  # Line endings as normalized by an XML parser
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        self._write(escape_pretty_xml(indent + text))
+
+    def _open_parent(self):
+        """Ensure that start tag of innermost started element is written"""
+        if self._open_elements and not self._open_elements[-1][2]:
+            tag, attrib, opened = self._open_elements[-1]
+            self._write_start_tag(
+                tag, attrib, self.indent*(len(self._open_elements) - 1))
+            self._line.append(">")
+            self._newline()
+            self._open_elements[-1][2] = True
+
+    def write_header(self):
+        """Write XML declaration"""
+        self._line.append('<?xml version="1.0" ?>')
+        self._newline()
+
+    def start(self, tag, attrib=None):
+        """Start element whose children will be written separately
+
+        The start tag is not written until the first child is, so that an
+        element without children is written as an empty element tag.
+
+        :param str tag: Tag of element
+        :param dict attrib: Attributes of element
+        """
+        self._open_parent()
+        if attrib is None:
+            attrib = {}
+        self._open_elements.append([tag, attrib, False])
+
+    def end(self):
+        """End innermost element opened with start"""
+        tag, attrib, opened = self._open_elements.pop()
+        indent = self.indent*len(self._open_elements)
+        if opened:
+            self._line.append("{}</{}>".format(indent, tag))
+        else:
+            self._write_start_tag(tag, attrib, indent)
+            self._line.append("/>")
+        self._newline()
+
+    def write_element(self, element):
+        """Write ElementTree element and all of its children
+
+        :param :py:class:xml.etree.ElementTree.Element element
+        """
+        self._open_parent()
+        self._write_element(element, self.indent*len(self._open_elements))
+
+    def _write_element(self, element, indent):
+        self._write_start_tag(element.tag, element.attrib, indent)
+        if len(element):
+            self._line.append(">")
+            self._newline()
+            child_indent = indent + self.indent
+            if element.text:
+                self._write_text(element.text, child_indent)
+            for child in element:
+                self._write_element(child, child_indent)
+                if child.tail:
+                    self._write_text(child.tail, child_indent)
+            self._line.append("{}</{}>".format(indent, element.tag))
+        elif element.text:
+            self._line.append(">")
+            self._write_data(element.text)
+            self._line.append("</{}>".format(element.tag))
+        else:
+            self._line.append("/>")
+        self._newline()
+
+    def close(self):
+        """End any elements which remain open and flush final line"""
+        while self._open_elements:
+            self.end()
+        self._newline()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Tests of batch axis conversions and rotation matrices against their
+scalar counterparts
+
+Scalar look-at and axis matrices are computed with the headless stand-in for
+mathutils.
+
+To run these tests, use the following command:
+python3 test_placement_batch.py
+"""
+
+import os
+import sys
+import math
+import random
+import unittest
+import warnings
+from array import array
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# pyw3d warns about each Blender module it cannot import
+warnings.simplefilter("ignore")
+from pyw3d import headless
+headless.install()
+from pyw3d.headless import mathutils
+from pyw3d.errors import EBKAC
+from pyw3d.placement import convert_to_blender_axes, \
+    convert_to_legacy_axes, convert_to_blender_axes_batch, \
+    convert_to_legacy_axes_batch, matrix_from_look, matrices_from_look, \
+    matrices_from_axis
+
+TOLERANCE = 1e-12
+
+
+def random_vectors(rng, num_vectors):
+    return [
+        tuple(rng.uniform(-10, 10) for axis in range(3))
+        for index in range(num_vectors)]
+
+
+def flat(vectors):
+    return array("d", [
+        component for vector in vectors for component in vector])
+
+
+class TestBatchPlacement(unittest.TestCase):
+    """Compare batch placement functions with scalar ones"""
+
+    def setUp(self):
+        rng = random.Random(0)
+        self.vectors = random_vectors(rng, 200)
+        self.ups = random_vectors(rng, 200)
+
+    def assertMatricesEqual(self, scalar_matrices, batch_matrices):
+        self.assertEqual(len(batch_matrices), 9*len(scalar_matrices))
+        for index, matrix in enumerate(scalar_matrices):
+            for row in range(3):
+                for column in range(3):
+                    self.assertAlmostEqual(
+                        matrix[row][column],
+                        batch_matrices[9*index + 3*row + column],
+                        delta=TOLERANCE,
+                        msg="element ({}, {}) of matrix {}".format(
+                            row, column, index))
+
+    def test_conversions(self):
+        for convert, convert_batch in (
+                (convert_to_blender_axes, convert_to_blender_axes_batch),
+                (convert_to_legacy_axes, convert_to_legacy_axes_batch)):
+            expected = flat([convert(vector) for vector in self.vectors])
+            for vectors in (self.vectors, flat(self.vectors)):
+                converted = convert_batch(vectors)
+                self.assertEqual(len(converted), len(expected))
+                for index, component in enumerate(converted):
+                    self.assertEqual(
+                        component, expected[index],
+                        msg="{}, component {} of vector {}".format(
+                            convert_batch.__name__, index % 3, index//3))
+
+    def test_round_trip(self):
+        converted = convert_to_legacy_axes_batch(
+            convert_to_blender_axes_batch(self.vectors))
+        for index, component in enumerate(flat(self.vectors)):
+            self.assertAlmostEqual(
+                converted[index], component, delta=TOLERANCE)
+
+    def test_empty(self):
+        self.assertEqual(len(convert_to_blender_axes_batch([])), 0)
+        self.assertEqual(len(matrices_from_look([])), 0)
+
+    def test_matrices_from_look(self):
+        expected = [
+            matrix_from_look(mathutils.Vector(look), mathutils.Vector(up))
+            for look, up in zip(self.vectors, self.ups)]
+        self.assertMatricesEqual(
+            expected, matrices_from_look(self.vectors, self.ups))
+        self.assertMatricesEqual(
+            expected, matrices_from_look(flat(self.vectors), flat(self.ups)))
+
+    def test_shared_up(self):
+        up = self.ups[0]
+        expected = [
+            matrix_from_look(mathutils.Vector(look), mathutils.Vector(up))
+            for look in self.vectors]
+        self.assertMatricesEqual(
+            expected, matrices_from_look(self.vectors, up))
+
+    def test_default_up(self):
+        expected = [
+            matrix_from_look(mathutils.Vector(look), mathutils.Vector(
+                (0, 1, 0)))
+            for look in self.vectors]
+        self.assertMatricesEqual(expected, matrices_from_look(self.vectors))
+
+    def test_matrices_from_axis(self):
+        angles = [
+            math.radians(index*7 % 360) for index in range(len(self.vectors))]
+        expected = [
+            mathutils.Matrix.Rotation(angle, 3, axis)
+            for angle, axis in zip(angles, self.vectors)]
+        self.assertMatricesEqual(
+            expected, matrices_from_axis(angles, self.vectors))
+
+    def test_mismatched_batches(self):
+        with self.assertRaises(EBKAC):
+            convert_to_blender_axes_batch(array("d", [1., 2.]))
+        with self.assertRaises(EBKAC):
+            matrices_from_look([(1, 0, 0)]*3, [(0, 1, 0)]*2)
+        with self.assertRaises(EBKAC):
+            matrices_from_axis([0., 1.], [(1, 0, 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()